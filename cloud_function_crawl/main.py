@@ -1,10 +1,18 @@
 # File: main.py  (Cloud Function: crawl_catalog)
 
-import io, json, requests, re, datetime
+import io, json, os, requests, re, datetime, hashlib
+from concurrent.futures import ThreadPoolExecutor
 from bs4 import BeautifulSoup
-from google.cloud import bigquery
+from google.cloud import bigquery, storage
 import functions_framework
 
+# ───────────────────────── 설정 ─────────────────────────
+GCS_BUCKET            = os.environ.get("GCS_BUCKET", "winged-precept-443218-v8.appspot.com")
+CRAWL_CACHE_PREFIX    = os.environ.get("CRAWL_CACHE_PREFIX", "catalog_crawl")
+CRAWL_PAGE_CONCURRENCY = int(os.environ.get("CRAWL_PAGE_CONCURRENCY", 4))
+# url_product 테이블 적재 (대시보드는 GCS 캐시를 읽으므로 기본 꺼짐)
+CRAWL_WRITE_URL_PRODUCT = os.environ.get("CRAWL_WRITE_URL_PRODUCT", "0") == "1"
+
 # ───────────────────────── 브라우저 수준 HEADERS ─────────────────────────
 HEADERS = {
     "User-Agent": (
@@ -35,6 +43,85 @@ def get_company_name_by_url(cate_url: str) -> str | None:
     row = next(client.query(query, job_config=job_cfg).result(), None)
     return row["company_name"] if row else None
 
+# ───────────────────────── GCS 캐시 / 작업 상태 ─────────────────────────
+#   cache : {prefix}/cache/{cache_key}.json  ← (company, category_url) 별 최신 결과
+#   job   : {prefix}/jobs/{job_id}.json      ← 진행 상황 (대시보드가 polling)
+def crawl_cache_key(company: str, cate_url: str) -> str:
+    return hashlib.sha1(f"{company}|{cate_url}".encode("utf-8")).hexdigest()[:20]
+
+def _bucket():
+    return storage.Client().bucket(GCS_BUCKET)
+
+def _write_json(bucket, path: str, obj: dict):
+    bucket.blob(path).upload_from_string(
+        json.dumps(obj, ensure_ascii=False), content_type="application/json"
+    )
+
+def _update_job(bucket, job_id: str | None, **fields):
+    """작업 상태 기록 (job_id 없이 호출된 동기 요청이면 생략, 실패해도 크롤링은 계속)"""
+    if not job_id:
+        return
+    try:
+        _write_json(bucket, f"{CRAWL_CACHE_PREFIX}/jobs/{job_id}.json", {
+            "job_id": job_id,
+            "updated_at": datetime.datetime.utcnow().isoformat(),
+            **fields,
+        })
+    except Exception as e:
+        print(f"[WARN] 작업 상태 기록 실패 ({job_id}): {e}")
+
+# ───────────────────────── 페이지 파싱 ─────────────────────────
+def _fetch_page(sess, cate_url: str, page_idx: int) -> list[dict]:
+    """카테고리 페이지 1개 → [{product_no, product_name}] (상품이 없으면 빈 리스트)"""
+    target_url = f"{cate_url}&page={page_idx}" if page_idx > 1 else cate_url
+    res = sess.get(target_url, timeout=20)
+    res.encoding = "utf-8"
+
+    soup = BeautifulSoup(res.text, "html.parser")
+    items = []
+    for li in soup.select("li[id^=anchorBoxId_]"):
+        m = re.match(r"anchorBoxId_(\d+)", li.get("id", ""))
+        if not m:
+            continue
+        spans = li.select("strong.name a span")
+        prod_nm = spans[-1].get_text(strip=True) if spans else ""
+        if not prod_nm:
+            continue
+        items.append({"product_no": m.group(1), "product_name": prod_nm})
+    return items
+
+def crawl_pages(sess, cate_url: str, max_pages: int, on_progress=None) -> list[dict]:
+    """
+    페이지를 CRAWL_PAGE_CONCURRENCY 개씩 동시에 요청
+    빈 페이지가 나오면 그 이전 페이지까지만 사용 (페이지 순서 유지)
+    """
+    items: list[dict] = []
+    page_idx = 1
+    with ThreadPoolExecutor(max_workers=CRAWL_PAGE_CONCURRENCY) as pool:
+        while True:
+            last = page_idx + CRAWL_PAGE_CONCURRENCY - 1
+            if max_pages:
+                last = min(last, max_pages)
+            if page_idx > last:
+                break
+
+            pages = list(range(page_idx, last + 1))
+            results = list(pool.map(lambda p: _fetch_page(sess, cate_url, p), pages))
+
+            reached_end = False
+            for page_items in results:
+                if not page_items:      # 다음 페이지 없음
+                    reached_end = True
+                    break
+                items += page_items
+            page_idx = last + 1
+
+            if on_progress:
+                on_progress(page_idx - 1, len(items))
+            if reached_end:
+                break
+    return items
+
 # ───────────────────────── Cloud Function 엔트리포인트 ─────────────────────────
 @functions_framework.http
 def crawl_catalog(request):
@@ -42,103 +129,105 @@ def crawl_catalog(request):
     Body(JSON):
       {
         "category_url": "https://piscess.shop/product/list.html?cate_no=76",
-        "max_pages": 10          # (선택) 기본 10, 0이면 끝까지
+        "max_pages": 10,         # (선택) 기본 10, 0이면 끝까지
+        "job_id": "...",         # (선택) 있으면 진행 상황을 GCS 작업 파일에 기록
+        "cache_key": "..."       # (선택) 결과 캐시 키 (없으면 company + category_url 로 계산)
       }
+    결과는 GCS 캐시(cache/{cache_key}.json)에 저장 → 대시보드는 캐시를 읽음
     """
+    data      = request.get_json(silent=True) or {}
+    job_id    = data.get("job_id")
+    bucket    = None
     try:
-        data      = request.get_json(silent=True) or {}
         cate_url  = data.get("category_url")
         max_pages = int(data.get("max_pages", 10))
 
         if not cate_url:
             return _resp({"status": "error", "msg": "category_url 누락"}, 400)
 
+        bucket = _bucket()
+        _update_job(bucket, job_id, state="running", pages_fetched=0, count=0)
+
         # 1️⃣ company_name 매핑
         company = get_company_name_by_url(cate_url)
         if not company:
+            _update_job(bucket, job_id, state="error", msg="company_name 조회 실패")
             return _resp({"status": "error", "msg": "company_name 조회 실패"}, 400)
+        cache_key = data.get("cache_key") or crawl_cache_key(company, cate_url)
 
         # 2️⃣ 세션 & 쿠키 확보 (timeout 20초)
         sess = requests.Session()
         sess.headers.update(HEADERS)
         base = f"https://{cate_url.split('/')[2]}"
         sess.get(base, timeout=20)   # 쿠키 사전 확보
+        sess.headers["Referer"] = base
+
+        # 3️⃣ 카탈로그 크롤링 (페이지 병렬)
+        items = crawl_pages(
+            sess, cate_url, max_pages,
+            on_progress=lambda pages, count: _update_job(
+                bucket, job_id, state="running", pages_fetched=pages, count=count
+            ),
+        )
 
-        # 3️⃣ 카탈로그 크롤링
-        rows = []
-        page_idx = 1
-        while True:
-            if max_pages and page_idx > max_pages:
-                break
-
-            target_url = f"{cate_url}&page={page_idx}" if page_idx > 1 else cate_url
-            sess.headers["Referer"] = base
-            res = sess.get(target_url, timeout=20)
-            res.encoding = "utf-8"
-
-            soup = BeautifulSoup(res.text, "html.parser")
-            li_tags = soup.select("li[id^=anchorBoxId_]")
-            if not li_tags:      # 다음 페이지 없음
-                break
+        # 같은 상품이 여러 페이지에 노출될 수 있으므로 첫 등장만 유지
+        seen, products = set(), []
+        for it in items:
+            if it["product_no"] not in seen:
+                seen.add(it["product_no"])
+                products.append(it)
 
-            for li in li_tags:
-                m = re.match(r"anchorBoxId_(\d+)", li.get("id", ""))
-                if not m:
-                    continue
-                prod_no = m.group(1)
-
-                spans = li.select("strong.name a span")
-                prod_nm = spans[-1].get_text(strip=True) if spans else ""
-                if not prod_nm:
-                    continue
-
-                rows.append(
-                    {
-                        "company_name": company,
-                        "product_no": prod_no,
-                        "product_name": prod_nm,
-                        "updated_at": datetime.datetime.utcnow().isoformat(),
-                    }
-                )
-
-            page_idx += 1
-
-        if not rows:
+        if not products:
+            _update_job(bucket, job_id, state="empty", msg="크롤링된 상품이 없습니다.")
             return _resp({"status": "empty", "msg": "크롤링된 상품이 없습니다."})
 
-        # 4️⃣ BigQuery: 해당 company_name 데이터만 삭제 후 새 데이터 추가
-        client   = bigquery.Client()
-        table_id = "winged-precept-443218-v8.ngn_dataset.url_product"
-
-        # 4-1) 해당 회사의 기존 데이터 삭제 (다른 회사 데이터는 유지)
-        delete_query = """
-            DELETE FROM `winged-precept-443218-v8.ngn_dataset.url_product`
-            WHERE company_name = @company_name
-        """
-        delete_job = client.query(
-            delete_query,
-            job_config=bigquery.QueryJobConfig(
-                query_parameters=[bigquery.ScalarQueryParameter("company_name", "STRING", company)]
-            )
-        )
-        delete_job.result()  # 삭제 완료 대기
+        # 4️⃣ (company, category_url) 캐시 저장
+        crawled_at = datetime.datetime.utcnow().isoformat()
+        _write_json(bucket, f"{CRAWL_CACHE_PREFIX}/cache/{cache_key}.json", {
+            "company_name": company,
+            "category_url": cate_url,
+            "crawled_at": crawled_at,
+            "products": products,
+        })
 
-        # 4-2) 새 데이터 추가 (WRITE_APPEND)
-        load_cfg = bigquery.LoadJobConfig(
-            source_format=bigquery.SourceFormat.NEWLINE_DELIMITED_JSON,
-            write_disposition=bigquery.WriteDisposition.WRITE_APPEND,
-        )
-        json_data = "\n".join(json.dumps(r, ensure_ascii=False) for r in rows).encode("utf-8")
-        load_job = client.load_table_from_file(
-            io.BytesIO(json_data), table_id, job_config=load_cfg, rewind=True
-        )
-        load_job.result()  # 완료 대기
+        if CRAWL_WRITE_URL_PRODUCT:
+            _load_url_product(company, products, crawled_at)
 
-        return _resp({"status": "success", "count": len(rows), "company": company})
+        _update_job(bucket, job_id, state="success", count=len(products), cache_key=cache_key)
+        return _resp({"status": "success", "count": len(products), "company": company, "cache_key": cache_key})
 
     except Exception as e:
+        if bucket is not None:
+            _update_job(bucket, job_id, state="error", msg=str(e))
         return _resp({"status": "error", "msg": str(e)}, 500)
 
+# ───────────────────────── (선택) url_product 적재 ─────────────────────────
+def _load_url_product(company: str, products: list[dict], crawled_at: str):
+    """BigQuery: 해당 company_name 데이터만 삭제 후 새 데이터 추가"""
+    client   = bigquery.Client()
+    table_id = "winged-precept-443218-v8.ngn_dataset.url_product"
+
+    delete_query = """
+        DELETE FROM `winged-precept-443218-v8.ngn_dataset.url_product`
+        WHERE company_name = @company_name
+    """
+    client.query(
+        delete_query,
+        job_config=bigquery.QueryJobConfig(
+            query_parameters=[bigquery.ScalarQueryParameter("company_name", "STRING", company)]
+        )
+    ).result()
+
+    rows = [{"company_name": company, **p, "updated_at": crawled_at} for p in products]
+    load_cfg = bigquery.LoadJobConfig(
+        source_format=bigquery.SourceFormat.NEWLINE_DELIMITED_JSON,
+        write_disposition=bigquery.WriteDisposition.WRITE_APPEND,
+    )
+    json_data = "\n".join(json.dumps(r, ensure_ascii=False) for r in rows).encode("utf-8")
+    client.load_table_from_file(
+        io.BytesIO(json_data), table_id, job_config=load_cfg, rewind=True
+    ).result()
+
 # ───────────────────────── 공통 응답 헬퍼 ─────────────────────────
 def _resp(obj: dict, code: int = 200):
     return (json.dumps(obj, ensure_ascii=False), code, {"Content-Type": "application/json"})
@@ -79,7 +79,7 @@ gcloud run deploy "$SERVICE" \
   --max-instances=3 \
   --cpu-boost \
   --execution-environment=gen2 \
-  --set-env-vars="PYTHONUNBUFFERED=1,GOOGLE_CLOUD_PROJECT=${PROJECT}" \
+  --set-env-vars="PYTHONUNBUFFERED=1,GOOGLE_CLOUD_PROJECT=${PROJECT},CROP_CACHE_BUCKET=${PROJECT}.appspot.com" \
   --quiet
 
 # 9. 새 서비스 URL 가져오기
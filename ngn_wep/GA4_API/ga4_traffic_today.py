@@ -5,6 +5,11 @@ from googleapiclient.discovery import build
 from datetime import datetime, timezone, timedelta
 import logging
 
+try:
+    from bq_query import run_query  # Cloud Run Job 이미지: /app/bq_query.py
+except ImportError:
+    from ngn_wep.dashboard.utils.bq_query import run_query
+
 # ✅ 한국 시간대 설정
 KST = timezone(timedelta(hours=9))
 
@@ -33,7 +38,7 @@ def get_ga4_property_ids():
     ORDER BY ga4_property_id
     """
     try:
-        results = bigquery_client.query(query).result()
+        results = run_query(bigquery_client, query, service="ga4_traffic_today")
         property_ids = [int(row.ga4_property_id) for row in results]
         logging.info(f"✅ GA4 Property IDs 로드 완료: {property_ids}")
         return property_ids
@@ -52,8 +57,7 @@ def collect_ga4_traffic(start_date, end_date):
     WHERE event_date BETWEEN DATE("{start_date}") AND DATE("{end_date}")
     """
     try:
-        delete_job = bigquery_client.query(delete_query)
-        delete_job.result()
+        run_query(bigquery_client, delete_query, service="ga4_traffic_today")
         logging.info(f"✅ 기존 데이터 삭제 완료")
     except Exception as e:
         logging.error(f"❌ 기존 데이터 삭제 실패: {e}")
@@ -226,8 +230,7 @@ def update_ga4_traffic_ngn(start_date, end_date):
         );
     """
 
-    query_job = bigquery_client.query(merge_query)
-    query_job.result()
+    run_query(bigquery_client, merge_query, service="ga4_traffic_today")
     logging.info(f"✅ {TABLE_ID_TRAFFIC_NGN} 테이블 업데이트 완료!")
 
 
@@ -5,6 +5,11 @@ from googleapiclient.discovery import build
 from datetime import datetime, timezone, timedelta
 import logging
 
+try:
+    from bq_query import run_query  # Cloud Run Job 이미지: /app/bq_query.py
+except ImportError:
+    from ngn_wep.dashboard.utils.bq_query import run_query
+
 # ✅ 한국 시간대 설정
 KST = timezone(timedelta(hours=9))
 
@@ -34,7 +39,7 @@ def get_ga4_property_ids():
     ORDER BY ga4_property_id
     """
     try:
-        results = bigquery_client.query(query).result()
+        results = run_query(bigquery_client, query, service="ga4_viewitem_today")
         property_ids = [int(row.ga4_property_id) for row in results]
         logging.info(f"✅ GA4 Property IDs 로드 완료: {property_ids}")
         return property_ids
@@ -250,7 +255,7 @@ def update_ga4_viewitem_ngn(target_date=None):
         );
     """
 
-    bigquery_client.query(merge_query).result()
+    run_query(bigquery_client, merge_query, service="ga4_viewitem_today")
     logging.info(f"✅ {TABLE_ID_TARGET} 테이블 업데이트 완료!")
 
 
@@ -4,6 +4,11 @@ from google.cloud import bigquery
 from datetime import datetime, timedelta, timezone
 import logging
 
+try:
+    from bq_query import run_query  # Cloud Run Job 이미지: /app/bq_query.py
+except ImportError:
+    from ngn_wep.dashboard.utils.bq_query import run_query
+
 # 한국 시간대 설정
 KST = timezone(timedelta(hours=9))
 today = datetime.now(KST).strftime("%Y-%m-%d")
@@ -199,13 +204,13 @@ def execute_bigquery(process_type="today"):
 
     try:
         logging.info(f"🚀 임시 테이블 생성 중... ({process_type})")
-        client.query(create_temp_table_query).result()
+        run_query(client, create_temp_table_query, service="daily_cafe24_items")
 
         logging.info("🔄 메인 테이블 병합 중...")
-        client.query(merge_query).result()
+        run_query(client, merge_query, service="daily_cafe24_items")
 
         logging.info("🧹 임시 테이블 삭제 중...")
-        client.query(drop_query).result()
+        run_query(client, drop_query, service="daily_cafe24_items")
 
         logging.info("✅ 전체 쿼리 완료! 최근 데이터가 반영되었습니다.")
 
@@ -3,6 +3,11 @@ from google.cloud import bigquery
 from datetime import datetime, timedelta, timezone
 import logging
 
+try:
+    from bq_query import run_query as bq_run_query  # Cloud Run Job 이미지: /app/bq_query.py
+except ImportError:
+    from ngn_wep.dashboard.utils.bq_query import run_query as bq_run_query
+
 # ✅ 한국 시간대 설정
 KST = timezone(timedelta(hours=9))
 current_time = datetime.now(timezone.utc).astimezone(KST)
@@ -209,8 +214,7 @@ def run_query(process_date):
 
     logging.info(f"🚀 '{process_date}' 기준으로 쿼리 실행 중...")
     try:
-        query_job = client.query(query)
-        query_job.result()
+        bq_run_query(client, query, service="daily_cafe24_sales")
         logging.info(f"✅ '{process_date}' 기준으로 데이터 성공적으로 처리되었습니다!")
     except Exception as e:
         logging.error(f"❌ 쿼리 실행 실패: {e}")
@@ -10,6 +10,11 @@ from calendar import monthrange
 import logging
 import time
 
+try:
+    from bq_query import run_query  # Cloud Run Job 이미지: /app/bq_query.py
+except ImportError:
+    from ngn_wep.dashboard.utils.bq_query import run_query
+
 # ✅ 한국 시간대 설정
 KST = timezone(timedelta(hours=9))
 current_time = datetime.now(timezone.utc).astimezone(KST)
@@ -182,8 +187,7 @@ def run_daily_sales_query(process_date):
     logging.info(f"🚀 daily_cafe24_sales: '{process_date}' 처리 중...")
     try:
         start_time = time.time()
-        query_job = client.query(query)
-        query_job.result()
+        run_query(client, query, service="daily_cafe24_sales_prev_month")
         elapsed = time.time() - start_time
         logging.info(f"✅ daily_cafe24_sales: '{process_date}' 완료! (소요 시간: {elapsed:.2f}초)")
         return True
@@ -201,8 +205,7 @@ def delete_period_data(start_date, end_date):
     
     logging.info(f"🗑️  데이터 삭제 중: {start_date} ~ {end_date}")
     try:
-        query_job = client.query(delete_query)
-        query_job.result()
+        run_query(client, delete_query, service="daily_cafe24_sales_prev_month")
         logging.info(f"✅ 삭제 완료: {start_date} ~ {end_date}")
         return True
     except Exception as e:
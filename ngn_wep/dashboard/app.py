@@ -49,6 +49,8 @@ from .handlers.data_handler       import data_blueprint
 from .handlers.auth_handler       import auth_blueprint
 from .services.meta_demo_handler  import meta_demo_blueprint
 from .handlers.mobile_handler     import mobile_blueprint
+from .utils.request_classifier    import classify_request, is_mobile_request
+from .utils.log_utils             import DEBUG, get_logger, log_event
 
 # ─────────────────────────────────────────────
 # 5) Flask 앱 생성 & 기본 설정
@@ -80,76 +82,14 @@ LOG.info("GCP 인증: ADC(Application Default Credentials) 사용")
 # ─────────────────────────────────────────────
 # 6) 모바일 디바이스 감지 함수
 # ─────────────────────────────────────────────
+REQ_LOG = get_logger("ngn.request")
+
 def is_mobile_device():
-    """모바일 디바이스인지 확인 - 개선된 버전"""
-    user_agent = request.headers.get('User-Agent', '').lower()
-    
-    # 확장된 모바일 키워드 목록
-    mobile_keywords = [
-        'mobile', 'android', 'iphone', 'ipad', 'blackberry', 'windows phone',
-        'opera mini', 'opera mobi', 'mobile safari', 'mobile chrome',
-        'samsung', 'lg', 'huawei', 'xiaomi', 'oneplus', 'motorola',
-        'nexus', 'pixel', 'galaxy', 'note', 'edge', 'plus',
-        'kindle', 'nook', 'tablet', 'phone', 'smartphone',
-        'chrome mobile', 'firefox mobile', 'safari mobile'
-    ]
-    
-    # 디버깅을 위한 로그 추가
-    print(f"[MOBILE DETECTION] User-Agent: {user_agent}")
-    print(f"[MOBILE DETECTION] Mobile keywords found: {[kw for kw in mobile_keywords if kw in user_agent]}")
-    
-    # 1. 화면 크기 기반 감지 (쿼리 파라미터로)
-    screen_width = request.args.get('screen_width')
-    if screen_width:
-        try:
-            width = int(screen_width)
-            if width <= 768:  # 모바일 기준 너비
-                print(f"[MOBILE DETECTION] Screen width detected: {width}px (mobile)")
-                return True
-        except ValueError:
-            pass
-    
-    # 2. User-Agent 기반 감지 (개선된 키워드)
-    is_mobile_ua = any(keyword in user_agent for keyword in mobile_keywords)
-    
-    # 3. 추가 모바일 감지: Accept 헤더 확인
-    accept_header = request.headers.get('Accept', '').lower()
-    is_mobile_accept = 'application/vnd.wap.xhtml+xml' in accept_header or 'text/vnd.wap.wml' in accept_header
-    
-    # 4. 추가 모바일 감지: 특정 모바일 브라우저 패턴
-    mobile_patterns = [
-        r'mozilla/.*mobile',
-        r'mozilla/.*android.*mobile',
-        r'mozilla/.*iphone.*mobile',
-        r'mozilla/.*ipad.*mobile',
-        r'chrome/.*mobile',
-        r'firefox/.*mobile',
-        r'safari/.*mobile',
-        r'android.*mobile',
-        r'iphone.*mobile',
-        r'ipad.*mobile'
-    ]
-    
-    import re
-    is_mobile_pattern = any(re.search(pattern, user_agent, re.IGNORECASE) for pattern in mobile_patterns)
-    
-    # 5. 추가 모바일 감지: Viewport 확인 (클라이언트 사이드에서 전송된 경우)
-    viewport_width = request.args.get('viewport_width')
-    if viewport_width:
-        try:
-            width = int(viewport_width)
-            if width <= 768:
-                print(f"[MOBILE DETECTION] Viewport width detected: {width}px (mobile)")
-                return True
-        except ValueError:
-            pass
-    
-    # 6. 최종 모바일 판단
-    is_mobile = is_mobile_ua or is_mobile_accept or is_mobile_pattern
-    
-    print(f"[MOBILE DETECTION] UA-based: {is_mobile_ua}, Accept-based: {is_mobile_accept}, Pattern-based: {is_mobile_pattern}")
-    print(f"[MOBILE DETECTION] Final Result: {is_mobile}")
-    
+    """모바일 디바이스인지 확인 (미리 컴파일된 규칙 + User-Agent별 LRU 캐시)"""
+    is_mobile = is_mobile_request(request)
+    if REQ_LOG.isEnabledFor(DEBUG):
+        log_event(REQ_LOG, DEBUG, "MOBILE DETECTION", result=is_mobile,
+                  user_agent=request.headers.get("User-Agent", ""), **classify_request(request))
     return is_mobile
 
 # ─────────────────────────────────────────────
@@ -345,6 +285,13 @@ def admake_manage_page():
     if not account_id:
         return redirect(url_for("ads_page"))
 
+    # 페이지가 그려지는 동안 광고 목록을 미리 조회 (프론트의 get_active_ads 요청은 캐시/진행 중 조회 결과 사용)
+    # refresh=1 (광고 게시 직후 이동) → 이 워커의 캐시도 버리고 새로 조회
+    from .utils.meta_read_model import invalidate_active_ads, prefetch_active_ads
+    if request.args.get('refresh') == '1':
+        invalidate_active_ads(account_id)
+    prefetch_active_ads(account_id)
+
     return render_template("admake_admanage_page.html",
                            company_names=session.get("company_names", []),
                            account_id=account_id)
@@ -470,12 +417,19 @@ app.register_blueprint(meta_demo_blueprint, url_prefix="/meta-api")
 app.register_blueprint(mobile_blueprint,    url_prefix="/m")
 
 # ─────────────────────────────────────────────
-# 9) 부팅 완료 로그
+# 9) 주간 트렌드 아티팩트 워커 메모리 적재 (백그라운드)
+# ─────────────────────────────────────────────
+if os.getenv("TREND_ARTIFACT_WARM", "1") == "1":
+    from .utils.trend_artifact_cache import get_trend_artifact_cache
+    get_trend_artifact_cache().warm()
+
+# ─────────────────────────────────────────────
+# 10) 부팅 완료 로그
 # ─────────────────────────────────────────────
 LOG.info("⭐ app import done in %.1fs", time.time() - _boot)
 
 # ─────────────────────────────────────────────
-# 10) 개발 모드 직접 실행 (로컬)
+# 11) 개발 모드 직접 실행 (로컬)
 # ─────────────────────────────────────────────
 if __name__ == "__main__":
     debug_mode = os.getenv("FLASK_ENV", "production") == "development"
@@ -1,6 +1,7 @@
 import os
 from flask import Blueprint, jsonify
 from google.cloud import bigquery
+from ..utils.bq_query import run_query
 
 # ✅ Cloud Run에서는 키 파일 대신 런타임 서비스계정(ADC)을 사용
 # GOOGLE_APPLICATION_CREDENTIALS 환경변수가 설정되어 있으면 제거하여 ADC 사용
@@ -23,7 +24,7 @@ def get_accounts():
     WHERE LOWER(company_name) != 'demo'
     ORDER BY company_name
     """
-    results = client.query(query).result()
+    results = run_query(client, query, service="accounts_handler")
     accounts = [row.company_name for row in results]
 
     return jsonify({"accounts": accounts})
@@ -8,6 +8,7 @@ from flask import (
     session, url_for, jsonify
 )
 from google.cloud import bigquery
+from ..utils.bq_query import run_query
 
 # ✅ Cloud Run에서는 키 파일 대신 런타임 서비스계정(ADC)을 사용
 # GOOGLE_APPLICATION_CREDENTIALS 환경변수가 설정되어 있으면 제거하여 ADC 사용
@@ -79,7 +80,7 @@ def login():
                     bigquery.ScalarQueryParameter("password", "STRING", password),
                 ]
             )
-            result = list(client.query(query, job_config=job_config).result())
+            result = list(run_query(client, query, job_config=job_config, service="auth_handler"))
         except Exception as e:
             print(f"[ERROR] 유저 쿼리 실패: {e}")
             # 모바일인 경우 모바일 로그인 페이지로 에러 표시
@@ -119,7 +120,7 @@ def login():
                         bigquery.ScalarQueryParameter("user_id", "STRING", user_id),
                     ]
                 )
-                rows = client.query(company_query, job_config=company_job_config).result()
+                rows = run_query(client, company_query, job_config=company_job_config, service="auth_handler")
                 company_names = [
                     row.company_name
                     for row in rows
@@ -134,7 +135,7 @@ def login():
                         FROM `ngn_dataset.user_company_map`
                         WHERE LOWER(company_name) != 'demo'
                     """
-                    rows = client.query(all_company_query).result()
+                    rows = run_query(client, all_company_query, service="auth_handler")
                     company_names = [row.company_name for row in rows]
 
         except Exception as e:
@@ -186,7 +187,7 @@ def handle_adcanvas_login(user_id: str, client: bigquery.Client):
                 bigquery.ScalarQueryParameter("user_id", "STRING", user_id)
             ]
         )
-        result = list(client.query(query, job_config=job_config).result())
+        result = list(run_query(client, query, job_config=job_config, service="auth_handler"))
 
         print(f"[AdCanvas] 사용자 {user_id}의 Meta 계정 수: {len(result)}")
 
@@ -6,7 +6,8 @@ import json
 import gzip
 import io
 import re
-from flask import Blueprint, request, jsonify, session, Response
+import hmac
+from flask import Blueprint, request, jsonify, session, Response, send_file
 from google.cloud import bigquery
 from google.cloud import storage
 import time
@@ -33,6 +34,15 @@ except (ImportError, ModuleNotFoundError) as e:
 
 # 캐시 유틸리티 임포트
 from ..utils.cache_utils import get_cache_stats, invalidate_cache_by_pattern
+from ..utils.image_proxy_cache import get_cached_image, get_image_proxy_stats
+from ..utils.monthly_snapshot_cache import get_monthly_snapshot_cache
+from ..utils.trend_artifact_cache import get_trend_artifact_cache, publish_trend_artifact
+from ..utils.pending_ad_store import LEGACY_SESSION_KEY, get_pending_ad_store
+from ..utils.meta_graph_batch import GRAPH_BATCH_MAX_OPS, batch_op, batch_result_error, pack_op_groups, run_batches
+from ..utils.meta_read_model import get_active_ads_cached, get_meta_account_mapping, invalidate_active_ads
+from ..utils.log_utils import DEBUG, INFO, get_logger, log_event
+from ..utils.request_tracing import render_metrics, start_trace
+from ..utils.bq_query import get_query_stats, run_query
 
 # 📦 서비스 함수 임포트 (기능별 정리)
 from ..services.cafe24_service import (
@@ -79,6 +89,9 @@ from ..services.compare_29cm_service import (
 
 
 data_blueprint = Blueprint("data", __name__, url_prefix="/dashboard")
+REQ_LOG = get_logger("ngn.request")
+# /dashboard/internal/metrics 접근 토큰 (비어 있으면 엔드포인트 비활성 - 서비스가 공개 배포되므로 항상 토큰 필요)
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
 
 
 def filter_ai_report_by_company(analysis_report: str, company_name: str) -> str:
@@ -181,10 +194,27 @@ def cache_stats():
     """캐시 상태 정보 조회"""
     try:
         stats = get_cache_stats()
-        return jsonify({"status": "success", "cache_stats": stats}), 200
+        return jsonify({
+            "status": "success",
+            "cache_stats": stats,
+            "image_proxy_stats": get_image_proxy_stats(),
+            "monthly_snapshot_stats": get_monthly_snapshot_cache().stats(),
+            "trend_artifact_stats": get_trend_artifact_cache().stats(),
+            "bigquery_query_stats": get_query_stats(request.args.get("top", type=int) or None)
+        }), 200
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
 
+@data_blueprint.route("/internal/metrics", methods=["GET"])
+def internal_metrics():
+    """요청/패널 지연시간 분위수, 캐시 hit/miss, BigQuery 사용량 지표 (Prometheus 텍스트 형식, 워커별 값)"""
+    if not METRICS_TOKEN:
+        # 토큰 미설정 → 업체별 지표가 노출되지 않도록 엔드포인트 자체를 숨김
+        return Response("not found\n", status=404, mimetype="text/plain")
+    if not hmac.compare_digest(request.headers.get("X-Metrics-Token", ""), METRICS_TOKEN):
+        return Response("forbidden\n", status=403, mimetype="text/plain")
+    return Response(render_metrics(), mimetype="text/plain; version=0.0.4; charset=utf-8")
+
 @data_blueprint.route("/cache/invalidate", methods=["POST"])
 def cache_invalidate():
     """캐시 무효화 (패턴 기반)"""
@@ -273,6 +303,7 @@ def get_start_end_dates(period, start_date=None, end_date=None):
 @data_blueprint.route("/get_data", methods=["POST"])
 def get_dashboard_data_route():
     t0 = time.time()
+    trace = None
     try:
         data = request.get_json()
         user_id = session.get("user_id")
@@ -328,29 +359,24 @@ def get_dashboard_data_route():
                 period = "manual"
             start_date, end_date = get_start_end_dates(period, start_date, end_date)
 
-        print(f"[DEBUG] 요청 필터 - company_name={company_name}, period={period}, "
-              f"start_date={start_date}, end_date={end_date}, page={page}, limit={limit}, data_type={data_type}")
-        print(f"[DEBUG] date_type={date_type}, date_sort={date_sort}, sort_by={sort_by}")
-        print(f"[DEBUG] 정규화된 data_type: '{data_type}'")
-        print(f"[DEBUG] performance_summary 조건 확인: data_type in ['performance_summary', 'all'] = {data_type in ['performance_summary', 'all']}")
+        log_event(REQ_LOG, DEBUG, "GET_DATA", company_name=company_name, period=period,
+                  start_date=start_date, end_date=end_date, page=page, limit=limit, data_type=data_type,
+                  date_type=date_type, date_sort=date_sort, sort_by=sort_by)
+        trace = start_trace("get_data", data_type, company_name)
 
         response_data = {"status": "success"}
-        timing_log = {}
         fetch_tasks = []
         results_map = {}
         with ThreadPoolExecutor() as executor:
             # Performance Summary
             if data_type in ["performance_summary", "all"]:
                 def fetch_performance():
-                    t1 = time.time()
                     performance_data = get_performance_summary_new(
                         company_name=company_name,
                         start_date=start_date,
                         end_date=end_date,
                         user_id=user_id
                     )
-                    t2 = time.time()
-                    timing_log["performance_summary"] = round(t2-t1, 3)
                     
                     # 🔥 ISO 형식으로 날짜 변환 (JavaScript에서 파싱 가능)
                     latest_update = None
@@ -365,95 +391,75 @@ def get_dashboard_data_route():
                                 break
                     
                     return ("performance_summary", performance_data[offset:offset + limit], len(performance_data), latest_update)
-                fetch_tasks.append(executor.submit(fetch_performance))
+                fetch_tasks.append(executor.submit(trace.wrap("performance_summary", fetch_performance)))
             
             # Cafe24 Sales
             if data_type in ["cafe24_sales", "all"]:
                 def fetch_cafe24_sales():
-                    t1 = time.time()
                     result = get_cafe24_sales_data(
                         company_name, period, start_date, end_date,
                         date_type, date_sort, limit, page, user_id
                     )
-                    t2 = time.time()
-                    timing_log["cafe24_sales"] = round(t2-t1, 3)
                     return ("cafe24_sales", result["rows"], result["total_count"])
-                fetch_tasks.append(executor.submit(fetch_cafe24_sales))
+                fetch_tasks.append(executor.submit(trace.wrap("cafe24_sales", fetch_cafe24_sales)))
             
             # Cafe24 Product Sales
             if data_type in ["cafe24_product_sales", "all"]:
                 def fetch_cafe24_product_sales():
-                    t1 = time.time()
                     result = get_cafe24_product_sales(
                         company_name, period, start_date, end_date,
                         sort_by=sort_by, limit=limit, page=page, user_id=user_id
                     )
-                    t2 = time.time()
-                    timing_log["cafe24_product_sales"] = round(t2-t1, 3)
                     return ("cafe24_product_sales", result["rows"], result["total_count"])
-                fetch_tasks.append(executor.submit(fetch_cafe24_product_sales))
+                fetch_tasks.append(executor.submit(trace.wrap("cafe24_product_sales", fetch_cafe24_product_sales)))
             
             # ViewItem Summary
             if data_type in ["viewitem_summary", "all"]:
                 def fetch_viewitem_summary():
-                    t1 = time.time()
                     data_rows = get_viewitem_summary(company_name, start_date, end_date, limit=500)
-                    t2 = time.time()
-                    timing_log["viewitem_summary"] = round(t2-t1, 3)
                     return ("viewitem_summary", data_rows, len(data_rows))
-                fetch_tasks.append(executor.submit(fetch_viewitem_summary))
+                fetch_tasks.append(executor.submit(trace.wrap("viewitem_summary", fetch_viewitem_summary)))
             
             # GA4 Source Summary
             if data_type in ["ga4_source_summary", "all"]:
                 def fetch_ga4_source_summary():
-                    t1 = time.time()
                     try:
                         # 캐시 무효화 파라미터 추출
                         cache_buster = data.get('_cache_buster')
-                        print(f"[DEBUG] GA4 Source Summary 호출 - company: {company_name}, start: {start_date}, end: {end_date}")
-                        print(f"[DEBUG] GA4 Source Summary 파라미터 타입 - company: {type(company_name)}, start: {type(start_date)}, end: {type(end_date)}")
-                        print(f"[DEBUG] GA4 Source Summary 전체 data: {data}")
+                        log_event(REQ_LOG, DEBUG, "GA4_SOURCE_SUMMARY", company_name=company_name,
+                                  start_date=start_date, end_date=end_date, payload=data)
                         
                         if not start_date or not end_date:
                             print(f"[ERROR] GA4 Source Summary - start_date 또는 end_date가 없습니다!")
                             return ("ga4_source_summary", [], 0)
                         
                         data_rows = get_ga4_source_summary(company_name, start_date, end_date, limit=100, _cache_buster=cache_buster)
-                        t2 = time.time()
-                        timing_log["ga4_source_summary"] = round(t2-t1, 3)
                         return ("ga4_source_summary", data_rows[offset:offset + limit], len(data_rows))
                     except Exception as e:
                         print(f"[ERROR] GA4 Source Summary 오류: {type(e).__name__}: {str(e)}")
                         return ("ga4_source_summary", [], 0)
-                fetch_tasks.append(executor.submit(fetch_ga4_source_summary))
+                fetch_tasks.append(executor.submit(trace.wrap("ga4_source_summary", fetch_ga4_source_summary)))
             
             # Monthly Net Sales & Visitors Chart
             if data_type == "monthly_net_sales_visitors":
                 def fetch_monthly_net_sales_visitors():
-                    t1 = time.time()
                     data_rows = get_monthly_net_sales_visitors(company_name)
-                    t2 = time.time()
-                    timing_log["monthly_net_sales_visitors"] = round(t2-t1, 3)
                     return ("monthly_net_sales_visitors", data_rows, len(data_rows))
-                fetch_tasks.append(executor.submit(fetch_monthly_net_sales_visitors))
+                fetch_tasks.append(executor.submit(trace.wrap("monthly_net_sales_visitors", fetch_monthly_net_sales_visitors)))
             
             # Product Sales Ratio
             if data_type == "product_sales_ratio":
                 def fetch_product_sales_ratio():
-                    t1 = time.time()
                     from ..services.product_sales_ratio import get_product_sales_ratio
                     # ⬇️ 서비스 함수는 리스트 파라미터를 기대하므로 문자열이면 리스트로 래핑
                     _company_names = company_name if isinstance(company_name, list) else [company_name]
                     data_rows = get_product_sales_ratio(_company_names, start_date, end_date, limit=50, user_id=user_id)
-                    t2 = time.time()
-                    timing_log["product_sales_ratio"] = round(t2-t1, 3)
                     return ("product_sales_ratio", data_rows)
-                fetch_tasks.append(executor.submit(fetch_product_sales_ratio))
+                fetch_tasks.append(executor.submit(trace.wrap("product_sales_ratio", fetch_product_sales_ratio)))
             
             # Platform Sales Summary
             if data_type == "platform_sales_summary":
                 def fetch_platform_sales_summary():
-                    t1 = time.time()
                     from ..services.platform_sales_summary import get_platform_sales_by_day
                     # ⬇️ 서비스 함수는 리스트 파라미터를 기대하므로 문자열이면 리스트로 래핑
                     _company_names = company_name if isinstance(company_name, list) else [company_name]
@@ -465,15 +471,12 @@ def get_dashboard_data_route():
                         date_type=date_type,
                         date_sort=date_sort
                     )
-                    t2 = time.time()
-                    timing_log["platform_sales_summary"] = round(t2-t1, 3)
                     return ("platform_sales_summary", data_rows, len(data_rows))
-                fetch_tasks.append(executor.submit(fetch_platform_sales_summary))
+                fetch_tasks.append(executor.submit(trace.wrap("platform_sales_summary", fetch_platform_sales_summary)))
             
             # Platform Sales Ratio (파이차트용)
             if data_type == "platform_sales_ratio":
                 def fetch_platform_sales_ratio():
-                    t1 = time.time()
                     from ..services.platform_sales_summary import get_platform_sales_ratio
                     _company_names = company_name if isinstance(company_name, list) else [company_name]
 
@@ -482,22 +485,17 @@ def get_dashboard_data_route():
                         start_date=start_date,
                         end_date=end_date
                     )
-                    t2 = time.time()
-                    timing_log["platform_sales_ratio"] = round(t2-t1, 3)
                     return ("platform_sales_ratio", data_rows)
-                fetch_tasks.append(executor.submit(fetch_platform_sales_ratio))
+                fetch_tasks.append(executor.submit(trace.wrap("platform_sales_ratio", fetch_platform_sales_ratio)))
             
             # Platform Sales Monthly
             if data_type == "platform_sales_monthly":
                 def fetch_monthly_platform_sales():
-                    t1 = time.time()
                     from ..services.platform_sales_summary import get_monthly_platform_sales
                     _company_names = company_name if isinstance(company_name, list) else [company_name]
                     data_rows = get_monthly_platform_sales(_company_names)
-                    t2 = time.time()
-                    timing_log["platform_sales_monthly"] = round(t2-t1, 3)
                     return ("platform_sales_monthly", data_rows, len(data_rows))
-                fetch_tasks.append(executor.submit(fetch_monthly_platform_sales))
+                fetch_tasks.append(executor.submit(trace.wrap("platform_sales_monthly", fetch_monthly_platform_sales)))
 
         # Collect results
         for future in fetch_tasks:
@@ -534,7 +532,6 @@ def get_dashboard_data_route():
 
         # Meta 광고 관련 데이터 요청 처리
         if data_type == "meta_ads_insight_table":
-            t1 = time.time()
             from ..services.meta_ads_insight import get_meta_ads_insight_table
 
             level = data.get("level", "account")
@@ -546,20 +543,19 @@ def get_dashboard_data_route():
             limit = data.get("limit", None)
             page = data.get("page", 1)
 
-            rows = get_meta_ads_insight_table(
-                level=level,
-                company_name=company_name,
-                start_date=start_date,
-                end_date=end_date,
-                account_id=account_id,
-                campaign_id=campaign_id,
-                adset_id=adset_id,
-                date_type=date_type,
-                limit=limit,
-                page=page
-            )
-            t2 = time.time()
-            timing_log["meta_ads_insight_table"] = round(t2-t1, 3)
+            with trace.span("meta_ads_insight_table"):
+                rows = get_meta_ads_insight_table(
+                    level=level,
+                    company_name=company_name,
+                    start_date=start_date,
+                    end_date=end_date,
+                    account_id=account_id,
+                    campaign_id=campaign_id,
+                    adset_id=adset_id,
+                    date_type=date_type,
+                    limit=limit,
+                    page=page
+                )
             
             # 페이지네이션된 결과 처리
             if isinstance(rows, dict) and "rows" in rows:
@@ -579,7 +575,7 @@ def get_dashboard_data_route():
                     FROM `winged-precept-443218-v8.ngn_dataset.meta_ads_ad_level`
                     WHERE date >= DATE_SUB(CURRENT_DATE(), INTERVAL 7 DAY)
                 """
-                result = client.query(meta_query).result()
+                result = run_query(client, meta_query, service="data_handler")
                 for row in result:
                     if row.updated_at:
                         response_data["updated_at"] = row.updated_at.isoformat() if hasattr(row.updated_at, 'isoformat') else str(row.updated_at)
@@ -668,11 +664,26 @@ def get_dashboard_data_route():
             if not category_url:
                 return jsonify({"status": "error", "message": "category_url 누락"}), 400
 
-            result, error = get_manual_product_list(category_url)
+            # 캐시가 있으면 products, 없으면 크롤링 작업 job_id 반환 (catalog_manual_job 으로 polling)
+            result, error = get_manual_product_list(category_url, force_refresh=bool(data.get("force_refresh")))
             if error:
                 return jsonify({"status": "error", "message": error}), 404
 
-            response_data["products"] = result
+            response_data.update(result)
+
+        # catalog_manual_job  ─ 자사몰 URL 수집 작업 진행 상황
+        if data_type == "catalog_manual_job":
+            from ..services.catalog_sidebar_service import get_manual_crawl_job
+
+            job_id = data.get("job_id")
+            if not job_id:
+                return jsonify({"status": "error", "message": "job_id 누락"}), 400
+
+            result, error = get_manual_crawl_job(job_id)
+            if error:
+                return jsonify({"status": "error", "message": error}), 404
+
+            response_data.update(result)
 
         # catalog_manual_search  ─ 수동 세트 키워드 검색
         if data_type == "catalog_manual_search":
@@ -701,15 +712,21 @@ def get_dashboard_data_route():
 
             response_data["results"] = result
 
+        trace.finish()
         t_end = time.time()
-        print("[TIMING_LOG] /dashboard/get_data timing:", timing_log, "total:", round(t_end-t0, 3), "s")
+        log_event(REQ_LOG, INFO, "TIMING_LOG", route="/dashboard/get_data", total=round(t_end-t0, 3),
+                  data_type=data_type, spans=trace.summary())
         return jsonify(response_data), 200
 
     except TypeError as te:
+        if trace:
+            trace.finish(error=True)
         print(f"[ERROR] 요청 데이터 타입 오류: {te}")
         return jsonify({"status": "error", "message": f"잘못된 요청 형식: {str(te)}"}), 400
 
     except Exception as e:
+        if trace:
+            trace.finish(error=True)
         print(f"[ERROR] 데이터 조회 중 오류 발생: {e}")
         return jsonify({"status": "error", "message": f"데이터 조회 중 오류 발생: {str(e)}"}), 500
 
@@ -784,13 +801,15 @@ def catalog_sets_route():
                 WHERE account_id = @account_id
                 LIMIT 1
             """
-            catalog_job = bq_client.query(
+            catalog_rows = run_query(
+                bq_client,
                 catalog_query,
                 job_config=bigquery.QueryJobConfig(
                     query_parameters=[bigquery.ScalarQueryParameter("account_id", "STRING", raw_account_id)]
-                )
+                ),
+                service="data_handler",
             )
-            catalog_row = next(catalog_job.result(), None)
+            catalog_row = next(catalog_rows, None)
 
             if catalog_row and catalog_row.get("catalog_id"):
                 catalog_id = catalog_row.get("catalog_id")
@@ -861,13 +880,15 @@ def create_catalog_ad():
             WHERE account_id = @account_id
             LIMIT 1
         """
-        mapping_job = bq_client.query(
+        mapping_rows = run_query(
+            bq_client,
             mapping_query,
             job_config=bigquery.QueryJobConfig(
                 query_parameters=[bigquery.ScalarQueryParameter("account_id", "STRING", raw_account_id)]
-            )
+            ),
+            service="data_handler",
         )
-        mapping_row = next(mapping_job.result(), None)
+        mapping_row = next(mapping_rows, None)
 
         if not mapping_row:
             return jsonify({"status": "error", "message": "계정 매핑 정보를 찾을 수 없습니다"}), 404
@@ -891,13 +912,15 @@ def create_catalog_ad():
             WHERE meta_acc_id = @acc_id
             LIMIT 1
         """
-        catalog_job = bq_client.query(
+        catalog_rows = run_query(
+            bq_client,
             catalog_query,
             job_config=bigquery.QueryJobConfig(
                 query_parameters=[bigquery.ScalarQueryParameter("acc_id", "STRING", raw_account_id)]
-            )
+            ),
+            service="data_handler",
         )
-        catalog_row = next(catalog_job.result(), None)
+        catalog_row = next(catalog_rows, None)
         catalog_id = catalog_row.get("catalog_id") if catalog_row else None
 
         if not catalog_id:
@@ -1132,62 +1155,36 @@ def get_monthly_report():
         if not company_name or company_name == "all":
             return jsonify({"status": "error", "message": "업체를 선택해주세요"}), 400
         
-        # GCS 버킷에서 스냅샷 파일 읽기
-        PROJECT_ID = os.environ.get("GOOGLE_CLOUD_PROJECT", "winged-precept-443218-v8")
-        GCS_BUCKET = os.environ.get("GCS_BUCKET", "winged-precept-443218-v8.appspot.com")
-        
-        # 경로 형식: ai-reports/monthly/{company}/{YYYY-MM}/snapshot.json[.gz] (실제 저장 경로)
+        # 경로: ai-reports/monthly/{company}/{YYYY-MM}/snapshot.json[.gz] (실제 저장 경로)
         month_str = f"{year}-{month:02d}"
         
-        # 여러 경로 시도 (압축 파일 우선, 그 다음 압축 없는 파일)
-        blob_paths = [
-            f"ai-reports/monthly/{company_name}/{month_str}/snapshot.json.gz",  # 압축 파일 (원본)
-            f"ai-reports/monthly/{company_name.lower()}/{month_str}/snapshot.json.gz",  # 압축 파일 (소문자)
-            f"ai-reports/monthly/{company_name}/{month_str}/snapshot.json",  # 압축 없는 파일 (원본, 하위 호환)
-            f"ai-reports/monthly/{company_name.lower()}/{month_str}/snapshot.json",  # 압축 없는 파일 (소문자)
-            f"ai-reports/{company_name}/{month_str}.json",  # 대체 경로 (원본)
-            f"ai-reports/{company_name.lower()}/{month_str}.json"  # 대체 경로 (소문자)
-        ]
+        # gzip 원본 그대로 전달 여부 (클라이언트가 raw=true 요청 + gzip 수용 시)
+        passthrough = bool(data.get("raw")) and "gzip" in request.headers.get("Accept-Encoding", "")
         
         try:
-            client = storage.Client(project=PROJECT_ID)
-            bucket = client.bucket(GCS_BUCKET)
+            # 경로 인덱스 → (경로, generation) 조회 후 generation 기준 캐시에서 읽기
+            snapshot_cache = get_monthly_snapshot_cache()
+            ref, payload = snapshot_cache.load(company_name, month_str, decode=not passthrough)
             
-            # 여러 경로 시도
-            blob = None
-            found_path = None
-            for blob_path in blob_paths:
-                test_blob = bucket.blob(blob_path)
-                if test_blob.exists():
-                    blob = test_blob
-                    found_path = blob_path
-                    break
-            
-            if not blob:
+            if ref is None:
                 return jsonify({
                     "status": "error",
                     "message": f"{year}년 {month}월 리포트가 아직 생성되지 않았습니다."
                 }), 404
             
-            # 하이브리드 읽기 로직: Gzip 압축 여부와 관계없이 바이트로 다운로드 후 자동 판별
-            snapshot_bytes = blob.download_as_bytes()
-            
-            # Gzip 압축 해제 시도 (성공하면 압축된 파일, 실패하면 압축되지 않은 파일)
-            try:
-                # Python 버전 호환성을 위해 gzip.GzipFile 사용 (max_length 파라미터 문제 회피)
-                with gzip.GzipFile(fileobj=io.BytesIO(snapshot_bytes)) as gz_file:
-                    snapshot_json_str = gz_file.read().decode('utf-8')
-                print(f"✅ GCS에서 스냅샷을 불러왔습니다: {found_path} (Gzip 압축 해제됨)", file=sys.stderr)
-            except (gzip.BadGzipFile, OSError, Exception) as e:
-                # Gzip 압축 해제 실패 → 압축되지 않은 JSON 파일로 처리 (하위 호환)
-                snapshot_json_str = snapshot_bytes.decode('utf-8')
-                print(f"✅ GCS에서 스냅샷을 불러왔습니다: {found_path} (압축 없음, 하위 호환)", file=sys.stderr)
-            
-            snapshot_data = json.loads(snapshot_json_str)
+            if passthrough:
+                # 압축 해제/재직렬화 없이 스냅샷 JSON 본문을 그대로 응답 (envelope 없음)
+                response = Response(payload, mimetype="application/json")
+                if payload[:2] == b"\x1f\x8b":
+                    response.headers["Content-Encoding"] = "gzip"
+                response.headers["X-Monthly-Report-Format"] = "raw"
+                response.headers["ETag"] = f'"{ref["generation"]}"'
+                response.headers["Vary"] = "Accept-Encoding"
+                return response
             
             return jsonify({
                 "status": "success",
-                "data": snapshot_data
+                "data": payload
             }), 200
             
         except Exception as e:
@@ -1265,9 +1262,10 @@ def check_new_monthly_report():
 def proxy_image():
     """
     외부 이미지 URL을 프록시하여 CORS 및 Mixed Content 문제를 해결합니다.
-    Meta API에서 가져온 이미지 URL을 서버에서 가져와서 반환합니다.
+    Meta API에서 가져온 이미지 URL을 디스크 LRU 캐시에서 반환합니다.
+    (ETag/If-None-Match, Range 지원 / ?w=<px> 썸네일 리사이즈 옵션)
     """
-    print(f"[PROXY] proxy_image 호출됨 - args: {request.args}")
+    image_url = None
     try:
         # URL 파라미터에서 이미지 URL 가져오기
         image_url = request.args.get("url")
@@ -1298,36 +1296,33 @@ def proxy_image():
         # 로컬 파일인 경우 직접 반환
         if image_url.startswith("/static/"):
             from flask import send_from_directory
-            import os
             static_folder = os.path.join(os.path.dirname(__file__), "..", "static")
             file_path = image_url.replace("/static/", "")
             return send_from_directory(static_folder, file_path)
         
-        # 외부 이미지 가져오기
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-        }
-        
-        response = requests.get(image_url, headers=headers, timeout=10, stream=True)
-        response.raise_for_status()
-        
-        # Content-Type 확인
-        content_type = response.headers.get("Content-Type", "image/jpeg")
+        # 썸네일 폭 (선택)
+        width = request.args.get("w", type=int)
         
-        # 이미지 데이터를 스트림으로 반환
-        def generate():
-            for chunk in response.iter_content(chunk_size=8192):
-                if chunk:
-                    yield chunk
-        
-        return Response(
-            generate(),
-            mimetype=content_type,
-            headers={
-                "Cache-Control": "public, max-age=3600",  # 1시간 캐시
-                "Access-Control-Allow-Origin": "*",  # CORS 허용
-            }
-        )
+        # 디스크 캐시에서 조회 (미스 시 1회만 upstream fetch)
+        # 조회 직후 다른 워커가 LRU 정리로 파일을 지웠으면 다시 조회 (미스 → 재fetch)
+        for attempt in range(2):
+            entry = get_cached_image(image_url, width)
+            try:
+                # send_file이 If-None-Match(304)와 Range(206)를 처리
+                response = send_file(
+                    entry["path"],
+                    mimetype=entry["content_type"],
+                    conditional=True,
+                    etag=entry["etag"],
+                    max_age=86400,
+                )
+                break
+            except FileNotFoundError:
+                if attempt:
+                    raise
+                print(f"[IMAGE_PROXY] 캐시 파일 삭제됨, 재조회: {image_url}")
+        response.headers["Access-Control-Allow-Origin"] = "*"  # CORS 허용
+        return response
         
     except requests.exceptions.RequestException as e:
         print(f"[ERROR] 이미지 프록시 실패: {image_url}, 오류: {str(e)}")
@@ -1349,6 +1344,7 @@ def get_batch_dashboard_data_route():
     모든 위젯 데이터를 한 번의 요청으로 병렬 처리하여 반환
     """
     t0 = time.time()
+    trace = None
     try:
         data = request.get_json()
         user_id = session.get("user_id")
@@ -1427,23 +1423,20 @@ def get_batch_dashboard_data_route():
             "product_sales_ratio": []
         }
         
-        timing_log = {}
         fetch_tasks = []
+        trace = start_trace("get_batch_dashboard_data", "all", company_name)
 
         # ✅ ThreadPoolExecutor로 병렬 처리
         with ThreadPoolExecutor() as executor:
             # 1. Performance Summary
             def fetch_performance():
                 try:
-                    t1 = time.time()
                     performance_data = get_performance_summary_new(
                         company_name=company_name,
                         start_date=start_date,
                         end_date=end_date,
                         user_id=user_id
                     )
-                    t2 = time.time()
-                    timing_log["performance_summary"] = round(t2-t1, 3)
                     
                     latest_update = None
                     if performance_data:
@@ -1460,97 +1453,81 @@ def get_batch_dashboard_data_route():
                     print(f"[ERROR] Performance Summary 오류: {type(e).__name__}: {str(e)}")
                     return ("performance_summary", [], 0, None)
             
-            fetch_tasks.append(executor.submit(fetch_performance))
+            fetch_tasks.append(executor.submit(trace.wrap("performance_summary", fetch_performance)))
             
             # 2. Cafe24 Sales
             def fetch_cafe24_sales():
                 try:
-                    t1 = time.time()
                     result = get_cafe24_sales_data(
                         company_name, period, start_date, end_date,
                         date_type, date_sort, limit=30, page=1, user_id=user_id
                     )
-                    t2 = time.time()
-                    timing_log["cafe24_sales"] = round(t2-t1, 3)
                     return ("cafe24_sales", result.get("rows", []), result.get("total_count", 0))
                 except Exception as e:
                     print(f"[ERROR] Cafe24 Sales 오류: {type(e).__name__}: {str(e)}")
                     return ("cafe24_sales", [], 0)
             
-            fetch_tasks.append(executor.submit(fetch_cafe24_sales))
+            fetch_tasks.append(executor.submit(trace.wrap("cafe24_sales", fetch_cafe24_sales)))
             
             # 3. Cafe24 Product Sales
             def fetch_cafe24_product_sales():
                 try:
-                    t1 = time.time()
                     result = get_cafe24_product_sales(
                         company_name, period, start_date, end_date,
                         sort_by=sort_by, limit=13, page=1, user_id=user_id
                     )
-                    t2 = time.time()
-                    timing_log["cafe24_product_sales"] = round(t2-t1, 3)
                     return ("cafe24_product_sales", result.get("rows", []), result.get("total_count", 0))
                 except Exception as e:
                     print(f"[ERROR] Cafe24 Product Sales 오류: {type(e).__name__}: {str(e)}")
                     return ("cafe24_product_sales", [], 0)
             
-            fetch_tasks.append(executor.submit(fetch_cafe24_product_sales))
+            fetch_tasks.append(executor.submit(trace.wrap("cafe24_product_sales", fetch_cafe24_product_sales)))
             
             # 4. GA4 Source Summary
             def fetch_ga4_source_summary():
                 try:
-                    t1 = time.time()
                     if not start_date or not end_date:
                         print(f"[ERROR] GA4 Source Summary - start_date 또는 end_date가 없습니다!")
                         return ("ga4_source_summary", [], 0)
                     
                     cache_buster = data.get('_cache_buster')
                     data_rows = get_ga4_source_summary(company_name, start_date, end_date, limit=100, _cache_buster=cache_buster)
-                    t2 = time.time()
-                    timing_log["ga4_source_summary"] = round(t2-t1, 3)
                     return ("ga4_source_summary", data_rows[:100], len(data_rows))
                 except Exception as e:
                     print(f"[ERROR] GA4 Source Summary 오류: {type(e).__name__}: {str(e)}")
                     return ("ga4_source_summary", [], 0)
             
-            fetch_tasks.append(executor.submit(fetch_ga4_source_summary))
+            fetch_tasks.append(executor.submit(trace.wrap("ga4_source_summary", fetch_ga4_source_summary)))
             
             # 5. ViewItem Summary
             def fetch_viewitem_summary():
                 try:
-                    t1 = time.time()
                     if not start_date or not end_date:
                         print(f"[ERROR] ViewItem Summary - start_date 또는 end_date가 없습니다!")
                         return ("viewitem_summary", [], 0)
                     
                     data_rows = get_viewitem_summary(company_name, start_date, end_date, limit=500)
-                    t2 = time.time()
-                    timing_log["viewitem_summary"] = round(t2-t1, 3)
                     return ("viewitem_summary", data_rows, len(data_rows))
                 except Exception as e:
                     print(f"[ERROR] ViewItem Summary 오류: {type(e).__name__}: {str(e)}")
                     return ("viewitem_summary", [], 0)
             
-            fetch_tasks.append(executor.submit(fetch_viewitem_summary))
+            fetch_tasks.append(executor.submit(trace.wrap("viewitem_summary", fetch_viewitem_summary)))
             
             # 6. Monthly Net Sales & Visitors
             def fetch_monthly_net_sales_visitors():
                 try:
-                    t1 = time.time()
                     data_rows = get_monthly_net_sales_visitors(company_name)
-                    t2 = time.time()
-                    timing_log["monthly_net_sales_visitors"] = round(t2-t1, 3)
                     return ("monthly_net_sales_visitors", data_rows, len(data_rows))
                 except Exception as e:
                     print(f"[ERROR] Monthly Net Sales Visitors 오류: {type(e).__name__}: {str(e)}")
                     return ("monthly_net_sales_visitors", [], 0)
             
-            fetch_tasks.append(executor.submit(fetch_monthly_net_sales_visitors))
+            fetch_tasks.append(executor.submit(trace.wrap("monthly_net_sales_visitors", fetch_monthly_net_sales_visitors)))
             
             # 7. Platform Sales Summary
             def fetch_platform_sales_summary():
                 try:
-                    t1 = time.time()
                     from ..services.platform_sales_summary import get_platform_sales_by_day
                     _company_names = company_name if isinstance(company_name, list) else [company_name]
                     
@@ -1565,19 +1542,16 @@ def get_batch_dashboard_data_route():
                         date_type=platform_date_type,
                         date_sort=platform_date_sort
                     )
-                    t2 = time.time()
-                    timing_log["platform_sales_summary"] = round(t2-t1, 3)
                     return ("platform_sales_summary", data_rows, len(data_rows))
                 except Exception as e:
                     print(f"[ERROR] Platform Sales Summary 오류: {type(e).__name__}: {str(e)}")
                     return ("platform_sales_summary", [], 0)
             
-            fetch_tasks.append(executor.submit(fetch_platform_sales_summary))
+            fetch_tasks.append(executor.submit(trace.wrap("platform_sales_summary", fetch_platform_sales_summary)))
             
             # 8. Platform Sales Ratio
             def fetch_platform_sales_ratio():
                 try:
-                    t1 = time.time()
                     from ..services.platform_sales_summary import get_platform_sales_ratio
                     _company_names = company_name if isinstance(company_name, list) else [company_name]
                     
@@ -1590,19 +1564,16 @@ def get_batch_dashboard_data_route():
                         start_date=start_date,
                         end_date=end_date
                     )
-                    t2 = time.time()
-                    timing_log["platform_sales_ratio"] = round(t2-t1, 3)
                     return ("platform_sales_ratio", data_rows)
                 except Exception as e:
                     print(f"[ERROR] Platform Sales Ratio 오류: {type(e).__name__}: {str(e)}")
                     return ("platform_sales_ratio", [])
             
-            fetch_tasks.append(executor.submit(fetch_platform_sales_ratio))
+            fetch_tasks.append(executor.submit(trace.wrap("platform_sales_ratio", fetch_platform_sales_ratio)))
             
             # 9. Product Sales Ratio
             def fetch_product_sales_ratio():
                 try:
-                    t1 = time.time()
                     from ..services.product_sales_ratio import get_product_sales_ratio
                     _company_names = company_name if isinstance(company_name, list) else [company_name]
                     
@@ -1613,14 +1584,12 @@ def get_batch_dashboard_data_route():
                     data_rows = get_product_sales_ratio(
                         _company_names, start_date, end_date, limit=50, user_id=user_id
                     )
-                    t2 = time.time()
-                    timing_log["product_sales_ratio"] = round(t2-t1, 3)
                     return ("product_sales_ratio", data_rows)
                 except Exception as e:
                     print(f"[ERROR] Product Sales Ratio 오류: {type(e).__name__}: {str(e)}")
                     return ("product_sales_ratio", [])
             
-            fetch_tasks.append(executor.submit(fetch_product_sales_ratio))
+            fetch_tasks.append(executor.submit(trace.wrap("product_sales_ratio", fetch_product_sales_ratio)))
 
         # ✅ 결과 수집
         for future in fetch_tasks:
@@ -1656,15 +1625,21 @@ def get_batch_dashboard_data_route():
                 print(f"[ERROR] Future 결과 처리 오류: {type(e).__name__}: {str(e)}")
                 # 개별 실패는 무시하고 계속 진행
 
+        trace.finish()
         t_end = time.time()
-        print("[BATCH_API] /dashboard/get_batch_dashboard_data timing:", timing_log, "total:", round(t_end-t0, 3), "s")
+        log_event(REQ_LOG, INFO, "BATCH_API", route="/dashboard/get_batch_dashboard_data", total=round(t_end-t0, 3),
+                  spans=trace.summary())
         return jsonify(response_data), 200
 
     except TypeError as te:
+        if trace:
+            trace.finish(error=True)
         print(f"[ERROR] Batch API 요청 데이터 타입 오류: {te}")
         return jsonify({"status": "error", "message": f"잘못된 요청 형식: {str(te)}"}), 400
 
     except Exception as e:
+        if trace:
+            trace.finish(error=True)
         print(f"[ERROR] Batch API 데이터 조회 중 오류 발생: {e}")
         return jsonify({"status": "error", "message": f"데이터 조회 중 오류 발생: {str(e)}"}), 500
 
@@ -1684,13 +1659,19 @@ def get_trend_data():
         company_name = data.get("company_name")  # 현재 로그인한 업체명 (자사몰 필터링용)
         
         # 주차 정보 조회 (스냅샷 경로 생성을 위해)
-        current_week = get_current_week_info()
+        # 워커 메모리의 주간 아티팩트 우선 → 없을 때만 BigQuery 조회
+        trend_cache = get_trend_artifact_cache()
+        current_week = trend_cache.get_run_id("29cm") or get_current_week_info()
         if not current_week:
             return jsonify({"status": "error", "message": "주차 정보를 찾을 수 없습니다."}), 404
         
-        # 스냅샷에서 로드 시도 (우선순위 1: GCS 버킷)
+        # 스냅샷에서 로드 시도 (우선순위 1: 워커 메모리 → GCS 버킷)
         # ✅ 업체명 폴더 구조 사용
-        snapshot_data = load_trend_snapshot_from_gcs(current_week, company_name) if company_name else None
+        # 응답에 필요한 탭만 로드 (Columnar 스냅샷이면 해당 탭 row group만 읽음)
+        requested_tabs = tab_names if tab_names and isinstance(tab_names, list) else [tab_name or "전체"]
+        snapshot_data = trend_cache.get_company_snapshot(
+            "29cm", current_week, company_name, load_trend_snapshot_from_gcs, tab_names=requested_tabs
+        ) if company_name else None
         
         if snapshot_data:
             # 스냅샷 데이터 사용 (GCS 버킷에서 로드 성공)
@@ -1810,8 +1791,8 @@ def get_trend_data():
                 
                 return jsonify(result), 200
         else:
-            # 스냅샷이 없으면 BigQuery에서 조회 (Fallback)
-            print(f"[WARN] ⚠️ GCS 스냅샷 없음, BigQuery에서 직접 조회 (비용 발생): {current_week}")
+            # 스냅샷이 없으면 주간 아티팩트(메모리) → BigQuery 순으로 조회 (Fallback)
+            print(f"[WARN] ⚠️ GCS 스냅샷 없음, 공통 트렌드 데이터로 응답: {current_week}")
             
             if tab_names and isinstance(tab_names, list):
                 # 여러 탭 데이터를 한 번에 반환
@@ -1885,6 +1866,9 @@ def create_trend_snapshot():
         success = save_trend_snapshot_to_gcs(current_week, tabs_data, current_week)
         
         if success:
+            # 주간 아티팩트 갱신 → 이 워커는 즉시, 다른 워커는 포인터 확인 주기 내 반영
+            publish_trend_artifact("29cm", current_week, tabs_data, tabs=tab_names)
+            get_trend_artifact_cache().invalidate("29cm")
             return jsonify({
                 "status": "success",
                 "message": f"스냅샷 생성 완료: {current_week}",
@@ -2012,7 +1996,7 @@ def generate_ad_preview():
                 bigquery.ScalarQueryParameter("account_id", "STRING", account_id)
             ]
         )
-        mapping_result = bq_client.query(mapping_query, job_config=job_config).result()
+        mapping_result = run_query(bq_client, mapping_query, job_config=job_config, service="data_handler")
         mapping_row = None
         for row in mapping_result:
             mapping_row = row
@@ -2251,7 +2235,7 @@ def generate_ad_preview():
 def get_trend_tabs():
     """사용 가능한 탭 목록 조회"""
     try:
-        tabs = get_available_tabs()
+        tabs = get_trend_artifact_cache().get_tabs("29cm") or get_available_tabs()
         return jsonify({"status": "success", "tabs": tabs}), 200
     except Exception as e:
         print(f"[ERROR] get_trend_tabs 실패: {e}")
@@ -2273,13 +2257,19 @@ def get_ably_trend_data():
         company_name = data.get("company_name")  # 현재 로그인한 업체명 (자사몰 필터링용)
         
         # 주차 정보 조회 (스냅샷 경로 생성을 위해)
-        current_week = get_ably_current_week_info()
+        # 워커 메모리의 주간 아티팩트 우선 → 없을 때만 BigQuery 조회
+        trend_cache = get_trend_artifact_cache()
+        current_week = trend_cache.get_run_id("ably") or get_ably_current_week_info()
         if not current_week:
             return jsonify({"status": "error", "message": "주차 정보를 찾을 수 없습니다."}), 404
         
-        # 스냅샷에서 로드 시도 (우선순위 1: GCS 버킷)
+        # 스냅샷에서 로드 시도 (우선순위 1: 워커 메모리 → GCS 버킷)
         # ✅ 업체명 폴더 구조 사용
-        snapshot_data = load_ably_trend_snapshot_from_gcs(current_week, company_name) if company_name else None
+        # 응답에 필요한 탭만 로드 (Columnar 스냅샷이면 해당 탭 row group만 읽음)
+        requested_tabs = tab_names if tab_names and isinstance(tab_names, list) else [tab_name or "상의"]
+        snapshot_data = trend_cache.get_company_snapshot(
+            "ably", current_week, company_name, load_ably_trend_snapshot_from_gcs, tab_names=requested_tabs
+        ) if company_name else None
         
         if snapshot_data:
             # 스냅샷 데이터 사용 (GCS 버킷에서 로드 성공)
@@ -2396,8 +2386,8 @@ def get_ably_trend_data():
                 
                 return jsonify(result), 200
         else:
-            # 스냅샷이 없으면 BigQuery에서 조회 (Fallback)
-            print(f"[WARN] ⚠️ GCS 스냅샷 없음, BigQuery에서 직접 조회 (비용 발생): {current_week}")
+            # 스냅샷이 없으면 주간 아티팩트(메모리) → BigQuery 순으로 조회 (Fallback)
+            print(f"[WARN] ⚠️ GCS 스냅샷 없음, 공통 트렌드 데이터로 응답: {current_week}")
             
             if tab_names and isinstance(tab_names, list):
                 # 여러 탭 데이터를 한 번에 반환
@@ -2471,6 +2461,9 @@ def create_ably_trend_snapshot():
         success = save_ably_trend_snapshot_to_gcs(current_week, tabs_data, current_week, enable_ai_analysis=True)
         
         if success:
+            # 주간 아티팩트 갱신 → 이 워커는 즉시, 다른 워커는 포인터 확인 주기 내 반영
+            publish_trend_artifact("ably", current_week, tabs_data, tabs=tab_names)
+            get_trend_artifact_cache().invalidate("ably")
             return jsonify({
                 "status": "success",
                 "message": f"Ably 스냅샷 생성 완료: {current_week}",
@@ -2491,7 +2484,7 @@ def create_ably_trend_snapshot():
 def get_ably_trend_tabs():
     """사용 가능한 Ably 탭 목록 조회"""
     try:
-        tabs = get_ably_available_tabs()
+        tabs = get_trend_artifact_cache().get_tabs("ably") or get_ably_available_tabs()
         return jsonify({"status": "success", "tabs": tabs}), 200
     except Exception as e:
         print(f"[ERROR] get_ably_trend_tabs 실패: {e}")
@@ -2690,9 +2683,9 @@ def get_compare_reviews():
 def get_active_ads():
     """
     Meta API에서 활성 광고 목록 조회
-    - effective_status 필터링 사용 (ACTIVE 상태)
-    - 조회 순서: adset → campaign → account (폴백)
-    - 썸네일 URL 포함
+    - 조회 순서: adset → campaign → account (폴백) — ids= field expansion 요청 1회로 조회
+    - 썸네일 URL 포함 (creative{thumbnail_url,image_url} 확장)
+    - 계정별 단기 캐시 (META_ADS_CACHE_TTL_SEC), refresh=1 이면 캐시 무시
     """
     try:
         account_id = request.args.get("account_id")
@@ -2704,225 +2697,15 @@ def get_active_ads():
         if not access_token:
             return jsonify({"status": "success", "ads": [], "total": 0, "message": "Meta API 토큰 없음"}), 200
 
-        # account_id 정규화 (act_ 접두사 제거)
-        clean_account_id = account_id.replace("act_", "")
-        ad_account_id = f"act_{clean_account_id}"
-        print(f"[STEP4] 요청 account_id: {account_id}, ad_account_id: {ad_account_id}")
-
-        # BigQuery에서 캠페인/세트 ID 조회
-        mapping_row = None
-        try:
-            bq_client = bigquery.Client()
-            mapping_query = """
-                SELECT account_id, conv_campaign_id, conv_adset_id, traffic_campaign_id, traffic_adset_id
-                FROM `ngn_dataset.meta_account_mapping`
-                WHERE account_id = @account_id
-                   OR account_id = @clean_account_id
-                   OR account_id = @prefixed_account_id
-                LIMIT 1
-            """
-            job_config = bigquery.QueryJobConfig(
-                query_parameters=[
-                    bigquery.ScalarQueryParameter("account_id", "STRING", account_id),
-                    bigquery.ScalarQueryParameter("clean_account_id", "STRING", clean_account_id),
-                    bigquery.ScalarQueryParameter("prefixed_account_id", "STRING", ad_account_id)
-                ]
-            )
-            mapping_result = bq_client.query(mapping_query, job_config=job_config).result()
-            for row in mapping_result:
-                mapping_row = row
-                print(f"[STEP4] BigQuery 매핑: conv_campaign={row.conv_campaign_id}, conv_adset={row.conv_adset_id}")
-                break
-        except Exception as bq_err:
-            print(f"[STEP4] BigQuery 조회 실패: {bq_err}")
-
-        # ID 목록 수집 (캠페인 유형별로 구분)
-        conv_adset_ids = set()
-        traffic_adset_ids = set()
-        conv_campaign_ids = set()
-        traffic_campaign_ids = set()
-
-        if mapping_row:
-            if mapping_row.conv_adset_id and mapping_row.conv_adset_id.strip():
-                conv_adset_ids.add(mapping_row.conv_adset_id.strip())
-            if mapping_row.traffic_adset_id and mapping_row.traffic_adset_id.strip():
-                traffic_adset_ids.add(mapping_row.traffic_adset_id.strip())
-            if mapping_row.conv_campaign_id and mapping_row.conv_campaign_id.strip():
-                conv_campaign_ids.add(mapping_row.conv_campaign_id.strip())
-            if mapping_row.traffic_campaign_id and mapping_row.traffic_campaign_id.strip():
-                traffic_campaign_ids.add(mapping_row.traffic_campaign_id.strip())
-
-        # 통합 리스트 (조회용)
-        adset_ids = list(conv_adset_ids | traffic_adset_ids)
-        campaign_ids = list(conv_campaign_ids | traffic_campaign_ids)
-
-        print(f"[STEP4] adset_ids: {adset_ids}, campaign_ids: {campaign_ids}")
-
-        # Meta API 필드 정의 (썸네일 + configured_status 포함)
-        fields = "id,name,status,effective_status,configured_status,preview_shareable_link,creative{id,thumbnail_url,image_url},adcreatives{image_url,thumbnail_url}"
-
-        # Meta API는 status/effective_status 필터링 지원 안함
-        # 서버에서 직접 필터링: DELETED, ARCHIVED 제외
-
-        all_ads = []
-
-        # 캐시 우회 헤더
-        headers = {
-            "Cache-Control": "no-cache, no-store, must-revalidate",
-            "Pragma": "no-cache"
-        }
-        # 타임스탬프 (캐시 무효화)
-        import time
-        cache_buster = int(time.time() * 1000)
-
-        # 광고 ID → 캠페인 유형 매핑
-        ad_campaign_type = {}
-
-        # 1단계: AdSet 기준 조회
-        if adset_ids:
-            for adset_id in adset_ids:
-                # 캠페인 유형 결정
-                if adset_id in conv_adset_ids:
-                    campaign_type = "전환"
-                elif adset_id in traffic_adset_ids:
-                    campaign_type = "유입"
-                else:
-                    campaign_type = "-"
-
-                try:
-                    ads_url = f"https://graph.facebook.com/v24.0/{adset_id}/ads"
-                    params = {
-                        "access_token": access_token,
-                        "fields": fields,
-                        "limit": 100,
-                        "_ts": cache_buster
-                    }
-                    print(f"[STEP4] AdSet {adset_id} ({campaign_type}) 조회 중...")
-                    response = requests.get(ads_url, params=params, headers=headers, timeout=30)
-                    result = response.json()
-
-                    if "error" not in result:
-                        ads_data = result.get("data", [])
-                        # 각 광고에 캠페인 유형 태깅
-                        for ad in ads_data:
-                            ad_campaign_type[ad.get("id")] = campaign_type
-                        all_ads.extend(ads_data)
-                        print(f"[STEP4] AdSet {adset_id}: {len(ads_data)}개 광고")
-                        for ad in ads_data:
-                            print(f"  - ID: {ad.get('id')}, Name: {ad.get('name')}, Status: {ad.get('status')}")
-                    else:
-                        print(f"[STEP4] AdSet {adset_id} 오류: {result.get('error', {}).get('message')}")
-                except Exception as e:
-                    print(f"[STEP4] AdSet {adset_id} 예외: {e}")
-
-        # 2단계: AdSet에서 못 찾으면 Campaign 기준 조회 (폴백)
-        if not all_ads and campaign_ids:
-            print(f"[STEP4] AdSet 조회 결과 없음, Campaign 폴백 시도")
-            for campaign_id in campaign_ids:
-                # 캠페인 유형 결정
-                if campaign_id in conv_campaign_ids:
-                    campaign_type = "전환"
-                elif campaign_id in traffic_campaign_ids:
-                    campaign_type = "유입"
-                else:
-                    campaign_type = "-"
-
-                try:
-                    ads_url = f"https://graph.facebook.com/v24.0/{campaign_id}/ads"
-                    params = {
-                        "access_token": access_token,
-                        "fields": fields,
-                        "limit": 100,
-                        "_ts": cache_buster
-                    }
-                    print(f"[STEP4] Campaign {campaign_id} ({campaign_type}) 조회 중...")
-                    response = requests.get(ads_url, params=params, headers=headers, timeout=30)
-                    result = response.json()
-
-                    if "error" not in result:
-                        ads_data = result.get("data", [])
-                        # 각 광고에 캠페인 유형 태깅
-                        for ad in ads_data:
-                            ad_campaign_type[ad.get("id")] = campaign_type
-                        all_ads.extend(ads_data)
-                        print(f"[STEP4] Campaign {campaign_id}: {len(ads_data)}개 광고")
-                        for ad in ads_data:
-                            print(f"  - ID: {ad.get('id')}, Name: {ad.get('name')}, Status: {ad.get('status')}")
-                    else:
-                        print(f"[STEP4] Campaign {campaign_id} 오류: {result.get('error', {}).get('message')}")
-                except Exception as e:
-                    print(f"[STEP4] Campaign {campaign_id} 예외: {e}")
-
-        # 3단계: 아직도 없으면 Account 전체 조회 (최종 폴백)
-        if not all_ads:
-            print(f"[STEP4] Campaign 조회 결과 없음, Account 전체 폴백")
-            try:
-                ads_url = f"https://graph.facebook.com/v24.0/{ad_account_id}/ads"
-                params = {
-                    "access_token": access_token,
-                    "fields": fields,
-                    "limit": 100,
-                    "_ts": cache_buster
-                }
-                print(f"[STEP4] Account {ad_account_id} 전체 조회 중...")
-                response = requests.get(ads_url, params=params, headers=headers, timeout=30)
-                result = response.json()
-
-                if "error" not in result:
-                    all_ads = result.get("data", [])
-                    print(f"[STEP4] Account 전체: {len(all_ads)}개 광고")
-                else:
-                    print(f"[STEP4] Account 전체 조회 오류: {result.get('error', {}).get('message')}")
-            except Exception as e:
-                print(f"[STEP4] Account 전체 조회 예외: {e}")
-
-        # 중복 제거 + DELETED/ARCHIVED 필터링 (서버 측)
-        seen_ids = set()
-        unique_ads = []
-        excluded_statuses = {'DELETED', 'ARCHIVED'}
-        for ad in all_ads:
-            ad_id = ad.get("id")
-            ad_status = ad.get("status", "")
-            # DELETED, ARCHIVED 제외
-            if ad_status in excluded_statuses:
-                continue
-            if ad_id and ad_id not in seen_ids:
-                seen_ids.add(ad_id)
-                unique_ads.append(ad)
-
-        print(f"[STEP4] 최종 조회 결과: {len(unique_ads)}개 광고 (DELETED/ARCHIVED 제외)")
-        for ad in unique_ads:
-            print(f"  [최종] ID: {ad.get('id')}, Name: {ad.get('name')}")
-
-        # 광고 데이터 가공 (썸네일 추출)
-        processed_ads = []
-        for ad in unique_ads:
-            # 썸네일 URL 추출 우선순위: creative.thumbnail_url → creative.image_url → adcreatives[0].image_url
-            thumbnail_url = ""
-            creative = ad.get("creative", {})
-            if creative:
-                thumbnail_url = creative.get("thumbnail_url") or creative.get("image_url") or ""
-
-            if not thumbnail_url:
-                adcreatives = ad.get("adcreatives", {}).get("data", [])
-                if adcreatives and len(adcreatives) > 0:
-                    thumbnail_url = adcreatives[0].get("image_url") or adcreatives[0].get("thumbnail_url") or ""
-
-            processed_ads.append({
-                "id": ad.get("id"),
-                "name": ad.get("name", "이름 없음"),
-                "status": ad.get("status"),
-                "effective_status": ad.get("effective_status"),
-                "configured_status": ad.get("configured_status"),  # 사용자 설정 상태 (ON/OFF 배지용)
-                "campaign_type": ad_campaign_type.get(ad.get("id"), "-"),  # 전환/유입
-                "thumbnail_url": thumbnail_url,
-                "preview_link": ad.get("preview_shareable_link", "")
-            })
+        force_refresh = request.args.get("refresh", "false").lower() in ("1", "true")
+        processed_ads, cached = get_active_ads_cached(account_id, access_token, force_refresh=force_refresh)
+        print(f"[STEP4] 활성 광고 {len(processed_ads)}개 (account_id: {account_id}, cached: {cached})")
 
         return jsonify({
             "status": "success",
             "ads": processed_ads,
-            "total": len(processed_ads)
+            "total": len(processed_ads),
+            "cached": cached
         }), 200
 
     except requests.exceptions.Timeout:
@@ -2979,6 +2762,9 @@ def pause_ads():
                 failed_ids.append(ad_id)
                 print(f"[STEP4] 광고 {ad_id} 일시정지 오류: {e}")
 
+        if success_count:
+            invalidate_active_ads(data.get("account_id"), ad_ids)
+
         return jsonify({
             "status": "success" if success_count > 0 else "error",
             "message": f"{success_count}개 광고 일시정지 완료",
@@ -3032,6 +2818,9 @@ def delete_ads():
                 failed_ids.append(ad_id)
                 print(f"[STEP4] 광고 {ad_id} 삭제 오류: {e}")
 
+        if success_count:
+            invalidate_active_ads(data.get("account_id"), ad_ids)
+
         return jsonify({
             "status": "success" if success_count > 0 else "error",
             "message": f"{success_count}개 광고 삭제 완료",
@@ -3074,19 +2863,52 @@ def translate_meta_error(error_message: str) -> str:
 # 📌 ADMAKE: Pending Ads 세션 관리 API
 # ─────────────────────────────────────────────────────────────
 
+def _pending_ads_scope(account_id: str = None) -> tuple:
+    """
+    pending_ads 저장소 키 (소유자, 광고 계정)
+    - 세션에는 draft id 하나만 저장 (광고 payload 는 서버 저장소에)
+    - 이전 방식으로 세션에 남아있는 목록은 저장소로 옮기고 세션에서 제거
+    """
+    draft_id = session.get("pending_ads_draft_id")
+    if not draft_id:
+        import uuid
+        draft_id = uuid.uuid4().hex
+        session["pending_ads_draft_id"] = draft_id
+
+    owner = f"{session.get('user_id') or 'anon'}:{draft_id}"
+    account = str(account_id or request.args.get("account_id") or "").replace("act_", "") or "-"
+
+    legacy_ads = session.pop("pending_ads", None) or []
+    # 세션 저장소 폴백이 계정별로 남긴 목록 (현재 계정 것만 이전, 나머지 계정은 해당 계정 조회 시 이전)
+    legacy_by_account = session.get(LEGACY_SESSION_KEY)
+    if legacy_by_account:
+        legacy_by_account = dict(legacy_by_account)
+        legacy_ads = legacy_ads + (legacy_by_account.pop(account, None) or [])
+        if legacy_by_account:
+            session[LEGACY_SESSION_KEY] = legacy_by_account
+        else:
+            session.pop(LEGACY_SESSION_KEY, None)
+    if legacy_ads:
+        store = get_pending_ad_store()
+        for ad in legacy_ads:
+            store.add(owner, account, ad)
+        print(f"[ADMAKE] 세션 pending_ads {len(legacy_ads)}개 → 서버 저장소 이전")
+
+    return owner, account
+
+
 @data_blueprint.route("/add_pending_ad", methods=["POST"])
 def add_pending_ad():
     """
-    Step 3에서 '광고 추가하기' 클릭 시 pending_ads 세션에 광고 데이터 추가
+    Step 3에서 '광고 추가하기' 클릭 시 pending_ads 저장소에 광고 데이터 추가
     """
     try:
         data = request.get_json()
         if not data:
             return jsonify({"status": "error", "message": "광고 데이터가 필요합니다."}), 400
 
-        # 세션에 pending_ads 리스트 초기화
-        if "pending_ads" not in session:
-            session["pending_ads"] = []
+        owner, account = _pending_ads_scope(data.get("account_id"))
+        store = get_pending_ad_store()
 
         # 고유 ID 생성
         import uuid
@@ -3102,22 +2924,21 @@ def add_pending_ad():
             "description": data.get("description", ""),
             "link": data.get("link", ""),
             "cta_type": data.get("cta_type", "SHOP_NOW"),
-            "ad_name": data.get("ad_name", f"AD_{len(session['pending_ads']) + 1}"),
+            "ad_name": data["ad_name"] if "ad_name" in data else f"AD_{store.count(owner, account) + 1}",
             "is_carousel": data.get("is_carousel", False),
             "cards": data.get("cards", []),
             "product_tags": data.get("product_tags")  # 제품 표시 정보
         }
 
-        session["pending_ads"].append(ad_data)
-        session.modified = True
+        total_count = store.add(owner, account, ad_data)
 
-        print(f"[ADMAKE] 광고 추가됨: {ad_data['ad_name']}, 총 {len(session['pending_ads'])}개")
+        print(f"[ADMAKE] 광고 추가됨: {ad_data['ad_name']}, 총 {total_count}개")
 
         return jsonify({
             "status": "success",
             "message": "광고가 추가되었습니다.",
             "ad_id": ad_data["id"],
-            "total_count": len(session["pending_ads"])
+            "total_count": total_count
         }), 200
 
     except Exception as e:
@@ -3128,10 +2949,11 @@ def add_pending_ad():
 @data_blueprint.route("/get_pending_ads", methods=["GET"])
 def get_pending_ads():
     """
-    세션에 저장된 pending_ads 리스트 조회
+    저장소에 저장된 pending_ads 리스트 조회
     """
     try:
-        pending_ads = session.get("pending_ads", [])
+        owner, account = _pending_ads_scope()
+        pending_ads = get_pending_ad_store().list(owner, account)
         print(f"[ADMAKE] pending_ads 조회: {len(pending_ads)}개")
 
         return jsonify({
@@ -3148,11 +2970,11 @@ def get_pending_ads():
 @data_blueprint.route("/clear_pending_ads", methods=["DELETE"])
 def clear_pending_ads():
     """
-    pending_ads 세션 초기화
+    pending_ads 초기화
     """
     try:
-        session["pending_ads"] = []
-        session.modified = True
+        owner, account = _pending_ads_scope()
+        get_pending_ad_store().clear(owner, account)
         print("[ADMAKE] pending_ads 초기화됨")
 
         return jsonify({
@@ -3171,20 +2993,18 @@ def remove_pending_ad(ad_id):
     특정 pending_ad 삭제
     """
     try:
-        pending_ads = session.get("pending_ads", [])
-        original_count = len(pending_ads)
-
-        session["pending_ads"] = [ad for ad in pending_ads if ad.get("id") != ad_id]
-        session.modified = True
+        owner, account = _pending_ads_scope()
+        store = get_pending_ad_store()
 
-        removed = original_count - len(session["pending_ads"])
+        removed = store.remove(owner, account, ad_id)
+        total_count = store.count(owner, account)
         print(f"[ADMAKE] 광고 삭제: {ad_id}, 삭제됨: {removed}개")
 
         return jsonify({
             "status": "success",
             "message": "광고가 삭제되었습니다.",
             "removed_count": removed,
-            "total_count": len(session["pending_ads"])
+            "total_count": total_count
         }), 200
 
     except Exception as e:
@@ -3263,25 +3083,8 @@ def get_budget_info():
         # account_id 정규화
         clean_account_id = account_id.replace("act_", "")
 
-        # BigQuery에서 캠페인/세트 ID 조회
-        bq_client = bigquery.Client()
-        mapping_query = """
-            SELECT conv_campaign_id, conv_adset_id, traffic_campaign_id, traffic_adset_id
-            FROM `ngn_dataset.meta_account_mapping`
-            WHERE account_id = @account_id
-            LIMIT 1
-        """
-        job_config = bigquery.QueryJobConfig(
-            query_parameters=[
-                bigquery.ScalarQueryParameter("account_id", "STRING", clean_account_id)
-            ]
-        )
-        mapping_result = bq_client.query(mapping_query, job_config=job_config).result()
-
-        mapping_row = None
-        for row in mapping_result:
-            mapping_row = row
-            break
+        # 캠페인/세트 ID (meta_account_mapping 워커 캐시)
+        mapping_row = get_meta_account_mapping(clean_account_id)
 
         if not mapping_row:
             return jsonify({"status": "error", "message": "계정 매핑 정보가 없습니다."}), 404
@@ -3292,19 +3095,19 @@ def get_budget_info():
         }
 
         # 전환 캠페인 예산 조회
-        if mapping_row.conv_campaign_id:
+        if mapping_row.get("conv_campaign_id"):
             conv_budget = get_campaign_budget_from_meta(
-                mapping_row.conv_campaign_id,
-                mapping_row.conv_adset_id,
+                mapping_row.get("conv_campaign_id"),
+                mapping_row.get("conv_adset_id"),
                 access_token
             )
             result["conv"] = conv_budget
 
         # 유입 캠페인 예산 조회
-        if mapping_row.traffic_campaign_id:
+        if mapping_row.get("traffic_campaign_id"):
             traffic_budget = get_campaign_budget_from_meta(
-                mapping_row.traffic_campaign_id,
-                mapping_row.traffic_adset_id,
+                mapping_row.get("traffic_campaign_id"),
+                mapping_row.get("traffic_adset_id"),
                 access_token
             )
             result["traffic"] = traffic_budget
@@ -3431,6 +3234,7 @@ def update_budget():
         print(f"[STEP4] 예산 업데이트 응답: {json.dumps(result, indent=2)}")
 
         if result.get("success"):
+            invalidate_active_ads(data.get("account_id"), [campaign_id, adset_id])
             return jsonify({
                 "status": "success",
                 "message": "예산이 업데이트되었습니다.",
@@ -3477,6 +3281,8 @@ def update_adset_status():
         print(f"[STEP4] AdSet 상태 업데이트: {adset_id} → {status}, 응답: {result}")
 
         if result.get("success"):
+            # 세트 ON/OFF는 광고 effective_status에 반영되므로 목록 캐시도 무효화
+            invalidate_active_ads(data.get("account_id"), [adset_id])
             return jsonify({
                 "status": "success",
                 "message": f"세트 상태가 {status}로 변경되었습니다."
@@ -3683,73 +3489,20 @@ def publish_ads_batch():
 
         print(f"[STEP5] 전송할 캠페인: {target_adsets}")
 
-        results = []
-        success_count = 0
-        fail_count = 0
-
-        for idx, ad_data in enumerate(ads):
-            ad_name = ad_data.get("name", f"AD_{idx + 1}")
-            print(f"[STEP5] 광고 {idx + 1}/{len(ads)} 처리 중: {ad_name}")
-
-            try:
-                # 1. AdCreative 생성 (UTM 파라미터 포함)
-                creative_id = create_ad_creative_internal(
-                    account_id=account_id,
-                    ad_data=ad_data,
-                    page_id=page_id,
-                    instagram_user_id=instagram_user_id,
-                    access_token=access_token,
-                    url_tags=utm_params  # UTM 파라미터 전달
-                )
-
-                if not creative_id:
-                    raise Exception("AdCreative 생성 실패")
-
-                print(f"[STEP5] AdCreative 생성 완료: {creative_id}")
-
-                # 2. 각 타겟 AdSet에 Ad 생성
-                ad_created = False
-                for campaign_type, adset_id in target_adsets:
-                    suffix = "_TRAFFIC" if campaign_type == "traffic" else ""
-                    full_ad_name = f"{ad_name}{suffix}"
-
-                    ad_result = create_ad_internal(
-                        account_id=account_id,
-                        adset_id=adset_id,
-                        creative_id=creative_id,
-                        ad_name=full_ad_name,
-                        access_token=access_token,
-                        status="ACTIVE",  # 광고 ON 상태로 생성
-                        pixel_id=pixel_id,  # 전환 + 유입 캠페인 모두 픽셀 적용 (웹사이트 이벤트 추적)
-                        end_time=end_time
-                    )
-
-                    if ad_result.get("success"):
-                        results.append({
-                            "name": full_ad_name,
-                            "campaign_type": campaign_type,
-                            "success": True,
-                            "creative_id": creative_id,
-                            "ad_id": ad_result.get("ad_id"),
-                            "preview_link": ad_result.get("preview_link")
-                        })
-                        success_count += 1
-                        ad_created = True
-                        print(f"[STEP5] Ad 생성 완료 ({campaign_type}): {ad_result.get('ad_id')}")
-                    else:
-                        raise Exception(f"{campaign_type} 캠페인 Ad 생성 실패: {ad_result.get('error', 'Unknown')}")
-
-            except Exception as e:
-                error_msg = str(e)
-                translated_error = translate_meta_error(error_msg)
-                print(f"[STEP5] 광고 {ad_name} 전송 실패: {error_msg}")
-
-                results.append({
-                    "name": ad_name,
-                    "success": False,
-                    "error": translated_error
-                })
-                fail_count += 1
+        # AdCreative → Ad 생성을 Graph batch로 전송 (광고별 개별 HTTPS 호출 대신 batch 몇 번)
+        results, success_count, fail_count = publish_ads_via_graph_batch(
+            account_id=account_id,
+            ads=ads,
+            target_adsets=target_adsets,
+            page_id=page_id,
+            instagram_user_id=instagram_user_id,
+            access_token=access_token,
+            url_tags=utm_params,  # UTM 파라미터 전달
+            pixel_id=pixel_id,    # 전환 + 유입 캠페인 모두 픽셀 적용 (웹사이트 이벤트 추적)
+        )
+        if success_count:
+            # 게시 직후 Step 4(/admake/manage)로 이동 → 새 광고가 목록에 바로 보이도록
+            invalidate_active_ads(account_id)
 
         return jsonify({
             "status": "success",
@@ -3763,6 +3516,136 @@ def publish_ads_batch():
         return jsonify({"status": "error", "message": str(e)}), 500
 
 
+def prefetch_video_thumbnails(video_ids: list, access_token: str) -> dict:
+    """비디오 썸네일 일괄 조회 (Graph batch) → {video_id: 썸네일 URL}"""
+    if not video_ids:
+        return {}
+    ops = [batch_op("GET", f"{vid}?fields=thumbnails,picture") for vid in video_ids]
+    batches = [ops[i:i + GRAPH_BATCH_MAX_OPS] for i in range(0, len(ops), GRAPH_BATCH_MAX_OPS)]
+
+    lookup = {}
+    offset = 0
+    for res in run_batches(batches, access_token):
+        chunk_ids = video_ids[offset:offset + GRAPH_BATCH_MAX_OPS]
+        offset += GRAPH_BATCH_MAX_OPS
+        if isinstance(res, Exception):
+            print(f"[STEP5] 비디오 썸네일 batch 조회 실패: {res}")
+            continue
+        for vid, item in zip(chunk_ids, res):
+            # 조회에 성공한 video_id 는 썸네일이 없어도 기록 (개별 재조회 방지)
+            if item is not None and batch_result_error(item, "썸네일 조회 실패") is None:
+                lookup[vid] = pick_video_thumbnail(item["body"])
+    print(f"[STEP5] 비디오 썸네일 batch 조회: {sum(1 for v in lookup.values() if v)}/{len(video_ids)}개")
+    return lookup
+
+
+def publish_ads_via_graph_batch(account_id: str, ads: list, target_adsets: list, page_id: str, instagram_user_id: str, access_token: str, url_tags: str = "", pixel_id: str = "") -> tuple:
+    """
+    광고 N개 × 대상 AdSet 을 Graph batch 로 생성
+    - 광고 1개 = [AdCreative 생성 + AdSet별 Ad 생성("{result=creative_i:$.id}" 참조)] 묶음
+    - 묶음은 쪼개지 않고 batch(요청 ≤ 50개)에 배치, batch 는 META_BATCH_CONCURRENCY 개까지 병렬 전송
+    반환: (results, success_count, fail_count) - 기존 광고별 순차 처리와 같은 결과 항목 형식
+    """
+    formatted_account_id = ensure_act_prefix(account_id)
+
+    # 1. 썸네일이 필요한 비디오는 먼저 한 번에 조회
+    video_ids = sorted({vid for ad_data in ads for vid in creative_video_ids_needing_thumbnail(ad_data)})
+    thumbnail_lookup = prefetch_video_thumbnails(video_ids, access_token)
+
+    # 2. 광고별 요청 묶음 구성
+    names, groups, errors = [], [], {}
+    for idx, ad_data in enumerate(ads):
+        ad_name = ad_data.get("name", f"AD_{idx + 1}")
+        names.append(ad_name)
+        try:
+            creative_payload = build_ad_creative_payload(
+                ad_data=ad_data,
+                page_id=page_id,
+                instagram_user_id=instagram_user_id,
+                access_token=access_token,
+                url_tags=url_tags,
+                thumbnail_lookup=thumbnail_lookup,
+            )
+        except Exception as e:
+            errors[idx] = str(e)
+            groups.append([])
+            continue
+
+        ref = f"creative_{idx}"
+        ops = [batch_op("POST", f"{formatted_account_id}/adcreatives", creative_payload,
+                        name=ref, omit_response_on_success=False)]
+        for campaign_type, adset_id in target_adsets:
+            suffix = "_TRAFFIC" if campaign_type == "traffic" else ""
+            ad_payload = build_ad_payload(adset_id, f"{{result={ref}:$.id}}", f"{ad_name}{suffix}",
+                                          status="ACTIVE", pixel_id=pixel_id)
+            ops.append(batch_op("POST", f"{formatted_account_id}/ads", ad_payload, depends_on=ref))
+        groups.append(ops)
+
+    # 3. batch 배치 & 전송
+    live = [idx for idx, ops in enumerate(groups) if ops]
+    packed = pack_op_groups([groups[idx] for idx in live])
+    op_batches = [[op for gi in batch for op in groups[live[gi]]] for batch in packed]
+    print(f"[STEP5] Graph batch 전송: 광고 {len(live)}개, 요청 {sum(len(b) for b in op_batches)}개, batch {len(op_batches)}회")
+    batch_results = run_batches(op_batches, access_token)
+
+    per_ad = {}
+    for batch, res in zip(packed, batch_results):
+        offset = 0
+        for gi in batch:
+            idx = live[gi]
+            size = len(groups[idx])
+            per_ad[idx] = res if isinstance(res, Exception) else res[offset:offset + size]
+            offset += size
+
+    # 4. 광고 순서대로 결과 정리
+    results = []
+    success_count = 0
+    fail_count = 0
+    for idx, ad_name in enumerate(names):
+        error = errors.get(idx)
+        res = per_ad.get(idx)
+        if error is None and isinstance(res, Exception):
+            error = str(res)
+        elif error is None:
+            creative_res = res[0]
+            error = batch_result_error(creative_res, "AdCreative 생성 실패")
+            creative_id = None if error or creative_res is None else creative_res["body"].get("id")
+            if not error and not creative_id:
+                error = "AdCreative ID를 받지 못했습니다."
+
+            if not error:
+                print(f"[STEP5] AdCreative 생성 완료: {creative_id}")
+                for (campaign_type, adset_id), ad_res in zip(target_adsets, res[1:]):
+                    suffix = "_TRAFFIC" if campaign_type == "traffic" else ""
+                    full_ad_name = f"{ad_name}{suffix}"
+                    ad_error = batch_result_error(ad_res, "Ad ID를 받지 못했습니다.")
+                    ad_id = None if ad_error or ad_res is None else ad_res["body"].get("id")
+                    if not ad_id:
+                        error = f"{campaign_type} 캠페인 Ad 생성 실패: {ad_error or 'Ad ID를 받지 못했습니다.'}"
+                        break
+                    results.append({
+                        "name": full_ad_name,
+                        "campaign_type": campaign_type,
+                        "success": True,
+                        "creative_id": creative_id,
+                        "ad_id": ad_id,
+                        "preview_link": ad_preview_link(account_id, ad_id)
+                    })
+                    success_count += 1
+                    print(f"[STEP5] Ad 생성 완료 ({campaign_type}): {ad_id}")
+
+        if error:
+            print(f"[STEP5] 광고 {ad_name} 전송 실패: {error}")
+            results.append({
+                "name": ad_name,
+                "success": False,
+                "error": translate_meta_error(error)
+            })
+            fail_count += 1
+
+    return results, success_count, fail_count
+
+
 def get_account_info(account_id: str, access_token: str) -> dict:
     """광고 계정에 연결된 페이지/Instagram/AdSet/UTM/Pixel 정보 조회 (BigQuery 우선, Meta API 폴백)"""
     try:
@@ -3790,7 +3673,7 @@ def get_account_info(account_id: str, access_token: str) -> dict:
                     bigquery.ScalarQueryParameter("account_id", "STRING", account_id)
                 ]
             )
-            mapping_result = bq_client.query(mapping_query, job_config=job_config).result()
+            mapping_result = run_query(bq_client, mapping_query, job_config=job_config, service="data_handler")
 
             for row in mapping_result:
                 page_id = str(row.page_id).strip() if row.page_id else None
@@ -3880,30 +3763,65 @@ def get_video_thumbnail(video_id: str, access_token: str) -> str:
         result = response.json()
 
         print(f"[STEP5] 비디오 썸네일 조회 응답: {json.dumps(result, indent=2, ensure_ascii=False)[:500]}")
-
-        # thumbnails 배열에서 가장 큰 썸네일 선택
-        if "thumbnails" in result and result["thumbnails"].get("data"):
-            thumbnails = result["thumbnails"]["data"]
-            # 해상도가 가장 높은 썸네일 선택
-            best_thumb = max(thumbnails, key=lambda x: x.get("width", 0) * x.get("height", 0))
-            thumb_url = best_thumb.get("uri") or best_thumb.get("url")
-            if thumb_url:
-                print(f"[STEP5] 비디오 썸네일 찾음 (thumbnails): {thumb_url}")
-                return thumb_url
-
-        # picture 필드에서 가져오기
-        if "picture" in result:
-            print(f"[STEP5] 비디오 썸네일 찾음 (picture): {result['picture']}")
-            return result["picture"]
-
-        print(f"[STEP5] 비디오 썸네일을 찾을 수 없음")
-        return None
+        return pick_video_thumbnail(result)
 
     except Exception as e:
         print(f"[STEP5] 비디오 썸네일 조회 오류: {e}")
         return None
 
 
+def pick_video_thumbnail(result: dict) -> str:
+    """비디오 조회 응답(thumbnails, picture)에서 썸네일 URL 선택"""
+    # thumbnails 배열에서 가장 큰 썸네일 선택
+    if "thumbnails" in result and result["thumbnails"].get("data"):
+        thumbnails = result["thumbnails"]["data"]
+        # 해상도가 가장 높은 썸네일 선택
+        best_thumb = max(thumbnails, key=lambda x: x.get("width", 0) * x.get("height", 0))
+        thumb_url = best_thumb.get("uri") or best_thumb.get("url")
+        if thumb_url:
+            print(f"[STEP5] 비디오 썸네일 찾음 (thumbnails): {thumb_url}")
+            return thumb_url
+
+    # picture 필드에서 가져오기
+    if "picture" in result:
+        print(f"[STEP5] 비디오 썸네일 찾음 (picture): {result['picture']}")
+        return result["picture"]
+
+    print(f"[STEP5] 비디오 썸네일을 찾을 수 없음")
+    return None
+
+
+def ad_preview_link(account_id: str, ad_id: str) -> str:
+    return f"https://business.facebook.com/adsmanager/manage/ads?act={account_id.replace('act_', '')}&selected_ad_ids={ad_id}"
+
+
+def build_ad_payload(adset_id: str, creative_id: str, ad_name: str, status: str = "PAUSED", pixel_id: str = "") -> dict:
+    """
+    Ad 생성 페이로드 (access_token 제외)
+    - creative_id 자리에 batch 참조("{result=creative_0:$.id}")도 사용 가능
+    """
+    payload = {
+        "name": ad_name,
+        "adset_id": str(adset_id),
+        "creative": json.dumps({"creative_id": str(creative_id)}),
+        "status": status,
+    }
+
+    # tracking_specs 추가 (Pixel ID가 있는 경우) - 웹사이트 이벤트 추적 활성화
+    # Meta API v24.0 형식: fb_pixel 사용 (offsite_pixel 아님)
+    if pixel_id:
+        tracking_specs = [
+            {
+                "action.type": "offsite_conversion",
+                "fb_pixel": [str(pixel_id)]
+            }
+        ]
+        payload["tracking_specs"] = json.dumps(tracking_specs)
+        print(f"[STEP5] tracking_specs 추가: {tracking_specs}")
+
+    return payload
+
+
 def create_ad_internal(account_id: str, adset_id: str, creative_id: str, ad_name: str, access_token: str, status: str = "PAUSED", pixel_id: str = "", end_time: str = "") -> dict:
     """
     Meta API를 통해 Ad(광고) 생성
@@ -3924,25 +3842,8 @@ def create_ad_internal(account_id: str, adset_id: str, creative_id: str, ad_name
         print(f"[STEP5] pixel_id: {pixel_id}")
         print(f"[STEP5] end_time: {end_time}")
 
-        payload = {
-            "name": ad_name,
-            "adset_id": str(adset_id),
-            "creative": json.dumps({"creative_id": str(creative_id)}),
-            "status": status,
-            "access_token": access_token
-        }
-
-        # tracking_specs 추가 (Pixel ID가 있는 경우) - 웹사이트 이벤트 추적 활성화
-        # Meta API v24.0 형식: fb_pixel 사용 (offsite_pixel 아님)
-        if pixel_id:
-            tracking_specs = [
-                {
-                    "action.type": "offsite_conversion",
-                    "fb_pixel": [str(pixel_id)]
-                }
-            ]
-            payload["tracking_specs"] = json.dumps(tracking_specs)
-            print(f"[STEP5] tracking_specs 추가: {tracking_specs}")
+        payload = build_ad_payload(adset_id, creative_id, ad_name, status=status, pixel_id=pixel_id)
+        payload["access_token"] = access_token
 
         # end_time 추가 (종료 시간이 있는 경우)
         # Note: end_time은 Ad 레벨이 아닌 AdSet 레벨에서 설정해야 함
@@ -3964,7 +3865,7 @@ def create_ad_internal(account_id: str, adset_id: str, creative_id: str, ad_name
             return {
                 "success": True,
                 "ad_id": ad_id,
-                "preview_link": f"https://business.facebook.com/adsmanager/manage/ads?act={account_id.replace('act_', '')}&selected_ad_ids={ad_id}"
+                "preview_link": ad_preview_link(account_id, ad_id)
             }
         elif "error" in result:
             error_msg = result["error"].get("message", "Unknown error")
@@ -3979,6 +3880,175 @@ def create_ad_internal(account_id: str, adset_id: str, creative_id: str, ad_name
         return {"success": False, "error": str(e)}
 
 
+def _lookup_video_thumbnail(video_id: str, access_token: str, thumbnail_lookup: dict = None) -> str:
+    """미리 조회한 썸네일(batch) 우선, 조회되지 않은 video_id 만 개별 조회"""
+    if thumbnail_lookup is not None and video_id in thumbnail_lookup:
+        return thumbnail_lookup[video_id]
+    return get_video_thumbnail(video_id, access_token)
+
+
+def creative_product_set_id(ad_data: dict) -> str:
+    """제품 표시 (Product Tags) 활성화 시 product_set_id"""
+    product_tags = ad_data.get("product_tags")
+    if product_tags and product_tags.get("enabled") and product_tags.get("product_set_id"):
+        return str(product_tags["product_set_id"])
+    return None
+
+
+def creative_video_ids_needing_thumbnail(ad_data: dict) -> list:
+    """AdCreative 구성 시 썸네일을 따로 조회해야 하는 video_id 목록"""
+    video_ids = []
+    if ad_data.get("is_carousel") and ad_data.get("cards"):
+        for card in ad_data["cards"]:
+            if card.get("video_id") and not (card.get("thumbnail_url") or card.get("image_url")):
+                video_ids.append(str(card["video_id"]))
+    elif ad_data.get("media_type", "image") == "video" and ad_data.get("video_id"):
+        thumbnail_url = ad_data.get("thumbnail_url") or ad_data.get("image_url")
+        if not thumbnail_url or thumbnail_url.startswith("blob:"):
+            video_ids.append(str(ad_data["video_id"]))
+    return video_ids
+
+
+def build_ad_creative_payload(ad_data: dict, page_id: str, instagram_user_id: str, access_token: str, url_tags: str = "", thumbnail_lookup: dict = None) -> dict:
+    """
+    AdCreative 생성 페이로드 (access_token 제외)
+    - thumbnail_lookup: {video_id: 썸네일 URL} (미리 batch 조회한 값, 없으면 개별 조회)
+    """
+    product_set_id = creative_product_set_id(ad_data)
+
+    # 3. object_story_spec 구성
+    object_story_spec = {
+        "page_id": str(page_id) if page_id else None
+    }
+
+    if instagram_user_id:
+        object_story_spec["instagram_user_id"] = str(instagram_user_id)
+        print(f"[STEP5] instagram_user_id 설정됨: {object_story_spec['instagram_user_id']}")
+
+    # 캐러셀 vs 단일 미디어 분기
+    if ad_data.get("is_carousel") and ad_data.get("cards"):
+        # 캐러셀 광고
+        child_attachments = []
+        for card in ad_data["cards"]:
+            attachment = {
+                "link": card.get("link", ad_data.get("link", "")),
+                "name": card.get("name", ""),
+                "description": card.get("description", ""),
+                "call_to_action": {"type": ad_data.get("cta_type", "SHOP_NOW")}
+            }
+            if card.get("video_id"):
+                video_id_str = str(card["video_id"])
+                attachment["video_id"] = video_id_str
+                thumb_url = card.get("thumbnail_url") or card.get("image_url")
+                if not thumb_url:
+                    thumb_url = _lookup_video_thumbnail(video_id_str, access_token, thumbnail_lookup)
+                if thumb_url:
+                    attachment["picture"] = str(thumb_url)
+            elif card.get("image_hash"):
+                attachment["image_hash"] = str(card["image_hash"])
+            child_attachments.append(attachment)
+
+        object_story_spec["link_data"] = {
+            "message": ad_data.get("message", ""),
+            "link": ad_data.get("link", ""),
+            "child_attachments": child_attachments,
+            "call_to_action": {"type": ad_data.get("cta_type", "SHOP_NOW")}
+        }
+    else:
+        # 단일 미디어 광고
+        media_type = ad_data.get("media_type", "image")
+
+        if media_type == "video":
+            video_id_str = str(ad_data.get("video_id")) if ad_data.get("video_id") else None
+            thumbnail_url = ad_data.get("thumbnail_url") or ad_data.get("image_url")
+
+            if thumbnail_url and thumbnail_url.startswith("blob:"):
+                thumbnail_url = None
+
+            if not thumbnail_url and video_id_str:
+                thumbnail_url = _lookup_video_thumbnail(video_id_str, access_token, thumbnail_lookup)
+
+            video_data = {
+                "video_id": video_id_str,
+                "message": ad_data.get("message", ""),
+                "title": ad_data.get("headline", ""),
+                "link_description": ad_data.get("description", ""),
+                "call_to_action": {
+                    "type": ad_data.get("cta_type", "SHOP_NOW"),
+                    "value": {"link": ad_data.get("link", "")}
+                }
+            }
+
+            if thumbnail_url:
+                video_data["image_url"] = str(thumbnail_url)
+
+            object_story_spec["video_data"] = video_data
+            print(f"[STEP5] video_data 사용")
+        else:
+            # 이미지 광고 (제품 표시 여부와 관계없이 동일한 link_data 구조)
+            object_story_spec["link_data"] = {
+                "message": ad_data.get("message", ""),
+                "link": ad_data.get("link", ""),
+                "image_hash": str(ad_data.get("image_hash")) if ad_data.get("image_hash") else None,
+                "name": ad_data.get("headline", ""),
+                "description": ad_data.get("description", ""),
+                "call_to_action": {"type": ad_data.get("cta_type", "SHOP_NOW")}
+            }
+            print(f"[STEP5] link_data 사용 (이미지 광고)")
+
+    # 5. object_story_spec JSON 직렬화
+    object_story_spec_json = json.dumps(object_story_spec, ensure_ascii=False)
+
+    # 6. 페이로드 구성
+    payload = {
+        "name": ad_data.get("name", "AdCreative"),
+        "object_story_spec": object_story_spec_json,
+    }
+
+    # UTM 파라미터 추가
+    if url_tags:
+        payload["url_tags"] = url_tags
+        print(f"[STEP5] url_tags 추가: {url_tags[:80]}...")
+
+    # 7. 제품 확장 (Product Extensions) 구성
+    # v24.0 공식 문서: https://developers.facebook.com/docs/marketing-api/advantage-catalog-ads/product-extensions/
+    # - creative_sourcing_spec: associated_product_set_id 포함
+    # - degrees_of_freedom_spec: creative_features_spec.product_extensions 포함
+    if product_set_id:
+        # 제품 확장 활성화 (카탈로그 항목 추가)
+        creative_sourcing_spec = {
+            "associated_product_set_id": product_set_id
+        }
+        degrees_of_freedom_spec = {
+            "creative_features_spec": {
+                "product_extensions": {
+                    "enroll_status": "OPT_IN",
+                    "action_metadata": {
+                        "type": "MANUAL"
+                    }
+                }
+            }
+        }
+        payload["creative_sourcing_spec"] = json.dumps(creative_sourcing_spec, ensure_ascii=False)
+        payload["degrees_of_freedom_spec"] = json.dumps(degrees_of_freedom_spec, ensure_ascii=False)
+        print(f"[STEP5] 제품 확장 활성화: product_set_id={product_set_id}")
+        print(f"[STEP5] creative_sourcing_spec: {creative_sourcing_spec}")
+        print(f"[STEP5] degrees_of_freedom_spec: {degrees_of_freedom_spec}")
+    else:
+        # 제품 확장 비활성화 (OPT_OUT)
+        degrees_of_freedom_spec = {
+            "creative_features_spec": {
+                "product_extensions": {
+                    "enroll_status": "OPT_OUT"
+                }
+            }
+        }
+        payload["degrees_of_freedom_spec"] = json.dumps(degrees_of_freedom_spec, ensure_ascii=False)
+        print(f"[STEP5] 제품 확장 비활성화 (OPT_OUT)")
+
+    return payload
+
+
 def create_ad_creative_internal(account_id: str, ad_data: dict, page_id: str, instagram_user_id: str, access_token: str, url_tags: str = "") -> str:
     """
     Meta API를 통해 AdCreative 생성 (내부 함수)
@@ -4015,13 +4085,15 @@ def create_ad_creative_internal(account_id: str, ad_data: dict, page_id: str, in
                     WHERE meta_acc_id = @acc_id
                     LIMIT 1
                 """
-                catalog_job = bq_client.query(
+                catalog_rows = run_query(
+                    bq_client,
                     catalog_query,
                     job_config=bigquery.QueryJobConfig(
                         query_parameters=[bigquery.ScalarQueryParameter("acc_id", "STRING", raw_account_id)]
-                    )
+                    ),
+                    service="data_handler",
                 )
-                catalog_row = next(catalog_job.result(), None)
+                catalog_row = next(catalog_rows, None)
                 if catalog_row and catalog_row["catalog_id"]:
                     catalog_id = str(catalog_row["catalog_id"])
                     print(f"[STEP5] catalog_id 조회 성공: {catalog_id}")
@@ -4030,136 +4102,16 @@ def create_ad_creative_internal(account_id: str, ad_data: dict, page_id: str, in
             except Exception as cat_err:
                 print(f"[STEP5] catalog_id 조회 오류: {cat_err}")
 
-        # 3. object_story_spec 구성
-        object_story_spec = {
-            "page_id": str(page_id) if page_id else None
-        }
-
-        if instagram_user_id:
-            object_story_spec["instagram_user_id"] = str(instagram_user_id)
-            print(f"[STEP5] instagram_user_id 설정됨: {object_story_spec['instagram_user_id']}")
-
-        # 캐러셀 vs 단일 미디어 분기
-        if ad_data.get("is_carousel") and ad_data.get("cards"):
-            # 캐러셀 광고
-            child_attachments = []
-            for card in ad_data["cards"]:
-                attachment = {
-                    "link": card.get("link", ad_data.get("link", "")),
-                    "name": card.get("name", ""),
-                    "description": card.get("description", ""),
-                    "call_to_action": {"type": ad_data.get("cta_type", "SHOP_NOW")}
-                }
-                if card.get("video_id"):
-                    video_id_str = str(card["video_id"])
-                    attachment["video_id"] = video_id_str
-                    thumb_url = card.get("thumbnail_url") or card.get("image_url")
-                    if not thumb_url:
-                        thumb_url = get_video_thumbnail(video_id_str, access_token)
-                    if thumb_url:
-                        attachment["picture"] = str(thumb_url)
-                elif card.get("image_hash"):
-                    attachment["image_hash"] = str(card["image_hash"])
-                child_attachments.append(attachment)
-
-            object_story_spec["link_data"] = {
-                "message": ad_data.get("message", ""),
-                "link": ad_data.get("link", ""),
-                "child_attachments": child_attachments,
-                "call_to_action": {"type": ad_data.get("cta_type", "SHOP_NOW")}
-            }
-        else:
-            # 단일 미디어 광고
-            media_type = ad_data.get("media_type", "image")
-
-            if media_type == "video":
-                video_id_str = str(ad_data.get("video_id")) if ad_data.get("video_id") else None
-                thumbnail_url = ad_data.get("thumbnail_url") or ad_data.get("image_url")
-
-                if thumbnail_url and thumbnail_url.startswith("blob:"):
-                    thumbnail_url = None
-
-                if not thumbnail_url and video_id_str:
-                    thumbnail_url = get_video_thumbnail(video_id_str, access_token)
-
-                video_data = {
-                    "video_id": video_id_str,
-                    "message": ad_data.get("message", ""),
-                    "title": ad_data.get("headline", ""),
-                    "link_description": ad_data.get("description", ""),
-                    "call_to_action": {
-                        "type": ad_data.get("cta_type", "SHOP_NOW"),
-                        "value": {"link": ad_data.get("link", "")}
-                    }
-                }
-
-                if thumbnail_url:
-                    video_data["image_url"] = str(thumbnail_url)
-
-                object_story_spec["video_data"] = video_data
-                print(f"[STEP5] video_data 사용")
-            else:
-                # 이미지 광고 (제품 표시 여부와 관계없이 동일한 link_data 구조)
-                object_story_spec["link_data"] = {
-                    "message": ad_data.get("message", ""),
-                    "link": ad_data.get("link", ""),
-                    "image_hash": str(ad_data.get("image_hash")) if ad_data.get("image_hash") else None,
-                    "name": ad_data.get("headline", ""),
-                    "description": ad_data.get("description", ""),
-                    "call_to_action": {"type": ad_data.get("cta_type", "SHOP_NOW")}
-                }
-                print(f"[STEP5] link_data 사용 (이미지 광고)")
-
-        # 5. object_story_spec JSON 직렬화
-        object_story_spec_json = json.dumps(object_story_spec, ensure_ascii=False)
-
-        # 6. 페이로드 구성
-        payload = {
-            "name": ad_data.get("name", "AdCreative"),
-            "object_story_spec": object_story_spec_json,
-            "access_token": access_token
-        }
-
-        # UTM 파라미터 추가
-        if url_tags:
-            payload["url_tags"] = url_tags
-            print(f"[STEP5] url_tags 추가: {url_tags[:80]}...")
-
-        # 7. 제품 확장 (Product Extensions) 구성
-        # v24.0 공식 문서: https://developers.facebook.com/docs/marketing-api/advantage-catalog-ads/product-extensions/
-        # - creative_sourcing_spec: associated_product_set_id 포함
-        # - degrees_of_freedom_spec: creative_features_spec.product_extensions 포함
-        if product_set_id:
-            # 제품 확장 활성화 (카탈로그 항목 추가)
-            creative_sourcing_spec = {
-                "associated_product_set_id": product_set_id
-            }
-            degrees_of_freedom_spec = {
-                "creative_features_spec": {
-                    "product_extensions": {
-                        "enroll_status": "OPT_IN",
-                        "action_metadata": {
-                            "type": "MANUAL"
-                        }
-                    }
-                }
-            }
-            payload["creative_sourcing_spec"] = json.dumps(creative_sourcing_spec, ensure_ascii=False)
-            payload["degrees_of_freedom_spec"] = json.dumps(degrees_of_freedom_spec, ensure_ascii=False)
-            print(f"[STEP5] 제품 확장 활성화: product_set_id={product_set_id}")
-            print(f"[STEP5] creative_sourcing_spec: {creative_sourcing_spec}")
-            print(f"[STEP5] degrees_of_freedom_spec: {degrees_of_freedom_spec}")
-        else:
-            # 제품 확장 비활성화 (OPT_OUT)
-            degrees_of_freedom_spec = {
-                "creative_features_spec": {
-                    "product_extensions": {
-                        "enroll_status": "OPT_OUT"
-                    }
-                }
-            }
-            payload["degrees_of_freedom_spec"] = json.dumps(degrees_of_freedom_spec, ensure_ascii=False)
-            print(f"[STEP5] 제품 확장 비활성화 (OPT_OUT)")
+        # 3. 페이로드 구성 (object_story_spec / UTM / 제품 확장)
+        payload = build_ad_creative_payload(
+            ad_data=ad_data,
+            page_id=page_id,
+            instagram_user_id=instagram_user_id,
+            access_token=access_token,
+            url_tags=url_tags,
+        )
+        object_story_spec_json = payload["object_story_spec"]
+        payload["access_token"] = access_token
 
         # 로깅
         print(f"[STEP5] ========== 전송 직전 최종 페이로드 ==========")
@@ -15,6 +15,7 @@ from ..services.ga4_source_summary import get_ga4_source_summary
 from ..services.meta_ads_service import get_meta_ads_data
 from ..services.meta_ads_insight import get_meta_account_list_filtered, get_meta_ads_insight_table
 from ..services.meta_ads_preview import get_meta_ads_preview_list
+from ..utils.bq_query import run_query
 
 # 모바일 전용 함수 제거 - performance_summary_new.py에서 통합으로 가져옴
 
@@ -30,7 +31,7 @@ def get_meta_ads_updated_at():
             FROM `winged-precept-443218-v8.ngn_dataset.meta_ads_ad_level`
             WHERE date >= DATE_SUB(CURRENT_DATE(), INTERVAL 7 DAY)
         """
-        result = client.query(query).result()
+        result = run_query(client, query, service="mobile_handler")
         for row in result:
             if row.updated_at:
                 return row.updated_at.isoformat() if hasattr(row.updated_at, 'isoformat') else str(row.updated_at)
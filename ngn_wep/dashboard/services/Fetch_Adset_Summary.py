@@ -4,6 +4,7 @@
 
 from google.cloud import bigquery
 from datetime import datetime
+from ..utils.bq_query import run_query
 
 client = bigquery.Client()
 
@@ -47,7 +48,7 @@ def debug_data_source(account_id: str, start_date: str, end_date: str):
     ]
 
     try:
-        results = client.query(debug_query, job_config=bigquery.QueryJobConfig(query_parameters=query_params)).result()
+        results = run_query(client, debug_query, job_config=bigquery.QueryJobConfig(query_parameters=query_params), service="fetch_adset_summary")
         debug_data = dictify_rows(results)
         print(f"[DEBUG] 데이터 소스 비교:")
         for row in debug_data:
@@ -100,7 +101,7 @@ def debug_missing_data(account_id: str, start_date: str, end_date: str):
     ]
 
     try:
-        results = client.query(debug_query, job_config=bigquery.QueryJobConfig(query_parameters=query_params)).result()
+        results = run_query(client, debug_query, job_config=bigquery.QueryJobConfig(query_parameters=query_params), service="fetch_adset_summary")
         debug_data = dictify_rows(results)
         print(f"[DEBUG] 광고세트별 분류 결과:")
         for row in debug_data:
@@ -221,10 +222,10 @@ def get_meta_ads_adset_summary_by_type(
         print(f"[DEBUG] 원본 데이터 직접 집계 시작: {start_date} ~ {end_date}, account_id: {account_id}")
 
         job_config = bigquery.QueryJobConfig(query_parameters=query_params)
-        summary_rows = client.query(type_summary_query, job_config=job_config).result()
+        summary_rows = run_query(client, type_summary_query, job_config=job_config, service="fetch_adset_summary")
         type_summary = dictify_rows(summary_rows)
 
-        spend_rows = client.query(total_spend_query, job_config=job_config).result()
+        spend_rows = run_query(client, total_spend_query, job_config=job_config, service="fetch_adset_summary")
         total_spend = list(spend_rows)[0].get("total_spend", 0.0) if spend_rows.total_rows else 0.0
 
         print(f"[DEBUG] 원본 데이터 집계 결과: {len(type_summary)}개 타입, 총 지출: {total_spend}")
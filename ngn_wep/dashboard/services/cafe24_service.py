@@ -1,6 +1,7 @@
 from google.cloud import bigquery
 import time
 from ..utils.cache_utils import cached_query
+from ..utils.bq_query import run_query
 
 
 def get_bigquery_client():
@@ -114,11 +115,11 @@ def get_cafe24_sales_data(company_name, period, start_date, end_date,
 
     try:
         t1 = time.time()
-        rows = client.query(main_query, job_config=bigquery.QueryJobConfig(query_parameters=query_params_main)).result()
+        rows = run_query(client, main_query, job_config=bigquery.QueryJobConfig(query_parameters=query_params_main), service="cafe24_service", company=company_name)
         data = [dict(row) for row in rows]
         t2 = time.time()
 
-        count_rows = client.query(count_query, job_config=bigquery.QueryJobConfig(query_parameters=query_params_base + query_params_common)).result()
+        count_rows = run_query(client, count_query, job_config=bigquery.QueryJobConfig(query_parameters=query_params_base + query_params_common), service="cafe24_service", company=company_name)
         total_count = next(count_rows).get("total_count", 0)
 
         print(f"[DEBUG] Cafe24 매출 데이터 쿼리 완료 - 데이터 {len(data)}개, 전체 {total_count}개")
@@ -248,11 +249,11 @@ def get_cafe24_product_sales(company_name, period, start_date, end_date,
 
     try:
         t1 = time.time()
-        result = client.query(data_query, job_config=bigquery.QueryJobConfig(query_parameters=query_params_main)).result()
+        result = run_query(client, data_query, job_config=bigquery.QueryJobConfig(query_parameters=query_params_main), service="cafe24_service", company=company_name)
         rows = [dict(row) for row in result]
         t2 = time.time()
 
-        count_result = client.query(count_query, job_config=bigquery.QueryJobConfig(query_parameters=query_params_base + query_params_common)).result()
+        count_result = run_query(client, count_query, job_config=bigquery.QueryJobConfig(query_parameters=query_params_base + query_params_common), service="cafe24_service", company=company_name)
         total_count = next(count_result)["total_count"]
         t3 = time.time()
 
@@ -2,25 +2,37 @@
 META Catalog – Sidebar service layer
 ────────────────────────────────────────────────────────────────────────────
 ● 1) get_catalog_sidebar_data           : 자동 세트(28일·7일) + catalog_id 조회
-● 2) get_manual_product_list            : 자사몰 카테고리 URL → 상품번호 + 이름
+● 2) get_manual_product_list            : 자사몰 카테고리 URL → 상품번호 + 이름 (캐시 우선, 없으면 크롤링 작업 제출)
+   └ get_manual_crawl_job()             : 크롤링 작업 진행 상황 / 결과 조회 (polling)
 ● 3) search_products_for_manual_set     : 키워드(상품명·번호) 검색
 ● 4) create_or_update_product_set       : 동일 세트명 있으면 ‘업데이트’, 없으면 ‘생성’
    └ 내부적으로 _get_existing_set_id() 로 기존 세트 탐색
+   └ retailer_id 매핑은 카탈로그별 prefix 색인(TTL/ETag 캐시), 생성은 Graph batch
 ────────────────────────────────────────────────────────────────────────────
 Graph API 버전·토큰·타임아웃 모두 환경변수로 주입 가능
 """
 
 # ───── 표준 라이브러리 ───────────────────────────────
 import os
+import re
 import json
+import time
+import hashlib
 import logging
+import threading
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 from itertools import islice
 from typing import Iterable, List, Sequence, Tuple, Dict, Optional
-from urllib.parse import urlparse   # host 추출에만 사용
+from urllib.parse import urlparse
 
 # ───── 외부 패키지 ───────────────────────────────────
 import requests
-from google.cloud import bigquery
+from google.cloud import bigquery, storage
+from google.api_core.exceptions import NotFound
+
+from ..utils.meta_graph_batch import GRAPH_BATCH_MAX_OPS, GraphBatchError, batch_op, graph_batch, batch_result_error
+from ..utils.bq_query import run_query
 
 
 # ─ Logger & BigQuery ────────────────────────────────────────────────────
@@ -38,6 +50,20 @@ FB_TOKEN = (
 )
 TIMEOUT  = int(os.getenv("META_API_TIMEOUT", 30))
 
+# ─ 카탈로그 retailer_id 색인 캐시 ─────────────────────
+#   TTL 안에서는 Graph 호출 없이 재사용, TTL 이 지나면 ETag 로 재검증
+CATALOG_INDEX_TTL_SEC = int(os.getenv("CATALOG_INDEX_TTL_SEC", 600))
+#   캐시에 없는 상품번호가 요청되면 강제 재조회 (단, 색인 생성 후 이 시간이 지난 경우만)
+CATALOG_INDEX_MIN_REFRESH_SEC = int(os.getenv("CATALOG_INDEX_MIN_REFRESH_SEC", 60))
+
+# ─ 수동 세트 크롤링 (crawl_catalog Cloud Function) ─────
+#   결과/진행 상황은 Cloud Function 이 GCS 에 기록 → 웹 요청은 캐시 조회 / 작업 제출 / polling 만 수행
+GCS_BUCKET               = os.getenv("GCS_BUCKET", "winged-precept-443218-v8.appspot.com")
+CRAWL_CACHE_PREFIX       = os.getenv("CRAWL_CACHE_PREFIX", "catalog_crawl")
+CATALOG_CRAWL_FRESH_SEC  = int(os.getenv("CATALOG_CRAWL_FRESH_SEC", 6 * 3600))   # 이 시간 안의 결과는 재크롤링 안 함
+CATALOG_CRAWL_JOB_TIMEOUT_SEC = int(os.getenv("CATALOG_CRAWL_JOB_TIMEOUT_SEC", 300))
+CATALOG_CRAWL_WORKERS    = int(os.getenv("CATALOG_CRAWL_WORKERS", 4))
+
 
 
 # ======================================================================
@@ -55,12 +81,14 @@ def get_catalog_sidebar_data(account_id: str):
         LIMIT 1
     """
     row = next(
-        bq_client.query(
+        run_query(
+            bq_client,
             sql_cmp,
             job_config=bigquery.QueryJobConfig(
                 query_parameters=[bigquery.ScalarQueryParameter("acc_id", "STRING", account_id)]
             ),
-        ).result(),
+            service="catalog_sidebar_service",
+        ),
         None,
     )
     if not row:
@@ -85,16 +113,22 @@ def get_catalog_sidebar_data(account_id: str):
 
     param = [bigquery.ScalarQueryParameter("cmp", "STRING", company_name)]
     best_28 = [
-        dict(r) for r in bq_client.query(
+        dict(r) for r in run_query(
+            bq_client,
             _top_query(28, 60),
-            job_config=bigquery.QueryJobConfig(query_parameters=param)
-        ).result()
+            job_config=bigquery.QueryJobConfig(query_parameters=param),
+            service="catalog_sidebar_service",
+            company=company_name,
+        )
     ]
     best_7 = [
-        dict(r) for r in bq_client.query(
+        dict(r) for r in run_query(
+            bq_client,
             _top_query(7, 20),
-            job_config=bigquery.QueryJobConfig(query_parameters=param)
-        ).result()
+            job_config=bigquery.QueryJobConfig(query_parameters=param),
+            service="catalog_sidebar_service",
+            company=company_name,
+        )
     ]
 
     return {
@@ -109,45 +143,49 @@ def get_catalog_sidebar_data(account_id: str):
 # 2) 수동 세트 – 카테고리 URL → product_no 크롤링 → 상품정보 조회
 # ======================================================================
 
-def get_manual_product_list(
-    category_url: str,
-    max_pages: int = 10,
-    crawl_func_url: str = os.getenv(
-        "CRAWL_FUNCTION_URL",
-        "https://asia-northeast3-winged-precept-443218-v8.cloudfunctions.net/crawl_catalog",
-    ),
-    crawl_timeout: int = 120,   # Cloud Function 최대 대기(초)
-):
-    """
-    1) Cloud Function(crawl_catalog)에 category_url 전달 → 즉시 크롤링 & BigQuery 적재
-    2) 적재가 끝나면 url_product 테이블을 조회해 상품목록 반환
-    """
-    import logging, requests
-    from urllib.parse import urlparse
-    from google.cloud import bigquery
+_crawl_executor = ThreadPoolExecutor(max_workers=CATALOG_CRAWL_WORKERS, thread_name_prefix="crawl_catalog")
+_crawl_inflight: Dict[str, str] = {}          # cache_key → 진행 중 job_id (같은 URL 중복 제출 방지)
+_crawl_lock = threading.Lock()
+_crawl_bucket = None
+_JOB_ID_RE = re.compile(r"^[0-9a-f]{20}-\d{10}$")
+
+
+def _get_crawl_bucket():
+    global _crawl_bucket
+    if _crawl_bucket is None:
+        with _crawl_lock:
+            if _crawl_bucket is None:
+                _crawl_bucket = storage.Client().bucket(GCS_BUCKET)
+    return _crawl_bucket
 
-    LOG = logging.getLogger("catalog")
 
-    # ────────────────── 1️⃣ Cloud Function 호출 ──────────────────
-    payload = {"category_url": category_url, "max_pages": max_pages}
+def _crawl_cache_key(company_name: str, category_url: str) -> str:
+    """(company, category_url) 캐시 키 – Cloud Function 의 crawl_cache_key 와 동일"""
+    return hashlib.sha1(f"{company_name}|{category_url}".encode("utf-8")).hexdigest()[:20]
+
+
+def _read_crawl_blob(path: str) -> Optional[Dict]:
+    blob = _get_crawl_bucket().blob(path)
     try:
-        LOG.info("[crawl_catalog 호출] %s", crawl_func_url)
-        cf_res = requests.post(
-            crawl_func_url,
-            json=payload,
-            timeout=crawl_timeout,
-            headers={"Content-Type": "application/json"},
+        return json.loads(blob.download_as_bytes().decode("utf-8"))
+    except NotFound:
+        return None
+    except Exception as e:
+        LOG.warning("[crawl_catalog] %s 읽기 실패: %s", path, e)
+        return None
+
+
+def _write_crawl_job(job_id: str, **fields):
+    try:
+        _get_crawl_bucket().blob(f"{CRAWL_CACHE_PREFIX}/jobs/{job_id}.json").upload_from_string(
+            json.dumps({"job_id": job_id, **fields}, ensure_ascii=False),
+            content_type="application/json",
         )
-        cf_res.raise_for_status()
-        cf_json = cf_res.json()
-        LOG.info("[crawl_catalog 응답] %s", cf_json)
-        if cf_json.get("status") != "success":
-            return None, f"Cloud Function 실패: {cf_json}"
     except Exception as e:
-        LOG.error("[Cloud Function 호출 오류] %s", e)
-        return None, f"Cloud Function 호출 오류: {e}"
+        LOG.warning("[crawl_catalog] 작업 상태 기록 실패 (%s): %s", job_id, e)
+
 
-    # ────────────────── 2️⃣ company_name 매핑 ──────────────────
+def _company_by_category_url(category_url: str) -> Optional[str]:
     host = urlparse(category_url).netloc.replace("www.", "")
     sql_cmp = """
         SELECT company_name
@@ -156,40 +194,147 @@ def get_manual_product_list(
         LIMIT 1
     """
     row = next(
-        bq_client.query(
+        run_query(
+            bq_client,
             sql_cmp,
             job_config=bigquery.QueryJobConfig(
                 query_parameters=[bigquery.ScalarQueryParameter("url", "STRING", host)]
             ),
-        ).result(),
+            service="catalog_sidebar_service",
+        ),
         None,
     )
-    if not row:
+    return row["company_name"] if row else None
+
+
+def _run_crawl_job(crawl_func_url: str, payload: Dict, crawl_timeout: int):
+    """백그라운드 스레드: Cloud Function 호출 (진행/결과는 Cloud Function 이 GCS 에 기록)"""
+    job_id = payload["job_id"]
+    try:
+        cf_res = requests.post(
+            crawl_func_url,
+            json=payload,
+            timeout=crawl_timeout,
+            headers={"Content-Type": "application/json"},
+        )
+        cf_json = cf_res.json()
+        LOG.info("[crawl_catalog 응답] %s %s", job_id, cf_json)
+        if cf_json.get("status") not in ("success", "empty"):
+            _write_crawl_job(job_id, state="error", msg=f"Cloud Function 실패: {cf_json}")
+    except Exception as e:
+        LOG.error("[Cloud Function 호출 오류] %s %s", job_id, e)
+        _write_crawl_job(job_id, state="error", msg=f"Cloud Function 호출 오류: {e}")
+    finally:
+        with _crawl_lock:
+            if _crawl_inflight.get(payload["cache_key"]) == job_id:
+                _crawl_inflight.pop(payload["cache_key"], None)
+
+
+def get_manual_product_list(
+    category_url: str,
+    max_pages: int = 10,
+    crawl_func_url: str = os.getenv(
+        "CRAWL_FUNCTION_URL",
+        "https://asia-northeast3-winged-precept-443218-v8.cloudfunctions.net/crawl_catalog",
+    ),
+    crawl_timeout: int = 120,   # Cloud Function 최대 대기(초) – 백그라운드 스레드에서만 대기
+    force_refresh: bool = False,
+):
+    """
+    1) category_url → company_name 매핑
+    2) (company, category_url) 캐시가 CATALOG_CRAWL_FRESH_SEC 안이면 바로 반환
+       → {"products": [...], "cached": True, "crawled_at": ...}
+    3) 아니면 크롤링 작업만 제출하고 job_id 반환 (웹 요청은 기다리지 않음)
+       → {"job_id": ..., "state": "queued"}  ※ get_manual_crawl_job(job_id) 으로 polling
+    """
+    # ────────────────── 1️⃣ company_name 매핑 ──────────────────
+    company_name = _company_by_category_url(category_url)
+    if not company_name:
+        host = urlparse(category_url).netloc.replace("www.", "")
         msg = f"해당 URL({host}) 과 매칭되는 회사 정보를 찾을 수 없습니다."
         LOG.error("[도메인 매핑 실패] " + msg)
         return None, msg
+    cache_key = _crawl_cache_key(company_name, category_url)
+
+    # ────────────────── 2️⃣ 캐시 조회 ──────────────────
+    if not force_refresh:
+        cached = _read_crawl_blob(f"{CRAWL_CACHE_PREFIX}/cache/{cache_key}.json")
+        if cached and cached.get("crawled_at"):
+            age = (datetime.utcnow() - datetime.fromisoformat(cached["crawled_at"])).total_seconds()
+            if age < CATALOG_CRAWL_FRESH_SEC:
+                LOG.info("[crawl_catalog 캐시] %s %d개 (%.0f초 전)", company_name, len(cached.get("products", [])), age)
+                return {
+                    "products"  : _as_product_rows(cached.get("products", [])),
+                    "cached"    : True,
+                    "crawled_at": cached["crawled_at"],
+                }, None
+
+    # ────────────────── 3️⃣ 크롤링 작업 제출 ──────────────────
+    with _crawl_lock:
+        job_id = _crawl_inflight.get(cache_key)
+        if job_id is None:
+            job_id = f"{cache_key}-{int(time.time())}"
+            _crawl_inflight[cache_key] = job_id
+            payload = {
+                "category_url": category_url,
+                "max_pages"   : max_pages,
+                "job_id"      : job_id,
+                "cache_key"   : cache_key,
+            }
+            LOG.info("[crawl_catalog 제출] %s → %s", job_id, crawl_func_url)
+            _crawl_executor.submit(_run_crawl_job, crawl_func_url, payload, crawl_timeout)
+    return {"job_id": job_id, "state": "queued"}, None
 
-    company_name = row["company_name"]
-    LOG.info("[업체 매핑] %s → %s", host, company_name)
 
-    # ────────────────── 3️⃣ url_product 테이블 조회 ──────────────────
-    sql_prod = """
-        SELECT DISTINCT product_name, CAST(product_no AS INT64) AS product_no
-        FROM `winged-precept-443218-v8.ngn_dataset.url_product`
-        WHERE company_name = @cmp
-        ORDER BY product_name
+def get_manual_crawl_job(job_id: str):
     """
-    rows = bq_client.query(
-        sql_prod,
-        job_config=bigquery.QueryJobConfig(
-            query_parameters=[bigquery.ScalarQueryParameter("cmp", "STRING", company_name)]
-        ),
-    ).result()
-    result = [dict(r) for r in rows]
-    LOG.info("[url_product] %d개 반환", len(result))
+    크롤링 작업 상태 조회
+    → {"job_id", "state": queued|running|success|empty|error, "pages_fetched", "count", ["products"]}
+    """
+    if not job_id or not _JOB_ID_RE.match(job_id):
+        return None, "잘못된 job_id 입니다."
+
+    job = _read_crawl_blob(f"{CRAWL_CACHE_PREFIX}/jobs/{job_id}.json")
+    if job is None:
+        # 아직 Cloud Function 이 시작 전 – 제출 후 제한 시간이 지나면 실패 처리
+        submitted_at = int(job_id.rsplit("-", 1)[1])
+        if time.time() - submitted_at > CATALOG_CRAWL_JOB_TIMEOUT_SEC:
+            return None, "크롤링 작업이 시작되지 않았습니다. 다시 시도해 주세요."
+        return {"job_id": job_id, "state": "queued", "pages_fetched": 0, "count": 0}, None
+
+    state = job.get("state")
+    result = {
+        "job_id"       : job_id,
+        "state"        : state,
+        "pages_fetched": job.get("pages_fetched", 0),
+        "count"        : job.get("count", 0),
+    }
+    if state == "success":
+        cache_key = job.get("cache_key") or job_id.rsplit("-", 1)[0]
+        cached = _read_crawl_blob(f"{CRAWL_CACHE_PREFIX}/cache/{cache_key}.json")
+        if cached is None:
+            return None, "크롤링 결과를 찾을 수 없습니다."
+        result["products"] = _as_product_rows(cached.get("products", []))
+        result["crawled_at"] = cached.get("crawled_at")
+    elif state == "empty":
+        result["products"] = []
+    elif state == "error":
+        return None, job.get("msg") or "크롤링 실패"
     return result, None
 
 
+def _as_product_rows(products: List[Dict]) -> List[Dict]:
+    """기존 url_product 조회 결과와 같은 형태 (product_name 순, product_no 정수)"""
+    rows = []
+    for p in products:
+        try:
+            rows.append({"product_name": p["product_name"], "product_no": int(p["product_no"])})
+        except (KeyError, TypeError, ValueError):
+            continue
+    rows.sort(key=lambda r: r["product_name"])
+    return rows
+
+
 
 # ======================================================================
 # 3) 수동 세트 – 키워드 검색
@@ -209,12 +354,14 @@ def search_products_for_manual_set(
         LIMIT 1
     """
     row = next(
-        bq_client.query(
+        run_query(
+            bq_client,
             sql_cmp,
             job_config=bigquery.QueryJobConfig(
                 query_parameters=[bigquery.ScalarQueryParameter("acc", "STRING", account_id)]
             ),
-        ).result(),
+            service="catalog_sidebar_service",
+        ),
         None,
     )
     if not row:
@@ -235,7 +382,8 @@ def search_products_for_manual_set(
         ORDER BY product_name
         LIMIT {limit}
     """
-    rows = bq_client.query(
+    rows = run_query(
+        bq_client,
         sql_search,
         job_config=bigquery.QueryJobConfig(
             query_parameters=[
@@ -243,7 +391,9 @@ def search_products_for_manual_set(
                 bigquery.ScalarQueryParameter("kw",  "STRING", keyword),
             ]
         ),
-    ).result()
+        service="catalog_sidebar_service",
+        company=company_name,
+    )
     return [dict(r) for r in rows], None
 
 
@@ -257,9 +407,15 @@ def _chunks(it: Iterable, size: int):
     while chunk := list(islice(it, size)):
         yield chunk
 
-def _fetch_catalog_retailer_ids(catalog_id: str) -> List[str]:
-    """해당 카탈로그에 등록된 모든 retailer_id 리스트"""
-    ids, after = [], None
+def _fetch_catalog_retailer_ids(
+    catalog_id: str,
+    etag: Optional[str] = None,
+) -> Tuple[Optional[List[str]], Optional[str]]:
+    """
+    해당 카탈로그에 등록된 모든 retailer_id 리스트 + 첫 페이지 ETag
+    etag 를 넘겼고 첫 페이지가 304(Not Modified)면 (None, etag) 반환
+    """
+    ids, after, first_etag = [], None, None
     while True:
         params = {
             "fields"      : "retailer_id",
@@ -267,21 +423,98 @@ def _fetch_catalog_retailer_ids(catalog_id: str) -> List[str]:
             "access_token": FB_TOKEN,
             **({"after": after} if after else {}),
         }
-        res = requests.get(f"{FB_HOST}/{catalog_id}/products",
-                           params=params, timeout=TIMEOUT).json()
+        headers = {"If-None-Match": etag} if (etag and not after) else None
+        resp = requests.get(f"{FB_HOST}/{catalog_id}/products",
+                            params=params, headers=headers, timeout=TIMEOUT)
+        if resp.status_code == 304:
+            return None, etag
+        if not after:
+            first_etag = resp.headers.get("ETag")
+        res = resp.json()
         ids += [p["retailer_id"] for p in res.get("data", [])]
         after = res.get("paging", {}).get("cursors", {}).get("after")
         if not after:
             break
-    return ids
+    return ids, first_etag
 
-def _map_short_to_full(short_ids: Sequence[str], catalog_ids: List[str]) -> List[str]:
-    """‘679’ → ‘679.P000…’ 식으로 full retailer_id 매핑"""
-    full: List[str] = []
-    for sid in short_ids:
-        full += [rid for rid in catalog_ids if rid.startswith(f"{sid}.")]
+
+class _RetailerIdIndex:
+    """
+    retailer_id prefix 색인
+    ‘679.P0001.S’ → ‘679’, ‘679.P0001’ 두 prefix 모두에 등록
+    (기존 rid.startswith(f"{sid}.") 전체 스캔과 같은 결과를 dict 조회 1회로)
+    """
+
+    def __init__(self, retailer_ids: List[str], etag: Optional[str]):
+        self.etag       = etag
+        self.fetched_at = time.monotonic()      # ETag 재검증 시 갱신
+        self.built_at   = self.fetched_at
+        self.size       = len(retailer_ids)
+        self.prefix_map: Dict[str, List[str]] = {}
+        for rid in retailer_ids:
+            pos = rid.find(".")
+            while pos != -1:
+                self.prefix_map.setdefault(rid[:pos], []).append(rid)
+                pos = rid.find(".", pos + 1)
+
+    def is_fresh(self) -> bool:
+        return time.monotonic() - self.fetched_at < CATALOG_INDEX_TTL_SEC
+
+    def can_force_refresh(self) -> bool:
+        return time.monotonic() - self.built_at >= CATALOG_INDEX_MIN_REFRESH_SEC
+
+    def map_short_to_full(self, short_ids: Sequence[str]) -> Tuple[List[str], List[str]]:
+        """(full retailer_id 목록, 카탈로그에 없는 short id 목록)"""
+        full: List[str] = []
+        missing: List[str] = []
+        for sid in short_ids:
+            matched = self.prefix_map.get(str(sid))
+            if matched:
+                full += matched
+            else:
+                missing.append(str(sid))
+        return full, missing
+
+
+_catalog_index_cache: Dict[str, _RetailerIdIndex] = {}
+_catalog_index_lock = threading.Lock()
+
+
+def _get_catalog_index(catalog_id: str, force_refresh: bool = False) -> Tuple[_RetailerIdIndex, bool]:
+    """카탈로그별 retailer_id 색인 (TTL 캐시, 만료 시 ETag 재검증) → (색인, 이번 호출에서 새로 받았는지)"""
+    with _catalog_index_lock:
+        cached = _catalog_index_cache.get(catalog_id)
+    if cached and cached.is_fresh() and not force_refresh:
+        return cached, False
+
+    ids, etag = _fetch_catalog_retailer_ids(catalog_id, None if force_refresh or not cached else cached.etag)
+    if ids is None and cached:
+        # 304 → 기존 색인 그대로 TTL 연장
+        cached.fetched_at = time.monotonic()
+        LOG.info("[catalog_index] %s 변경 없음 (ETag) → 캐시 재사용", catalog_id)
+        return cached, False
+
+    index = _RetailerIdIndex(ids or [], etag)
+    with _catalog_index_lock:
+        _catalog_index_cache[catalog_id] = index
+    LOG.info("[catalog_index] %s 색인 생성: retailer_id %d개", catalog_id, index.size)
+    return index, True
+
+
+def _map_short_to_full(catalog_id: str, short_ids: Sequence[str]) -> List[str]:
+    """
+    ‘679’ → ‘679.P000…’ 식으로 full retailer_id 매핑
+    캐시된 색인에 없는 id 가 있으면 (새로 등록된 상품일 수 있으므로) 1회 새로 받아 재시도
+    """
+    index, fetched = _get_catalog_index(catalog_id)
+    full, missing = index.map_short_to_full(short_ids)
+    if missing and not fetched and index.can_force_refresh():
+        LOG.info("[catalog_index] %s 색인에 없는 상품번호 %d개 → 재조회", catalog_id, len(missing))
+        index, _ = _get_catalog_index(catalog_id, force_refresh=True)
+        full, _ = index.map_short_to_full(short_ids)
     return full
 
+
 def _get_existing_set_id(catalog_id: str, set_name: str) -> Optional[str]:
     """세트명이 동일한 product_set ID(있으면)"""
     after = None
@@ -378,9 +611,8 @@ def create_or_update_product_set(
     if not FB_TOKEN:
         return {}, "META_SYSTEM_TOKEN 누락"
 
-    # 1️⃣ 매핑
-    catalog_ids = _fetch_catalog_retailer_ids(catalog_id)
-    full_ids    = _map_short_to_full(retailer_ids, catalog_ids)
+    # 1️⃣ 매핑 (카탈로그별 prefix 색인, TTL 캐시)
+    full_ids = _map_short_to_full(catalog_id, retailer_ids)
     if not full_ids:
         return {}, "카탈로그에서 매칭된 retailer_id 가 없습니다."
 
@@ -406,33 +638,56 @@ def create_or_update_product_set(
             return {}, del_res["error"].get("message", "세트 삭제 실패")
         existing_id = None   # ← fall-through 로 ‘새로 생성’ 진입
 
-    # 3️⃣ 새 세트 생성
+    # 3️⃣ 새 세트 생성 + 나머지 상품 추가 (Graph batch)
+    #    생성 요청과 추가 요청을 한 batch 로 보내고, 추가 요청은 생성 결과 id 를 참조
     first, rest = full_ids[:500], full_ids[500:]
-    create_body = {
-        "name"        : set_name,
-        "filter"      : json.dumps({"retailer_id": {"is_any": first}},
-                                   ensure_ascii=False, separators=(",", ":")),
-        "access_token": FB_TOKEN,
-    }
-    res = requests.post(f"{FB_HOST}/{catalog_id}/product_sets",
-                        data=create_body, timeout=TIMEOUT).json()
-    if "id" not in res:
-        return {}, res.get("error", {}).get("message", "Create 실패")
-
-    new_id = res["id"]
-    for chunk in _chunks(rest, 500):
-        add = requests.post(
-            f"{FB_HOST}/{new_id}/products",
-            data={
-                "retailer_id" : ",".join(chunk),
-                "method"      : "POST",
-                "allow_upsert": "true",
-                "access_token": FB_TOKEN,
-            },
-            timeout=TIMEOUT,
-        ).json()
-        if not add.get("success"):
-            return {}, add.get("error", {}).get("message", "추가 업로드 실패")
+    create_op = batch_op(
+        "POST", f"{catalog_id}/product_sets",
+        {
+            "name"  : set_name,
+            "filter": json.dumps({"retailer_id": {"is_any": first}},
+                                 ensure_ascii=False, separators=(",", ":")),
+        },
+        name="create", omit_response_on_success=False,
+    )
 
-    return {"action": "created", "set_id": new_id}, ""
+    def _add_op(set_ref: str, chunk: List[str], depends_on: Optional[str] = None) -> Dict:
+        return batch_op(
+            "POST", f"{set_ref}/products",
+            {"retailer_id": ",".join(chunk), "method": "POST", "allow_upsert": "true"},
+            depends_on=depends_on,
+        )
+
+    chunks = list(_chunks(rest, 500))
+    ops = [create_op]
+    ops += [_add_op("{result=create:$.id}", c, "create") for c in chunks[:GRAPH_BATCH_MAX_OPS - 1]]
 
+    try:
+        results = graph_batch(ops, FB_TOKEN, version=FB_VER, timeout=TIMEOUT)
+    except (GraphBatchError, requests.RequestException, ValueError) as e:
+        return {}, str(e)
+
+    err = batch_result_error(results[0], "Create 실패")
+    if err or not results[0]:
+        return {}, err or "Create 실패"
+    new_id = results[0]["body"].get("id")
+    if not new_id:
+        return {}, "Create 실패"
+
+    for r in results[1:]:
+        err = batch_result_error(r, "추가 업로드 실패", require_success=True)
+        if err:
+            return {}, err
+
+    # 49개 청크(약 24,500개) 초과분은 생성된 set_id 로 이어서 batch 업로드
+    for batch_chunks in _chunks(chunks[GRAPH_BATCH_MAX_OPS - 1:], GRAPH_BATCH_MAX_OPS):
+        try:
+            results = graph_batch([_add_op(new_id, c) for c in batch_chunks], FB_TOKEN, version=FB_VER, timeout=TIMEOUT)
+        except (GraphBatchError, requests.RequestException, ValueError) as e:
+            return {}, str(e)
+        for r in results:
+            err = batch_result_error(r, "추가 업로드 실패", require_success=True)
+            if err:
+                return {}, err
+
+    return {"action": "created", "set_id": new_id}, ""
@@ -5,18 +5,25 @@
 import os
 import json
 import re
-import time
-import random
 import gzip
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone, timedelta
-from typing import List, Dict, Any, Optional
+from typing import Iterable, List, Dict, Any, Optional
 from urllib.parse import urlencode
-from urllib.request import Request, urlopen
-from urllib.error import HTTPError, URLError
 
+import requests
 from google.cloud import bigquery
 from google.cloud import storage
 
+from ..utils.polite_crawler import get_polite_crawler
+from ..utils.bq_query import run_query, run_query_job
+from ..utils.review_watermark_cache import get_review_watermark_cache
+from ..utils.columnar_snapshot import (
+    load_columnar_manifest,
+    read_columnar_groups,
+    write_columnar_snapshot,
+)
+
 # 캐싱 유틸리티 임포트
 try:
     from ..utils.cache_utils import cached_query
@@ -58,6 +65,9 @@ REVIEW_HEADERS_BASE = {
 
 REVIEW_SORT_CANDIDATES = ["", "BEST"]  # 빈 값 = 최신순
 
+# 동시 수집 스레드 수 (요청 속도 상한은 polite_crawler의 호스트별 토큰 버킷이 보장)
+CRAWL_29CM_CONCURRENCY = int(os.environ.get("CRAWL_29CM_CONCURRENCY", 8))
+
 
 def get_bigquery_client():
     """BigQuery Client 생성"""
@@ -81,18 +91,13 @@ def safe_float(v):
 
 
 def post_json(url: str, headers: dict, payload: dict) -> dict:
-    """POST JSON 요청"""
-    body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
-    req = Request(url, data=body, headers=headers, method="POST")
-    with urlopen(req, timeout=40) as resp:
-        return json.loads(resp.read().decode("utf-8", errors="replace"))
+    """POST JSON 요청 (공유 세션 + 호스트별 속도 제한 + 429/5xx 재시도)"""
+    return get_polite_crawler().post_json(url, headers=headers, payload=payload, timeout=40)
 
 
 def get_json(url: str, headers: dict) -> dict:
-    """GET JSON 요청"""
-    req = Request(url, headers=headers, method="GET")
-    with urlopen(req, timeout=30) as resp:
-        return json.loads(resp.read().decode("utf-8", errors="replace"))
+    """GET JSON 요청 (공유 세션 + 호스트별 속도 제한 + 429/5xx 재시도)"""
+    return get_polite_crawler().get_json(url, headers=headers, timeout=30)
 
 
 def get_competitor_brands(company_name: str) -> List[Dict[str, Any]]:
@@ -118,7 +123,7 @@ def get_competitor_brands(company_name: str) -> List[Dict[str, Any]]:
     )
 
     try:
-        rows = client.query(query, job_config=job_config).result()
+        rows = run_query(client, query, job_config=job_config, service="compare_29cm_service", company=company_name)
         return [dict(row) for row in rows]
     except Exception as e:
         print(f"[ERROR] get_competitor_brands 실패: {e}")
@@ -148,7 +153,7 @@ def get_own_brand_id(company_name: str) -> Optional[int]:
     )
 
     try:
-        rows = list(client.query(query, job_config=job_config).result())
+        rows = list(run_query(client, query, job_config=job_config, service="compare_29cm_service", company=company_name))
         if rows and rows[0].brand_id_29cm:
             return int(rows[0].brand_id_29cm)
         return None
@@ -180,8 +185,7 @@ def update_brand_name(company_name: str, brand_id: int, brand_name: str) -> bool
     )
 
     try:
-        job = client.query(query, job_config=job_config)
-        job.result()  # 완료 대기
+        job = run_query_job(client, query, job_config=job_config, service="compare_29cm_service", company=company_name)
         if job.num_dml_affected_rows and job.num_dml_affected_rows > 0:
             print(f"[INFO] 브랜드명 업데이트: {brand_id} → {brand_name}")
         return True
@@ -265,12 +269,13 @@ def search_29cm_products(keyword: str) -> List[Dict]:
         payload = build_search_payload(keyword)
         resp = post_json(SEARCH_API_URL, SEARCH_HEADERS, payload)
         return extract_top20(resp)
-    except HTTPError as e:
-        body = e.read().decode("utf-8", errors="replace")
-        print(f"[ERROR] 검색 API HTTPError {e.code}: {body[:500]}")
+    except requests.HTTPError as e:
+        body = e.response.text if e.response is not None else ""
+        status = e.response.status_code if e.response is not None else None
+        print(f"[ERROR] 검색 API HTTPError {status}: {body[:500]}")
         return []
-    except URLError as e:
-        print(f"[ERROR] 검색 API URLError: {e}")
+    except requests.RequestException as e:
+        print(f"[ERROR] 검색 API 요청 오류: {e}")
         return []
     except Exception as e:
         print(f"[ERROR] 검색 API 오류: {e}")
@@ -283,23 +288,24 @@ def fetch_brand_products(brand_id: int) -> List[Dict]:
         payload = build_brand_payload(brand_id)
         resp = post_json(SEARCH_API_URL, SEARCH_HEADERS, payload)
         return extract_top20(resp)
-    except HTTPError as e:
-        body = e.read().decode("utf-8", errors="replace")
-        print(f"[ERROR] 브랜드 API HTTPError {e.code}: {body[:500]}")
+    except requests.HTTPError as e:
+        body = e.response.text if e.response is not None else ""
+        status = e.response.status_code if e.response is not None else None
+        print(f"[ERROR] 브랜드 API HTTPError {status}: {body[:500]}")
         return []
-    except URLError as e:
-        print(f"[ERROR] 브랜드 API URLError: {e}")
+    except requests.RequestException as e:
+        print(f"[ERROR] 브랜드 API 요청 오류: {e}")
         return []
     except Exception as e:
         print(f"[ERROR] 브랜드 API 오류: {e}")
         return []
 
 
-def _fetch_reviews(item_id: int, sort_value: str, limit: int, referer: str) -> dict:
+def _fetch_reviews(item_id: int, sort_value: str, limit: int, referer: str, page: int = 0) -> dict:
     """리뷰 API 호출 (내부 함수)"""
     params = {
         "itemId": item_id,
-        "page": 0,
+        "page": page,
         "size": limit,
         "sort": sort_value,
     }
@@ -310,57 +316,89 @@ def _fetch_reviews(item_id: int, sort_value: str, limit: int, referer: str) -> d
     return get_json(url, headers)
 
 
-def fetch_product_reviews(item_id: int, limit: int = 10) -> List[Dict]:
-    """상품 리뷰 수집 (fallback 포함)"""
-    referers = [
+def _review_referers(item_id: int) -> List[str]:
+    return [
         f"https://www.29cm.co.kr/products/{item_id}",
         f"https://product.29cm.co.kr/catalog/{item_id}",
     ]
 
-    for ref in referers:
+
+def _extract_review_results(data: dict) -> Optional[List[dict]]:
+    """리뷰 API 응답에서 원본 리뷰 목록 추출 (실패 응답이면 None)"""
+    if isinstance(data, dict) and data.get("result") == "FAIL":
+        return None
+    raw = data.get("raw") or data
+    data_section = raw.get("data") or {}
+    return data_section.get("results") or []
+
+
+def _normalize_review(r: dict) -> Dict:
+    """리뷰 정규화"""
+    content = (r.get("contents") or r.get("content") or "").strip()
+    content = content.replace("\r\n", "\n").replace("\r", "\n")
+
+    if len(content) > 200:
+        content = content[:200] + "…"
+
+    opt = r.get("optionValue") or []
+    if isinstance(opt, list):
+        opt_str = ", ".join([str(x) for x in opt if x is not None]) or None
+    else:
+        opt_str = str(opt)
+
+    created_at = (
+        r.get("insertTimestamp")
+        or r.get("createdAt")
+        or r.get("created_at")
+        or r.get("registrationDate")
+    )
+
+    return {
+        "rating": safe_int(r.get("point")),
+        "option": opt_str,
+        "created_at": created_at,
+        "content": content,
+    }
+
+
+def _fetch_latest_review_page(item_id: int, page: int, size: int) -> List[dict]:
+    """최신순 리뷰 페이지 조회 (referer fallback, 모두 실패하면 예외)"""
+    last_error: Optional[Exception] = None
+    for ref in _review_referers(item_id):
+        try:
+            results = _extract_review_results(_fetch_reviews(item_id, REVIEW_SORT_CANDIDATES[0], size, ref, page=page))
+            if results is not None:
+                return results
+        except Exception as e:
+            last_error = e
+    raise last_error or ValueError(f"리뷰 조회 실패: item_id={item_id}")
+
+
+def fetch_product_reviews(item_id: int, limit: int = 10, review_count: Optional[int] = None) -> List[Dict]:
+    """상품 리뷰 수집 (리뷰 워터마크 캐시 → fallback 포함)
+
+    review_count: 목록 API의 리뷰 수 (캐시와 같으면 리뷰 API 호출 생략)
+    """
+    cache = get_review_watermark_cache()
+    if cache is not None:
+        cached = cache.get_reviews(
+            item_id,
+            lambda page, size: _fetch_latest_review_page(item_id, page, size),
+            limit,
+            review_count=review_count,
+        )
+        if cached is not None:
+            return [_normalize_review(r) for r in cached]
+
+    for ref in _review_referers(item_id):
         for sort_value in REVIEW_SORT_CANDIDATES:
             try:
-                data = _fetch_reviews(item_id, sort_value, limit, ref)
-
-                if isinstance(data, dict) and data.get("result") == "FAIL":
+                results = _extract_review_results(_fetch_reviews(item_id, sort_value, limit, ref))
+                if results is None:
                     continue
+                return [_normalize_review(r) for r in results]
 
-                # 리뷰 정규화
-                raw = data.get("raw") or data
-                data_section = raw.get("data") or {}
-                results = data_section.get("results") or []
-
-                reviews = []
-                for r in results:
-                    content = (r.get("contents") or r.get("content") or "").strip()
-                    content = content.replace("\r\n", "\n").replace("\r", "\n")
-
-                    if len(content) > 200:
-                        content = content[:200] + "…"
-
-                    opt = r.get("optionValue") or []
-                    if isinstance(opt, list):
-                        opt_str = ", ".join([str(x) for x in opt if x is not None]) or None
-                    else:
-                        opt_str = str(opt)
-
-                    created_at = (
-                        r.get("insertTimestamp")
-                        or r.get("createdAt")
-                        or r.get("created_at")
-                        or r.get("registrationDate")
-                    )
-
-                    reviews.append({
-                        "rating": safe_int(r.get("point")),
-                        "option": opt_str,
-                        "created_at": created_at,
-                        "content": content,
-                    })
-
-                return reviews
-
-            except HTTPError as e:
+            except requests.HTTPError as e:
                 continue
             except Exception as e:
                 continue
@@ -368,6 +406,74 @@ def fetch_product_reviews(item_id: int, limit: int = 10) -> List[Dict]:
     return []  # 모든 시도 실패
 
 
+def fetch_reviews_for_items(
+    item_ids: Iterable[int],
+    limit: int = 10,
+    review_counts: Optional[Dict[int, Optional[int]]] = None
+) -> Dict[int, List[Dict]]:
+    """여러 상품 리뷰 병렬 수집 (item_id 중복 제거, 상품당 1회 호출)
+
+    review_counts: {item_id: 목록 API 리뷰 수} (리뷰 캐시 적중 판단용)
+
+    Returns:
+        {item_id: reviews}
+    """
+    unique_ids = list(dict.fromkeys(i for i in item_ids if i))
+    if not unique_ids:
+        return {}
+    review_counts = review_counts or {}
+
+    workers = max(1, min(CRAWL_29CM_CONCURRENCY, len(unique_ids)))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        reviews = executor.map(
+            lambda item_id: fetch_product_reviews(item_id, limit=limit, review_count=review_counts.get(item_id)),
+            unique_ids,
+        )
+        reviews_by_item = dict(zip(unique_ids, reviews))
+
+    # 배치 수집 후 워터마크 저장 (대시보드 단건 조회는 메모리에만 반영)
+    cache = get_review_watermark_cache()
+    if cache is not None:
+        cache.flush()
+    return reviews_by_item
+
+
+def crawl_brands(brand_ids: Iterable[int], review_limit: int = 10) -> Dict[int, List[Dict]]:
+    """여러 브랜드 상품 + 리뷰 병렬 수집 (베스트 매칭/저장 전 단계)
+
+    - 브랜드 상품 목록을 동시에 조회
+    - 여러 브랜드(여러 자사몰)에 걸쳐 겹치는 상품은 리뷰를 한 번만 수집
+    - 호스트별 요청 속도 상한은 기존 순차 수집과 동일하게 유지
+
+    Returns:
+        {brand_id: 상품 목록 (reviews 포함)} - 결과가 없는 브랜드는 빈 리스트
+    """
+    unique_brand_ids = list(dict.fromkeys(b for b in brand_ids if b))
+    if not unique_brand_ids:
+        return {}
+
+    workers = max(1, min(CRAWL_29CM_CONCURRENCY, len(unique_brand_ids)))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        products_by_brand = dict(zip(unique_brand_ids, executor.map(fetch_brand_products, unique_brand_ids)))
+
+    all_item_ids = []
+    review_counts: Dict[int, Optional[int]] = {}
+    for results in products_by_brand.values():
+        for result in results:
+            all_item_ids.append(result.get("item_id"))
+            review_counts[result.get("item_id")] = result.get("review_count")
+    reviews_by_item = fetch_reviews_for_items(all_item_ids, limit=review_limit, review_counts=review_counts)
+    print(f"[INFO] 브랜드 {len(unique_brand_ids)}개, 상품 {len(all_item_ids)}개 (리뷰 수집 {len(reviews_by_item)}개) 수집 완료")
+
+    for results in products_by_brand.values():
+        for result in results:
+            item_id = result.get("item_id")
+            if item_id:
+                result["reviews"] = reviews_by_item.get(item_id, [])
+
+    return products_by_brand
+
+
 def extract_item_id_from_url(item_url: str) -> Optional[int]:
     """item_url에서 item_id 추출"""
     if not item_url:
@@ -407,7 +513,7 @@ def load_best_ranking_dict(run_id: str) -> Dict[int, Dict]:
     
     best_dict = {}
     try:
-        rows = client.query(query, job_config=job_config).result()
+        rows = run_query(client, query, job_config=job_config, service="compare_29cm_service")
         for row in rows:
             product_id = safe_int(row.product_id)
             if product_id:
@@ -499,8 +605,8 @@ def save_search_results_to_gcs(
         # 스냅샷 경로 생성 (company_name 포함)
         blob_path = get_compare_snapshot_path(run_id, company_name)
         
-        # 기존 스냅샷 로드 (있다면)
-        existing_snapshot = load_search_results_from_gcs(company_name, run_id)
+        # 기존 스냅샷 로드 (있다면, JSON 원본 기준)
+        existing_snapshot = _load_search_results(company_name, run_id, columnar=False)
         if existing_snapshot is None:
             existing_snapshot = {}
         
@@ -531,6 +637,9 @@ def save_search_results_to_gcs(
             print(f"[INFO] 기존 스냅샷 삭제: {blob_path}")
         
         blob.upload_from_string(compressed_bytes, content_type='application/gzip')
+        write_columnar_snapshot(
+            bucket, blob_path, existing_snapshot, meta=_snapshot_meta(snapshot_data), json_generation=blob.generation
+        )
         
         print(f"[INFO] 스냅샷 저장 완료: {blob_path} ({search_keyword}: {len(search_results)}개)")
         return True
@@ -543,12 +652,40 @@ def save_search_results_to_gcs(
     
 
 
+def _snapshot_meta(snapshot_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Columnar manifest에 넣을 스냅샷 메타 (search_results 제외)"""
+    return {k: v for k, v in snapshot_data.items() if k != "search_results"}
+
+
+def _load_search_results_columnar(bucket, blob_path: str, search_keyword: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Columnar 스냅샷에서 필요한 브랜드(row group)만 로드 (없으면 None)"""
+    manifest = load_columnar_manifest(bucket, blob_path)
+    if manifest is None:
+        return None
+
+    groups = read_columnar_groups(bucket, manifest, [search_keyword] if search_keyword else None)
+    if groups is None:
+        return None
+    return {**(manifest.get("meta") or {}), "search_results": groups}
+
+
 @cached_query(func_name="compare_29cm_load_search_results", ttl=300)  # 5분 캐싱
 def load_search_results_from_gcs(company_name: str, run_id: str, search_keyword: Optional[str] = None) -> Optional[Dict[str, List[Dict]]]:
     """
     GCS 스냅샷에서 검색 결과 로드 (캐싱 적용)
     demo 계정의 경우 piscess 스냅샷을 로드합니다.
     """
+    return _load_search_results(company_name, run_id, search_keyword, columnar=True)
+
+
+def _load_search_results(company_name: str, run_id: str, search_keyword: Optional[str] = None,
+                         columnar: bool = True) -> Optional[Dict[str, List[Dict]]]:
+    """
+    스냅샷 로드 본체
+    columnar=False: JSON 스냅샷만 읽음 (저장 경로의 읽기-수정-쓰기용, 캐시 미사용)
+      Parquet 왕복 시 없는 키가 None으로 채워지고 int/float 혼합 컬럼 타입이 바뀌므로
+      그 결과를 JSON 스냅샷에 다시 쓰지 않도록 함
+    """
     try:
         # demo를 piscess로 매핑하여 스냅샷 경로 생성
         snapshot_company_name = "piscess" if company_name.lower() == "demo" else company_name
@@ -556,21 +693,25 @@ def load_search_results_from_gcs(company_name: str, run_id: str, search_keyword:
         
         client = storage.Client(project=PROJECT_ID)
         bucket = client.bucket(GCS_BUCKET)
-        blob = bucket.blob(blob_path)
-        
-        if not blob.exists():
-            print(f"[WARN] 스냅샷 파일이 없습니다: {blob_path}")
-            return None
-        
-        # 파일 읽기 및 압축 해제
-        snapshot_bytes = blob.download_as_bytes(raw_download=True)
-        
-        try:
-            snapshot_json_str = gzip.decompress(snapshot_bytes).decode('utf-8')
-        except (gzip.BadGzipFile, OSError):
-            snapshot_json_str = snapshot_bytes.decode('utf-8')
-        
-        snapshot_data = json.loads(snapshot_json_str)
+
+        # Columnar 스냅샷 우선 (요청한 브랜드 row group만 읽음) → 없으면 JSON 전체 로드
+        snapshot_data = _load_search_results_columnar(bucket, blob_path, search_keyword) if columnar else None
+        if snapshot_data is None:
+            blob = bucket.blob(blob_path)
+
+            if not blob.exists():
+                print(f"[WARN] 스냅샷 파일이 없습니다: {blob_path}")
+                return None
+
+            # 파일 읽기 및 압축 해제
+            snapshot_bytes = blob.download_as_bytes(raw_download=True)
+
+            try:
+                snapshot_json_str = gzip.decompress(snapshot_bytes).decode('utf-8')
+            except (gzip.BadGzipFile, OSError):
+                snapshot_json_str = snapshot_bytes.decode('utf-8')
+
+            snapshot_data = json.loads(snapshot_json_str)
         
         # company_name 확인 (demo인 경우 piscess 스냅샷이므로 검증 통과)
         snapshot_company_in_file = snapshot_data.get("company_name")
@@ -601,7 +742,7 @@ def load_search_results_from_gcs(company_name: str, run_id: str, search_keyword:
         }
         
     except Exception as e:
-        print(f"[ERROR] load_search_results_from_gcs 실패: {e}")
+        print(f"[ERROR] _load_search_results 실패: {e}")
         import traceback
         traceback.print_exc()
         return None
@@ -632,13 +773,16 @@ def collect_and_save_brand_results(
     # 브랜드명 추출 (첫 번째 상품에서)
     brand_name = search_results[0].get("brand_name") if search_results else None
 
-    # 2. 리뷰 수집
+    # 2. 리뷰 수집 (병렬, 호출 간격은 호스트별 속도 제한으로 유지)
+    reviews_by_item = fetch_reviews_for_items(
+        (r.get("item_id") for r in search_results),
+        limit=10,
+        review_counts={r.get("item_id"): r.get("review_count") for r in search_results},
+    )
     for result in search_results:
         item_id = result.get("item_id")
         if item_id:
-            time.sleep(random.uniform(0.3, 0.5))  # API 호출 간격
-            reviews = fetch_product_reviews(item_id, limit=10)
-            result["reviews"] = reviews
+            result["reviews"] = reviews_by_item.get(item_id, [])
 
     # 3. 베스트 목록 매칭
     search_results = match_with_best_ranking(search_results, best_dict)
@@ -677,19 +821,38 @@ def save_brand_results_to_gcs(
     if not search_results:
         return False
 
+    return save_company_brand_results_to_gcs(
+        company_name=company_name,
+        run_id=run_id,
+        results_by_brand={brand_id: search_results},
+        search_date=search_date,
+    )
+
+
+def save_company_brand_results_to_gcs(
+    company_name: str,
+    run_id: str,
+    results_by_brand: Dict[int, List[Dict]],
+    search_date: datetime
+) -> bool:
+    """여러 브랜드 검색 결과를 자사몰 스냅샷에 한 번에 저장 (읽기-수정-쓰기 1회)"""
+    results_by_brand = {b: r for b, r in results_by_brand.items() if r}
+    if not results_by_brand:
+        return False
+
     try:
         # 스냅샷 경로 생성 (company_name 포함)
         blob_path = get_compare_snapshot_path(run_id, company_name)
 
-        # 기존 스냅샷 로드 (있다면)
-        existing_data = load_search_results_from_gcs(company_name, run_id)
+        # 기존 스냅샷 로드 (있다면, JSON 원본 기준)
+        existing_data = _load_search_results(company_name, run_id, columnar=False)
         existing_snapshot = {}
         if existing_data and "search_results" in existing_data:
             existing_snapshot = existing_data["search_results"]
 
         # brand_id를 문자열 키로 사용
-        brand_key = str(brand_id)
-        existing_snapshot[brand_key] = search_results
+        for brand_id, search_results in results_by_brand.items():
+            existing_snapshot[str(brand_id)] = search_results
 
         # 스냅샷 데이터 구성
         snapshot_data = {
@@ -713,17 +876,73 @@ def save_brand_results_to_gcs(
             blob.delete()
 
         blob.upload_from_string(compressed_bytes, content_type='application/gzip')
+        write_columnar_snapshot(
+            bucket, blob_path, existing_snapshot, meta=_snapshot_meta(snapshot_data), json_generation=blob.generation
+        )
 
-        print(f"[INFO] 스냅샷 저장 완료: {blob_path} (brand_id={brand_id}: {len(search_results)}개)")
+        summary = ", ".join(f"brand_id={b}: {len(r)}개" for b, r in results_by_brand.items())
+        print(f"[INFO] 스냅샷 저장 완료: {blob_path} ({summary})")
         return True
 
     except Exception as e:
-        print(f"[ERROR] save_brand_results_to_gcs 실패: {e}")
+        print(f"[ERROR] save_company_brand_results_to_gcs 실패: {e}")
         import traceback
         traceback.print_exc()
         return False
 
 
+def collect_and_save_company_brands(
+    company_name: str,
+    brands: List[Dict[str, Any]],
+    run_id: str,
+    best_dict: Dict[int, Dict],
+    crawled: Optional[Dict[int, List[Dict]]] = None
+) -> List[Dict[str, Any]]:
+    """자사몰 1곳의 브랜드(자사몰 + 경쟁사) 수집 결과를 매칭 후 한 번에 저장
+
+    Args:
+        brands: [{"brand_id": int, "is_own_mall": bool}, ...]
+        crawled: crawl_brands() 결과 (여러 자사몰이 공유, 없으면 여기서 수집)
+
+    Returns:
+        수집된 브랜드 목록 [{"brand_id", "brand_name", "is_own_mall"}, ...]
+    """
+    if crawled is None:
+        crawled = crawl_brands(b["brand_id"] for b in brands)
+
+    results_by_brand: Dict[int, List[Dict]] = {}
+    collected: List[Dict[str, Any]] = []
+    for brand in brands:
+        brand_id = brand["brand_id"]
+        # 같은 브랜드를 여러 자사몰이 공유하므로 매칭 결과는 복사본에 기록
+        search_results = [dict(r) for r in crawled.get(brand_id) or []]
+        if not search_results:
+            print(f"[WARN] 검색 결과 없음: brand_id={brand_id}")
+            continue
+
+        results_by_brand[brand_id] = match_with_best_ranking(search_results, best_dict)
+        collected.append({
+            "brand_id": brand_id,
+            "brand_name": search_results[0].get("brand_name"),
+            "is_own_mall": bool(brand.get("is_own_mall")),
+        })
+
+    if not results_by_brand:
+        return []
+
+    search_date = datetime.now(timezone(timedelta(hours=9)))
+    if not save_company_brand_results_to_gcs(company_name, run_id, results_by_brand, search_date):
+        print(f"[ERROR] 저장 실패: {company_name}")
+        return []
+
+    # 브랜드명 자동 업데이트 (경쟁사만)
+    for brand in collected:
+        if brand["brand_name"] and not brand["is_own_mall"]:
+            update_brand_name(company_name, brand["brand_id"], brand["brand_name"])
+
+    return collected
+
+
 # 하위 호환성을 위한 기존 함수 유지
 def collect_and_save_search_results(
     company_name: str,
@@ -742,13 +961,16 @@ def collect_and_save_search_results(
 
     print(f"[INFO] 검색 결과 {len(search_results)}개 수집")
 
-    # 2. 리뷰 수집
+    # 2. 리뷰 수집 (병렬, 호출 간격은 호스트별 속도 제한으로 유지)
+    reviews_by_item = fetch_reviews_for_items(
+        (r.get("item_id") for r in search_results),
+        limit=10,
+        review_counts={r.get("item_id"): r.get("review_count") for r in search_results},
+    )
     for result in search_results:
         item_id = result.get("item_id")
         if item_id:
-            time.sleep(random.uniform(0.3, 0.5))  # API 호출 간격
-            reviews = fetch_product_reviews(item_id, limit=10)
-            result["reviews"] = reviews
+            result["reviews"] = reviews_by_item.get(item_id, [])
 
     # 3. 베스트 목록 매칭
     search_results = match_with_best_ranking(search_results, best_dict)
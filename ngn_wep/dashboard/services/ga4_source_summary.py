@@ -1,5 +1,6 @@
 from google.cloud import bigquery
 from ..utils.cache_utils import cached_query
+from ..utils.bq_query import run_query
 
 def get_bigquery_client():
     return bigquery.Client()
@@ -108,7 +109,7 @@ def get_ga4_source_summary(company_name, start_date: str, end_date: str, limit:
 
     try:
         client = get_bigquery_client()
-        rows = client.query(query, job_config=bigquery.QueryJobConfig(query_parameters=query_params)).result()
+        rows = run_query(client, query, job_config=bigquery.QueryJobConfig(query_parameters=query_params), service="ga4_source_summary", company=company_name)
         data = [dict(row) for row in rows]
         print(f"[DEBUG] GA4 소스 요약 결과 {len(data)}건")
         if len(data) > 0:
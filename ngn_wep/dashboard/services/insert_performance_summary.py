@@ -4,6 +4,11 @@ from googleapiclient.discovery import build
 import os
 import sys
 
+try:
+    from bq_query import run_query  # Cloud Run Job 이미지: /app/bq_query.py
+except ImportError:
+    from ngn_wep.dashboard.utils.bq_query import run_query
+
 # ✅ KST 설정
 KST = timezone(timedelta(hours=9))
 
@@ -29,7 +34,7 @@ def get_ga4_property_ids_by_company(company_name, client):
     LIMIT 1
     """
     try:
-        results = client.query(query).result()
+        results = run_query(client, query, service="insert_performance_summary", company=company_name)
         for row in results:
             return int(row.ga4_property_id)
         return None
@@ -130,7 +135,7 @@ def insert_performance_summary(target_date, update_cart_signup_only=False):
         """
         
         try:
-            companies = [row.company_name for row in client.query(company_query).result()]
+            companies = [row.company_name for row in run_query(client, company_query, service="insert_performance_summary")]
         except Exception as e:
             print(f"[WARN] {date_str}: 업체 목록 조회 실패: {e}")
             sys.stdout.flush()
@@ -169,7 +174,7 @@ def insert_performance_summary(target_date, update_cart_signup_only=False):
                 )
                 
                 try:
-                    client.query(update_query, job_config=job_config).result()
+                    run_query(client, update_query, job_config=job_config, service="insert_performance_summary", company=company_name)
                     print(f"[INFO] {date_str} {company_name}: 장바구니={cart_signup_data['cart_users']}명, 회원가입={cart_signup_data['signup_count']}건 업데이트 완료")
                     sys.stdout.flush()
                     updated_count += 1
@@ -280,7 +285,7 @@ def insert_performance_summary(target_date, update_cart_signup_only=False):
 
     """
 
-    client.query(create_temp_query).result()
+    run_query(client, create_temp_query, service="insert_performance_summary")
     print(f"[SUCCESS] 임시테이블 생성 완료 → {temp_table}")
     sys.stdout.flush()
     
@@ -293,7 +298,7 @@ def insert_performance_summary(target_date, update_cart_signup_only=False):
     SELECT DISTINCT company_name
     FROM `{PROJECT_ID}.{temp_table}`
     """
-    companies = [row.company_name for row in client.query(company_query).result()]
+    companies = [row.company_name for row in run_query(client, company_query, service="insert_performance_summary")]
     
     # 각 업체별로 GA4 데이터 수집 및 업데이트
     for company_name in companies:
@@ -318,7 +323,7 @@ def insert_performance_summary(target_date, update_cart_signup_only=False):
                     bigquery.ScalarQueryParameter("target_date", "DATE", date_str)
                 ]
             )
-            client.query(update_query, job_config=job_config).result()
+            run_query(client, update_query, job_config=job_config, service="insert_performance_summary", company=company_name)
             print(f"[INFO] {company_name}: 장바구니={cart_signup_data['cart_users']}명, 회원가입={cart_signup_data['signup_count']}건")
             sys.stdout.flush()
         else:
@@ -368,14 +373,14 @@ def insert_performance_summary(target_date, update_cart_signup_only=False):
       )
     """
 
-    client.query(merge_query).result()
+    run_query(client, merge_query, service="insert_performance_summary")
     print(f"[SUCCESS] 메인 테이블 병합 완료 → {TABLE_ID}")
     sys.stdout.flush()
 
     # 임시 테이블 삭제 (존재하지 않을 수 있으므로 예외 처리)
     try:
         drop_query = f"DROP TABLE IF EXISTS `{PROJECT_ID}.{temp_table}`"
-        client.query(drop_query).result()
+        run_query(client, drop_query, service="insert_performance_summary")
         print(f"[SUCCESS] 임시테이블 삭제 완료 → {temp_table}")
         sys.stdout.flush()
     except Exception as e:
@@ -1,6 +1,7 @@
 from google.cloud import bigquery
 from flask import session
 from typing import Optional
+from ..utils.bq_query import run_query
 
 # ------------------------- 공통 ------------------------- #
 def dictify_rows(rows):
@@ -33,7 +34,7 @@ def get_meta_account_list_filtered(company_name: str):
     )
 
     try:
-        return dictify_rows(bigquery.Client().query(qry, job_config=cfg).result())
+        return dictify_rows(run_query(bigquery.Client(), qry, job_config=cfg, service="meta_ads_insight", company=company_name))
     except Exception as e:
         print(f"[ERROR] Meta 계정 리스트 조회 실패: {e}")
         return []
@@ -287,7 +288,7 @@ def get_meta_ads_insight_table(
     try:
         # 파라미터화된 쿼리 실행
         job_config = bigquery.QueryJobConfig(query_parameters=query_params)
-        rows = client.query(query, job_config=job_config).result()
+        rows = run_query(client, query, job_config=job_config, service="meta_ads_insight", company=company_name)
         result = dictify_rows(rows)
         if date_type == "summary":
             for r in result:
@@ -311,7 +312,7 @@ def get_meta_ads_insight_table(
 
             try:
                 count_job_config = bigquery.QueryJobConfig(query_parameters=count_params)
-                count_rows = client.query(count_query, job_config=count_job_config).result()
+                count_rows = run_query(client, count_query, job_config=count_job_config, service="meta_ads_insight", company=company_name)
                 total_count = next(count_rows)["total_count"]
                 print(f"[DEBUG] 메타 광고 전체 개수: {total_count}, 현재 페이지: {len(result)}개")
                 return {
@@ -1,14 +1,18 @@
 import os
 import logging
 import requests
+from requests.adapters import HTTPAdapter
 from requests.exceptions import RequestException, Timeout, ConnectionError as RequestsConnectionError
 from google.cloud import bigquery
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor
 import time
 from urllib.parse import quote
 from collections import defaultdict
 import threading
 
+from ..utils.cache_utils import SimpleCache
+from ..utils.bq_query import run_query
+
 # ✅ 로깅 설정
 logger = logging.getLogger(__name__)
 
@@ -24,6 +28,72 @@ if creds_path and not os.path.exists(creds_path):
 # ✅ 토큰 로그 출력 여부 (1회만 출력)
 _token_logged = False
 
+# ✅ 미리보기 수집 설정
+# - Graph API ids= 요청 1회에 최대 50개 노드 (광고/크리에이티브/영상)
+# - 동시 요청 수는 META_PREVIEW_MAX_CONCURRENCY 안에서 조절 (rate limit 응답 시 절반으로 감소)
+META_GRAPH_URL = "https://graph.facebook.com/v24.0/"
+META_PREVIEW_IDS_PER_REQUEST = 50
+META_PREVIEW_MAX_CONCURRENCY = int(os.getenv("META_PREVIEW_MAX_CONCURRENCY", 8))
+META_PREVIEW_TIMEOUT = int(os.getenv("META_PREVIEW_TIMEOUT", 10))
+# 광고 → 크리에이티브 연결 / 게재 상태는 바뀔 수 있으므로 짧게, 크리에이티브는 수정 불가라 길게 캐시
+META_PREVIEW_STATUS_TTL_SEC = int(os.getenv("META_PREVIEW_STATUS_TTL_SEC", 60))
+META_PREVIEW_CREATIVE_TTL_SEC = int(os.getenv("META_PREVIEW_CREATIVE_TTL_SEC", 24 * 3600))
+# 영상 source URL은 서명 만료가 있으므로 크리에이티브보다 짧게
+META_PREVIEW_VIDEO_TTL_SEC = int(os.getenv("META_PREVIEW_VIDEO_TTL_SEC", 1800))
+
+AD_NODE_FIELDS = "effective_status,adcreatives.limit(1){id}"
+CREATIVE_DETAIL_FIELDS = "body,object_story_spec,image_url,video_id,asset_feed_spec"
+VIDEO_FIELDS = "source,thumbnails"
+# Graph API rate limit 오류 (http 429 포함)
+THROTTLE_REASONS = {"http_429", "api_error_4", "api_error_17", "api_error_32", "api_error_613", "api_error_80004"}
+
+_ad_status_cache = SimpleCache(max_size=5000)
+_creative_cache = SimpleCache(max_size=5000)
+_video_cache = SimpleCache(max_size=2000)
+
+# ✅ 공유 HTTP 세션 (keep-alive 연결 재사용)
+_session = requests.Session()
+_session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=META_PREVIEW_MAX_CONCURRENCY))
+_preview_executor = ThreadPoolExecutor(max_workers=META_PREVIEW_MAX_CONCURRENCY, thread_name_prefix="meta-preview")
+
+
+class _AdaptiveConcurrency:
+    """
+    동시 요청 수 제한 (AIMD)
+    - 성공 시 limit + 1 (최대 max_limit), rate limit 응답 시 limit / 2 (최소 1)
+    """
+
+    def __init__(self, max_limit):
+        self.max_limit = max(1, max_limit)
+        self.limit = self.max_limit
+        self.in_flight = 0
+        self._cond = threading.Condition()
+
+    def __enter__(self):
+        with self._cond:
+            while self.in_flight >= self.limit:
+                self._cond.wait()
+            self.in_flight += 1
+        return self
+
+    def __exit__(self, *exc):
+        with self._cond:
+            self.in_flight -= 1
+            self._cond.notify_all()
+        return False
+
+    def report(self, throttled):
+        with self._cond:
+            if throttled:
+                self.limit = max(1, self.limit // 2)
+                logger.warning(f"[META_API][THROTTLE] rate limit 응답 - 동시 요청 수 {self.limit}로 감소")
+            elif self.limit < self.max_limit:
+                self.limit += 1
+            self._cond.notify_all()
+
+
+_concurrency = _AdaptiveConcurrency(META_PREVIEW_MAX_CONCURRENCY)
+
 
 def _get_meta_access_token():
     """
@@ -45,15 +115,16 @@ def _get_meta_access_token():
     return token
 
 
-def _safe_meta_api_get(url, timeout=3, context=""):
+def _safe_meta_api_get(url, timeout=3, context="", params=None):
     """
     Meta Graph API GET 요청을 수행하고, 에러 발생 시 상세 로그를 남깁니다.
+    (공유 세션 사용 - 연결 재사용)
     
     Returns:
         tuple: (data, error_reason) - 성공 시 (dict, None), 실패 시 (None, "reason_string")
     """
     try:
-        resp = requests.get(url, timeout=timeout)
+        resp = _session.get(url, params=params, timeout=timeout)
         
         # ✅ HTTP 상태 코드 체크
         if resp.status_code != 200:
@@ -137,10 +208,12 @@ def get_meta_ads_preview_list(account_id):
     company_check_params = [
         bigquery.ScalarQueryParameter("account_id", "STRING", account_id)
     ]
-    company_result = client.query(
+    company_result = run_query(
+        client,
         company_check_query,
-        job_config=bigquery.QueryJobConfig(query_parameters=company_check_params)
-    ).result()
+        job_config=bigquery.QueryJobConfig(query_parameters=company_check_params),
+        service="meta_ads_preview",
+    )
     company_data = next(iter(company_result), {})
     company_name = company_data.get("company_name", None)
     verified_account_id = company_data.get("meta_acc_id", None)
@@ -217,10 +290,13 @@ def get_meta_ads_preview_list(account_id):
 
     logger.warning("[META_API][BIGQUERY] 광고 목록 조회 시작")
     query_start = time.time()
-    ads = client.query(
+    ads = run_query(
+        client,
         query,
-        job_config=bigquery.QueryJobConfig(query_parameters=ads_query_params)
-    ).result()
+        job_config=bigquery.QueryJobConfig(query_parameters=ads_query_params),
+        service="meta_ads_preview",
+        company=company_name,
+    )
     
     # ✅ BigQuery 결과를 ad_list로 변환하면서 상세 로깅
     ad_list = []
@@ -326,9 +402,121 @@ def get_meta_ads_preview_list(account_id):
     return results
 
 
+def _chunks(items, size):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def _fetch_ids_chunk(ids, fields, access_token, context):
+    """ids= 요청 1회 → ({id: node}, error_reason)"""
+    with _concurrency:
+        data, api_error = _safe_meta_api_get(
+            META_GRAPH_URL,
+            timeout=META_PREVIEW_TIMEOUT,
+            context=f"{context} ids={len(ids)}",
+            params={"ids": ",".join(ids), "fields": fields, "access_token": access_token},
+        )
+    _concurrency.report(api_error in THROTTLE_REASONS)
+    return data, api_error
+
+
+def _fetch_nodes(ids, fields, access_token, context):
+    """
+    노드 여러 개를 ids= 요청으로 조회 (50개 단위, 병렬)
+    - 잘못된 id가 하나라도 있으면 Graph가 요청 전체를 거부하므로, 실패한 묶음은 id 1개씩 다시 조회
+    Returns:
+        tuple: ({id: node}, {id: error_reason})
+    """
+    ids = list(dict.fromkeys(i for i in ids if i))
+    nodes, errors = {}, {}
+    if not ids:
+        return nodes, errors
+
+    retry_ids = []
+    chunks = list(_chunks(ids, META_PREVIEW_IDS_PER_REQUEST))
+    for chunk, (data, api_error) in zip(chunks, _preview_executor.map(
+        lambda c: _fetch_ids_chunk(c, fields, access_token, context), chunks
+    )):
+        if data is None:
+            if len(chunk) > 1:
+                retry_ids += chunk
+            else:
+                errors[chunk[0]] = api_error
+            continue
+        for node_id in chunk:
+            if node_id in data:
+                nodes[node_id] = data[node_id]
+            else:
+                errors[node_id] = "missing_in_response"
+
+    if retry_ids:
+        logger.warning(f"[META_API][IDS_RETRY] {context}: 묶음 조회 실패 {len(retry_ids)}개 → 개별 조회")
+        for node_id, (data, api_error) in zip(retry_ids, _preview_executor.map(
+            lambda i: _fetch_ids_chunk([i], fields, access_token, context), retry_ids
+        )):
+            if data is not None and node_id in data:
+                nodes[node_id] = data[node_id]
+            else:
+                errors[node_id] = api_error or "missing_in_response"
+    return nodes, errors
+
+
+def _cached_nodes(cache, ids, fields, access_token, context, ttl):
+    """캐시 우선 조회, 없는 id만 Graph API로 가져와 캐시에 저장 → ({id: node}, {id: error_reason})"""
+    found = {}
+    missing = []
+    for node_id in dict.fromkeys(i for i in ids if i):
+        cached = cache.get(node_id)
+        if cached is not None:
+            found[node_id] = cached
+        else:
+            missing.append(node_id)
+
+    fetched, errors = _fetch_nodes(missing, fields, access_token, context)
+    for node_id, node in fetched.items():
+        cache.set(node_id, node, ttl=ttl)
+    found.update(fetched)
+    logger.warning(f"[META_API][CACHE] {context}: 요청={len(found) + len(errors)}, 캐시={len(found) - len(fetched)}, 조회={len(missing)}")
+    return found, errors
+
+
+def _extract_video_id(detail_data):
+    """video_id 추출 (root → asset_feed_spec.videos[0] → object_story_spec.video_data)"""
+    # 1) root video_id
+    if detail_data.get("video_id"):
+        return detail_data["video_id"]
+
+    # 2) asset_feed_spec 기반 (NGN 자동 형식 광고)
+    videos = detail_data.get("asset_feed_spec", {}).get("videos", [])
+    if isinstance(videos, list) and len(videos) > 0 and videos[0].get("video_id"):
+        return videos[0].get("video_id")
+
+    # 3) object_story_spec.video_data.video_id
+    return detail_data.get("object_story_spec", {}).get("video_data", {}).get("video_id")
+
+
+def _creative_id_from_ad_node(ad_node):
+    """광고 노드 → (creative_id, skip_reason)"""
+    adcreatives = ad_node.get("adcreatives")
+    if not adcreatives:
+        return None, "no_adcreatives_field"
+    adcreatives_data = adcreatives.get("data", [])
+    if not adcreatives_data:
+        return None, "empty_adcreatives_data"
+    creative_id = adcreatives_data[0].get("id")
+    if not creative_id:
+        return None, "missing_creative_id"
+    return creative_id, None
+
+
 def get_ads_details_parallel(ad_list):
     """
-    병렬 처리로 광고 상세 정보를 수집합니다.
+    광고 상세 정보를 단계별 묶음 요청으로 수집합니다.
+    1) 광고 → 크리에이티브 id / 게재 상태 (META_PREVIEW_STATUS_TTL_SEC 캐시)
+    2) 크리에이티브 상세 (creative_id 기준 캐시, 수정 불가라 길게)
+    3) 영상 source / 썸네일 (video_id 기준 캐시)
+    - 단계마다 캐시에 없는 id만 ids= 요청(50개 단위, 병렬)으로 조회 → 캐시가 차 있으면 요청 1회 이하
+    - 결과 순서는 ad_list 순서(지출 순) 유지
     """
     total_count = len(ad_list)
     start_time = time.time()
@@ -338,83 +526,90 @@ def get_ads_details_parallel(ad_list):
         logger.warning("[META_API][PARALLEL_EMPTY] ⚠️ ad_list가 비어있습니다!")
         return []
     
-    # ✅ [INPUT] 첫 3개 광고 샘플 디버그 로그
-    for idx, ad in enumerate(ad_list[:3]):
-        ad_id_val = ad.get("ad_id") if isinstance(ad, dict) else None
-        has_creative_id = "creative_id" in ad if isinstance(ad, dict) else False
-        has_creative = "creative" in ad if isinstance(ad, dict) else False
-        ad_keys = list(ad.keys()) if isinstance(ad, dict) else []
-        logger.warning(
-            f"[META_API][INPUT] idx={idx}, "
-            f"ad_id={ad_id_val}, "
-            f"has_creative_id={has_creative_id}, "
-            f"has_creative={has_creative}, "
-            f"ad_type={type(ad).__name__}, "
-            f"keys={ad_keys}"
+    # ✅ 스킵 사유별 카운트
+    skip_reasons = defaultdict(int)
+
+    def _skip(ad, reason):
+        skip_reasons[reason or "unknown"] += 1
+        ad_id = ad.get("ad_id") if isinstance(ad, dict) else None
+        ad_name = ad.get("ad_name", "UNKNOWN") if isinstance(ad, dict) else "UNKNOWN"
+        logger.warning(f"[META_API][SKIP] reason={reason}, ad_id={ad_id}, ad_name={str(ad_name)[:50]}")
+
+    valid_ads = []
+    for ad in ad_list:
+        if not ad or not isinstance(ad, dict):
+            _skip(ad, "invalid_ad_dict")
+        elif not ad.get("ad_id"):
+            _skip(ad, "missing_ad_id")
+        else:
+            valid_ads.append(ad)
+    if not valid_ads:
+        return []
+
+    # ✅ 호출 시점에 토큰 읽기 (토큰 없으면 RuntimeError 전파 - 조용히 0개 반환 금지)
+    access_token = _get_meta_access_token()
+
+    # 1) 광고 → 크리에이티브 id
+    ad_nodes, ad_errors = _cached_nodes(
+        _ad_status_cache, [ad["ad_id"] for ad in valid_ads], AD_NODE_FIELDS,
+        access_token, "adcreatives", META_PREVIEW_STATUS_TTL_SEC,
+    )
+    creative_by_ad = {}
+    status_by_ad = {}
+    for ad in valid_ads:
+        ad_node = ad_nodes.get(ad["ad_id"])
+        if ad_node is None:
+            _skip(ad, f"adcreatives_api_{ad_errors.get(ad['ad_id'])}")
+            continue
+        status_by_ad[ad["ad_id"]] = ad_node.get("effective_status")
+        creative_id, skip_reason = _creative_id_from_ad_node(ad_node)
+        if skip_reason:
+            _skip(ad, skip_reason)
+            continue
+        creative_by_ad[ad["ad_id"]] = creative_id
+
+    # 2) 크리에이티브 상세 - asset_feed_spec 포함하여 자동 형식 광고 지원
+    creatives, creative_errors = _cached_nodes(
+        _creative_cache, list(creative_by_ad.values()), CREATIVE_DETAIL_FIELDS,
+        access_token, "creative_detail", META_PREVIEW_CREATIVE_TTL_SEC,
+    )
+
+    # 3) 영상 source + 썸네일 (source 권한이 없으면 요청 전체가 실패하므로 썸네일만 다시 조회)
+    video_ids = [_extract_video_id(c) for c in creatives.values()]
+    videos, video_errors = _cached_nodes(
+        _video_cache, video_ids, VIDEO_FIELDS, access_token, "video_source", META_PREVIEW_VIDEO_TTL_SEC,
+    )
+    if video_errors:
+        thumbs, _ = _cached_nodes(
+            _video_cache, list(video_errors), "thumbnails", access_token, "video_thumbnails", META_PREVIEW_VIDEO_TTL_SEC,
         )
-    
+        videos.update(thumbs)
+
     results = []
-    success_count = 0
-    fail_count = 0
-    
-    # ✅ 스킵 사유별 카운트 (thread-safe)
-    skip_reasons = defaultdict(int)
-    skip_reasons_lock = threading.Lock()
-    
-    # ThreadPoolExecutor를 사용한 병렬 처리
-    logger.warning(f"[META_API][EXECUTOR] ThreadPoolExecutor 시작 (max_workers=5)")
-    with ThreadPoolExecutor(max_workers=5) as executor:
-        # 각 광고에 대해 병렬로 상세 정보 수집
-        future_to_ad = {
-            executor.submit(get_single_ad_details, ad): ad 
-            for ad in ad_list
-        }
-        logger.warning(f"[META_API][EXECUTOR] {len(future_to_ad)}개 future 생성 완료")
-        
-        # 완료된 작업들을 순서대로 처리
-        processed_count = 0
-        for future in as_completed(future_to_ad):
-            ad = future_to_ad[future]
-            ad_id_for_log = ad.get("ad_id", "UNKNOWN") if isinstance(ad, dict) else "INVALID"
-            processed_count += 1
-            
-            try:
-                result, skip_reason = future.result()
-                if result:  # 유효한 결과만 추가
-                    results.append(result)
-                    success_count += 1
-                    logger.warning(f"[META_API][SUCCESS] ad_id={ad_id_for_log} (processed={processed_count}/{total_count})")
-                else:
-                    fail_count += 1
-                    # ✅ [NONE] result가 None인 경우 상세 로깅
-                    logger.warning(
-                        f"[META_API][NONE] ad_id={ad_id_for_log}, "
-                        f"skip_reason={skip_reason}, "
-                        f"processed={processed_count}/{total_count}"
-                    )
-                    # ✅ 스킵 사유 카운트
-                    with skip_reasons_lock:
-                        skip_reasons[skip_reason or "unknown"] += 1
-            except RuntimeError as e:
-                # 토큰 누락 시 즉시 에러 전파 (조용히 0개 반환 금지)
-                logger.error(f"[META_API][RUNTIME_ERROR] 토큰 에러로 처리 중단: ad_id={ad_id_for_log}, error={e}")
-                raise
-            except Exception as e:
-                fail_count += 1
-                with skip_reasons_lock:
-                    skip_reasons[f"exception_{type(e).__name__}"] += 1
-                logger.exception(
-                    f"[META_API][FUTURE_EXCEPTION] ad_id={ad_id_for_log}, "
-                    f"exception={type(e).__name__}: {e}"
-                )
-                continue
-    
+    for ad in valid_ads:
+        creative_id = creative_by_ad.get(ad["ad_id"])
+        if not creative_id:
+            continue
+        detail_data = creatives.get(creative_id)
+        if detail_data is None:
+            _skip(ad, f"creative_detail_api_{creative_errors.get(creative_id)}")
+            continue
+        try:
+            result, skip_reason = _build_ad_preview(ad, detail_data, videos, status_by_ad.get(ad["ad_id"]))
+        except Exception as e:
+            logger.exception(f"[META_API][BUILD_EXCEPTION] ad_id={ad['ad_id']}, creative_id={creative_id}")
+            result, skip_reason = None, f"exception_{type(e).__name__}"
+        if result:
+            results.append(result)
+        else:
+            _skip(ad, skip_reason)
+
     elapsed_time = time.time() - start_time
     
     # ✅ 최종 수집 결과 요약 로그 (1회)
     logger.warning(
         f"[META_API][SUMMARY] 📊 수집 결과 요약: "
-        f"요청={total_count}개, 성공={success_count}개, 실패={fail_count}개, "
+        f"요청={total_count}개, 성공={len(results)}개, 실패={total_count - len(results)}개, "
         f"경과시간={elapsed_time:.2f}초"
     )
     
@@ -423,252 +618,124 @@ def get_ads_details_parallel(ad_list):
         reasons_str = ", ".join([f"{k}={v}" for k, v in sorted(skip_reasons.items())])
         logger.warning(f"[META_API][SKIP_SUMMARY] 📋 스킵 사유별 카운트: {reasons_str}")
     else:
-        logger.warning(f"[META_API][SKIP_SUMMARY] 스킵 사유 없음 (모두 성공 또는 예외)")
+        logger.warning(f"[META_API][SKIP_SUMMARY] 스킵 사유 없음 (모두 성공)")
     
     return results
 
 
-def get_single_ad_details(ad):
+def _build_ad_preview(ad, detail_data, videos, effective_status=None):
     """
-    단일 광고의 상세 정보를 수집합니다.
+    크리에이티브 상세 + 영상 정보 → 미리보기 항목
+    - effective_status: 광고 노드의 현재 게재 상태 (ACTIVE/PAUSED 등, 지출 순 목록은 그대로 두고 표시용으로만 전달)
     
     Returns:
         tuple: (result_dict, skip_reason) - 성공 시 (dict, None), 실패 시 (None, "reason_string")
     """
-    # ✅ [ENTER] 무조건 찍히는 진입 로그 (맨 첫 줄)
-    ad_id_raw = ad.get("ad_id") if isinstance(ad, dict) else None
-    logger.warning(f"[META_API][ENTER] get_single_ad_details ad_id={ad_id_raw}, ad_type={type(ad).__name__}")
-    
-    # ✅ ad dict 검증 및 기본값 추출
-    if not ad or not isinstance(ad, dict):
-        logger.warning(f"[META_API][SKIP] reason=invalid_ad_dict, ad_type={type(ad).__name__}, ad_value={str(ad)[:100]}")
-        return None, "invalid_ad_dict"
-    
     ad_id = ad.get("ad_id")
     ad_name = ad.get("ad_name", "UNKNOWN")
     account_id = ad.get("account_id", "UNKNOWN")
     instagram_acc_name = ad.get("instagram_acc_name", "")
-    ad_keys = list(ad.keys())
-    
-    # ✅ ad_id 필수 검증
-    if not ad_id:
-        logger.warning(
-            f"[META_API][SKIP] reason=missing_ad_id, "
-            f"account_id={account_id}, ad_name={ad_name[:50]}, "
-            f"keys={ad_keys}"
-        )
-        return None, "missing_ad_id"
-    
-    logger.warning(f"[META_API][DETAIL_START] ad_id={ad_id}, ad_name={ad_name[:50]}, account_id={account_id}")
-    
-    # ✅ 호출 시점에 토큰 읽기 (토큰 없으면 RuntimeError 발생)
-    try:
-        access_token = _get_meta_access_token()
-    except RuntimeError as e:
-        logger.error(f"[META_API][SKIP] reason=token_missing, ad_id={ad_id}, error={e}")
-        raise  # 토큰 에러는 전파
-    
-    try:
-        # 1차 요청: 크리에이티브 ID (타임아웃 단축)
-        creative_url = f"https://graph.facebook.com/v24.0/{ad_id}?fields=adcreatives&access_token={access_token}"
-        logger.warning(f"[META_API][API_CALL_1] adcreatives 요청: ad_id={ad_id}")
-        
-        creative_data, api_error = _safe_meta_api_get(creative_url, timeout=3, context=f"adcreatives ad_id={ad_id}")
-        if creative_data is None:
-            skip_reason = f"adcreatives_api_{api_error}"
-            logger.warning(
-                f"[META_API][SKIP] reason={skip_reason}, "
-                f"ad_id={ad_id}, account_id={account_id}, ad_name={ad_name[:50]}"
-            )
-            return None, skip_reason
-        
-        logger.warning(f"[META_API][API_RESP_1] adcreatives 응답 수신: ad_id={ad_id}, keys={list(creative_data.keys())}")
-        
-        # ✅ adcreatives 응답 구조 검증
-        adcreatives = creative_data.get("adcreatives")
-        if not adcreatives:
-            logger.warning(
-                f"[META_API][SKIP] reason=no_adcreatives_field, "
-                f"ad_id={ad_id}, account_id={account_id}, "
-                f"response_keys={list(creative_data.keys())}"
-            )
-            return None, "no_adcreatives_field"
-        
-        adcreatives_data = adcreatives.get("data", [])
-        if not adcreatives_data or len(adcreatives_data) == 0:
-            logger.warning(
-                f"[META_API][SKIP] reason=empty_adcreatives_data, "
-                f"ad_id={ad_id}, account_id={account_id}, "
-                f"adcreatives={adcreatives}"
-            )
-            return None, "empty_adcreatives_data"
-        
-        creative_id = adcreatives_data[0].get("id")
-        if not creative_id:
-            logger.warning(
-                f"[META_API][SKIP] reason=missing_creative_id, "
-                f"ad_id={ad_id}, account_id={account_id}, "
-                f"adcreatives_data[0]={adcreatives_data[0]}"
-            )
-            return None, "missing_creative_id"
-        
-        logger.warning(f"[META_API][CREATIVE_OK] ad_id={ad_id}, creative_id={creative_id}")
 
-        # 2차 요청: 상세 정보 (타임아웃 단축) - asset_feed_spec 포함하여 자동 형식 광고 지원
-        detail_url = (
-            f"https://graph.facebook.com/v24.0/{creative_id}"
-            f"?fields=body,object_story_spec,image_url,video_id,asset_feed_spec"
-            f"&access_token={access_token}"
-        )
-        logger.warning(f"[META_API][API_CALL_2] creative_detail 요청: creative_id={creative_id}")
-        
-        detail_data, api_error = _safe_meta_api_get(detail_url, timeout=3, context=f"creative_detail creative_id={creative_id}")
-        if detail_data is None:
-            skip_reason = f"creative_detail_api_{api_error}"
-            logger.warning(
-                f"[META_API][SKIP] reason={skip_reason}, "
-                f"ad_id={ad_id}, creative_id={creative_id}, account_id={account_id}"
-            )
-            return None, skip_reason
-        
-        logger.warning(f"[META_API][API_RESP_2] creative_detail 응답 수신: creative_id={creative_id}, keys={list(detail_data.keys())}")
+    # asset_feed_spec 추출 (NGN 자동 형식 광고용)
+    asset_feed = detail_data.get("asset_feed_spec", {})
+    
+    # message 추출 (여러 경로 지원)
+    message = (
+        detail_data.get("body") or  # 직접 body
+        detail_data.get("object_story_spec", {}).get("message") or  # object_story_spec.message
+        detail_data.get("object_story_spec", {}).get("video_data", {}).get("message") or  # object_story_spec.video_data.message
+        (asset_feed.get("bodies", [{}])[0].get("text") if asset_feed.get("bodies") and len(asset_feed.get("bodies", [])) > 0 else None) or  # asset_feed_spec.bodies[0].text
+        (asset_feed.get("descriptions", [{}])[0].get("text") if asset_feed.get("descriptions") and len(asset_feed.get("descriptions", [])) > 0 else None) or  # asset_feed_spec.descriptions[0].text
+        "(문구 없음)"
+    )
 
-        # asset_feed_spec 추출 (NGN 자동 형식 광고용)
-        asset_feed = detail_data.get("asset_feed_spec", {})
-        
-        # message 추출 (여러 경로 지원)
-        message = (
-            detail_data.get("body") or  # 직접 body
-            detail_data.get("object_story_spec", {}).get("message") or  # object_story_spec.message
-            detail_data.get("object_story_spec", {}).get("video_data", {}).get("message") or  # object_story_spec.video_data.message
-            (asset_feed.get("bodies", [{}])[0].get("text") if asset_feed.get("bodies") and len(asset_feed.get("bodies", [])) > 0 else None) or  # asset_feed_spec.bodies[0].text
-            (asset_feed.get("descriptions", [{}])[0].get("text") if asset_feed.get("descriptions") and len(asset_feed.get("descriptions", [])) > 0 else None) or  # asset_feed_spec.descriptions[0].text
-            "(문구 없음)"
-        )
+    # link 추출 (여러 경로 지원)
+    # asset_feed_spec.link_urls[0].website_url (NGN 계정 실제 구조)
+    asset_link_urls = asset_feed.get("link_urls", [])
+    asset_link_value = None
+    if asset_link_urls and len(asset_link_urls) > 0:
+        asset_link_value = asset_link_urls[0].get("website_url")  # asset_feed_spec.link_urls[0].website_url
+    
+    # asset_feed_spec.links는 문자열 배열일 수도 있고 객체 배열일 수도 있음 (다른 구조 대비)
+    asset_links = asset_feed.get("links", [])
+    if not asset_link_value and asset_links and len(asset_links) > 0:
+        if isinstance(asset_links[0], str):
+            asset_link_value = asset_links[0]  # 문자열인 경우
+        elif isinstance(asset_links[0], dict):
+            asset_link_value = asset_links[0].get("link")  # 객체인 경우
+    
+    link = (
+        detail_data.get("object_story_spec", {}).get("video_data", {}).get("call_to_action", {}).get("value", {}).get("link") or  # object_story_spec.video_data.call_to_action.value.link
+        detail_data.get("object_story_spec", {}).get("link_data", {}).get("link") or  # object_story_spec.link_data.link
+        asset_link_value or  # asset_feed_spec.link_urls[0].website_url (최우선)
+        (asset_feed.get("call_to_action_links", [{}])[0].get("link") if asset_feed.get("call_to_action_links") and len(asset_feed.get("call_to_action_links", [])) > 0 else None) or  # asset_feed_spec.call_to_action_links[0].link
+        "#"
+    )
+    
+    # 디버깅: asset_feed_spec이 있는 경우 로그 출력
+    if asset_feed:
+        logger.debug(f"[META_API] asset_feed_spec 발견 (ad_id={ad_id}): message={message[:50] if message else 'None'}..., link={link[:50] if link and link != '#' else 'None'}...")
 
-        # link 추출 (여러 경로 지원)
-        # asset_feed_spec.link_urls[0].website_url (NGN 계정 실제 구조)
-        asset_link_urls = asset_feed.get("link_urls", [])
-        asset_link_value = None
-        if asset_link_urls and len(asset_link_urls) > 0:
-            asset_link_value = asset_link_urls[0].get("website_url")  # asset_feed_spec.link_urls[0].website_url
-        
-        # asset_feed_spec.links는 문자열 배열일 수도 있고 객체 배열일 수도 있음 (다른 구조 대비)
-        asset_links = asset_feed.get("links", [])
-        if not asset_link_value and asset_links and len(asset_links) > 0:
-            if isinstance(asset_links[0], str):
-                asset_link_value = asset_links[0]  # 문자열인 경우
-            elif isinstance(asset_links[0], dict):
-                asset_link_value = asset_links[0].get("link")  # 객체인 경우
-        
-        link = (
-            detail_data.get("object_story_spec", {}).get("video_data", {}).get("call_to_action", {}).get("value", {}).get("link") or  # object_story_spec.video_data.call_to_action.value.link
-            detail_data.get("object_story_spec", {}).get("link_data", {}).get("link") or  # object_story_spec.link_data.link
-            asset_link_value or  # asset_feed_spec.link_urls[0].website_url (최우선)
-            (asset_feed.get("call_to_action_links", [{}])[0].get("link") if asset_feed.get("call_to_action_links") and len(asset_feed.get("call_to_action_links", [])) > 0 else None) or  # asset_feed_spec.call_to_action_links[0].link
-            "#"
-        )
-        
-        # 디버깅: asset_feed_spec이 있는 경우 로그 출력
-        if asset_feed:
-            logger.debug(f"[META_API] asset_feed_spec 발견 (ad_id={ad_id}): message={message[:50] if message else 'None'}..., link={link[:50] if link and link != '#' else 'None'}...")
+    extracted_video_id = _extract_video_id(detail_data)
 
-        # video_id 추출 (여러 경로 지원)
-        extracted_video_id = None
-        
-        # 1) root video_id
-        if detail_data.get("video_id"):
-            extracted_video_id = detail_data["video_id"]
-        
-        # 2) asset_feed_spec 기반 (NGN 자동 형식 광고)
-        asset_feed = detail_data.get("asset_feed_spec", {})
-        videos = asset_feed.get("videos", [])
-        if not extracted_video_id and isinstance(videos, list) and len(videos) > 0:
-            extracted_video_id = videos[0].get("video_id")
-        
-        # 3) object_story_spec.video_data.video_id
-        oss = detail_data.get("object_story_spec", {})
-        if not extracted_video_id:
-            extracted_video_id = oss.get("video_data", {}).get("video_id")
-        
-        # 비디오 URL 추출 및 고화질 썸네일 폴백 처리
-        video_url = None
-        high_quality_thumbnail = None  # 고화질 썸네일 (비디오 source 실패 시 사용)
-        
-        if extracted_video_id:
-            # 1단계: 비디오 source URL 조회 시도
-            video_api = (
-                f"https://graph.facebook.com/v24.0/{extracted_video_id}"
-                f"?fields=source&access_token={access_token}"
-            )
-            video_data, video_error = _safe_meta_api_get(video_api, timeout=3, context=f"video_source video_id={extracted_video_id}")
-            if video_data:
-                video_url = video_data.get("source")
-            else:
-                logger.warning(f"[META_API][VIDEO_FALLBACK] 비디오 source 조회 실패 (ad_id={ad_id}, error={video_error}), 썸네일로 폴백")
-            
-            # 2단계: 비디오 source가 없거나 실패한 경우, 고화질 썸네일 조회
-            if not video_url:
-                thumb_url = f"https://graph.facebook.com/v24.0/{extracted_video_id}?fields=thumbnails&access_token={access_token}"
-                thumb_data, thumb_error = _safe_meta_api_get(thumb_url, timeout=2, context=f"video_thumbnails video_id={extracted_video_id}")
-                if thumb_data:
-                    thumbnails = thumb_data.get("thumbnails", {}).get("data", [])
-                    if thumbnails:
-                        # 해상도(width * height)가 가장 높은 썸네일 선택 (고화질)
-                        high_quality_thumbnail = max(
-                            thumbnails, 
-                            key=lambda x: x.get("width", 0) * x.get("height", 0)
-                        ).get("uri", "")
-                        logger.warning(f"[META_API][THUMB_OK] 고화질 썸네일 추출 성공 (ad_id={ad_id})")
-        
-        # 이미지 URL 추출 (썸네일용 또는 이미지 광고용)
-        # asset_feed_spec.videos[0].thumbnail_url 추출 (NGN 자동 형식 광고용)
-        asset_video_thumbnail = None
-        if asset_feed and asset_feed.get("videos") and len(asset_feed.get("videos", [])) > 0:
-            asset_video_thumbnail = asset_feed.get("videos", [])[0].get("thumbnail_url")
-        
-        # 고화질 썸네일이 있으면 최우선으로 사용, 없으면 기존 로직 사용
-        image_url = (
-            high_quality_thumbnail or  # 고화질 썸네일 (최우선)
-            asset_video_thumbnail or  # asset_feed_spec.videos[0].thumbnail_url
-            detail_data.get("thumbnail_url") or  # 루트 thumbnail_url (NGN 계정)
-            detail_data.get("image_url") or  # 직접 이미지 URL
-            detail_data.get("object_story_spec", {}).get("link_data", {}).get("picture") or  # 링크 광고 이미지
-            detail_data.get("object_story_spec", {}).get("link_data", {}).get("image_url") or
-            detail_data.get("object_story_spec", {}).get("video_data", {}).get("image_url") or  # 비디오 광고 이미지
-            detail_data.get("object_story_spec", {}).get("video_data", {}).get("picture") or
-            ""
-        )
+    # 비디오 URL 추출 및 고화질 썸네일 폴백 처리
+    video_url = None
+    high_quality_thumbnail = None  # 고화질 썸네일 (비디오 source 실패 시 사용)
 
-        # ✅ 이미지 URL 또는 비디오 URL 중 하나는 있어야 함
-        if (not image_url or image_url.strip() == "") and (not video_url or video_url.strip() == ""):
-            logger.warning(
-                f"[META_API][SKIP] reason=no_image_or_video_url, "
-                f"ad_id={ad_id}, account_id={account_id}, ad_name={ad_name[:50]}, "
-                f"detail_keys={list(detail_data.keys())}"
-            )
-            return None, "no_image_or_video_url"
-        
-        # ✅ 이미지 URL을 프록시 URL로 변환 (배포 환경 대응)
-        proxy_image_url = get_proxy_image_url(image_url) if image_url else ""
-        
-        logger.warning(f"[META_API][DETAIL_OK] ✅ 광고 상세 수집 성공: ad_id={ad_id}, has_image={bool(image_url)}, has_video={bool(video_url)}")
-        
-        return {
-            "ad_id": ad_id,
-            "ad_name": ad["ad_name"],
-            "instagram_acc_name": instagram_acc_name,
-            "message": message,
-            "link": link,
-            "image_url": proxy_image_url,  # 프록시 URL로 변환된 썸네일 또는 이미지 광고용
-            "video_url": video_url,  # 비디오 광고 원본 URL (있을 경우)
-            "is_video": bool(extracted_video_id)
-        }, None  # 성공 시 skip_reason = None
+    if extracted_video_id:
+        video_data = videos.get(extracted_video_id) or {}
+        video_url = video_data.get("source")
+        if not video_url:
+            logger.warning(f"[META_API][VIDEO_FALLBACK] 비디오 source 없음 (ad_id={ad_id}), 썸네일로 폴백")
+            thumbnails = video_data.get("thumbnails", {}).get("data", [])
+            if thumbnails:
+                # 해상도(width * height)가 가장 높은 썸네일 선택 (고화질)
+                high_quality_thumbnail = max(
+                    thumbnails, 
+                    key=lambda x: x.get("width", 0) * x.get("height", 0)
+                ).get("uri", "")
 
-    except Exception as e:
-        skip_reason = f"exception_{type(e).__name__}"
-        logger.exception(
-            f"[META_API][SKIP] reason={skip_reason}, "
-            f"ad_id={ad_id}, account_id={account_id}, ad_name={ad_name[:50]}"
+    # 이미지 URL 추출 (썸네일용 또는 이미지 광고용)
+    # asset_feed_spec.videos[0].thumbnail_url 추출 (NGN 자동 형식 광고용)
+    asset_video_thumbnail = None
+    if asset_feed and asset_feed.get("videos") and len(asset_feed.get("videos", [])) > 0:
+        asset_video_thumbnail = asset_feed.get("videos", [])[0].get("thumbnail_url")
+    
+    # 고화질 썸네일이 있으면 최우선으로 사용, 없으면 기존 로직 사용
+    image_url = (
+        high_quality_thumbnail or  # 고화질 썸네일 (최우선)
+        asset_video_thumbnail or  # asset_feed_spec.videos[0].thumbnail_url
+        detail_data.get("thumbnail_url") or  # 루트 thumbnail_url (NGN 계정)
+        detail_data.get("image_url") or  # 직접 이미지 URL
+        detail_data.get("object_story_spec", {}).get("link_data", {}).get("picture") or  # 링크 광고 이미지
+        detail_data.get("object_story_spec", {}).get("link_data", {}).get("image_url") or
+        detail_data.get("object_story_spec", {}).get("video_data", {}).get("image_url") or  # 비디오 광고 이미지
+        detail_data.get("object_story_spec", {}).get("video_data", {}).get("picture") or
+        ""
+    )
+
+    # ✅ 이미지 URL 또는 비디오 URL 중 하나는 있어야 함
+    if (not image_url or image_url.strip() == "") and (not video_url or video_url.strip() == ""):
+        logger.warning(
+            f"[META_API][SKIP] reason=no_image_or_video_url, "
+            f"ad_id={ad_id}, account_id={account_id}, ad_name={ad_name[:50]}, "
+            f"detail_keys={list(detail_data.keys())}"
         )
-        return None, skip_reason
+        return None, "no_image_or_video_url"
+    
+    # ✅ 이미지 URL을 프록시 URL로 변환 (배포 환경 대응)
+    proxy_image_url = get_proxy_image_url(image_url) if image_url else ""
+    
+    logger.warning(f"[META_API][DETAIL_OK] ✅ 광고 상세 수집 성공: ad_id={ad_id}, has_image={bool(image_url)}, has_video={bool(video_url)}")
+    
+    return {
+        "ad_id": ad_id,
+        "ad_name": ad["ad_name"],
+        "instagram_acc_name": instagram_acc_name,
+        "message": message,
+        "link": link,
+        "image_url": proxy_image_url,  # 프록시 URL로 변환된 썸네일 또는 이미지 광고용
+        "video_url": video_url,  # 비디오 광고 원본 URL (있을 경우)
+        "is_video": bool(extracted_video_id),
+        "effective_status": effective_status  # 현재 게재 상태 (지출 기간 중 꺼진 광고 구분용)
+    }, None  # 성공 시 skip_reason = None
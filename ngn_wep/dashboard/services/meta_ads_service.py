@@ -1,4 +1,5 @@
 from google.cloud import bigquery
+from ..utils.bq_query import run_query
 
 def get_bigquery_client():
     """ ✅ BigQuery Client 생성 """
@@ -99,7 +100,7 @@ def get_meta_ads_data(company_name, period, start_date, end_date, date_type="sum
     print("\n[DEBUG] Meta Ads 데이터 쿼리 실행:\n", query)
 
     try:
-        results = client.query(query, job_config=bigquery.QueryJobConfig(query_parameters=query_params)).result()
+        results = run_query(client, query, job_config=bigquery.QueryJobConfig(query_parameters=query_params), service="meta_ads_service", company=company_name)
         data = [dict(row) for row in results]
         print(f"[DEBUG] Meta Ads API 응답 데이터: {data}")
         return data
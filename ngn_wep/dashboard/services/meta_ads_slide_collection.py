@@ -2,6 +2,8 @@
 
 from google.cloud import bigquery
 
+from ..utils.bq_query import run_query
+
 def get_slide_collection_ads(account_id=None):
     """
     슬라이드/콜렉션 광고 리스트 조회 (단일/영상 광고 제외) - 광고명 기준으로 그룹핑
@@ -54,8 +56,7 @@ def get_slide_collection_ads(account_id=None):
     )
 
     try:
-        query_job = client.query(query, job_config=job_config)
-        rows = query_job.result()
+        rows = run_query(client, query, job_config=job_config, service="meta_ads_slide_collection")
         result = [dict(row) for row in rows]
         print(f"[DEBUG] [슬라이드광고] BigQuery 결과 {len(result)}건 조회됨")
         return result
@@ -1,5 +1,6 @@
 from google.cloud import bigquery
 from ..utils.cache_utils import cached_query
+from ..utils.bq_query import run_query
 
 def get_bigquery_client():
     return bigquery.Client()
@@ -70,7 +71,7 @@ def get_monthly_net_sales_visitors(company_name):
 
     try:
         client = get_bigquery_client()
-        rows = client.query(query, job_config=bigquery.QueryJobConfig(query_parameters=query_params)).result()
+        rows = run_query(client, query, job_config=bigquery.QueryJobConfig(query_parameters=query_params), service="monthly_net_sales_visitors", company=company_name)
         data = [dict(row) for row in rows]
         print(f"[DEBUG] monthly_net_sales_visitors 결과: {len(data)} 건")
         return data
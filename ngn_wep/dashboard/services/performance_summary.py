@@ -1,5 +1,6 @@
 from google.cloud import bigquery
 from ..utils.cache_utils import cached_query
+from ..utils.bq_query import run_query
 
 def get_bigquery_client():
     return bigquery.Client()
@@ -82,7 +83,7 @@ def get_performance_summary(company_name, start_date: str, end_date: str, user_i
 
     try:
         client = get_bigquery_client()
-        result = client.query(query, job_config=bigquery.QueryJobConfig(query_parameters=query_params)).result()
+        result = run_query(client, query, job_config=bigquery.QueryJobConfig(query_parameters=query_params), service="performance_summary", company=company_name)
         rows = [dict(row) for row in result]
         print(f"[DEBUG] performance_summary 결과: {len(rows)}개")
         return rows
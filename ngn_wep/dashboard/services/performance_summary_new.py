@@ -6,6 +6,7 @@
 import time
 from google.cloud import bigquery
 from ..utils.cache_utils import cached_query
+from ..utils.bq_query import run_query
 
 # BigQuery 클라이언트 싱글톤
 _bq_client = None
@@ -213,7 +214,7 @@ def get_performance_summary_new(company_name, start_date: str, end_date: str, us
         # 쿼리 실행
         client = get_bigquery_client()
         job_config = bigquery.QueryJobConfig(query_parameters=query_params)
-        result = client.query(query, job_config=job_config).result()
+        result = run_query(client, query, job_config=job_config, service="performance_summary_new", company=company_name)
 
         rows = list(result)
         elapsed = time.time() - start_time
@@ -322,7 +323,7 @@ def get_cafe24_summary_simple(company_name, start_date: str, end_date: str, user
 
     try:
         client = get_bigquery_client()
-        result = client.query(query, job_config=bigquery.QueryJobConfig(query_parameters=query_params)).result()
+        result = run_query(client, query, job_config=bigquery.QueryJobConfig(query_parameters=query_params), service="performance_summary_new", company=company_name)
         row = list(result)[0]
         return {"total_revenue": row.total_revenue or 0, "total_orders": row.total_orders or 0}
     except Exception as e:
@@ -383,7 +384,7 @@ def get_meta_ads_summary_simple(company_name, start_date: str, end_date: str, ac
 
     try:
         client = get_bigquery_client()
-        result = client.query(query, job_config=bigquery.QueryJobConfig(query_parameters=query_params)).result()
+        result = run_query(client, query, job_config=bigquery.QueryJobConfig(query_parameters=query_params), service="performance_summary_new", company=company_name)
         rows = list(result)
         if rows:
             row = rows[0]
@@ -423,7 +424,7 @@ def get_ga4_visitors_simple(company_name, start_date: str, end_date: str, user_i
 
     try:
         client = get_bigquery_client()
-        result = client.query(query, job_config=bigquery.QueryJobConfig(query_parameters=query_params)).result()
+        result = run_query(client, query, job_config=bigquery.QueryJobConfig(query_parameters=query_params), service="performance_summary_new", company=company_name)
         row = list(result)[0]
         return row.total_visitors or 0
     except Exception as e:
@@ -452,7 +453,7 @@ def get_ga4_product_views_simple(company_name, start_date: str, end_date: str, u
 
     try:
         client = get_bigquery_client()
-        result = client.query(query, job_config=bigquery.QueryJobConfig(query_parameters=query_params)).result()
+        result = run_query(client, query, job_config=bigquery.QueryJobConfig(query_parameters=query_params), service="performance_summary_new", company=company_name)
         row = list(result)[0]
         return row.product_views or 0
     except Exception as e:
@@ -482,7 +483,7 @@ def get_cart_signup_from_summary_table(company_name, start_date: str, end_date:
 
     try:
         client = get_bigquery_client()
-        result = client.query(query, job_config=bigquery.QueryJobConfig(query_parameters=query_params)).result()
+        result = run_query(client, query, job_config=bigquery.QueryJobConfig(query_parameters=query_params), service="performance_summary_new", company=company_name)
         row = list(result)[0]
         return {'cart_users': int(row.cart_users or 0), 'signup_count': int(row.signup_count or 0)}
     except Exception as e:
@@ -1,5 +1,6 @@
 from google.cloud import bigquery
 from ..utils.cache_utils import cached_query
+from ..utils.bq_query import run_query
 
 # ✅ 1. 일별 또는 요약 플랫폼 매출 조회
 @cached_query(func_name="platform_sales", ttl=1800)  # 30분 캐싱
@@ -87,7 +88,7 @@ def get_platform_sales_by_day(company_names, start_date, end_date, date_type="da
     )
 
     try:
-        result = client.query(final_query, job_config=job_config).result()
+        result = run_query(client, final_query, job_config=job_config, service="platform_sales_summary", company=company_names)
         return [dict(row) for row in result]
     except Exception as e:
         print(f"[ERROR] get_platform_sales_by_day 실패: {e}")
@@ -149,7 +150,7 @@ def get_platform_sales_ratio(company_names, start_date, end_date):
     )
 
     try:
-        result = client.query(query, job_config=job_config).result()
+        result = run_query(client, query, job_config=job_config, service="platform_sales_summary", company=company_names)
         return [dict(row) for row in result]
     except Exception as e:
         print(f"[ERROR] get_platform_sales_ratio 실패: {e}")
@@ -215,7 +216,7 @@ def get_monthly_platform_sales(company_names, months_back=12):
     )
 
     try:
-        result = client.query(query, job_config=job_config).result()
+        result = run_query(client, query, job_config=job_config, service="platform_sales_summary", company=company_names)
         return [dict(row) for row in result]
     except Exception as e:
         print(f"[ERROR] get_monthly_platform_sales 실패: {e}")
@@ -1,5 +1,6 @@
 from google.cloud import bigquery
 from ..utils.cache_utils import cached_query
+from ..utils.bq_query import run_query
 
 
 def get_bigquery_client():
@@ -130,10 +131,13 @@ def get_product_sales_ratio(
             val = getattr(p, "value", getattr(p, "values", None))
             print(f'  {i}: {p.name} = {val}')
 
-        rows = client.query(
+        rows = run_query(
+            client,
             query,
             job_config=bigquery.QueryJobConfig(query_parameters=query_params),
-        ).result()
+            service="product_sales_ratio",
+            company=company_name,
+        )
         data = [dict(r) for r in rows]
         print(f'[DEBUG] 결과 건수: {len(data)}')
         
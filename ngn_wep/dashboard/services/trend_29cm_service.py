@@ -10,6 +10,14 @@ from datetime import datetime, timezone, timedelta
 from google.cloud import bigquery
 from google.cloud import storage
 from ..utils.cache_utils import cached_query
+from ..utils.bq_query import run_query
+from ..utils.trend_artifact_cache import get_trend_artifact_cache
+from .trend_rank_diff import (
+    fetch_trend_rank_diff,
+    empty_trend_lists,
+    load_trend_snapshot_columnar,
+    write_trend_snapshot_columnar,
+)
 from typing import List, Dict, Any, Optional
 
 def get_bigquery_client():
@@ -17,193 +25,49 @@ def get_bigquery_client():
     return bigquery.Client()
 
 
-@cached_query(func_name="trend_29cm_rising", ttl=604800)  # 7일 캐싱 (주간 데이터)
-def get_rising_star(tab_name: str = "전체") -> List[Dict[str, Any]]:
+@cached_query(func_name="trend_29cm_all_tabs", ttl=604800)  # 7일 캐싱 (run_id별 결과)
+def get_trend_lists_by_tab(run_id: Optional[str] = None) -> Optional[Dict[str, Dict[str, List[Dict[str, Any]]]]]:
     """
-    급상승 랭킹 (Rising Star) 조회
-    지난주 대비 이번주 순위가 상승한 상품
+    전체 탭의 급상승/신규진입/순위하락 목록 (쿼리 1회, run_id별로 캐싱)
+    run_id가 None이면 최신 주차 기준
+    실패 시 None 반환 (캐시에 남지 않도록)
     """
     client = get_bigquery_client()
-    
-    query = """
-    DECLARE target_tab STRING DEFAULT @tab_name;
-    
-    WITH weeks AS (
-      SELECT DISTINCT run_id 
-      FROM `winged-precept-443218-v8.ngn_dataset.platform_29cm_best`
-      WHERE period_type = 'WEEKLY' 
-      ORDER BY run_id DESC 
-      LIMIT 2
-    ),
-    base_data AS (
-      SELECT *,
-        DENSE_RANK() OVER (ORDER BY run_id DESC) as week_idx,
-        REGEXP_EXTRACT(item_url, r'catalog/([0-9]+)') as product_id
-      FROM `winged-precept-443218-v8.ngn_dataset.platform_29cm_best`
-      WHERE period_type = 'WEEKLY' 
-        AND best_page_name = target_tab 
-        AND run_id IN (SELECT run_id FROM weeks)
-      QUALIFY ROW_NUMBER() OVER (PARTITION BY run_id, item_url ORDER BY collected_at DESC) = 1
-    ),
-    curr_week AS (SELECT * FROM base_data WHERE week_idx = 1),
-    prev_week AS (SELECT * FROM base_data WHERE week_idx = 2)
-    
-    SELECT 
-      CONCAT(curr.best_page_name, ' ', CAST(curr.rank AS STRING), '위') AS Ranking,
-      curr.brand_name AS Brand_Name,
-      curr.product_name AS Product_Name,
-      (prev.rank - curr.rank) AS Rank_Change,
-      curr.rank AS This_Week_Rank,
-      prev.rank AS Last_Week_Rank,
-      curr.thumbnail_url,
-      curr.price,
-      curr.item_url,
-      curr.run_id AS current_run_id
-    FROM curr_week curr
-    JOIN prev_week prev ON curr.product_id = prev.product_id
-    WHERE prev.rank > curr.rank  -- 순위가 상승 (숫자가 작아짐)
-    ORDER BY Rank_Change DESC
-    LIMIT 20
-    """
-    
-    job_config = bigquery.QueryJobConfig(
-        query_parameters=[
-            bigquery.ScalarQueryParameter("tab_name", "STRING", tab_name)
-        ]
-    )
-    
     try:
-        rows = client.query(query, job_config=job_config).result()
-        return [dict(row) for row in rows]
+        return fetch_trend_rank_diff(client, "29cm", run_id)
     except Exception as e:
-        print(f"[ERROR] get_rising_star 실패: {e}")
-        return []
+        print(f"[ERROR] get_trend_lists_by_tab 실패: {e}")
+        return None
+
+
+def _get_tab_lists(tab_name: str) -> Dict[str, List[Dict[str, Any]]]:
+    # 주간 아티팩트가 워커 메모리에 있으면 그대로 사용 (BigQuery 미조회)
+    all_tabs = get_trend_artifact_cache().get_tabs_data("29cm") or get_trend_lists_by_tab() or {}
+    return all_tabs.get(tab_name) or empty_trend_lists()
+
+
+def get_rising_star(tab_name: str = "전체") -> List[Dict[str, Any]]:
+    """
+    급상승 랭킹 (Rising Star) 조회
+    지난주 대비 이번주 순위가 상승한 상품
+    """
+    return _get_tab_lists(tab_name)["rising_star"]
 
 
-@cached_query(func_name="trend_29cm_new_entry", ttl=604800)  # 7일 캐싱
 def get_new_entry(tab_name: str = "전체") -> List[Dict[str, Any]]:
     """
     신규 진입 (New Entry) 조회
     지난주에는 없었고 이번주에 새로 등장한 상품
     """
-    client = get_bigquery_client()
-    
-    query = """
-    DECLARE target_tab STRING DEFAULT @tab_name;
-    
-    WITH weeks AS (
-      SELECT DISTINCT run_id 
-      FROM `winged-precept-443218-v8.ngn_dataset.platform_29cm_best`
-      WHERE period_type = 'WEEKLY' 
-      ORDER BY run_id DESC 
-      LIMIT 2
-    ),
-    base_data AS (
-      SELECT *,
-        DENSE_RANK() OVER (ORDER BY run_id DESC) as week_idx,
-        REGEXP_EXTRACT(item_url, r'catalog/([0-9]+)') as product_id
-      FROM `winged-precept-443218-v8.ngn_dataset.platform_29cm_best`
-      WHERE period_type = 'WEEKLY' 
-        AND best_page_name = target_tab 
-        AND run_id IN (SELECT run_id FROM weeks)
-      QUALIFY ROW_NUMBER() OVER (PARTITION BY run_id, item_url ORDER BY collected_at DESC) = 1
-    ),
-    curr_week AS (SELECT * FROM base_data WHERE week_idx = 1),
-    prev_week AS (SELECT * FROM base_data WHERE week_idx = 2)
-    
-    SELECT 
-      CONCAT(curr.best_page_name, ' ', CAST(curr.rank AS STRING), '위') AS Ranking,
-      curr.brand_name AS Brand_Name,
-      curr.product_name AS Product_Name,
-      NULL AS Rank_Change,  -- 신규 진입이므로 변동폭 없음
-      curr.rank AS This_Week_Rank,
-      NULL AS Last_Week_Rank,  -- 신규 진입이므로 지난주 순위 없음
-      curr.thumbnail_url,
-      curr.price,
-      curr.item_url,
-      curr.run_id AS current_run_id
-    FROM curr_week curr
-    LEFT JOIN prev_week prev ON curr.product_id = prev.product_id
-    WHERE prev.product_id IS NULL  -- 지난주에 없던 상품
-    ORDER BY curr.rank ASC
-    LIMIT 20
-    """
-    
-    job_config = bigquery.QueryJobConfig(
-        query_parameters=[
-            bigquery.ScalarQueryParameter("tab_name", "STRING", tab_name)
-        ]
-    )
-    
-    try:
-        rows = client.query(query, job_config=job_config).result()
-        return [dict(row) for row in rows]
-    except Exception as e:
-        print(f"[ERROR] get_new_entry 실패: {e}")
-        return []
+    return _get_tab_lists(tab_name)["new_entry"]
 
 
-@cached_query(func_name="trend_29cm_rank_drop", ttl=604800)  # 7일 캐싱
 def get_rank_drop(tab_name: str = "전체") -> List[Dict[str, Any]]:
     """
     순위 하락 (Rank Drop) 조회
     지난주 대비 이번주 순위가 하락한 상품
     """
-    client = get_bigquery_client()
-    
-    query = """
-    DECLARE target_tab STRING DEFAULT @tab_name;
-    
-    WITH weeks AS (
-      SELECT DISTINCT run_id 
-      FROM `winged-precept-443218-v8.ngn_dataset.platform_29cm_best`
-      WHERE period_type = 'WEEKLY' 
-      ORDER BY run_id DESC 
-      LIMIT 2
-    ),
-    base_data AS (
-      SELECT *,
-        DENSE_RANK() OVER (ORDER BY run_id DESC) as week_idx,
-        REGEXP_EXTRACT(item_url, r'catalog/([0-9]+)') as product_id
-      FROM `winged-precept-443218-v8.ngn_dataset.platform_29cm_best`
-      WHERE period_type = 'WEEKLY' 
-        AND best_page_name = target_tab 
-        AND run_id IN (SELECT run_id FROM weeks)
-      QUALIFY ROW_NUMBER() OVER (PARTITION BY run_id, item_url ORDER BY collected_at DESC) = 1
-    ),
-    curr_week AS (SELECT * FROM base_data WHERE week_idx = 1),
-    prev_week AS (SELECT * FROM base_data WHERE week_idx = 2)
-    
-    SELECT 
-      CONCAT(curr.best_page_name, ' ', CAST(curr.rank AS STRING), '위') AS Ranking,
-      curr.brand_name AS Brand_Name,
-      curr.product_name AS Product_Name,
-      (prev.rank - curr.rank) AS Rank_Change,  -- 음수값 (순위 하락)
-      curr.rank AS This_Week_Rank,
-      prev.rank AS Last_Week_Rank,
-      curr.thumbnail_url,
-      curr.price,
-      curr.item_url,
-      curr.run_id AS current_run_id
-    FROM curr_week curr
-    JOIN prev_week prev ON curr.product_id = prev.product_id
-    WHERE prev.rank < curr.rank  -- 순위가 하락 (숫자가 커짐)
-    ORDER BY Rank_Change ASC  -- 가장 많이 하락한 순서
-    LIMIT 20
-    """
-    
-    job_config = bigquery.QueryJobConfig(
-        query_parameters=[
-            bigquery.ScalarQueryParameter("tab_name", "STRING", tab_name)
-        ]
-    )
-    
-    try:
-        rows = client.query(query, job_config=job_config).result()
-        return [dict(row) for row in rows]
-    except Exception as e:
-        print(f"[ERROR] get_rank_drop 실패: {e}")
-        return []
+    return _get_tab_lists(tab_name)["rank_drop"]
 
 
 @cached_query(func_name="trend_29cm_current_week", ttl=604800)  # 7일 캐싱
@@ -222,7 +86,7 @@ def get_current_week_info() -> Optional[str]:
     """
     
     try:
-        rows = client.query(query).result()
+        rows = run_query(client, query, service="trend_29cm_service")
         for row in rows:
             return row.run_id
         return None
@@ -258,7 +122,7 @@ def get_available_tabs() -> List[str]:
     """
     
     try:
-        rows = client.query(query).result()
+        rows = run_query(client, query, service="trend_29cm_service")
         return [row.best_page_name for row in rows]
     except Exception as e:
         print(f"[ERROR] get_available_tabs 실패: {e}")
@@ -306,10 +170,11 @@ def get_trend_snapshot_path(run_id: str, company_name: Optional[str] = None) ->
         return f"ai-reports/trend/29cm/{year}-{month:02d}-{week}/snapshot.json.gz"
 
 
-def load_trend_snapshot_from_gcs(run_id: str, company_name: Optional[str] = None) -> Optional[Dict[str, Any]]:
+def load_trend_snapshot_from_gcs(run_id: str, company_name: Optional[str] = None, tab_names: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
     """
     GCS 버킷에서 트렌드 스냅샷 로드
     demo 계정의 경우 piscess 스냅샷을 로드합니다.
+    tab_names를 주면 Columnar 스냅샷에서 해당 탭만 읽음 (JSON 스냅샷만 있으면 전체 로드)
     """
     try:
         PROJECT_ID = os.environ.get("GOOGLE_CLOUD_PROJECT", "winged-precept-443218-v8")
@@ -328,6 +193,12 @@ def load_trend_snapshot_from_gcs(run_id: str, company_name: Optional[str] = None
         client = storage.Client(project=PROJECT_ID)
         bucket = client.bucket(GCS_BUCKET)
         
+        # Columnar 스냅샷 우선 (요청한 탭 row group만 읽음)
+        snapshot_data = load_trend_snapshot_columnar(bucket, blob_path, tab_names)
+        if snapshot_data is not None:
+            print(f"[INFO] GCS에서 트렌드 스냅샷 로드 (columnar): {blob_path}")
+            return snapshot_data
+        
         # 호환성을 위해 두 가지 경로 모두 시도
         # 1. 새로운 포맷: 2026-01-01 (week를 01로)
         # 2. 기존 포맷: 2026-01-1 (week를 1로)
@@ -466,6 +337,7 @@ def save_trend_snapshot_to_gcs(run_id: str, tabs_data: Dict[str, Dict[str, List[
         bucket = client.bucket(GCS_BUCKET)
         blob = bucket.blob(blob_path)
         blob.upload_from_string(compressed_bytes, content_type='application/gzip')
+        write_trend_snapshot_columnar(bucket, blob_path, snapshot_data, json_generation=blob.generation)
         
         print(f"[INFO] 트렌드 스냅샷 저장 완료: {blob_path}")
         return True
@@ -480,15 +352,7 @@ def save_trend_snapshot_to_gcs(run_id: str, tabs_data: Dict[str, Dict[str, List[
 def get_all_tabs_data_from_bigquery(tab_names: List[str]) -> Dict[str, Dict[str, List[Dict]]]:
     """
     BigQuery에서 모든 탭 데이터 조회 (스냅샷 생성용)
+    탭 수와 관계없이 쿼리 1회 (get_trend_lists_by_tab)
     """
-    result = {}
-    
-    for tab_name in tab_names:
-        result[tab_name] = {
-            "rising_star": get_rising_star(tab_name),
-            "new_entry": get_new_entry(tab_name),
-            "rank_drop": get_rank_drop(tab_name)
-        }
-    
-    return result
-
+    all_tabs = get_trend_lists_by_tab() or {}
+    return {tab_name: all_tabs.get(tab_name) or empty_trend_lists() for tab_name in tab_names}
@@ -0,0 +1,215 @@
+"""
+주간 베스트 순위 변동 계산 (29CM / Ably 공통)
+- 기존: 탭마다 급상승/신규진입/순위하락 쿼리를 각각 실행 → 스냅샷 1회에 (3 × 탭 수)번 테이블 스캔
+- 변경: 두 주차(run_id)를 한 번만 읽어 모든 탭의 주간 순위 변동을 계산하고
+  상품마다 rising_star / new_entry / rank_drop 태그를 붙여 탭·유형별 상위 N개만 반환 (스캔 1회)
+- 반환 형식은 기존 탭별 함수 결과와 동일 (Ranking, Brand_Name, ... , current_run_id)
+"""
+import os
+from typing import Any, Dict, List, Optional
+
+from google.cloud import bigquery
+
+from ..utils.columnar_snapshot import load_columnar_manifest, read_columnar_groups, write_columnar_snapshot
+from ..utils.trend_artifact_cache import PARTIAL_TABS_KEY
+from ..utils.bq_query import run_query
+
+PROJECT_ID = os.environ.get("GOOGLE_CLOUD_PROJECT", "winged-precept-443218-v8")
+DATASET = "ngn_dataset"
+
+TREND_TYPES = ("rising_star", "new_entry", "rank_drop")
+TREND_LIST_LIMIT = 20
+
+# 플랫폼별 차이 (기존 서비스 쿼리와 동일한 의미 유지)
+# - drop_change: 순위하락 Rank_Change 부호 ("prev_minus_curr" → 음수, "curr_minus_prev" → 양수)
+# - new_entry_max_rank: 신규진입 후보 순위 상한 (None이면 제한 없음)
+# - new_entry_last_week_rank: 신규진입 상품의 Last_Week_Rank 표시값
+TREND_PLATFORMS = {
+    "29cm": {
+        "table": "platform_29cm_best",
+        "tab_column": "best_page_name",
+        "product_id_pattern": r"catalog/([0-9]+)",
+        "drop_change": "prev_minus_curr",
+        "new_entry_max_rank": None,
+        "new_entry_last_week_rank": None,
+    },
+    "ably": {
+        "table": "platform_ably_best",
+        "tab_column": "category_medium",
+        "product_id_pattern": r"goods/([0-9]+)",
+        "drop_change": "curr_minus_prev",
+        "new_entry_max_rank": 100,
+        "new_entry_last_week_rank": "New",
+    },
+}
+
+
+def build_trend_rank_diff_query(platform: str) -> str:
+    """모든 탭의 주간 순위 변동을 한 번에 계산하는 쿼리"""
+    config = TREND_PLATFORMS[platform]
+    table = f"`{PROJECT_ID}.{DATASET}.{config['table']}`"
+    tab_column = config["tab_column"]
+
+    drop_change = "(curr_rank - prev_rank)" if config["drop_change"] == "curr_minus_prev" else "(prev_rank - curr_rank)"
+    new_entry_filter = ""
+    if config["new_entry_max_rank"]:
+        new_entry_filter = f"AND (trend_type != 'new_entry' OR curr_rank <= {int(config['new_entry_max_rank'])})"
+
+    return f"""
+    DECLARE target_run_id STRING DEFAULT COALESCE(
+      @run_id,
+      (SELECT MAX(run_id) FROM {table} WHERE period_type = 'WEEKLY')
+    );
+
+    WITH weeks AS (
+      SELECT DISTINCT run_id
+      FROM {table}
+      WHERE period_type = 'WEEKLY'
+        AND run_id <= target_run_id
+      ORDER BY run_id DESC
+      LIMIT 2
+    ),
+    base_data AS (
+      SELECT
+        {tab_column} AS tab_name,
+        run_id,
+        rank,
+        brand_name,
+        product_name,
+        thumbnail_url,
+        price,
+        item_url,
+        REGEXP_EXTRACT(item_url, r'{config['product_id_pattern']}') AS product_id
+      FROM {table}
+      WHERE period_type = 'WEEKLY'
+        AND run_id IN (SELECT run_id FROM weeks)
+      QUALIFY ROW_NUMBER() OVER (PARTITION BY {tab_column}, run_id, item_url ORDER BY collected_at DESC) = 1
+    ),
+    curr_week AS (SELECT * FROM base_data WHERE run_id = target_run_id),
+    prev_week AS (SELECT * FROM base_data WHERE run_id < target_run_id),
+    tagged AS (
+      SELECT
+        curr.tab_name,
+        curr.rank AS curr_rank,
+        prev.rank AS prev_rank,
+        curr.brand_name,
+        curr.product_name,
+        curr.thumbnail_url,
+        curr.price,
+        curr.item_url,
+        curr.run_id,
+        CASE
+          WHEN prev.product_id IS NULL THEN 'new_entry'
+          WHEN prev.rank > curr.rank THEN 'rising_star'  -- 순위 상승 (숫자가 작아짐)
+          WHEN prev.rank < curr.rank THEN 'rank_drop'    -- 순위 하락 (숫자가 커짐)
+        END AS trend_type
+      FROM curr_week curr
+      LEFT JOIN prev_week prev
+        ON curr.tab_name = prev.tab_name AND curr.product_id = prev.product_id
+    )
+
+    SELECT
+      tab_name,
+      trend_type,
+      CONCAT(tab_name, ' ', CAST(curr_rank AS STRING), '위') AS Ranking,
+      brand_name AS Brand_Name,
+      product_name AS Product_Name,
+      CASE trend_type
+        WHEN 'rising_star' THEN (prev_rank - curr_rank)
+        WHEN 'rank_drop' THEN {drop_change}
+      END AS Rank_Change,
+      curr_rank AS This_Week_Rank,
+      prev_rank AS Last_Week_Rank,
+      thumbnail_url,
+      price,
+      item_url,
+      run_id AS current_run_id,
+      ROW_NUMBER() OVER (
+        PARTITION BY tab_name, trend_type
+        ORDER BY
+          CASE trend_type
+            WHEN 'rising_star' THEN (curr_rank - prev_rank)  -- 많이 오른 순
+            WHEN 'new_entry' THEN curr_rank                  -- 높은 순위 순
+            ELSE (prev_rank - curr_rank)                     -- 많이 떨어진 순
+          END,
+          curr_rank
+      ) AS list_position
+    FROM tagged
+    WHERE trend_type IS NOT NULL
+      {new_entry_filter}
+    QUALIFY list_position <= @list_limit
+    ORDER BY tab_name, trend_type, list_position
+    """
+
+
+def empty_trend_lists() -> Dict[str, List[Dict[str, Any]]]:
+    return {trend_type: [] for trend_type in TREND_TYPES}
+
+
+def fetch_trend_rank_diff(
+    client: bigquery.Client,
+    platform: str,
+    run_id: Optional[str] = None,
+    limit: int = TREND_LIST_LIMIT,
+) -> Dict[str, Dict[str, List[Dict[str, Any]]]]:
+    """
+    모든 탭의 급상승/신규진입/순위하락 목록을 쿼리 1회로 조회
+    run_id가 None이면 최신 주차 기준
+
+    반환: {탭: {"rising_star": [...], "new_entry": [...], "rank_drop": [...]}}
+    (변동 상품이 하나도 없는 탭은 포함되지 않으므로 호출 측에서 empty_trend_lists()로 보완)
+    """
+    config = TREND_PLATFORMS[platform]
+    job_config = bigquery.QueryJobConfig(
+        query_parameters=[
+            bigquery.ScalarQueryParameter("run_id", "STRING", run_id),
+            bigquery.ScalarQueryParameter("list_limit", "INT64", limit),
+        ]
+    )
+
+    result: Dict[str, Dict[str, List[Dict[str, Any]]]] = {}
+    rows = run_query(client, build_trend_rank_diff_query(platform), job_config=job_config, service="trend_rank_diff")
+    for row in rows:
+        item = dict(row)
+        tab_name = item.pop("tab_name")
+        trend_type = item.pop("trend_type")
+        item.pop("list_position", None)
+        if trend_type == "new_entry":
+            item["Last_Week_Rank"] = config["new_entry_last_week_rank"]
+        result.setdefault(tab_name, empty_trend_lists())[trend_type].append(item)
+
+    return result
+
+
+# ============================================================
+# 트렌드 스냅샷 Columnar 저장/로드 (탭별 row group)
+# ============================================================
+TREND_SUB_FIELD = "_trend_type"
+
+
+def write_trend_snapshot_columnar(bucket, blob_path: str, snapshot_data: Dict[str, Any],
+                                  json_generation: Optional[int] = None) -> bool:
+    """JSON 스냅샷 옆에 탭별 row group Parquet + manifest 저장 (tabs_data 외 필드는 manifest meta)"""
+    meta = {k: v for k, v in snapshot_data.items() if k != "tabs_data"}
+    return write_columnar_snapshot(
+        bucket, blob_path, snapshot_data.get("tabs_data") or {}, meta=meta, sub_field=TREND_SUB_FIELD,
+        json_generation=json_generation,
+    )
+
+
+def load_trend_snapshot_columnar(bucket, blob_path: str, tab_names: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
+    """
+    Columnar 스냅샷에서 요청한 탭만 로드 (tab_names가 None이면 전체, 없으면 None)
+    일부 탭만 읽은 경우 PARTIAL_TABS_KEY에 요청한 탭 목록 기록 (TrendArtifactCache가 부족한 탭만 추가 로드)
+    """
+    manifest = load_columnar_manifest(bucket, blob_path)
+    if manifest is None:
+        return None
+
+    tabs_data = read_columnar_groups(bucket, manifest, tab_names)
+    if tabs_data is None:
+        return None
+    snapshot = {**(manifest.get("meta") or {}), "tabs_data": tabs_data}
+    if tab_names is not None:
+        snapshot[PARTIAL_TABS_KEY] = list(tab_names)
+    return snapshot
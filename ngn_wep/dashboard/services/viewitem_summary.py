@@ -2,6 +2,7 @@
 
 from google.cloud import bigquery
 from ..utils.cache_utils import cached_query
+from ..utils.bq_query import run_query
 
 def get_bigquery_client():
     return bigquery.Client()
@@ -105,7 +106,7 @@ def get_viewitem_summary(company_name, start_date: str, end_date: str, limit: in
     try:
         client = get_bigquery_client()
         print(f"[DEBUG] 🚀 BigQuery 쿼리 실행 시작")
-        rows = client.query(query, job_config=bigquery.QueryJobConfig(query_parameters=query_params)).result()
+        rows = run_query(client, query, job_config=bigquery.QueryJobConfig(query_parameters=query_params), service="viewitem_summary", company=company_name)
         data = [dict(row) for row in rows]
         print(f"[DEBUG] ✅ ViewItem Summary 결과 {len(data)}건")
         print(f"[DEBUG] 📋 첫 번째 데이터 샘플: {data[0] if data else 'None'}")
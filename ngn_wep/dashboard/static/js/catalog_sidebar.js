@@ -365,6 +365,22 @@ async function fetchCatalogSidebar(accountId) {
   }
 }
 
+// 자사몰 URL 크롤링 작업 polling (완료/실패 응답 반환)
+async function pollManualCrawlJob(jobId, intervalMs = 2000, maxWaitMs = 300000) {
+  const startedAt = Date.now();
+  while (Date.now() - startedAt < maxWaitMs) {
+    await new Promise(resolve => setTimeout(resolve, intervalMs));
+    const res  = await fetch("/dashboard/get_data", {
+      method : "POST",
+      headers: { "Content-Type": "application/json" },
+      body   : JSON.stringify({ data_type: "catalog_manual_job", job_id: jobId }),
+    });
+    const json = await res.json();
+    if (json.status !== "success" || json.products) return json;
+  }
+  return { status: "error", message: "상품 수집이 지연되고 있습니다. 잠시 후 다시 시도해 주세요." };
+}
+
 async function fetchManualProducts() {
   if (isFetchingManualList) return;
   const url = qs("#manualCategoryUrlInput")?.value.trim();
@@ -382,7 +398,9 @@ async function fetchManualProducts() {
       headers: { "Content-Type": "application/json" },
       body   : JSON.stringify({ data_type: "catalog_manual", category_url: url }),
     });
-    const json = await res.json();
+    let json = await res.json();
+    // 캐시가 없으면 크롤링 작업 job_id 가 오므로 완료될 때까지 polling
+    if (json.status === "success" && json.job_id) json = await pollManualCrawlJob(json.job_id);
     renderManualProductTable(json.status === "success" ? json.products : []);
     if (json.status !== "success") showInlinePopup(json.message || "상품 데이터를 불러올 수 없습니다.");
   } catch (e) {
@@ -284,7 +284,8 @@ async function loadMonthlyReport(companyName, year, month) {
       body: JSON.stringify({
         company_name: companyName,
         year: year,
-        month: month
+        month: month,
+        raw: true  // 서버가 gzip 스냅샷을 그대로 전달 (envelope 없이 스냅샷 본문)
       })
     });
     
@@ -297,11 +298,13 @@ async function loadMonthlyReport(companyName, year, month) {
       throw new Error(result.message || "리포트를 불러올 수 없습니다");
     }
     
-    if (!result.data) {
+    // raw 응답이면 본문이 곧 스냅샷, 아니면 기존 envelope의 data
+    const isRaw = response.headers.get("X-Monthly-Report-Format") === "raw";
+    if (!isRaw && !result.data) {
       throw new Error("리포트 데이터가 없습니다");
     }
     
-    const data = result.data;
+    const data = isRaw ? result : result.data;
     console.log("[월간 리포트] 받은 데이터:", data);
     console.log("[월간 리포트] 데이터 구조 확인 - facts:", data?.facts);
     console.log("[월간 리포트] 데이터 구조 확인 - mall_sales:", data?.facts?.mall_sales);
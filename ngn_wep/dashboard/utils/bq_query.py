@@ -0,0 +1,315 @@
+"""
+BigQuery 쿼리 실행 래퍼 (비용 / 지연시간 집계)
+- 대시보드 서비스 / 핸들러 / ETL 핸들러의 client.query(...).result() 대신 사용
+  rows = run_query(client, query, job_config, service="cafe24_service", company=company_name)
+- job 라벨: service, data_type, company
+  → INFORMATION_SCHEMA.JOBS / 청구 내보내기에서 라벨별 비용 집계 가능
+- 완료된 job 통계 (처리/청구 bytes, slot ms, 캐시 적중, 소요 시간)
+  - 최근 BQ_STATS_WINDOW건을 워커 메모리에 보관 → 쿼리 형태(리터럴 제거 SQL)별 상위 N개를 /dashboard/cache/stats에서 제공
+  - 현재 요청 span(request_tracing)에도 기록
+- dry_run_query(): 실행 없이 예상 처리 bytes / 비용 조회
+- dry_run_capture(): 블록 안의 run_query / run_query_job을 dry run으로 대체하고 쿼리별 예상 bytes 수집
+  (tools/bench_query_budget 쿼리 예산 점검용, 결과 행은 비어 있음)
+- BQ_MAX_BYTES_BILLED > 0이면 maximum_bytes_billed 미지정 job에 상한 적용 (초과 시 BigQuery가 job 거부)
+- ETL 이미지에는 이 파일만 /app/bq_query.py로 복사해 단독 모듈로 사용 (request_tracing 없으면 span 기록 생략)
+"""
+import os
+import re
+import time
+import hashlib
+import logging
+import threading
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+from google.cloud import bigquery
+
+try:
+    from .request_tracing import company_label, current_span, record_bq_job
+except ImportError:
+    # ETL 단독 실행 (패키지 밖)
+    def company_label(company_name) -> str:
+        if isinstance(company_name, (list, tuple)):
+            company_name = company_name[0] if len(company_name) == 1 else "all"
+        return str(company_name or "all").strip().lower() or "all"
+
+    def current_span():
+        return None
+
+    def record_bq_job(job):
+        return None
+
+BQ_STATS_WINDOW = int(os.getenv("BQ_STATS_WINDOW", 5000))
+BQ_TOP_N = int(os.getenv("BQ_TOP_N", 20))
+BQ_PRICE_PER_TIB_USD = float(os.getenv("BQ_PRICE_PER_TIB_USD", 6.25))
+BQ_MAX_BYTES_BILLED = int(os.getenv("BQ_MAX_BYTES_BILLED", 0))
+# 이 크기 이상 청구된 job은 INFO 로그 (나머지는 DEBUG)
+BQ_LOG_MIN_BYTES_BILLED = int(os.getenv("BQ_LOG_MIN_BYTES_BILLED", 1024 ** 3))
+BQ_SAMPLE_SQL_LEN = 300
+
+TIB = 1024 ** 4
+_LABEL_MAX_LEN = 63
+
+_log = logging.getLogger("ngn.bigquery")
+
+# dry_run_capture() 활성 시 수집 대상 list (None이면 실제 실행)
+_capture: ContextVar[Optional[list]] = ContextVar("ngn_bq_dry_run_capture", default=None)
+
+
+# ============================================================
+# 라벨 / 쿼리 형태
+# ============================================================
+
+def _label_value(value) -> str:
+    """BigQuery 라벨 값 규칙: 소문자/숫자/_/- (국제 문자 허용), 최대 63자"""
+    text = re.sub(r"[^\w-]", "_", str(value or "").strip().lower())[:_LABEL_MAX_LEN]
+    return text or "none"
+
+
+def _job_labels(service: str, data_type: Optional[str], company) -> Dict[str, str]:
+    if data_type is None:
+        span = current_span()
+        data_type = span.name if span is not None else None
+    return {
+        "service": _label_value(service),
+        "data_type": _label_value(data_type),
+        "company": _label_value(company_label(company) if company is not None else None),
+    }
+
+
+# 백틱 식별자는 유지, 문자열/숫자 리터럴은 ? 로 치환
+_SQL_COMMENT_RE = re.compile(r"--[^\n]*|/\*.*?\*/", re.S)
+_SQL_LITERAL_RE = re.compile(r"(`[^`]*`)|'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"|\b\d+(?:\.\d+)?\b")
+_SQL_IN_LIST_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SQL_SPACE_RE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=512)
+def query_shape(query: str) -> str:
+    """리터럴/주석/공백 차이를 없앤 쿼리 형태 (날짜·업체명만 다른 f-string 쿼리를 같은 형태로 묶음)"""
+    text = _SQL_COMMENT_RE.sub(" ", query)
+    text = _SQL_LITERAL_RE.sub(lambda m: m.group(1) or "?", text)
+    text = _SQL_IN_LIST_RE.sub("(?)", text)
+    return _SQL_SPACE_RE.sub(" ", text).strip()
+
+
+def query_shape_id(query: str) -> str:
+    return hashlib.sha1(query_shape(query).encode("utf-8")).hexdigest()[:12]
+
+
+def _estimated_cost_usd(bytes_billed: int) -> float:
+    return round(bytes_billed / TIB * BQ_PRICE_PER_TIB_USD, 4)
+
+
+# ============================================================
+# 최근 job 통계 (쿼리 형태별 상위 N)
+# ============================================================
+
+class QueryStats:
+    """최근 window건의 완료 job 기록 + 쿼리 형태별 샘플 SQL"""
+
+    def __init__(self, window: int = BQ_STATS_WINDOW):
+        self._lock = threading.Lock()
+        self._jobs = deque(maxlen=window)
+        self._samples: Dict[str, Dict[str, str]] = {}
+        self._window = window
+
+    def record(self, shape_id: str, query: str, labels: Dict[str, str], job, seconds: float):
+        entry = {
+            "shape_id": shape_id,
+            "service": labels["service"],
+            "data_type": labels["data_type"],
+            "bytes_processed": int(getattr(job, "total_bytes_processed", None) or 0),
+            "bytes_billed": int(getattr(job, "total_bytes_billed", None) or 0),
+            "slot_ms": int(getattr(job, "slot_millis", None) or 0),
+            "cache_hit": bool(getattr(job, "cache_hit", False)),
+            "seconds": seconds,
+            "ts": time.time(),
+        }
+        with self._lock:
+            self._jobs.append(entry)
+            if shape_id not in self._samples:
+                if len(self._samples) >= self._window:
+                    live = {j["shape_id"] for j in self._jobs}
+                    self._samples = {k: v for k, v in self._samples.items() if k in live}
+                self._samples[shape_id] = {
+                    "service": labels["service"],
+                    "sample_sql": query_shape(query)[:BQ_SAMPLE_SQL_LEN],
+                }
+        return entry
+
+    def summary(self, top_n: int = BQ_TOP_N) -> Dict[str, Any]:
+        with self._lock:
+            jobs = list(self._jobs)
+            samples = dict(self._samples)
+
+        shapes: Dict[str, Dict[str, Any]] = {}
+        for j in jobs:
+            s = shapes.get(j["shape_id"])
+            if s is None:
+                s = shapes[j["shape_id"]] = {
+                    "shape_id": j["shape_id"],
+                    "service": j["service"],
+                    "data_types": set(),
+                    "count": 0,
+                    "bytes_processed": 0,
+                    "bytes_billed": 0,
+                    "max_bytes_billed": 0,
+                    "slot_ms": 0,
+                    "seconds": 0.0,
+                    "cache_hits": 0,
+                }
+            s["data_types"].add(j["data_type"])
+            s["count"] += 1
+            s["bytes_processed"] += j["bytes_processed"]
+            s["bytes_billed"] += j["bytes_billed"]
+            s["max_bytes_billed"] = max(s["max_bytes_billed"], j["bytes_billed"])
+            s["slot_ms"] += j["slot_ms"]
+            s["seconds"] += j["seconds"]
+            s["cache_hits"] += j["cache_hit"]
+
+        top = sorted(shapes.values(), key=lambda s: (s["bytes_billed"], s["slot_ms"]), reverse=True)[:top_n]
+        for s in top:
+            s["data_types"] = sorted(s["data_types"])
+            s["avg_seconds"] = round(s.pop("seconds") / s["count"], 3)
+            s["estimated_cost_usd"] = _estimated_cost_usd(s["bytes_billed"])
+            s["sample_sql"] = samples.get(s["shape_id"], {}).get("sample_sql", "")
+
+        total_billed = sum(j["bytes_billed"] for j in jobs)
+        return {
+            "window_jobs": len(jobs),
+            "window_seconds": round(time.time() - jobs[0]["ts"], 1) if jobs else 0,
+            "bytes_processed": sum(j["bytes_processed"] for j in jobs),
+            "bytes_billed": total_billed,
+            "slot_ms": sum(j["slot_ms"] for j in jobs),
+            "cache_hit_ratio": round(sum(j["cache_hit"] for j in jobs) / len(jobs), 3) if jobs else 0,
+            "estimated_cost_usd": _estimated_cost_usd(total_billed),
+            "price_per_tib_usd": BQ_PRICE_PER_TIB_USD,
+            "top_queries": top,
+        }
+
+    def clear(self):
+        with self._lock:
+            self._jobs.clear()
+            self._samples.clear()
+
+
+_stats = QueryStats()
+
+
+def get_query_stats(top_n: Optional[int] = None) -> Dict[str, Any]:
+    """최근 job 합계 + 청구 bytes 기준 상위 N개 쿼리 형태 (기본 BQ_TOP_N개)"""
+    return _stats.summary(top_n or BQ_TOP_N)
+
+
+# ============================================================
+# 실행
+# ============================================================
+
+def _prepare_config(job_config, labels: Dict[str, str]):
+    job_config = job_config if job_config is not None else bigquery.QueryJobConfig()
+    job_config.labels = {**(job_config.labels or {}), **labels}
+    if BQ_MAX_BYTES_BILLED > 0 and not getattr(job_config, "dry_run", False) and job_config.maximum_bytes_billed is None:
+        job_config.maximum_bytes_billed = BQ_MAX_BYTES_BILLED
+    return job_config
+
+
+def _record(query: str, labels: Dict[str, str], job, seconds: float):
+    entry = _stats.record(query_shape_id(query), query, labels, job, seconds)
+    record_bq_job(job)
+    level = logging.INFO if entry["bytes_billed"] >= BQ_LOG_MIN_BYTES_BILLED else logging.DEBUG
+    if _log.isEnabledFor(level):
+        _log.log(level, "[BQ_JOB] service=%s data_type=%s company=%s shape=%s billed=%.1fMB processed=%.1fMB "
+                 "slot_ms=%d cache_hit=%s %.2fs job_id=%s",
+                 labels["service"], labels["data_type"], labels["company"], entry["shape_id"],
+                 entry["bytes_billed"] / 1024 ** 2, entry["bytes_processed"] / 1024 ** 2,
+                 entry["slot_ms"], entry["cache_hit"], seconds, getattr(job, "job_id", None))
+
+
+def _dry_run(client, query: str, job_config, labels: Dict[str, str], **kwargs):
+    config = bigquery.QueryJobConfig.from_api_repr(job_config.to_api_repr()) if job_config is not None \
+        else bigquery.QueryJobConfig()
+    config.dry_run = True
+    config.use_query_cache = False
+    config.labels = {**(config.labels or {}), **labels}
+    job = client.query(query, job_config=config, **kwargs)
+    bytes_processed = int(job.total_bytes_processed or 0)
+    return job, {
+        "shape_id": query_shape_id(query),
+        "bytes_processed": bytes_processed,
+        "estimated_cost_usd": _estimated_cost_usd(bytes_processed),
+        "referenced_tables": [
+            f"{t.project}.{t.dataset_id}.{t.table_id}" for t in (getattr(job, "referenced_tables", None) or [])
+        ],
+    }
+
+
+def _capture_dry_run(sink: list, client, query: str, job_config, labels: Dict[str, str], **kwargs):
+    job, info = _dry_run(client, query, job_config, labels, **kwargs)
+    sink.append({"service": labels["service"], "data_type": labels["data_type"], "query": query, **info})
+    return job
+
+
+def run_query_job(client, query: str, job_config=None, *, service: str,
+                  data_type: Optional[str] = None, company=None, **kwargs):
+    """
+    쿼리 실행 후 완료된 QueryJob 반환 (DML 영향 행 수 등 job 속성이 필요한 경우)
+    - data_type 미지정 시 현재 span 이름(패널) 사용
+    """
+    labels = _job_labels(service, data_type, company)
+    sink = _capture.get()
+    if sink is not None:
+        return _capture_dry_run(sink, client, query, job_config, labels, **kwargs)
+    job_config = _prepare_config(job_config, labels)
+    start = time.perf_counter()
+    job = client.query(query, job_config=job_config, **kwargs)
+    job.result()
+    _record(query, labels, job, time.perf_counter() - start)
+    return job
+
+
+def run_query(client, query: str, job_config=None, *, service: str,
+              data_type: Optional[str] = None, company=None, **kwargs):
+    """쿼리 실행 후 결과 RowIterator 반환 (client.query(...).result() 대체)"""
+    labels = _job_labels(service, data_type, company)
+    sink = _capture.get()
+    if sink is not None:
+        # dry run job의 result()는 빈 RowIterator
+        return _capture_dry_run(sink, client, query, job_config, labels, **kwargs).result()
+    job_config = _prepare_config(job_config, labels)
+    start = time.perf_counter()
+    job = client.query(query, job_config=job_config, **kwargs)
+    rows = job.result()
+    _record(query, labels, job, time.perf_counter() - start)
+    return rows
+
+
+def dry_run_query(client, query: str, job_config=None, *, service: str = "dry_run",
+                  data_type: Optional[str] = None, company=None) -> Dict[str, Any]:
+    """
+    실행 없이 예상 처리 bytes / 비용 조회 (dry run은 과금 없음)
+    - job_config의 query_parameters 등은 유지, 원본 job_config는 변경하지 않음
+    """
+    _, info = _dry_run(client, query, job_config, _job_labels(service, data_type, company))
+    return info
+
+
+@contextmanager
+def dry_run_capture():
+    """
+    블록 안(현재 스레드/컨텍스트)의 run_query / run_query_job 호출을 dry run으로 대체
+      with dry_run_capture() as captured:
+          get_viewitem_summary.__wrapped__("demo", "2025-01-01", "2025-01-28")
+      → captured: [{"service", "data_type", "query", "shape_id", "bytes_processed", ...}, ...]
+    - 과금/실행 없음, 서비스에는 빈 결과가 반환됨
+    - ThreadPoolExecutor 작업 스레드로는 전파되지 않음
+    """
+    sink: list = []
+    token = _capture.set(sink)
+    try:
+        yield sink
+    finally:
+        _capture.reset(token)
@@ -11,6 +11,8 @@ from datetime import datetime, timedelta
 from typing import Any, Optional, Union, Dict, List
 from functools import wraps
 
+from .request_tracing import record_cache
+
 # ============================================================
 # 메모리 기반 TTL 캐시 (SimpleCache)
 # ============================================================
@@ -331,12 +333,14 @@ def cached_query(func_name: str = None, ttl: int = None):
             try:
                 cached_result = cache_get(cache_key)
                 if cached_result is not None:
+                    record_cache(hit=True)
                     return cached_result
             except Exception as e:
                 # 캐시 조회 실패 시 무시하고 함수 실행
                 print(f"[CACHE] 조회 중 오류 (무시됨): {e}")
 
             # 캐시 미스 - 실제 함수 실행
+            record_cache(hit=False)
             result = func(*args, **kwargs)
 
             # 결과를 캐시에 저장
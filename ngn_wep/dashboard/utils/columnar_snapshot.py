@@ -0,0 +1,236 @@
+"""
+Columnar snapshot (Parquet + JSON manifest)
+- 기존: 비교/트렌드 스냅샷은 중첩 JSON 1개(gzip) → 브랜드/탭 하나를 보여줘도 전체를 내려받아 파싱
+- 변경: 기존 JSON 옆에 Parquet 파일(그룹별 row group 1개)과 작은 manifest를 함께 저장
+  로더는 manifest만 읽은 뒤 필요한 row group/컬럼만 GCS ranged read로 읽음
+  → 로드 시간/메모리가 화면에 표시하는 브랜드·탭 수에 비례
+
+경로: {JSON 경로에서 .json.gz 제거}.parquet / .manifest.json
+- dict/list 값(리뷰 목록 등)과 타입이 섞인 컬럼은 JSON 문자열 컬럼으로 저장 (manifest의 json_columns)
+- 트렌드처럼 {탭: {유형: [...]}} 구조는 sub_field 컬럼으로 펼쳐 저장하고 읽을 때 다시 묶음
+- manifest에 기준 JSON 스냅샷의 generation을 기록 → JSON만 다시 쓴 경우(AI 분석 재실행 등)
+  로더가 generation 불일치로 manifest를 버리고 JSON 경로 사용 (오래된 Parquet을 읽지 않음)
+- pyarrow가 없거나 COLUMNAR_SNAPSHOT=0 이면 쓰기/읽기 모두 건너뜀 (호출 측은 JSON 경로 사용)
+"""
+import os
+import json
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    pa = None
+    pq = None
+    PYARROW_AVAILABLE = False
+
+COLUMNAR_SNAPSHOT_ENABLED = os.environ.get("COLUMNAR_SNAPSHOT", "1") == "1" and PYARROW_AVAILABLE
+COLUMNAR_READ_CHUNK_SIZE = int(os.environ.get("COLUMNAR_READ_CHUNK_SIZE", 256 * 1024))
+
+MANIFEST_VERSION = 2
+GROUP_COLUMN = "_group"
+
+
+def columnar_paths(json_blob_path: str) -> Tuple[str, str]:
+    """JSON 스냅샷 경로 → (Parquet 경로, manifest 경로)"""
+    base = json_blob_path
+    for suffix in (".json.gz", ".json"):
+        if base.endswith(suffix):
+            base = base[: -len(suffix)]
+            break
+    return f"{base}.parquet", f"{base}.manifest.json"
+
+
+def _flatten_groups(groups: Dict[str, Any], sub_field: Optional[str]) -> Tuple[List[Dict[str, Any]], Dict[str, Dict[str, Any]]]:
+    """그룹별 행 목록으로 펼치기 (sub_field가 있으면 {유형: [...]} 한 단계 더 펼침)"""
+    rows: List[Dict[str, Any]] = []
+    group_info: Dict[str, Dict[str, Any]] = {}
+    for group_key, value in groups.items():
+        group_rows: List[Dict[str, Any]] = []
+        info: Dict[str, Any] = {}
+        if sub_field:
+            info["sub_keys"] = list((value or {}).keys())
+            for sub_key, items in (value or {}).items():
+                group_rows.extend({**item, sub_field: sub_key} for item in items or [])
+        else:
+            group_rows.extend(dict(item) for item in value or [])
+        for row in group_rows:
+            row[GROUP_COLUMN] = str(group_key)
+        info["num_rows"] = len(group_rows)
+        group_info[str(group_key)] = info
+        rows.extend(group_rows)
+    return rows, group_info
+
+
+def _build_table(rows: List[Dict[str, Any]]) -> Tuple["pa.Table", List[str]]:
+    """행 목록 → Arrow 테이블 (중첩/혼합 타입 컬럼은 JSON 문자열)"""
+    columns: List[str] = []
+    seen = set()
+    for row in rows:
+        for key in row:
+            if key not in seen:
+                seen.add(key)
+                columns.append(key)
+
+    arrays = []
+    json_columns = []
+    for column in columns:
+        values = [row.get(column) for row in rows]
+        if any(isinstance(v, (dict, list, tuple)) for v in values):
+            array = None
+        else:
+            try:
+                array = pa.array(values)
+            except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+                array = None
+        if array is None:
+            json_columns.append(column)
+            array = pa.array([None if v is None else json.dumps(v, ensure_ascii=False) for v in values], type=pa.string())
+        arrays.append(array)
+
+    return pa.Table.from_arrays(arrays, names=columns), json_columns
+
+
+def write_columnar_snapshot(
+    bucket,
+    json_blob_path: str,
+    groups: Dict[str, Any],
+    meta: Optional[Dict[str, Any]] = None,
+    sub_field: Optional[str] = None,
+    json_generation: Optional[int] = None,
+) -> bool:
+    """
+    그룹(브랜드/탭)별 row group으로 Parquet 저장 후 manifest 저장 (manifest가 항상 마지막)
+    json_generation: 방금 업로드한 JSON 스냅샷 blob의 generation (없으면 GCS에서 조회)
+    실패해도 예외를 올리지 않음 (JSON 스냅샷이 기준 데이터)
+    """
+    if not COLUMNAR_SNAPSHOT_ENABLED:
+        return False
+
+    parquet_path, manifest_path = columnar_paths(json_blob_path)
+    try:
+        rows, group_info = _flatten_groups(groups, sub_field)
+        if not rows:
+            return False
+        table, json_columns = _build_table(rows)
+        if json_generation is None:
+            json_blob = bucket.get_blob(json_blob_path)
+            if json_blob is None:
+                return False
+            json_generation = json_blob.generation
+
+        sink = pa.BufferOutputStream()
+        row_group = 0
+        with pq.ParquetWriter(sink, table.schema, compression="zstd") as writer:
+            offset = 0
+            for group_key, info in group_info.items():
+                if info["num_rows"] == 0:
+                    info["row_group"] = None
+                    continue
+                writer.write_table(table.slice(offset, info["num_rows"]), row_group_size=info["num_rows"])
+                info["row_group"] = row_group
+                row_group += 1
+                offset += info["num_rows"]
+
+        parquet_blob = bucket.blob(parquet_path)
+        parquet_blob.upload_from_string(sink.getvalue().to_pybytes(), content_type="application/vnd.apache.parquet")
+
+        manifest = {
+            "version": MANIFEST_VERSION,
+            "format": "parquet",
+            "parquet_path": parquet_path,
+            "parquet_generation": parquet_blob.generation,
+            "json_generation": json_generation,
+            "columns": [c for c in table.column_names if c != GROUP_COLUMN],
+            "json_columns": json_columns,
+            "sub_field": sub_field,
+            "groups": group_info,
+            "meta": meta or {},
+        }
+        bucket.blob(manifest_path).upload_from_string(
+            json.dumps(manifest, ensure_ascii=False), content_type="application/json"
+        )
+        print(f"[INFO] Columnar 스냅샷 저장: {parquet_path} (그룹 {len(group_info)}개, {len(rows)}행)")
+        return True
+    except Exception as e:
+        print(f"[WARN] Columnar 스냅샷 저장 실패 (JSON 스냅샷은 유지): {e}")
+        return False
+
+
+def load_columnar_manifest(bucket, json_blob_path: str) -> Optional[Dict[str, Any]]:
+    """
+    manifest 로드 (없거나 읽을 수 없으면 None → 호출 측 JSON 경로 사용)
+    JSON 스냅샷이 manifest 작성 이후 다시 쓰였으면(generation 불일치) None
+    """
+    if not COLUMNAR_SNAPSHOT_ENABLED:
+        return None
+
+    _, manifest_path = columnar_paths(json_blob_path)
+    try:
+        blob = bucket.get_blob(manifest_path)
+        if blob is None:
+            return None
+        manifest = json.loads(blob.download_as_bytes().decode("utf-8"))
+        if manifest.get("version") != MANIFEST_VERSION:
+            return None
+        json_blob = bucket.get_blob(json_blob_path)
+        if json_blob is None or str(json_blob.generation) != str(manifest.get("json_generation")):
+            print(f"[INFO] Columnar manifest가 JSON 스냅샷과 다름 (JSON만 갱신됨) → JSON 사용: {json_blob_path}")
+            return None
+        return manifest
+    except Exception as e:
+        print(f"[WARN] Columnar manifest 로드 실패: {e}")
+        return None
+
+
+def read_columnar_groups(
+    bucket,
+    manifest: Dict[str, Any],
+    group_keys: Optional[Iterable[str]] = None,
+    columns: Optional[List[str]] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    필요한 그룹의 row group / 컬럼만 ranged read
+    반환 형식은 write_columnar_snapshot()에 넘긴 groups와 같음 (없는 그룹은 제외)
+    읽기 실패 시 None
+    """
+    groups_info: Dict[str, Dict[str, Any]] = manifest.get("groups") or {}
+    keys = list(groups_info.keys()) if group_keys is None else [str(k) for k in group_keys if str(k) in groups_info]
+    sub_field = manifest.get("sub_field")
+
+    result: Dict[str, Any] = {}
+    for key in keys:
+        result[key] = {sub_key: [] for sub_key in groups_info[key].get("sub_keys", [])} if sub_field else []
+
+    row_groups = sorted(groups_info[k]["row_group"] for k in keys if groups_info[k].get("row_group") is not None)
+    if not row_groups:
+        return result
+
+    read_columns = None
+    if columns is not None:
+        read_columns = [c for c in manifest.get("columns", []) if c in columns]
+        read_columns.append(GROUP_COLUMN)
+        if sub_field and sub_field not in read_columns:
+            read_columns.append(sub_field)
+
+    try:
+        blob = bucket.blob(manifest["parquet_path"], generation=manifest.get("parquet_generation"))
+        with blob.open("rb", chunk_size=COLUMNAR_READ_CHUNK_SIZE) as f:
+            table = pq.ParquetFile(f).read_row_groups(row_groups, columns=read_columns)
+    except Exception as e:
+        print(f"[WARN] Columnar 스냅샷 읽기 실패: {e}")
+        return None
+
+    json_columns = set(manifest.get("json_columns") or [])
+    for row in table.to_pylist():
+        group_key = row.pop(GROUP_COLUMN)
+        for column in json_columns:
+            if row.get(column) is not None:
+                row[column] = json.loads(row[column])
+        if sub_field:
+            result[group_key].setdefault(row.pop(sub_field), []).append(row)
+        else:
+            result[group_key].append(row)
+
+    return result
@@ -0,0 +1,370 @@
+"""
+Image proxy disk cache for /dashboard/proxy_image
+Meta/Instagram CDN 이미지를 디스크 LRU 캐시에 저장하고 재사용
+
+- 키: 정규화된 URL (fbcdn/cdninstagram은 호스트와 서명 파라미터(oh, oe, _nc_*)를 제외)
+- 동일 URL 동시 요청은 1회만 upstream fetch (single-flight)
+- 커넥션 풀을 공유하는 requests.Session 사용
+- ?w= 썸네일은 원본 캐시에서 리사이즈해 별도 변형(variant)으로 저장
+  (원본이 이미 작으면 원본을 가리키는 별칭(alias) 항목만 저장)
+
+주의사항:
+- Gunicorn 워커마다 인덱스는 독립이지만 디스크 디렉토리는 공유됨
+  (다른 워커가 지운 파일은 조회 시 미스로 처리)
+"""
+import os
+import json
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from io import BytesIO
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlsplit, parse_qsl, urlencode
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# ============================================================
+# 설정
+# ============================================================
+
+IMAGE_CACHE_DIR = os.getenv("IMAGE_PROXY_CACHE_DIR", "/tmp/ngn_image_proxy")
+IMAGE_CACHE_MAX_BYTES = int(os.getenv("IMAGE_PROXY_CACHE_MAX_MB", 512)) * 1024 * 1024
+IMAGE_FETCH_TIMEOUT = 10
+
+# Meta CDN 호스트 (scontent-xxx 등 엣지 호스트가 요청마다 바뀜)
+_CDN_HOST_SUFFIXES = ("fbcdn.net", "cdninstagram.com")
+
+# 서명/만료 파라미터 (같은 이미지라도 요청마다 바뀜 → 캐시 키에서 제외)
+# stp(크기/크롭 변형) 등 나머지 파라미터는 다른 이미지를 가리키므로 키에 유지
+_CDN_SIGNATURE_PARAMS = ("oh", "oe")
+_CDN_SIGNATURE_PREFIXES = ("_nc_",)
+
+# 썸네일 폭은 고정 버킷으로 올림 (변형 개수 제한)
+THUMBNAIL_WIDTHS = (64, 128, 256, 320, 480, 640, 960, 1280)
+
+_UPSTREAM_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+}
+
+
+def normalize_image_url(url: str) -> str:
+    """캐시 키용 URL 정규화"""
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+
+    params = parse_qsl(parts.query, keep_blank_values=True)
+
+    # Meta CDN: 호스트(scontent-xxx)와 서명 파라미터가 매번 달라지므로 제외
+    if host.endswith(_CDN_HOST_SUFFIXES):
+        params = [
+            (name, value) for name, value in params
+            if name not in _CDN_SIGNATURE_PARAMS and not name.startswith(_CDN_SIGNATURE_PREFIXES)
+        ]
+        return f"metacdn:{parts.path}?{urlencode(sorted(params))}"
+
+    return f"{parts.scheme.lower()}://{host}{parts.path}?{urlencode(sorted(params))}"
+
+
+def thumbnail_width(requested: Optional[int]) -> Optional[int]:
+    """요청 폭 → 썸네일 버킷 폭 (None이면 원본)"""
+    if not requested or requested <= 0:
+        return None
+    for width in THUMBNAIL_WIDTHS:
+        if requested <= width:
+            return width
+    return None  # 가장 큰 버킷보다 크면 원본 사용
+
+
+# ============================================================
+# 디스크 LRU 캐시
+# ============================================================
+
+class DiskLRUCache:
+    """
+    바이트 크기 기준 LRU 디스크 캐시
+    - 본문: <root>/<key[:2]>/<key>
+    - 메타데이터(content_type, etag, size): <root>/<key[:2]>/<key>.json
+    - 별칭: 메타데이터만 있고 alias_of 로 다른 키의 본문을 가리킴 (크기 0으로 계산)
+    """
+
+    def __init__(self, root: str, max_bytes: int):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._index: "OrderedDict[str, int]" = OrderedDict()  # key -> size (LRU 순서)
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        os.makedirs(root, exist_ok=True)
+        self._load_index()
+
+    def _paths(self, key: str) -> Tuple[str, str]:
+        base = os.path.join(self.root, key[:2], key)
+        return base, f"{base}.json"
+
+    def _load_index(self):
+        """기존 디스크 파일로 인덱스 복원 (접근 시간 오래된 순)"""
+        entries = []
+        for dirpath, _, filenames in os.walk(self.root):
+            for name in filenames:
+                if name.endswith(".json") or name.endswith(".tmp"):
+                    continue
+                path = os.path.join(dirpath, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((st.st_atime, name, st.st_size))
+
+        for _, key, size in sorted(entries):
+            self._index[key] = size
+            self._total_bytes += size
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """캐시된 항목의 메타데이터 + 파일 경로 (없으면 None)"""
+        data_path, meta_path = self._paths(key)
+        try:
+            with open(meta_path, "r") as f:
+                meta = json.load(f)
+            alias_of = meta.get("alias_of")
+            if alias_of:
+                target = self.get(alias_of)
+                if target is None:
+                    raise FileNotFoundError(alias_of)
+                with self._lock:
+                    if key in self._index:
+                        self._index.move_to_end(key)
+                    else:
+                        self._index[key] = 0
+                return target
+            if not os.path.exists(data_path):
+                raise FileNotFoundError(data_path)
+        except (OSError, ValueError):
+            with self._lock:
+                self._misses += 1
+                size = self._index.pop(key, None)
+                if size is not None:
+                    self._total_bytes -= size
+            return None
+
+        with self._lock:
+            self._hits += 1
+            if key in self._index:
+                self._index.move_to_end(key)
+            else:
+                # 다른 워커가 저장한 항목
+                self._index[key] = meta.get("size", 0)
+                self._total_bytes += meta.get("size", 0)
+        meta["path"] = data_path
+        return meta
+
+    def put(self, key: str, data: bytes, content_type: str) -> Dict[str, Any]:
+        """항목 저장 후 용량 초과분 제거"""
+        data_path, meta_path = self._paths(key)
+        os.makedirs(os.path.dirname(data_path), exist_ok=True)
+
+        meta = {
+            "content_type": content_type,
+            "etag": hashlib.sha256(data).hexdigest()[:32],
+            "size": len(data),
+            "stored_at": int(time.time()),
+        }
+
+        # 임시 파일에 쓰고 rename → 다른 워커가 반쯤 쓰인 파일을 읽지 않도록
+        suffix = f".{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(data_path + suffix, "wb") as f:
+            f.write(data)
+        os.replace(data_path + suffix, data_path)
+        with open(meta_path + suffix, "w") as f:
+            json.dump(meta, f)
+        os.replace(meta_path + suffix, meta_path)
+
+        with self._lock:
+            old = self._index.pop(key, None)
+            if old is not None:
+                self._total_bytes -= old
+            self._index[key] = len(data)
+            self._total_bytes += len(data)
+            evicted = self._evict_locked()
+
+        for evicted_key in evicted:
+            for path in self._paths(evicted_key):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+        meta["path"] = data_path
+        return meta
+
+    def put_alias(self, key: str, target_key: str) -> None:
+        """key 조회 시 target_key 항목을 돌려주는 별칭 저장 (본문 복사 없음)"""
+        _, meta_path = self._paths(key)
+        os.makedirs(os.path.dirname(meta_path), exist_ok=True)
+
+        suffix = f".{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(meta_path + suffix, "w") as f:
+            json.dump({"alias_of": target_key, "size": 0, "stored_at": int(time.time())}, f)
+        os.replace(meta_path + suffix, meta_path)
+
+        with self._lock:
+            old = self._index.pop(key, None)
+            if old is not None:
+                self._total_bytes -= old
+            self._index[key] = 0
+
+    def _evict_locked(self) -> list:
+        evicted = []
+        while self._total_bytes > self.max_bytes and len(self._index) > 1:
+            key, size = self._index.popitem(last=False)
+            self._total_bytes -= size
+            evicted.append(key)
+        return evicted
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._index),
+                "total_bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+            }
+
+
+# ============================================================
+# 프록시 (single-flight fetch + 썸네일)
+# ============================================================
+
+_session: Optional[requests.Session] = None
+_disk_cache: Optional[DiskLRUCache] = None
+_init_lock = threading.Lock()
+
+# 진행 중인 upstream fetch (key -> Event)
+_inflight: Dict[str, threading.Event] = {}
+_inflight_lock = threading.Lock()
+
+
+def _get_session() -> requests.Session:
+    global _session
+    if _session is None:
+        with _init_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=8, pool_maxsize=32, max_retries=1)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                session.headers.update(_UPSTREAM_HEADERS)
+                _session = session
+    return _session
+
+
+def _get_disk_cache() -> DiskLRUCache:
+    global _disk_cache
+    if _disk_cache is None:
+        with _init_lock:
+            if _disk_cache is None:
+                _disk_cache = DiskLRUCache(IMAGE_CACHE_DIR, IMAGE_CACHE_MAX_BYTES)
+                print(f"[IMAGE_PROXY] 디스크 캐시 활성화: {IMAGE_CACHE_DIR} (최대 {IMAGE_CACHE_MAX_BYTES // (1024 * 1024)}MB)")
+    return _disk_cache
+
+
+def _cache_key(normalized_url: str, width: Optional[int] = None) -> str:
+    raw = normalized_url if width is None else f"{normalized_url}#w={width}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _single_flight(key: str, produce) -> Dict[str, Any]:
+    """
+    같은 key에 대한 동시 생성 요청을 하나로 합침
+    - 첫 요청만 produce() 실행, 나머지는 완료를 기다렸다가 캐시에서 읽음
+    """
+    cache = _get_disk_cache()
+
+    while True:
+        entry = cache.get(key)
+        if entry is not None:
+            return entry
+
+        with _inflight_lock:
+            event = _inflight.get(key)
+            if event is None:
+                event = threading.Event()
+                _inflight[key] = event
+                leader = True
+            else:
+                leader = False
+
+        if not leader:
+            # 리더 완료 대기 후 캐시 재조회 (리더가 실패했으면 다음 루프에서 새 리더가 됨)
+            event.wait(IMAGE_FETCH_TIMEOUT + 5)
+            continue
+
+        try:
+            return produce()
+        finally:
+            with _inflight_lock:
+                _inflight.pop(key, None)
+            event.set()
+
+
+def _fetch_original(image_url: str, key: str) -> Dict[str, Any]:
+    response = _get_session().get(image_url, timeout=IMAGE_FETCH_TIMEOUT)
+    response.raise_for_status()
+    content_type = response.headers.get("Content-Type", "image/jpeg")
+    return _get_disk_cache().put(key, response.content, content_type)
+
+
+def _make_thumbnail(original: Dict[str, Any], original_key: str, key: str, width: int) -> Dict[str, Any]:
+    """
+    원본 캐시 파일에서 썸네일 생성
+    - 원본이 요청 폭 이하이거나 Pillow가 없으면 원본을 가리키는 별칭 저장
+      (다음 요청에서 원본을 다시 열어 크기를 확인하지 않도록)
+    """
+    try:
+        from PIL import Image
+    except ImportError:
+        _get_disk_cache().put_alias(key, original_key)
+        return original
+
+    with Image.open(original["path"]) as img:
+        if img.width <= width:
+            _get_disk_cache().put_alias(key, original_key)
+            return original
+
+        height = max(1, int(img.height * width / img.width))
+        thumb = img.resize((width, height), Image.LANCZOS)
+
+        buffer = BytesIO()
+        if thumb.mode in ("RGBA", "LA", "P"):
+            thumb.save(buffer, format="PNG", optimize=True)
+            content_type = "image/png"
+        else:
+            thumb.convert("RGB").save(buffer, format="JPEG", quality=85)
+            content_type = "image/jpeg"
+
+    return _get_disk_cache().put(key, buffer.getvalue(), content_type)
+
+
+def get_cached_image(image_url: str, width: Optional[int] = None) -> Dict[str, Any]:
+    """
+    이미지 URL → 캐시 항목 {"path", "content_type", "etag", "size"}
+    upstream 실패 시 requests 예외가 그대로 전파됨
+    """
+    normalized = normalize_image_url(image_url)
+    original_key = _cache_key(normalized)
+    original = _single_flight(original_key, lambda: _fetch_original(image_url, original_key))
+
+    bucket_width = thumbnail_width(width)
+    if bucket_width is None:
+        return original
+
+    thumb_key = _cache_key(normalized, bucket_width)
+    return _single_flight(thumb_key, lambda: _make_thumbnail(original, original_key, thumb_key, bucket_width))
+
+
+def get_image_proxy_stats() -> Dict[str, Any]:
+    """캐시 통계 (/dashboard/cache/stats 용)"""
+    return _get_disk_cache().stats()
@@ -0,0 +1,40 @@
+"""
+레벨 기반 구조화 로그
+- print 디버그 로그 대체: 레벨이 꺼져 있으면 메시지 포맷/직렬화를 하지 않음 (isEnabledFor 확인만)
+- 출력 형식: [EVENT] key=value key=value ...
+- 레벨: NGN_LOG_LEVEL (기본 INFO, DEBUG로 설정하면 요청별 디버그 로그 출력)
+"""
+import os
+import json
+import logging
+
+NGN_LOG_LEVEL = os.getenv("NGN_LOG_LEVEL", "INFO").upper()
+LOG_VALUE_MAX_LEN = 500
+
+DEBUG = logging.DEBUG
+INFO = logging.INFO
+WARNING = logging.WARNING
+
+
+def get_logger(name: str) -> logging.Logger:
+    """NGN_LOG_LEVEL이 적용된 로거"""
+    logger = logging.getLogger(name)
+    logger.setLevel(NGN_LOG_LEVEL)
+    return logger
+
+
+def _format_value(value) -> str:
+    if isinstance(value, (dict, list, tuple)):
+        text = json.dumps(value, ensure_ascii=False, default=str)
+    else:
+        text = str(value)
+    if len(text) > LOG_VALUE_MAX_LEN:
+        text = text[:LOG_VALUE_MAX_LEN] + "..."
+    return text
+
+
+def log_event(logger: logging.Logger, level: int, event: str, **fields):
+    """구조화 로그 1줄 (레벨이 꺼져 있으면 즉시 반환)"""
+    if not logger.isEnabledFor(level):
+        return
+    logger.log(level, "[%s] %s", event, " ".join(f"{k}={_format_value(v)}" for k, v in fields.items()))
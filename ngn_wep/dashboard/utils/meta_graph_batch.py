@@ -0,0 +1,140 @@
+"""
+Meta Graph API batch 요청 유틸
+- 요청 최대 50개를 HTTP 1회로 전송 (POST https://graph.facebook.com/{버전}  batch=[...])
+- 요청 간 의존 관계: name + depends_on + "{result=<name>:$.id}" 참조
+  (예: AdCreative 생성 → 같은 batch 안의 Ad 생성이 creative id 참조)
+- 여러 batch는 META_BATCH_CONCURRENCY 개까지 병렬 전송
+- 결과는 요청 순서대로 {"code": int, "body": dict} (응답이 생략/미처리된 요청은 None)
+"""
+import os
+import json
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Union
+from urllib.parse import urlencode
+
+import requests
+
+META_GRAPH_VERSION = os.environ.get("FB_GRAPH_VERSION", "v24.0")
+GRAPH_BATCH_MAX_OPS = 50
+META_BATCH_CONCURRENCY = int(os.environ.get("META_BATCH_CONCURRENCY", 3))
+META_BATCH_TIMEOUT = int(os.environ.get("META_BATCH_TIMEOUT", 120))
+
+
+class GraphBatchError(Exception):
+    """batch 호출 자체가 실패한 경우 (개별 요청 실패는 결과의 code/body로 전달)"""
+
+
+def batch_op(
+    method: str,
+    relative_url: str,
+    body: Optional[Dict[str, Any]] = None,
+    name: Optional[str] = None,
+    depends_on: Optional[str] = None,
+    omit_response_on_success: Optional[bool] = None,
+) -> Dict[str, Any]:
+    """batch 요청 1건 구성 (body 값 중 dict/list는 JSON 문자열로 직렬화)"""
+    op: Dict[str, Any] = {"method": method, "relative_url": relative_url}
+    if body:
+        # "{result=name:$.id}" 참조는 Graph가 본문 해석 전에 치환하므로 참조 문자는 인코딩하지 않음
+        op["body"] = urlencode({
+            k: json.dumps(v, ensure_ascii=False) if isinstance(v, (dict, list)) else v
+            for k, v in body.items()
+            if v is not None
+        }, safe="{}=:$")
+    if name:
+        op["name"] = name
+    if depends_on:
+        op["depends_on"] = depends_on
+    if omit_response_on_success is not None:
+        op["omit_response_on_success"] = omit_response_on_success
+    return op
+
+
+def graph_batch(
+    ops: Sequence[Dict[str, Any]],
+    access_token: str,
+    version: str = META_GRAPH_VERSION,
+    timeout: float = META_BATCH_TIMEOUT,
+) -> List[Optional[Dict[str, Any]]]:
+    """batch 1회 호출 (ops ≤ GRAPH_BATCH_MAX_OPS)"""
+    if len(ops) > GRAPH_BATCH_MAX_OPS:
+        raise ValueError(f"batch 요청은 최대 {GRAPH_BATCH_MAX_OPS}개 ({len(ops)}개 전달됨)")
+
+    res = requests.post(
+        f"https://graph.facebook.com/{version}",
+        data={
+            "batch": json.dumps(list(ops), ensure_ascii=False, separators=(",", ":")),
+            "include_headers": "false",
+            "access_token": access_token,
+        },
+        timeout=timeout,
+    ).json()
+    if isinstance(res, dict):
+        raise GraphBatchError(res.get("error", {}).get("message", "batch 요청 실패"))
+
+    results: List[Optional[Dict[str, Any]]] = []
+    for item in res:
+        if item is None:
+            results.append(None)
+            continue
+        try:
+            body = json.loads(item.get("body") or "{}")
+        except ValueError:
+            body = {}
+        results.append({"code": item.get("code"), "body": body})
+    # 처리되지 않은 뒤쪽 요청은 응답 목록에서 빠질 수 있으므로 길이를 맞춤
+    results += [None] * (len(ops) - len(results))
+    return results
+
+
+def pack_op_groups(groups: Sequence[Sequence[Dict[str, Any]]], max_ops: int = GRAPH_BATCH_MAX_OPS) -> List[List[int]]:
+    """
+    의존 관계가 있는 요청 묶음(group)을 쪼개지 않고 batch 단위로 배치
+    반환: batch별 group 인덱스 목록
+    """
+    batches: List[List[int]] = []
+    current: List[int] = []
+    size = 0
+    for idx, group in enumerate(groups):
+        if len(group) > max_ops:
+            raise ValueError(f"group {idx} 요청 수({len(group)})가 batch 한도({max_ops})를 넘습니다.")
+        if current and size + len(group) > max_ops:
+            batches.append(current)
+            current, size = [], 0
+        current.append(idx)
+        size += len(group)
+    if current:
+        batches.append(current)
+    return batches
+
+
+def run_batches(
+    batches: Sequence[Sequence[Dict[str, Any]]],
+    access_token: str,
+    concurrency: int = META_BATCH_CONCURRENCY,
+) -> List[Union[List[Optional[Dict[str, Any]]], Exception]]:
+    """여러 batch 병렬 전송 → batch별 결과 (호출 실패 시 해당 batch 자리에 예외 객체)"""
+    def _run(ops):
+        try:
+            return graph_batch(ops, access_token)
+        except Exception as e:
+            return e
+
+    if len(batches) <= 1:
+        return [_run(ops) for ops in batches]
+    with ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(batches)))) as pool:
+        return list(pool.map(_run, batches))
+
+
+def batch_result_error(result: Optional[Dict[str, Any]], default: str, require_success: bool = False) -> Optional[str]:
+    """
+    batch 결과 1건의 오류 메시지 (성공이면 None)
+    - 응답이 생략된 요청(None)도 None → 응답 본문(id 등)이 필요한 호출 측에서 따로 확인
+    """
+    if result is None:
+        return None
+    body = result.get("body") or {}
+    if result.get("code") != 200 or "error" in body or (require_success and not body.get("success")):
+        error = body.get("error") or {}
+        return error.get("error_user_msg") or error.get("message") or default
+    return None
@@ -0,0 +1,333 @@
+"""
+ADMAKE 광고 관리(Step 4) Meta 읽기 모델 캐시
+- meta_account_mapping : 워커별로 테이블 전체를 한 번 읽어 META_MAPPING_TTL_SEC 동안 재사용
+  (요청마다 bigquery.Client() 생성 + 조회하던 방식 대체)
+- 활성 광고 목록 : adset / campaign / account 노드를 ids= 한 번의 field expansion 요청으로 조회
+  GET /{버전}/?ids=adset,campaign,act_X&fields=ads.limit(100){...,creative{thumbnail_url,image_url}}
+  → 폴백 순서(adset → campaign → account)는 응답을 받은 뒤 서버에서 적용
+- 광고 목록은 계정별로 META_ADS_CACHE_TTL_SEC 동안 캐시, 같은 계정 동시 요청은 조회 1회로 합침
+- 페이지 렌더링 시 prefetch_active_ads()로 미리 조회 → 프론트 요청은 캐시/진행 중 조회 결과 사용
+- 광고 게시/일시정지/삭제, 예산/세트 변경 시 invalidate_active_ads()로 무효화
+  - 워커 메모리 캐시 삭제 + 공유 캐시(cache_utils, Redis 사용 시 인스턴스 간 공유)에 무효화 시각 기록
+    → 다른 워커의 캐시도 무효화 시각 이전에 시작된 조회 결과는 사용하지 않음
+  - 공유 캐시가 없는 배포(SimpleCache)는 짧은 TTL + 프론트의 refresh=1 (변경 직후/수동 새로고침)로 보완
+"""
+import os
+import time
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import requests
+from google.cloud import bigquery
+
+from .meta_graph_batch import META_GRAPH_VERSION
+from .bq_query import run_query
+from .cache_utils import cache_get, cache_set
+
+META_MAPPING_TTL_SEC = int(os.getenv("META_MAPPING_TTL_SEC", 600))
+META_ADS_CACHE_TTL_SEC = int(os.getenv("META_ADS_CACHE_TTL_SEC", 15))
+META_ADS_FETCH_TIMEOUT = int(os.getenv("META_ADS_FETCH_TIMEOUT", 30))
+META_ADS_PAGE_LIMIT = 100
+
+# 썸네일 + configured_status 포함 (creative / adcreatives 모두 한 요청에서 확장)
+ACTIVE_AD_FIELDS = (
+    "id,name,status,effective_status,configured_status,preview_shareable_link,"
+    "creative{id,thumbnail_url,image_url},adcreatives{image_url,thumbnail_url}"
+)
+EXCLUDED_AD_STATUSES = {"DELETED", "ARCHIVED"}
+
+
+def clean_account_id(account_id) -> str:
+    """act_ 접두사 제거"""
+    return str(account_id or "").strip().replace("act_", "")
+
+
+def _clean_id(value) -> Optional[str]:
+    value = str(value).strip() if value is not None else ""
+    return value or None
+
+
+# ============================================================
+# meta_account_mapping (워커별 TTL 캐시)
+# ============================================================
+
+_bq_client = None
+_bq_client_lock = threading.Lock()
+_mapping_lock = threading.Lock()
+_mapping_rows: Dict[str, Dict[str, Any]] = {}
+_mapping_loaded_at = 0.0
+
+
+def _get_bq_client():
+    global _bq_client
+    if _bq_client is None:
+        with _bq_client_lock:
+            if _bq_client is None:
+                _bq_client = bigquery.Client()
+    return _bq_client
+
+
+def _load_mapping_rows() -> Dict[str, Dict[str, Any]]:
+    rows = run_query(_get_bq_client(), "SELECT * FROM `ngn_dataset.meta_account_mapping`", service="meta_read_model")
+    mapping = {}
+    for row in rows:
+        item = dict(row.items())
+        key = clean_account_id(item.get("account_id"))
+        if key and key not in mapping:
+            mapping[key] = item
+    return mapping
+
+
+def get_meta_account_mapping(account_id, force_refresh: bool = False) -> Optional[Dict[str, Any]]:
+    """
+    광고 계정 매핑 1행 (dict, 없으면 None)
+    - 테이블이 작으므로 전체를 읽어 두고 TTL 만료 시 다시 읽음
+    - 다시 읽기에 실패하면 이전 데이터를 계속 사용
+    """
+    global _mapping_rows, _mapping_loaded_at
+    key = clean_account_id(account_id)
+    if force_refresh or time.time() - _mapping_loaded_at > META_MAPPING_TTL_SEC:
+        with _mapping_lock:
+            if force_refresh or time.time() - _mapping_loaded_at > META_MAPPING_TTL_SEC:
+                try:
+                    _mapping_rows = _load_mapping_rows()
+                    print(f"[META_READ] meta_account_mapping 로드: {len(_mapping_rows)}개 계정")
+                except Exception as e:
+                    print(f"[META_READ] meta_account_mapping 로드 실패: {e}")
+                    if not _mapping_rows:
+                        raise
+                # 실패한 경우에도 TTL 동안은 재시도하지 않음 (BigQuery 장애 시 요청마다 대기 방지)
+                _mapping_loaded_at = time.time()
+    return _mapping_rows.get(key)
+
+
+# ============================================================
+# 활성 광고 조회 (field expansion 1회)
+# ============================================================
+
+def _graph_get(params: Dict[str, Any], node_id: Optional[str] = None) -> Dict[str, Any]:
+    url = f"https://graph.facebook.com/{META_GRAPH_VERSION}/{node_id or ''}"
+    return requests.get(url, params=params, timeout=META_ADS_FETCH_TIMEOUT).json()
+
+
+def fetch_ads_by_node(node_ids: List[str], access_token: str) -> Tuple[Dict[str, List[Dict[str, Any]]], bool]:
+    """
+    노드(adset/campaign/account)별 광고 목록 → ({node_id: [ad, ...]}, 전체 성공 여부)
+    - ids= 요청 1회로 조회, 노드 하나라도 잘못되면 Graph가 요청 전체를 거부하므로 그때만 노드별로 재조회
+    """
+    fields = f"ads.limit({META_ADS_PAGE_LIMIT}){{{ACTIVE_AD_FIELDS}}}"
+    if not node_ids:
+        return {}, True
+
+    try:
+        result = _graph_get({"ids": ",".join(node_ids), "fields": fields, "access_token": access_token})
+        if "error" not in result:
+            return {
+                node_id: ((result.get(node_id) or {}).get("ads") or {}).get("data", [])
+                for node_id in node_ids
+            }, True
+        print(f"[META_READ] 통합 조회 오류: {result['error'].get('message')} - 노드별 조회로 폴백")
+    except Exception as e:
+        print(f"[META_READ] 통합 조회 예외: {e} - 노드별 조회로 폴백")
+
+    ads_by_node: Dict[str, List[Dict[str, Any]]] = {}
+    ok = True
+    for node_id in node_ids:
+        try:
+            result = _graph_get({"fields": fields, "access_token": access_token}, node_id)
+            if "error" in result:
+                ok = False
+                print(f"[META_READ] {node_id} 오류: {result['error'].get('message')}")
+                continue
+            ads_by_node[node_id] = (result.get("ads") or {}).get("data", [])
+        except Exception as e:
+            ok = False
+            print(f"[META_READ] {node_id} 예외: {e}")
+    return ads_by_node, ok
+
+
+def _ad_thumbnail(ad: Dict[str, Any]) -> str:
+    """썸네일 URL 우선순위: creative.thumbnail_url → creative.image_url → adcreatives[0].image_url"""
+    creative = ad.get("creative") or {}
+    thumbnail_url = creative.get("thumbnail_url") or creative.get("image_url") or ""
+    if not thumbnail_url:
+        adcreatives = (ad.get("adcreatives") or {}).get("data", [])
+        if adcreatives:
+            thumbnail_url = adcreatives[0].get("image_url") or adcreatives[0].get("thumbnail_url") or ""
+    return thumbnail_url
+
+
+def load_active_ads(account_id, access_token: str) -> Tuple[List[Dict[str, Any]], List[str], bool]:
+    """
+    계정의 활성 광고 목록 (가공 완료) → (ads, 조회한 노드 id 목록, 성공 여부)
+    - 조회 우선순위: adset → campaign → account (앞 단계에 광고가 있으면 뒤 단계 결과는 사용하지 않음)
+    - DELETED / ARCHIVED 제외, 중복 제거
+    """
+    clean_id = clean_account_id(account_id)
+    ad_account_id = f"act_{clean_id}"
+
+    mapping = None
+    try:
+        mapping = get_meta_account_mapping(clean_id)
+    except Exception as e:
+        print(f"[META_READ] 매핑 조회 실패: {e}")
+    mapping = mapping or {}
+
+    # (노드 id, 캠페인 유형) - 같은 id가 전환/유입 모두에 있으면 전환 우선
+    adset_nodes, campaign_nodes = {}, {}
+    for prefix, campaign_type in (("conv", "전환"), ("traffic", "유입")):
+        adset_id = _clean_id(mapping.get(f"{prefix}_adset_id"))
+        campaign_id = _clean_id(mapping.get(f"{prefix}_campaign_id"))
+        if adset_id:
+            adset_nodes.setdefault(adset_id, campaign_type)
+        if campaign_id:
+            campaign_nodes.setdefault(campaign_id, campaign_type)
+
+    node_ids = list(dict.fromkeys([*adset_nodes, *campaign_nodes, ad_account_id]))
+    print(f"[META_READ] {ad_account_id} 광고 조회: adsets={list(adset_nodes)}, campaigns={list(campaign_nodes)}")
+    ads_by_node, ok = fetch_ads_by_node(node_ids, access_token)
+
+    tagged: List[Tuple[Dict[str, Any], str]] = []
+    for nodes in (adset_nodes, campaign_nodes, {ad_account_id: "-"}):
+        for node_id, campaign_type in nodes.items():
+            tagged += [(ad, campaign_type) for ad in ads_by_node.get(node_id, [])]
+        if tagged:
+            break
+
+    seen_ids = set()
+    processed_ads = []
+    for ad, campaign_type in tagged:
+        ad_id = ad.get("id")
+        if ad.get("status", "") in EXCLUDED_AD_STATUSES:
+            continue
+        if not ad_id or ad_id in seen_ids:
+            continue
+        seen_ids.add(ad_id)
+        processed_ads.append({
+            "id": ad_id,
+            "name": ad.get("name", "이름 없음"),
+            "status": ad.get("status"),
+            "effective_status": ad.get("effective_status"),
+            "configured_status": ad.get("configured_status"),  # 사용자 설정 상태 (ON/OFF 배지용)
+            "campaign_type": campaign_type,  # 전환/유입
+            "thumbnail_url": _ad_thumbnail(ad),
+            "preview_link": ad.get("preview_shareable_link", "")
+        })
+
+    print(f"[META_READ] {ad_account_id} 최종 {len(processed_ads)}개 광고 (DELETED/ARCHIVED 제외)")
+    return processed_ads, node_ids, ok
+
+
+# ============================================================
+# 계정별 광고 목록 캐시 / prefetch / 무효화
+# ============================================================
+
+_ads_lock = threading.Lock()
+_ads_cache: Dict[str, Dict[str, Any]] = {}      # account → {"ads", "object_ids", "started_at", "fetched_at"}
+_ads_inflight: Dict[str, Future] = {}            # account → 진행 중 조회
+_ads_generation: Dict[str, int] = {}             # account → 무효화 횟수 (조회 중 무효화되면 결과 저장 안 함)
+_prefetch_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="meta-ads-prefetch")
+
+
+def _invalidated_at_key(key: str) -> str:
+    return f"ngn_cache:meta_active_ads_invalidated:{key}"
+
+
+def _is_fresh(key: str, entry: Optional[Dict[str, Any]]) -> bool:
+    """TTL 이내이고, 다른 워커/인스턴스의 무효화 시각 이후에 시작된 조회 결과인지"""
+    if not entry or time.time() - entry["fetched_at"] >= META_ADS_CACHE_TTL_SEC:
+        return False
+    invalidated_at = cache_get(_invalidated_at_key(key))
+    return invalidated_at is None or entry["started_at"] > float(invalidated_at)
+
+
+def get_active_ads_cached(account_id, access_token: str, force_refresh: bool = False) -> Tuple[List[Dict[str, Any]], bool]:
+    """
+    계정 활성 광고 목록 → (ads, 캐시 사용 여부)
+    - TTL 내 캐시가 있으면 Meta 호출 없음
+    - 같은 계정 조회가 진행 중이면 그 결과를 기다림 (prefetch 포함)
+    """
+    key = clean_account_id(account_id)
+    owner = False
+    entry = None if force_refresh else _ads_cache.get(key)
+    if _is_fresh(key, entry):
+        return entry["ads"], True
+    with _ads_lock:
+        future = _ads_inflight.get(key)
+        if future is None:
+            future = Future()
+            _ads_inflight[key] = future
+            generation = _ads_generation.get(key, 0)
+            owner = True
+
+    if not owner:
+        return future.result(timeout=META_ADS_FETCH_TIMEOUT * 2), True
+
+    try:
+        started_at = time.time()
+        ads, node_ids, ok = load_active_ads(key, access_token)
+        with _ads_lock:
+            # 오류가 섞인 결과와, 조회 도중 무효화된 결과는 캐시하지 않음
+            if ok and _ads_generation.get(key, 0) == generation:
+                _ads_cache[key] = {
+                    "ads": ads,
+                    "object_ids": set(node_ids) | {ad["id"] for ad in ads},
+                    "started_at": started_at,
+                    "fetched_at": time.time(),
+                }
+        future.set_result(ads)
+        return ads, False
+    except Exception as e:
+        future.set_exception(e)
+        raise
+    finally:
+        with _ads_lock:
+            if _ads_inflight.get(key) is future:
+                del _ads_inflight[key]
+
+
+def prefetch_active_ads(account_id, access_token: Optional[str] = None):
+    """광고 관리 페이지 렌더링 시 백그라운드로 광고 목록 미리 조회 (이미 캐시/조회 중이면 생략)"""
+    access_token = access_token or os.environ.get("META_SYSTEM_USER_TOKEN")
+    key = clean_account_id(account_id)
+    if not key or not access_token:
+        return
+    if key in _ads_inflight or _is_fresh(key, _ads_cache.get(key)):
+        return
+
+    def _run():
+        try:
+            get_active_ads_cached(key, access_token)
+        except Exception as e:
+            print(f"[META_READ] prefetch 실패 ({key}): {e}")
+
+    _prefetch_executor.submit(_run)
+
+
+def invalidate_active_ads(account_id=None, object_ids: Optional[Iterable[str]] = None) -> int:
+    """
+    광고 목록 캐시 무효화 → 삭제된 계정 수
+    - account_id : 해당 계정 캐시 삭제
+    - object_ids : 광고/세트/캠페인 id가 포함된 계정 캐시 삭제 (요청에 account_id가 없는 경우)
+    - 무효화 시각을 공유 캐시에 기록 → 다른 워커의 캐시도 다음 조회에서 버려짐
+    """
+    keys = set()
+    object_ids = {str(i) for i in (object_ids or []) if i}
+    with _ads_lock:
+        if account_id:
+            keys.add(clean_account_id(account_id))
+        if object_ids:
+            keys.update(k for k, entry in _ads_cache.items() if entry["object_ids"] & object_ids)
+        removed = 0
+        for key in keys:
+            _ads_generation[key] = _ads_generation.get(key, 0) + 1
+            if _ads_cache.pop(key, None) is not None:
+                removed += 1
+    now = time.time()
+    for key in keys:
+        # 캐시 항목보다 오래 남아 있으면 충분 (TTL이 지난 항목은 어차피 다시 조회)
+        cache_set(_invalidated_at_key(key), now, ttl=META_ADS_CACHE_TTL_SEC * 2)
+    if removed:
+        print(f"[META_READ] 광고 목록 캐시 무효화: {sorted(keys)}")
+    return removed
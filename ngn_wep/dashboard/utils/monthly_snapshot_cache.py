@@ -0,0 +1,293 @@
+"""
+Monthly report snapshot serving cache
+월간 리포트 스냅샷(GCS)을 경로 인덱스 + generation 기반 캐시로 제공
+
+- 경로 인덱스: monthly_snapshot_job이 스냅샷 저장 시 갱신하는
+  gs://{GCS_BUCKET}/ai-reports/monthly/_index.json 을 읽어 (company, YYYY-MM) → 경로/generation 조회
+  형식: {"version": 1, "entries": {"<company>/<YYYY-MM>": {"path", "generation", "gzip", "updated"}}}
+  (tools/ai_report_test/snapshot_index.py 와 동일한 형식 - 대시보드 이미지에는 tools가 없어서 별도 구현)
+- 인덱스에 없으면 기존처럼 후보 경로를 순서대로 확인 (레거시 경로 호환)
+- 원본 바이트: 디스크 캐시 (워커 간 공유), 디코딩된 JSON: 프로세스 메모리 LRU
+  둘 다 (경로, generation) 키라서 스냅샷이 다시 써지면 자동으로 새 항목이 됨
+  - Cloud Run /tmp는 메모리 기반 → 새 generation 저장 시 같은 경로의 이전 generation 파일 삭제
+    + SNAPSHOT_DISK_MAX_MB 초과 시 오래 사용하지 않은 파일부터 삭제 (인덱스는 프로세스별)
+"""
+import os
+import sys
+import json
+import gzip
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from google.api_core.exceptions import NotFound
+from google.cloud import storage
+
+PROJECT_ID = os.environ.get("GOOGLE_CLOUD_PROJECT", "winged-precept-443218-v8")
+GCS_BUCKET = os.environ.get("GCS_BUCKET", "winged-precept-443218-v8.appspot.com")
+
+SNAPSHOT_INDEX_PATH = "ai-reports/monthly/_index.json"
+SNAPSHOT_INDEX_TTL = int(os.environ.get("SNAPSHOT_INDEX_TTL", 60))          # 인덱스 재조회 주기 (초)
+SNAPSHOT_FALLBACK_TTL = int(os.environ.get("SNAPSHOT_FALLBACK_TTL", 300))   # 레거시 경로 탐색 결과 유지 (초)
+SNAPSHOT_DISK_CACHE_DIR = os.environ.get("SNAPSHOT_CACHE_DIR", "/tmp/ngn_monthly_snapshots")
+SNAPSHOT_DISK_MAX_BYTES = int(os.environ.get("SNAPSHOT_DISK_MAX_MB", 256)) * 1024 * 1024
+SNAPSHOT_MEMORY_MAX = int(os.environ.get("SNAPSHOT_MEMORY_MAX", 32))        # 메모리에 보관할 디코딩 스냅샷 수
+
+
+def candidate_blob_paths(company_name: str, month_str: str) -> list:
+    """스냅샷 후보 경로 (압축 파일 우선, 레거시 경로 포함)"""
+    return [
+        f"ai-reports/monthly/{company_name}/{month_str}/snapshot.json.gz",  # 압축 파일 (원본)
+        f"ai-reports/monthly/{company_name.lower()}/{month_str}/snapshot.json.gz",  # 압축 파일 (소문자)
+        f"ai-reports/monthly/{company_name}/{month_str}/snapshot.json",  # 압축 없는 파일 (원본, 하위 호환)
+        f"ai-reports/monthly/{company_name.lower()}/{month_str}/snapshot.json",  # 압축 없는 파일 (소문자)
+        f"ai-reports/{company_name}/{month_str}.json",  # 대체 경로 (원본)
+        f"ai-reports/{company_name.lower()}/{month_str}.json"  # 대체 경로 (소문자)
+    ]
+
+
+class MonthlySnapshotCache:
+    """
+    스냅샷 조회 캐시 (스레드 안전)
+
+    get_snapshot_ref() → 경로/generation (GCS 메타데이터 조회 최소화)
+    get_snapshot_bytes() → 원본 바이트 (디스크 캐시)
+    get_snapshot_data() → 디코딩된 dict (메모리 LRU)
+    """
+
+    def __init__(self, bucket_name: str, disk_dir: str, memory_max: int, disk_max_bytes: int = SNAPSHOT_DISK_MAX_BYTES):
+        self._bucket_name = bucket_name
+        self._bucket = None
+        self._disk_dir = disk_dir
+        self._disk_max_bytes = disk_max_bytes
+        self._disk_files: Optional["OrderedDict[str, int]"] = None  # 파일명 -> 크기 (LRU 순서)
+        self._disk_bytes = 0
+        self._memory_max = memory_max
+        self._lock = threading.Lock()
+
+        self._index: Dict[str, Dict[str, Any]] = {}
+        self._index_loaded_at = 0.0
+        self._fallback_refs: Dict[str, Tuple[float, Optional[Dict[str, Any]]]] = {}
+        self._decoded: "OrderedDict[Tuple[str, int], Any]" = OrderedDict()
+
+        self._stats = {"index_loads": 0, "memory_hits": 0, "disk_hits": 0, "downloads": 0}
+
+    # ---------- GCS ----------
+    def _get_bucket(self):
+        if self._bucket is None:
+            client = storage.Client(project=PROJECT_ID)
+            self._bucket = client.bucket(self._bucket_name)
+        return self._bucket
+
+    # ---------- 경로 인덱스 ----------
+    def _refresh_index_if_stale(self):
+        now = time.time()
+        if now - self._index_loaded_at < SNAPSHOT_INDEX_TTL:
+            return
+
+        try:
+            blob = self._get_bucket().blob(SNAPSHOT_INDEX_PATH)
+            index_data = json.loads(blob.download_as_bytes())
+            entries = index_data.get("entries", {})
+        except Exception as e:
+            # 인덱스가 없거나 읽기 실패 → 후보 경로 탐색으로 폴백
+            print(f"[SNAPSHOT_CACHE] 인덱스 로드 실패 (후보 경로 탐색 사용): {e}", file=sys.stderr)
+            entries = None
+
+        with self._lock:
+            self._index_loaded_at = now
+            self._stats["index_loads"] += 1
+            if entries is not None:
+                self._index = entries
+                # 인덱스가 새로 로드되면 탐색 결과(없음 포함)도 다시 확인
+                self._fallback_refs.clear()
+
+    def _probe_candidates(self, company_name: str, month_str: str) -> Optional[Dict[str, Any]]:
+        """인덱스 미등록 스냅샷: 후보 경로를 순서대로 메타데이터 조회"""
+        bucket = self._get_bucket()
+        for blob_path in candidate_blob_paths(company_name, month_str):
+            blob = bucket.get_blob(blob_path)
+            if blob is not None:
+                return {
+                    "path": blob_path,
+                    "generation": blob.generation,
+                    "gzip": blob_path.endswith(".gz"),
+                    "updated": blob.updated.isoformat() if blob.updated else None,
+                }
+        return None
+
+    def get_snapshot_ref(self, company_name: str, month_str: str) -> Optional[Dict[str, Any]]:
+        """(company, YYYY-MM) → {"path", "generation", "gzip", "updated"} (없으면 None)"""
+        self._refresh_index_if_stale()
+
+        index_key = f"{company_name}/{month_str}"
+        with self._lock:
+            ref = self._index.get(index_key) or self._index.get(index_key.lower())
+            if ref is not None:
+                return ref
+
+            cached = self._fallback_refs.get(index_key)
+            if cached is not None and time.time() - cached[0] < SNAPSHOT_FALLBACK_TTL:
+                return cached[1]
+
+        ref = self._probe_candidates(company_name, month_str)
+        with self._lock:
+            self._fallback_refs[index_key] = (time.time(), ref)
+        return ref
+
+    # ---------- 원본 바이트 (디스크) ----------
+    def _disk_path(self, ref: Dict[str, Any]) -> str:
+        name = hashlib.sha256(ref["path"].encode("utf-8")).hexdigest()[:24]
+        return os.path.join(self._disk_dir, f"{name}-{ref['generation']}")
+
+    def _load_disk_index_locked(self):
+        """기존 디스크 파일로 인덱스 복원 (접근 시간 오래된 순)"""
+        self._disk_files = OrderedDict()
+        self._disk_bytes = 0
+        entries = []
+        try:
+            names = os.listdir(self._disk_dir)
+        except OSError:
+            names = []
+        for name in names:
+            if name.endswith(".tmp"):
+                continue
+            try:
+                st = os.stat(os.path.join(self._disk_dir, name))
+            except OSError:
+                continue
+            entries.append((st.st_atime, name, st.st_size))
+        for _, name, size in sorted(entries):
+            self._disk_files[name] = size
+            self._disk_bytes += size
+
+    def _touch_disk_file(self, name: str):
+        with self._lock:
+            if self._disk_files is not None and name in self._disk_files:
+                self._disk_files.move_to_end(name)
+
+    def _record_disk_file(self, name: str, size: int):
+        """저장한 파일 등록 → 같은 경로의 이전 generation과 용량 초과분 삭제"""
+        path_prefix = name.rsplit("-", 1)[0] + "-"
+        with self._lock:
+            if self._disk_files is None:
+                self._load_disk_index_locked()
+            stale = [n for n in self._disk_files if n.startswith(path_prefix) and n != name]
+            for old in stale:
+                self._disk_bytes -= self._disk_files.pop(old)
+
+            self._disk_bytes += size - self._disk_files.pop(name, 0)
+            self._disk_files[name] = size
+            while self._disk_bytes > self._disk_max_bytes and len(self._disk_files) > 1:
+                old, old_size = self._disk_files.popitem(last=False)
+                self._disk_bytes -= old_size
+                stale.append(old)
+
+        for old in stale:
+            try:
+                os.remove(os.path.join(self._disk_dir, old))
+            except OSError:
+                pass
+
+    def get_snapshot_bytes(self, ref: Dict[str, Any]) -> bytes:
+        """GCS 원본 바이트 (gzip이면 압축 상태 그대로)"""
+        disk_path = self._disk_path(ref)
+        try:
+            with open(disk_path, "rb") as f:
+                data = f.read()
+            with self._lock:
+                self._stats["disk_hits"] += 1
+            self._touch_disk_file(os.path.basename(disk_path))
+            return data
+        except FileNotFoundError:
+            pass
+
+        # generation을 지정해서 다운로드 → 인덱스와 다른 버전을 섞어 읽지 않음
+        blob = self._get_bucket().blob(ref["path"], generation=ref["generation"])
+        data = blob.download_as_bytes(raw_download=True)
+        with self._lock:
+            self._stats["downloads"] += 1
+
+        try:
+            os.makedirs(self._disk_dir, exist_ok=True)
+            tmp_path = f"{disk_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, disk_path)
+            self._record_disk_file(os.path.basename(disk_path), len(data))
+        except OSError as e:
+            print(f"[SNAPSHOT_CACHE] 디스크 캐시 저장 실패: {e}", file=sys.stderr)
+
+        return data
+
+    # ---------- 디코딩된 스냅샷 (메모리) ----------
+    def get_snapshot_data(self, ref: Dict[str, Any]) -> Any:
+        """디코딩된 스냅샷 dict (호출자는 수정하지 말 것 - 캐시 공유 객체)"""
+        key = (ref["path"], ref["generation"])
+        with self._lock:
+            if key in self._decoded:
+                self._decoded.move_to_end(key)
+                self._stats["memory_hits"] += 1
+                return self._decoded[key]
+
+        raw = self.get_snapshot_bytes(ref)
+        # 하이브리드 읽기: 확장자와 관계없이 gzip 매직 바이트로 판별
+        if raw[:2] == b"\x1f\x8b":
+            raw = gzip.decompress(raw)
+        data = json.loads(raw.decode("utf-8"))
+
+        with self._lock:
+            self._decoded[key] = data
+            while len(self._decoded) > self._memory_max:
+                self._decoded.popitem(last=False)
+        return data
+
+    def load(self, company_name: str, month_str: str, decode: bool = True) -> Tuple[Optional[Dict[str, Any]], Any]:
+        """
+        스냅샷 조회 → (ref, payload)
+        decode=True면 dict, False면 원본 바이트 / 스냅샷이 없으면 (None, None)
+        """
+        ref = self.get_snapshot_ref(company_name, month_str)
+        if ref is None:
+            return None, None
+
+        try:
+            return ref, (self.get_snapshot_data(ref) if decode else self.get_snapshot_bytes(ref))
+        except NotFound:
+            # 인덱스 갱신 전에 스냅샷이 다시 써져서 해당 generation이 사라진 경우 → 직접 탐색 후 재시도
+            print(f"[SNAPSHOT_CACHE] generation 불일치, 재탐색: {ref['path']}#{ref['generation']}", file=sys.stderr)
+            index_key = f"{company_name}/{month_str}"
+            ref = self._probe_candidates(company_name, month_str)
+            with self._lock:
+                self._index.pop(index_key, None)
+                self._index.pop(index_key.lower(), None)
+                self._fallback_refs[index_key] = (time.time(), ref)
+            if ref is None:
+                return None, None
+            return ref, (self.get_snapshot_data(ref) if decode else self.get_snapshot_bytes(ref))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self._stats,
+                "index_entries": len(self._index),
+                "memory_entries": len(self._decoded),
+                "disk_entries": len(self._disk_files or {}),
+                "disk_bytes": self._disk_bytes,
+            }
+
+
+_snapshot_cache: Optional[MonthlySnapshotCache] = None
+_snapshot_cache_lock = threading.Lock()
+
+
+def get_monthly_snapshot_cache() -> MonthlySnapshotCache:
+    """MonthlySnapshotCache 싱글톤"""
+    global _snapshot_cache
+    if _snapshot_cache is None:
+        with _snapshot_cache_lock:
+            if _snapshot_cache is None:
+                _snapshot_cache = MonthlySnapshotCache(GCS_BUCKET, SNAPSHOT_DISK_CACHE_DIR, SNAPSHOT_MEMORY_MAX)
+    return _snapshot_cache
@@ -0,0 +1,255 @@
+"""
+ADMAKE 임시 광고(pending_ads) 서버 저장소
+- 기존: 광고 payload 전체(문구/미디어/카드)를 Flask 쿠키 세션에 저장
+  → 요청마다 서명/직렬화되어 오가고, 쿠키 크기 한도를 넘으면 저장 실패
+- 변경: 세션에는 draft id 하나만 두고, 광고 목록은 서버 저장소에 (소유자, 광고 계정) 단위로 저장
+  - Redis (REDIS_ENABLED=true, cache_utils 와 같은 연결 설정) : 인스턴스 간 공유
+  - GCS (기본) : gs://{PENDING_AD_BUCKET}/{PENDING_AD_GCS_PREFIX}/<owner 해시>/<account>.json
+    초안 1개 = blob 1개, generation 조건부 저장 (동시 추가/삭제가 서로 덮지 않음)
+    Cloud Run 다중 인스턴스 + session affinity 없음 → 인스턴스 간 공유 저장소가 기본이어야 함
+  - SQLite (PENDING_AD_STORE=sqlite) : 단일 인스턴스/로컬 개발용, GCS 초기화 실패 시 폴백(오류 로그)
+- 오래된 초안은 PENDING_AD_TTL_SEC 이후 만료
+"""
+import os
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from .cache_utils import REDIS_ENABLED, REDIS_HOST, REDIS_PORT, REDIS_DB, REDIS_PASSWORD
+
+PENDING_AD_TTL_SEC = int(os.getenv("PENDING_AD_TTL_SEC", 7 * 24 * 3600))
+PENDING_AD_DB_PATH = os.getenv("PENDING_AD_DB_PATH", "/tmp/ngn_pending_ads.sqlite3")
+PENDING_AD_KEY_PREFIX = "ngn_pending_ads"
+PENDING_AD_STORE = os.getenv("PENDING_AD_STORE", "").lower()
+PENDING_AD_BUCKET = os.getenv("PENDING_AD_BUCKET", os.getenv("GCS_BUCKET", "winged-precept-443218-v8.appspot.com"))
+PENDING_AD_GCS_PREFIX = os.getenv("PENDING_AD_GCS_PREFIX", "admake/_pending_ads")
+# 이전 폴백(쿠키 세션 저장소)이 쓰던 세션 키 - 남아있으면 서버 저장소로 이전
+LEGACY_SESSION_KEY = "pending_ads_by_account"
+
+
+class RedisPendingAdStore:
+    """
+    Redis 저장소
+    - {prefix}:{owner}:{account}       HASH  ad_id → 광고 JSON
+    - {prefix}:{owner}:{account}:order ZSET  ad_id (score = 추가 시각, 목록 순서 유지)
+    """
+
+    def __init__(self, client):
+        self.client = client
+
+    def _keys(self, owner: str, account: str):
+        key = f"{PENDING_AD_KEY_PREFIX}:{owner}:{account}"
+        return key, f"{key}:order"
+
+    def list(self, owner: str, account: str) -> List[Dict[str, Any]]:
+        key, order_key = self._keys(owner, account)
+        ad_ids = self.client.zrange(order_key, 0, -1)
+        if not ad_ids:
+            return []
+        payloads = self.client.hmget(key, ad_ids)
+        return [json.loads(p) for p in payloads if p]
+
+    def add(self, owner: str, account: str, ad: Dict[str, Any]) -> int:
+        key, order_key = self._keys(owner, account)
+        pipe = self.client.pipeline()
+        pipe.hset(key, ad["id"], json.dumps(ad, ensure_ascii=False))
+        pipe.zadd(order_key, {ad["id"]: time.time()})
+        pipe.expire(key, PENDING_AD_TTL_SEC)
+        pipe.expire(order_key, PENDING_AD_TTL_SEC)
+        pipe.zcard(order_key)
+        return pipe.execute()[-1]
+
+    def remove(self, owner: str, account: str, ad_id: str) -> int:
+        key, order_key = self._keys(owner, account)
+        pipe = self.client.pipeline()
+        pipe.hdel(key, ad_id)
+        pipe.zrem(order_key, ad_id)
+        return pipe.execute()[0]
+
+    def clear(self, owner: str, account: str):
+        self.client.delete(*self._keys(owner, account))
+
+    def count(self, owner: str, account: str) -> int:
+        return self.client.zcard(self._keys(owner, account)[1])
+
+
+class SqlitePendingAdStore:
+    """SQLite 저장소 (연결 1개 + 락, WAL)"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS pending_ads (
+                seq        INTEGER PRIMARY KEY AUTOINCREMENT,
+                owner      TEXT NOT NULL,
+                account    TEXT NOT NULL,
+                ad_id      TEXT NOT NULL,
+                payload    TEXT NOT NULL,
+                created_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_pending_ads_owner ON pending_ads (owner, account)")
+
+    def list(self, owner: str, account: str) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT payload FROM pending_ads WHERE owner = ? AND account = ? AND created_at >= ? ORDER BY seq",
+                (owner, account, time.time() - PENDING_AD_TTL_SEC),
+            ).fetchall()
+        return [json.loads(r[0]) for r in rows]
+
+    def add(self, owner: str, account: str, ad: Dict[str, Any]) -> int:
+        now = time.time()
+        with self._lock:
+            self._conn.execute("DELETE FROM pending_ads WHERE created_at < ?", (now - PENDING_AD_TTL_SEC,))
+            self._conn.execute(
+                "INSERT INTO pending_ads (owner, account, ad_id, payload, created_at) VALUES (?, ?, ?, ?, ?)",
+                (owner, account, ad["id"], json.dumps(ad, ensure_ascii=False), now),
+            )
+            return self._count(owner, account)
+
+    def remove(self, owner: str, account: str, ad_id: str) -> int:
+        with self._lock:
+            cur = self._conn.execute(
+                "DELETE FROM pending_ads WHERE owner = ? AND account = ? AND ad_id = ?",
+                (owner, account, ad_id),
+            )
+            return cur.rowcount
+
+    def clear(self, owner: str, account: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM pending_ads WHERE owner = ? AND account = ?", (owner, account))
+
+    def count(self, owner: str, account: str) -> int:
+        with self._lock:
+            return self._count(owner, account)
+
+    def _count(self, owner: str, account: str) -> int:
+        return self._conn.execute(
+            "SELECT COUNT(*) FROM pending_ads WHERE owner = ? AND account = ? AND created_at >= ?",
+            (owner, account, time.time() - PENDING_AD_TTL_SEC),
+        ).fetchone()[0]
+
+
+class GCSPendingAdStore:
+    """
+    GCS 저장소 (초안 1개 = JSON blob 1개)
+    - {"updated_at": ts, "ads": [...]} 형식, updated_at 이 PENDING_AD_TTL_SEC 지나면 빈 목록으로 취급
+    - 수정은 읽은 generation 조건부 업로드, 충돌 시 다시 읽고 재시도
+    """
+
+    MAX_RETRIES = 5
+
+    def __init__(self, bucket_name: str, prefix: str):
+        from google.cloud import storage
+
+        self.bucket = storage.Client().bucket(bucket_name)
+        self.prefix = prefix.strip("/")
+
+    def _blob_name(self, owner: str, account: str) -> str:
+        owner_hash = hashlib.sha256(owner.encode("utf-8")).hexdigest()[:32]
+        return f"{self.prefix}/{owner_hash}/{account}.json"
+
+    def _read(self, owner: str, account: str) -> Tuple[List[Dict[str, Any]], int]:
+        """(광고 목록, generation) - blob 이 없으면 generation 0"""
+        blob = self.bucket.get_blob(self._blob_name(owner, account))
+        if blob is None:
+            return [], 0
+        payload = json.loads(blob.download_as_bytes(if_generation_match=blob.generation))
+        if time.time() - payload.get("updated_at", 0) > PENDING_AD_TTL_SEC:
+            return [], blob.generation
+        return payload.get("ads") or [], blob.generation
+
+    def _update(self, owner: str, account: str, mutate) -> Any:
+        """mutate(ads) → (새 목록, 반환값), generation 조건부 저장"""
+        from google.api_core.exceptions import NotFound, PreconditionFailed
+
+        for _ in range(self.MAX_RETRIES):
+            try:
+                ads, generation = self._read(owner, account)
+            except NotFound:
+                continue  # 읽는 사이 교체/삭제됨
+            new_ads, result = mutate(list(ads))
+            blob = self.bucket.blob(self._blob_name(owner, account))
+            try:
+                if new_ads:
+                    data = json.dumps({"updated_at": time.time(), "ads": new_ads}, ensure_ascii=False)
+                    # generation=0 이면 "아직 없을 때만 생성"
+                    blob.upload_from_string(data, content_type="application/json", if_generation_match=generation)
+                elif generation:
+                    blob.delete(if_generation_match=generation)
+                return result
+            except (PreconditionFailed, NotFound):
+                continue
+        raise RuntimeError("pending_ads 저장 충돌이 반복되었습니다. 다시 시도해주세요.")
+
+    def list(self, owner: str, account: str) -> List[Dict[str, Any]]:
+        from google.api_core.exceptions import NotFound
+
+        try:
+            return self._read(owner, account)[0]
+        except NotFound:
+            return self._read(owner, account)[0]  # 읽는 사이 교체됨 → 1회 재조회
+
+    def add(self, owner: str, account: str, ad: Dict[str, Any]) -> int:
+        def _add(ads):
+            ads.append(ad)
+            return ads, len(ads)
+        return self._update(owner, account, _add)
+
+    def remove(self, owner: str, account: str, ad_id: str) -> int:
+        def _remove(ads):
+            kept = [a for a in ads if a.get("id") != ad_id]
+            return kept, len(ads) - len(kept)
+        return self._update(owner, account, _remove)
+
+    def clear(self, owner: str, account: str):
+        self._update(owner, account, lambda ads: ([], None))
+
+    def count(self, owner: str, account: str) -> int:
+        return len(self.list(owner, account))
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_pending_ad_store():
+    """pending_ads 저장소 싱글톤 (Redis 우선, 미설정/연결 실패 시 GCS, PENDING_AD_STORE=sqlite 면 SQLite)"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                if REDIS_ENABLED:
+                    try:
+                        import redis
+                        client = redis.Redis(
+                            host=REDIS_HOST,
+                            port=REDIS_PORT,
+                            db=REDIS_DB,
+                            password=REDIS_PASSWORD,
+                            decode_responses=True,
+                            socket_timeout=0.5,
+                            socket_connect_timeout=0.5
+                        )
+                        client.ping()
+                        _store = RedisPendingAdStore(client)
+                        print(f"[PENDING_ADS] Redis 저장소 사용: {REDIS_HOST}:{REDIS_PORT}")
+                    except Exception as e:
+                        print(f"[ERROR] [PENDING_ADS] Redis 연결 실패: {e} - GCS 저장소로 폴백")
+                if _store is None and PENDING_AD_STORE != "sqlite":
+                    try:
+                        _store = GCSPendingAdStore(PENDING_AD_BUCKET, PENDING_AD_GCS_PREFIX)
+                        print(f"[PENDING_ADS] GCS 저장소 사용: gs://{PENDING_AD_BUCKET}/{PENDING_AD_GCS_PREFIX}")
+                    except Exception as e:
+                        print(f"[ERROR] [PENDING_ADS] GCS 저장소 초기화 실패: {e} - 인스턴스 로컬 SQLite로 폴백 (인스턴스 간 공유 안 됨)")
+                if _store is None:
+                    _store = SqlitePendingAdStore(PENDING_AD_DB_PATH)
+                    print(f"[PENDING_ADS] SQLite 저장소 사용: {PENDING_AD_DB_PATH}")
+    return _store
@@ -0,0 +1,164 @@
+"""
+Polite crawler HTTP client
+외부 플랫폼(29CM 등) API 호출용 공용 클라이언트
+
+- keep-alive: 커넥션 풀을 공유하는 requests.Session 1개 (스레드 간 공유)
+- 호스트별 토큰 버킷: 동시 호출 수와 관계없이 호스트별 초당 요청 수 상한 유지
+  (기존 순차 호출 + 0.3~0.5초 sleep 과 같은 수준의 요청 속도 상한)
+- 429/5xx/연결 오류: 지수 백오프 재시도, Retry-After 가 있으면 해당 호스트 전체를 그만큼 멈춤
+"""
+import os
+import sys
+import time
+import random
+import threading
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# 호스트별 (초당 요청 수, 버스트)
+CRAWL_HOST_RATES: Dict[str, Tuple[float, float]] = {
+    "review-api.29cm.co.kr": (float(os.environ.get("CRAWL_29CM_REVIEW_RPS", 3)), 3),
+    "display-bff-api.29cm.co.kr": (float(os.environ.get("CRAWL_29CM_SEARCH_RPS", 2)), 2),
+}
+CRAWL_DEFAULT_RPS = float(os.environ.get("CRAWL_DEFAULT_RPS", 2))
+CRAWL_MAX_RETRIES = int(os.environ.get("CRAWL_MAX_RETRIES", 3))
+CRAWL_BACKOFF_BASE_SEC = float(os.environ.get("CRAWL_BACKOFF_BASE_SEC", 0.5))
+CRAWL_POOL_SIZE = int(os.environ.get("CRAWL_POOL_SIZE", 16))
+
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+
+class TokenBucket:
+    """토큰 버킷 (스레드 안전) - acquire()는 토큰이 생길 때까지 대기"""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = max(rate, 0.01)
+        self.capacity = max(burst, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now < self._blocked_until:
+                    wait = self._blocked_until - now
+                else:
+                    self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                    self._updated = now
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def pause(self, seconds: float):
+        """호스트가 속도 제한을 알려오면 해당 시간 동안 모든 요청 정지"""
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+            self._tokens = 0
+            self._updated = self._blocked_until
+
+
+class PoliteCrawler:
+    """공유 세션 + 호스트별 속도 제한 + 재시도"""
+
+    def __init__(self, host_rates: Dict[str, Tuple[float, float]], default_rps: float, max_retries: int, pool_size: int):
+        self._host_rates = host_rates
+        self._default_rps = default_rps
+        self._max_retries = max_retries
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=8, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self._stats = {"requests": 0, "retries": 0, "throttled": 0, "failures": 0}
+
+    def _bucket(self, host: str) -> TokenBucket:
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                rate, burst = self._host_rates.get(host, (self._default_rps, self._default_rps))
+                bucket = TokenBucket(rate, burst)
+                self._buckets[host] = bucket
+            return bucket
+
+    def _count(self, key: str):
+        with self._lock:
+            self._stats[key] += 1
+
+    def request(self, method: str, url: str, timeout: float = 30, **kwargs) -> requests.Response:
+        """
+        속도 제한을 지키며 요청, 429/5xx/연결 오류는 재시도
+        최종 실패 시 requests 예외(HTTPError 등)를 그대로 발생
+        """
+        bucket = self._bucket(urlparse(url).netloc)
+
+        for attempt in range(self._max_retries + 1):
+            bucket.acquire()
+            self._count("requests")
+            try:
+                resp = self.session.request(method, url, timeout=timeout, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt >= self._max_retries:
+                    self._count("failures")
+                    raise
+                self._count("retries")
+                time.sleep(CRAWL_BACKOFF_BASE_SEC * (2 ** attempt) + random.uniform(0, 0.2))
+                continue
+
+            if resp.status_code in RETRY_STATUS_CODES and attempt < self._max_retries:
+                self._count("retries")
+                backoff = CRAWL_BACKOFF_BASE_SEC * (2 ** attempt) + random.uniform(0, 0.2)
+                if resp.status_code == 429:
+                    self._count("throttled")
+                    retry_after = resp.headers.get("Retry-After", "")
+                    backoff = max(backoff, float(retry_after)) if retry_after.isdigit() else backoff
+                    # 한 요청이 제한에 걸리면 같은 호스트의 다른 스레드도 함께 멈춤
+                    bucket.pause(backoff)
+                else:
+                    time.sleep(backoff)
+                continue
+
+            if resp.status_code >= 400:
+                self._count("failures")
+            resp.raise_for_status()
+            return resp
+
+        # 도달하지 않음 (마지막 시도는 raise_for_status 또는 예외로 종료)
+        raise requests.HTTPError(f"요청 실패: {url}")
+
+    def get_json(self, url: str, headers: Optional[dict] = None, timeout: float = 30) -> Any:
+        resp = self.request("GET", url, headers=headers, timeout=timeout)
+        return resp.json()
+
+    def post_json(self, url: str, headers: Optional[dict] = None, payload: Optional[dict] = None, timeout: float = 40) -> Any:
+        resp = self.request("POST", url, headers=headers, json=payload, timeout=timeout)
+        return resp.json()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self._stats)
+
+
+_crawler: Optional[PoliteCrawler] = None
+_crawler_lock = threading.Lock()
+
+
+def get_polite_crawler() -> PoliteCrawler:
+    """PoliteCrawler 싱글톤"""
+    global _crawler
+    if _crawler is None:
+        with _crawler_lock:
+            if _crawler is None:
+                _crawler = PoliteCrawler(CRAWL_HOST_RATES, CRAWL_DEFAULT_RPS, CRAWL_MAX_RETRIES, CRAWL_POOL_SIZE)
+                print(f"[CRAWLER] 호스트별 속도 제한: {CRAWL_HOST_RATES} (기본 {CRAWL_DEFAULT_RPS}/s)", file=sys.stderr)
+    return _crawler
@@ -0,0 +1,62 @@
+"""
+요청 분류 (모바일 여부)
+- 기존 app.is_mobile_device: 요청마다 키워드 리스트 생성 + 정규식 10개 컴파일 + 디버그 print 여러 줄
+- 변경: 키워드를 정규식 1개로 미리 컴파일, User-Agent 판정 결과는 LRU 메모이즈
+  (같은 브라우저의 반복 요청은 dict 조회 1회)
+"""
+import os
+import re
+from functools import lru_cache
+
+MOBILE_UA_CACHE_SIZE = int(os.getenv("MOBILE_UA_CACHE_SIZE", 2048))
+MOBILE_MAX_WIDTH = 768  # 모바일 기준 너비 (screen_width / viewport_width)
+
+MOBILE_KEYWORDS = (
+    'mobile', 'android', 'iphone', 'ipad', 'blackberry', 'windows phone',
+    'opera mini', 'opera mobi', 'mobile safari', 'mobile chrome',
+    'samsung', 'lg', 'huawei', 'xiaomi', 'oneplus', 'motorola',
+    'nexus', 'pixel', 'galaxy', 'note', 'edge', 'plus',
+    'kindle', 'nook', 'tablet', 'phone', 'smartphone',
+    'chrome mobile', 'firefox mobile', 'safari mobile'
+)
+# 기존 브라우저 패턴(mozilla/.*mobile, android.*mobile 등)은 모두 'mobile' 키워드를 포함하므로 키워드 규칙에 포함됨
+_MOBILE_UA_RE = re.compile("|".join(re.escape(kw) for kw in MOBILE_KEYWORDS))
+_WAP_ACCEPT_RE = re.compile(r"application/vnd\.wap\.xhtml\+xml|text/vnd\.wap\.wml")
+
+
+@lru_cache(maxsize=MOBILE_UA_CACHE_SIZE)
+def is_mobile_user_agent(user_agent: str) -> bool:
+    """User-Agent 키워드 기반 모바일 판정 (대소문자 무시, 결과 메모이즈)"""
+    return _MOBILE_UA_RE.search(user_agent.lower()) is not None
+
+
+def _narrow_width(value) -> bool:
+    if not value:
+        return False
+    try:
+        return int(value) <= MOBILE_MAX_WIDTH
+    except ValueError:
+        return False
+
+
+def classify_request(req) -> dict:
+    """
+    모바일 판정 근거별 결과
+    - width  : screen_width / viewport_width 쿼리 파라미터 ≤ 768
+    - ua     : User-Agent 키워드
+    - accept : WAP Accept 헤더
+    """
+    return {
+        "width": _narrow_width(req.args.get("screen_width")) or _narrow_width(req.args.get("viewport_width")),
+        "ua": is_mobile_user_agent(req.headers.get("User-Agent", "")),
+        "accept": _WAP_ACCEPT_RE.search(req.headers.get("Accept", "").lower()) is not None,
+    }
+
+
+def is_mobile_request(req) -> bool:
+    """모바일 디바이스 요청 여부 (가벼운 판정부터 확인)"""
+    if is_mobile_user_agent(req.headers.get("User-Agent", "")):
+        return True
+    if _narrow_width(req.args.get("screen_width")) or _narrow_width(req.args.get("viewport_width")):
+        return True
+    return _WAP_ACCEPT_RE.search(req.headers.get("Accept", "").lower()) is not None
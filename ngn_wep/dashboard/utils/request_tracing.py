@@ -0,0 +1,281 @@
+"""
+대시보드 요청 추적 (span) + 인메모리 지표 (Prometheus 텍스트 형식)
+- /dashboard/get_data, /dashboard/get_batch_dashboard_data 요청 1건 = Trace, 패널(서비스 호출) 1건 = Span
+- Span 속성: 캐시 hit/miss 횟수, BigQuery job id / 처리 bytes / 청구 bytes / slot ms
+  (서비스 코드에서는 record_cache(), record_bq_job()만 호출 → 현재 스레드의 Span에 기록, Span 밖이면 무시)
+- 종료된 Span/Trace는 워커 메모리 지표로 집계
+  - ngn_dashboard_request_seconds{route,data_type,company}    summary (p50/p95/p99, 최근 METRICS_WINDOW건)
+  - ngn_dashboard_panel_seconds{panel,data_type,company}       summary
+  - ngn_dashboard_cache_requests_total{panel,result}           counter
+  - ngn_dashboard_bq_jobs_total / _bq_bytes_processed_total / _bq_bytes_billed_total / _bq_slot_ms_total
+    {panel,company}                                            counter
+- 지표는 워커(프로세스)별 값 → 수집기에서 인스턴스 라벨로 합산
+"""
+import os
+import math
+import time
+import threading
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+METRICS_WINDOW = int(os.getenv("METRICS_WINDOW", 1024))
+# 라벨 조합 상한 (업체 수가 늘어 시계열이 폭증하지 않도록, 초과분은 company="_other"로 집계)
+METRICS_MAX_SERIES = int(os.getenv("METRICS_MAX_SERIES", 2000))
+METRICS_QUANTILES = (0.5, 0.95, 0.99)
+SPAN_MAX_JOB_IDS = 5
+
+_METRIC_HELP = {
+    "ngn_dashboard_request_seconds": ("summary", "대시보드 데이터 요청 전체 처리 시간"),
+    "ngn_dashboard_panel_seconds": ("summary", "패널(서비스 호출)별 처리 시간"),
+    "ngn_dashboard_request_errors_total": ("counter", "오류로 끝난 대시보드 데이터 요청 수"),
+    "ngn_dashboard_cache_requests_total": ("counter", "패널별 결과 캐시 조회 수"),
+    "ngn_dashboard_bq_jobs_total": ("counter", "패널별 BigQuery job 수"),
+    "ngn_dashboard_bq_bytes_processed_total": ("counter", "패널별 BigQuery 처리 bytes"),
+    "ngn_dashboard_bq_bytes_billed_total": ("counter", "패널별 BigQuery 청구 bytes"),
+    "ngn_dashboard_bq_slot_ms_total": ("counter", "패널별 BigQuery slot ms"),
+}
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def company_label(company_name) -> str:
+    """company_name(문자열/리스트) → 지표 라벨 (여러 업체 조회는 all)"""
+    if isinstance(company_name, (list, tuple)):
+        if len(company_name) == 1:
+            company_name = company_name[0]
+        else:
+            return "all"
+    return str(company_name or "all").strip().lower() or "all"
+
+
+# ============================================================
+# 지표 저장소
+# ============================================================
+
+class MetricsRegistry:
+    """summary(최근 N건 분위수 + 누적 sum/count)와 counter를 라벨 조합별로 보관"""
+
+    def __init__(self, window: int = METRICS_WINDOW, max_series: int = METRICS_MAX_SERIES):
+        self.window = window
+        self.max_series = max_series
+        self._lock = threading.Lock()
+        self._summaries: Dict[Tuple[str, LabelKey], Dict[str, Any]] = {}
+        self._counters: Dict[Tuple[str, LabelKey], float] = {}
+
+    def _key(self, store: dict, name: str, labels: Dict[str, str]) -> Tuple[str, LabelKey]:
+        key = (name, tuple(sorted(labels.items())))
+        if key not in store and len(store) >= self.max_series and "company" in labels:
+            key = (name, tuple(sorted({**labels, "company": "_other"}.items())))
+        return key
+
+    def observe(self, name: str, labels: Dict[str, str], value: float):
+        with self._lock:
+            key = self._key(self._summaries, name, labels)
+            series = self._summaries.get(key)
+            if series is None:
+                series = self._summaries[key] = {"window": deque(maxlen=self.window), "sum": 0.0, "count": 0}
+            series["window"].append(value)
+            series["sum"] += value
+            series["count"] += 1
+
+    def inc(self, name: str, labels: Dict[str, str], value: float = 1):
+        if not value:
+            return
+        with self._lock:
+            key = self._key(self._counters, name, labels)
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def quantiles(self, name: str, labels: Dict[str, str]) -> Dict[float, float]:
+        with self._lock:
+            series = self._summaries.get((name, tuple(sorted(labels.items()))))
+            values = sorted(series["window"]) if series else []
+        return {q: _quantile(values, q) for q in METRICS_QUANTILES} if values else {}
+
+    def render(self) -> str:
+        """Prometheus text exposition format (0.0.4)"""
+        with self._lock:
+            summaries = [(k, sorted(v["window"]), v["sum"], v["count"]) for k, v in self._summaries.items()]
+            counters = list(self._counters.items())
+
+        by_name: Dict[str, List[str]] = {}
+        for (name, labels), values, total, count in sorted(summaries):
+            lines = by_name.setdefault(name, [])
+            for q in METRICS_QUANTILES:
+                lines.append(f"{name}{_labels(labels, quantile=q)} {_quantile(values, q):.6f}")
+            lines.append(f"{name}_sum{_labels(labels)} {total:.6f}")
+            lines.append(f"{name}_count{_labels(labels)} {count}")
+        for (name, labels), value in sorted(counters):
+            by_name.setdefault(name, []).append(f"{name}{_labels(labels)} {_number(value)}")
+
+        out = []
+        for name in sorted(by_name):
+            metric_type, help_text = _METRIC_HELP.get(name, ("untyped", name))
+            out.append(f"# HELP {name} {help_text}")
+            out.append(f"# TYPE {name} {metric_type}")
+            out.extend(by_name[name])
+        return "\n".join(out) + "\n"
+
+    def clear(self):
+        with self._lock:
+            self._summaries.clear()
+            self._counters.clear()
+
+
+def _quantile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, max(0, math.ceil(q * len(sorted_values)) - 1))
+    return sorted_values[idx]
+
+
+def _number(value: float) -> str:
+    # bytes 카운터는 정수 그대로 출력 (지수 표기로 자릿수가 잘리지 않도록)
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(labels: LabelKey, **extra) -> str:
+    items = list(labels) + [(k, v) for k, v in extra.items()]
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in items) + "}"
+
+
+_registry = MetricsRegistry()
+
+
+def get_metrics_registry() -> MetricsRegistry:
+    return _registry
+
+
+def render_metrics() -> str:
+    return _registry.render()
+
+
+# ============================================================
+# Span / Trace
+# ============================================================
+
+class Span:
+    __slots__ = ("name", "attrs", "start", "duration")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.attrs: Dict[str, Any] = {}
+        self.start = time.perf_counter()
+        self.duration = 0.0
+
+    def add(self, key: str, value: float = 1):
+        self.attrs[key] = self.attrs.get(key, 0) + value
+
+    def finish(self):
+        self.duration = time.perf_counter() - self.start
+
+    def summary(self) -> Dict[str, Any]:
+        return {"seconds": round(self.duration, 3), **self.attrs}
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("ngn_current_span", default=None)
+
+
+class Trace:
+    """요청 1건의 span 모음 (패널 span은 ThreadPoolExecutor 작업 스레드에서 열림)"""
+
+    def __init__(self, route: str, data_type: str, company_name):
+        self.route = route
+        self.labels = {"data_type": str(data_type or "all"), "company": company_label(company_name)}
+        self.spans: List[Span] = []
+        self.start = time.perf_counter()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name: str):
+        span = Span(name)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except Exception:
+            span.attrs["error"] = 1
+            raise
+        finally:
+            span.finish()
+            _current_span.reset(token)
+            with self._lock:
+                self.spans.append(span)
+            _record_span(self, span)
+
+    def wrap(self, name: str, fn: Callable) -> Callable:
+        """fn 호출을 span으로 감쌈 (executor.submit(trace.wrap("panel", fetch_fn)))"""
+        def run(*args, **kwargs):
+            with self.span(name):
+                return fn(*args, **kwargs)
+        return run
+
+    def timings(self) -> Dict[str, float]:
+        with self._lock:
+            return {s.name: round(s.duration, 3) for s in self.spans}
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {s.name: s.summary() for s in self.spans}
+
+    def finish(self, error: bool = False) -> float:
+        elapsed = time.perf_counter() - self.start
+        labels = {"route": self.route, **self.labels}
+        _registry.observe("ngn_dashboard_request_seconds", labels, elapsed)
+        if error:
+            _registry.inc("ngn_dashboard_request_errors_total", labels)
+        return elapsed
+
+
+def start_trace(route: str, data_type: str, company_name) -> Trace:
+    return Trace(route, data_type, company_name)
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+def _record_span(trace: Trace, span: Span):
+    labels = {"panel": span.name, **trace.labels}
+    _registry.observe("ngn_dashboard_panel_seconds", labels, span.duration)
+
+    attrs = span.attrs
+    panel_labels = {"panel": span.name, "company": trace.labels["company"]}
+    _registry.inc("ngn_dashboard_cache_requests_total", {"panel": span.name, "result": "hit"}, attrs.get("cache_hits", 0))
+    _registry.inc("ngn_dashboard_cache_requests_total", {"panel": span.name, "result": "miss"}, attrs.get("cache_misses", 0))
+    _registry.inc("ngn_dashboard_bq_jobs_total", panel_labels, attrs.get("bq_jobs", 0))
+    _registry.inc("ngn_dashboard_bq_bytes_processed_total", panel_labels, attrs.get("bq_bytes_processed", 0))
+    _registry.inc("ngn_dashboard_bq_bytes_billed_total", panel_labels, attrs.get("bq_bytes_billed", 0))
+    _registry.inc("ngn_dashboard_bq_slot_ms_total", panel_labels, attrs.get("bq_slot_ms", 0))
+
+
+# ============================================================
+# 서비스 코드용 기록 함수 (Span 밖에서 호출되면 아무 것도 하지 않음)
+# ============================================================
+
+def record_cache(hit: bool):
+    span = _current_span.get()
+    if span is not None:
+        span.add("cache_hits" if hit else "cache_misses")
+
+
+def record_bq_job(job):
+    """완료된 BigQuery QueryJob 통계를 현재 span에 기록"""
+    span = _current_span.get()
+    if span is None or job is None:
+        return
+    span.add("bq_jobs")
+    span.add("bq_bytes_processed", getattr(job, "total_bytes_processed", None) or 0)
+    span.add("bq_bytes_billed", getattr(job, "total_bytes_billed", None) or 0)
+    span.add("bq_slot_ms", getattr(job, "slot_millis", None) or 0)
+    if getattr(job, "cache_hit", False):
+        span.add("bq_cache_hits")
+    job_ids = span.attrs.setdefault("bq_job_ids", [])
+    if len(job_ids) < SPAN_MAX_JOB_IDS and getattr(job, "job_id", None):
+        job_ids.append(job.job_id)
@@ -0,0 +1,317 @@
+"""
+29CM 리뷰 워터마크 캐시 (item_id 기준)
+- 기존: 비교 스냅샷/월간 스냅샷 실행마다 모든 상품의 최신 리뷰를 처음부터 다시 수집
+- 변경: 상품별로 가장 최근 리뷰 ID(워터마크)와 최근 리뷰 N개를 보관하고
+  다음 실행에서는 워터마크보다 새로운 리뷰만 작은 페이지로 조회 (워터마크를 만나면 페이지 조회 중단)
+  목록 API의 리뷰 수가 캐시와 같으면 리뷰 API 호출 자체를 생략
+- 리뷰는 원본 필드 일부(contents/point/optionValue/insertTimestamp)만 저장 → 호출 측 정규화 로직은 그대로 사용
+- 저장소: REVIEW_CACHE_BUCKET(기본 GCS_BUCKET) 설정 시 GCS gzip JSON 1개, 아니면 로컬 디스크(REVIEW_CACHE_DIR)
+  flush()는 저장된 최신본과 병합 후 generation 조건부로 저장 (여러 Job이 동시에 써도 서로의 갱신을 덮지 않음)
+- 메모리 항목은 REVIEW_CACHE_MAX_ITEMS 개로 제한 (대시보드처럼 flush 없이 오래 도는 프로세스 대비)
+  초과 시 fetched_at 오래된 순으로 10% 여유분까지 정리
+"""
+import os
+import sys
+import json
+import gzip
+import time
+import hashlib
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+REVIEW_CACHE_ENABLED = os.environ.get("REVIEW_CACHE", "1") == "1"
+REVIEW_CACHE_BUCKET = os.environ.get("REVIEW_CACHE_BUCKET", os.environ.get("GCS_BUCKET", ""))
+REVIEW_CACHE_BLOB = os.environ.get("REVIEW_CACHE_BLOB", "ai-reports/_review_cache/29cm_reviews.json.gz")
+REVIEW_CACHE_DIR = os.environ.get("REVIEW_CACHE_DIR", "/tmp/review_cache")
+REVIEW_CACHE_MAX_ITEMS = int(os.environ.get("REVIEW_CACHE_MAX_ITEMS", 20000))
+REVIEW_CACHE_MAX_AGE_DAYS = int(os.environ.get("REVIEW_CACHE_MAX_AGE_DAYS", 28))  # 지나면 전체 재수집 (삭제/수정 리뷰 반영)
+REVIEW_CACHE_PAGE_SIZE = int(os.environ.get("REVIEW_CACHE_PAGE_SIZE", 5))          # 증분 조회 페이지 크기
+REVIEW_CACHE_MAX_PAGES = int(os.environ.get("REVIEW_CACHE_MAX_PAGES", 4))
+
+CACHE_FORMAT_VERSION = 1
+REVIEW_CONTENT_MAX_CHARS = 400  # 호출 측은 정리 후 200자로 자르므로 여유를 두고 저장
+REVIEW_ID_FIELDS = ("itemReviewNo", "reviewNo", "reviewId", "id")
+REVIEW_TIMESTAMP_FIELDS = ("insertTimestamp", "createdAt", "created_at", "registrationDate")
+
+# fetch_page(page, size) -> 원본 리뷰 리스트 (최신순), 실패 시 예외
+FetchPage = Callable[[int, int], List[Dict[str, Any]]]
+
+
+def review_fingerprint(raw: Dict[str, Any]) -> str:
+    """리뷰 식별자 (ID 필드가 없으면 작성 시각 + 내용 해시)"""
+    for key in REVIEW_ID_FIELDS:
+        if raw.get(key) is not None:
+            return str(raw[key])
+    basis = f"{_review_timestamp(raw)}|{raw.get('contents') or raw.get('content') or ''}"
+    return hashlib.sha1(basis.encode("utf-8")).hexdigest()[:16]
+
+
+def _review_timestamp(raw: Dict[str, Any]):
+    for key in REVIEW_TIMESTAMP_FIELDS:
+        if raw.get(key):
+            return raw[key]
+    return None
+
+
+def compact_review(raw: Dict[str, Any]) -> Dict[str, Any]:
+    """캐시에 저장할 리뷰 필드만 추출"""
+    return {
+        "id": review_fingerprint(raw),
+        "contents": (raw.get("contents") or raw.get("content") or "")[:REVIEW_CONTENT_MAX_CHARS],
+        "point": raw.get("point"),
+        "optionValue": raw.get("optionValue"),
+        "insertTimestamp": _review_timestamp(raw),
+    }
+
+
+class LocalReviewStore:
+    """로컬 디스크 저장소"""
+
+    def __init__(self, root: str, blob_name: str):
+        self.path = os.path.join(root, os.path.basename(blob_name))
+        os.makedirs(root, exist_ok=True)
+
+    def read(self) -> Tuple[Optional[bytes], Any]:
+        try:
+            with open(self.path, "rb") as f:
+                data = f.read()
+            return data, os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            return None, None
+
+    def write(self, data: bytes, generation: Any) -> bool:
+        # 임시 파일에 쓰고 rename (로컬은 단일 프로세스 실행을 가정하므로 generation 확인 생략)
+        tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, self.path)
+        return True
+
+
+class GCSReviewStore:
+    """GCS 저장소 (Cloud Run Job 실행 간 공유)"""
+
+    def __init__(self, bucket_name: str, blob_name: str):
+        from google.cloud import storage
+
+        self.bucket = storage.Client().bucket(bucket_name)
+        self.blob_name = blob_name
+
+    def read(self) -> Tuple[Optional[bytes], Any]:
+        blob = self.bucket.get_blob(self.blob_name)
+        if blob is None:
+            return None, 0
+        return blob.download_as_bytes(if_generation_match=blob.generation), blob.generation
+
+    def write(self, data: bytes, generation: Any) -> bool:
+        from google.api_core.exceptions import PreconditionFailed
+
+        try:
+            # generation=0 이면 "아직 없을 때만 생성"
+            self.bucket.blob(self.blob_name).upload_from_string(
+                data, content_type="application/gzip", if_generation_match=generation or 0
+            )
+            return True
+        except PreconditionFailed:
+            return False
+
+
+class ReviewWatermarkCache:
+    """item_id → {워터마크, 최근 리뷰 N개} 캐시 (조회/저장 실패는 경고만 남기고 전체 수집으로 진행)"""
+
+    def __init__(self, store):
+        self.store = store
+        self._entries: Optional[Dict[str, Dict[str, Any]]] = None
+        self._dirty_keys = set()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "incremental": 0, "full": 0, "new_reviews": 0, "requests": 0}
+
+    # ------------------------------------------------------------------
+    # 저장소
+    # ------------------------------------------------------------------
+    def _read_entries(self) -> Tuple[Dict[str, Dict[str, Any]], Any]:
+        data, generation = self.store.read()
+        if not data:
+            return {}, generation
+        payload = json.loads(gzip.decompress(data).decode("utf-8"))
+        if payload.get("version") != CACHE_FORMAT_VERSION:
+            return {}, generation
+        return payload.get("items") or {}, generation
+
+    def _ensure_loaded(self) -> Dict[str, Dict[str, Any]]:
+        if self._entries is None:
+            with self._lock:
+                if self._entries is None:
+                    try:
+                        entries, _ = self._read_entries()
+                        print(f"✅ [INFO] 리뷰 캐시 로드: {len(entries)}개 상품", file=sys.stderr)
+                    except Exception as e:
+                        print(f"⚠️ [WARN] 리뷰 캐시 로드 실패 (전체 수집으로 진행): {e}", file=sys.stderr)
+                        entries = {}
+                    self._entries = entries
+        return self._entries
+
+    def flush(self) -> bool:
+        """이번 실행에서 갱신된 상품만 저장된 최신본에 병합해 저장"""
+        with self._lock:
+            if not self._dirty_keys or self._entries is None:
+                return True
+            updates = {key: self._entries[key] for key in self._dirty_keys if key in self._entries}
+
+        for _ in range(3):
+            try:
+                stored, generation = self._read_entries()
+                for key, entry in updates.items():
+                    if entry.get("fetched_at", 0) >= (stored.get(key) or {}).get("fetched_at", 0):
+                        stored[key] = entry
+                if len(stored) > REVIEW_CACHE_MAX_ITEMS:
+                    newest = sorted(stored.items(), key=lambda kv: kv[1].get("fetched_at", 0), reverse=True)
+                    stored = dict(newest[:REVIEW_CACHE_MAX_ITEMS])
+
+                payload = {"version": CACHE_FORMAT_VERSION, "updated_at": int(time.time()), "items": stored}
+                data = gzip.compress(json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+                if self.store.write(data, generation):
+                    with self._lock:
+                        self._dirty_keys.difference_update(updates.keys())
+                    print(f"✅ [INFO] 리뷰 캐시 저장: {len(updates)}개 갱신 (전체 {len(stored)}개), {self.stats()}", file=sys.stderr)
+                    return True
+            except Exception as e:
+                print(f"⚠️ [WARN] 리뷰 캐시 저장 실패: {e}", file=sys.stderr)
+                return False
+        print("⚠️ [WARN] 리뷰 캐시 저장 충돌이 반복되어 이번 갱신은 건너뜁니다", file=sys.stderr)
+        return False
+
+    # ------------------------------------------------------------------
+    # 조회
+    # ------------------------------------------------------------------
+    def _count(self, key: str, n: int = 1):
+        with self._lock:
+            self._stats[key] += n
+
+    def get_reviews(
+        self,
+        item_id: Any,
+        fetch_page: FetchPage,
+        limit: int,
+        review_count: Optional[int] = None,
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        최신 리뷰 최대 limit개 (compact_review 형식, 최신순)
+        - 캐시 리뷰 수 == review_count: 호출 없이 캐시 반환
+        - 워터마크 있음: 작은 페이지로 새 리뷰만 조회, 기존 리뷰와 병합
+        - 워터마크 없음/만료: 첫 페이지(limit개)만 조회
+        조회가 실패하면 None (호출 측 기존 수집 경로로 대체)
+        """
+        entries = self._ensure_loaded()
+        key = str(item_id)
+        entry = entries.get(key)
+        now = int(time.time())
+        if entry and (
+            now - entry.get("fetched_at", 0) > REVIEW_CACHE_MAX_AGE_DAYS * 86400
+            or entry.get("limit", 0) < limit
+        ):
+            entry = None
+
+        if entry and review_count is not None and entry.get("review_count") == review_count:
+            self._count("hits")
+            return entry["reviews"][:limit]
+
+        try:
+            reached_watermark = False
+            if entry:
+                fresh, reached_watermark = self._fetch_newer(entry, fetch_page, limit)
+                self._count("new_reviews", len(fresh))
+            if reached_watermark or (entry and len(fresh) >= limit):
+                reviews = fresh + entry["reviews"] if reached_watermark else fresh
+                self._count("incremental")
+            else:
+                # 워터마크 없음/만료, 또는 캐시 리뷰를 다시 만나지 못함(삭제/수정) → 첫 페이지 전체 재수집
+                fresh = [compact_review(r) for r in fetch_page(0, limit) or []]
+                self._count("requests")
+                reviews = fresh
+                self._count("full")
+        except Exception:
+            return None
+
+        # 중복 제거 (페이지 경계에서 같은 리뷰가 다시 나올 수 있음)
+        seen = set()
+        merged = []
+        for review in reviews:
+            if review["id"] not in seen:
+                seen.add(review["id"])
+                merged.append(review)
+        merged = merged[:limit]
+
+        new_entry = {
+            "newest_id": merged[0]["id"] if merged else None,
+            "newest_at": merged[0]["insertTimestamp"] if merged else None,
+            "review_count": review_count,
+            "limit": limit,
+            "reviews": merged,
+            "fetched_at": now,
+        }
+        with self._lock:
+            entries[key] = new_entry
+            self._dirty_keys.add(key)
+            if len(entries) > REVIEW_CACHE_MAX_ITEMS:
+                self._trim_locked(entries)
+        return merged
+
+    def _trim_locked(self, entries: Dict[str, Dict[str, Any]]):
+        """오래 조회된 항목부터 정리 (매 호출 정렬을 피하려고 한 번에 상한의 90%까지 줄임)"""
+        keep = max(1, REVIEW_CACHE_MAX_ITEMS * 9 // 10)
+        oldest = sorted(entries, key=lambda k: entries[k].get("fetched_at", 0))
+        for key in oldest[:len(entries) - keep]:
+            del entries[key]
+            self._dirty_keys.discard(key)
+
+    def _fetch_newer(self, entry: Dict[str, Any], fetch_page: FetchPage, limit: int) -> Tuple[List[Dict[str, Any]], bool]:
+        """
+        워터마크(캐시에 있는 리뷰)를 만날 때까지 최신순으로 페이지 조회
+        반환: (새 리뷰, 워터마크 도달 여부) - 캐시 리뷰 id를 실제로 만난 경우에만 True
+        """
+        known_ids = {review["id"] for review in entry.get("reviews") or []}
+        fresh: List[Dict[str, Any]] = []
+        page_size = max(1, min(REVIEW_CACHE_PAGE_SIZE, limit))
+
+        for page in range(REVIEW_CACHE_MAX_PAGES):
+            raw_reviews = fetch_page(page, page_size) or []
+            self._count("requests")
+            for raw in raw_reviews:
+                review = compact_review(raw)
+                if review["id"] in known_ids:
+                    return fresh, True
+                fresh.append(review)
+            if len(raw_reviews) < page_size or len(fresh) >= limit:
+                # 워터마크를 못 만난 채 마지막 페이지 도달 → 캐시 리뷰가 삭제/수정된 것이므로 병합하지 않음
+                # 새 리뷰만으로 limit 충족 → 기존 리뷰는 밀려남
+                return fresh, False
+        return fresh, False
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+        stats["items"] = len(self._entries or {})
+        return stats
+
+
+_cache: Optional[ReviewWatermarkCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_review_watermark_cache() -> Optional[ReviewWatermarkCache]:
+    """ReviewWatermarkCache 싱글톤 (REVIEW_CACHE=0 이면 None)"""
+    global _cache
+    if not REVIEW_CACHE_ENABLED:
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                if REVIEW_CACHE_BUCKET:
+                    print(f"✅ [INFO] 리뷰 캐시: gs://{REVIEW_CACHE_BUCKET}/{REVIEW_CACHE_BLOB}", file=sys.stderr)
+                    store = GCSReviewStore(REVIEW_CACHE_BUCKET, REVIEW_CACHE_BLOB)
+                else:
+                    print(f"✅ [INFO] 리뷰 캐시: {REVIEW_CACHE_DIR}", file=sys.stderr)
+                    store = LocalReviewStore(REVIEW_CACHE_DIR, REVIEW_CACHE_BLOB)
+                _cache = ReviewWatermarkCache(store)
+    return _cache
@@ -0,0 +1,344 @@
+"""
+Weekly trend artifact store (29CM / Ably)
+주간 트렌드 결과(전체 탭 × 급상승/신규진입/순위하락)를 run_id별 아티팩트로 한 번 만들어 두고
+각 워커 메모리에 올려서 트렌드 API가 BigQuery/GCS 없이 응답하도록 함
+
+- 아티팩트: gs://{GCS_BUCKET}/ai-reports/trend/{platform}/_artifacts/{run_id}.json.gz
+  형식: {"version": 1, "platform", "run_id", "created_at", "tabs": [...], "tabs_data": {탭: {rising_star, new_entry, rank_drop}}}
+- 포인터: gs://{GCS_BUCKET}/ai-reports/trend/{platform}/_artifacts/latest.json
+  형식: {"version": 1, "run_id", "path", "generation", "updated_at"}
+  (더 오래된 run_id로 재생성해도 포인터는 되돌리지 않음)
+- 워커: 시작 시(warm) 또는 첫 요청 때 포인터 → 아티팩트를 읽어 메모리에 보관
+  이후 포인터 확인은 TREND_ARTIFACT_REFRESH_SEC 주기로 백그라운드 스레드에서만 수행 →
+  run_id가 바뀌면 아티팩트 교체 + 이전 주차 업체 스냅샷 메모리 비움
+- 업체별 스냅샷(AI 인사이트 포함)도 (platform, run_id, company) 키로 메모리에 보관
+  요청한 탭만 loader에 넘김 → Columnar 스냅샷이면 해당 탭 row group만 읽고, 이후 다른 탭 요청 시 부족한 탭만 추가 로드
+"""
+import os
+import sys
+import json
+import gzip
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from google.cloud import storage
+
+PROJECT_ID = os.environ.get("GOOGLE_CLOUD_PROJECT", "winged-precept-443218-v8")
+GCS_BUCKET = os.environ.get("GCS_BUCKET", "winged-precept-443218-v8.appspot.com")
+
+TREND_ARTIFACT_VERSION = 1
+TREND_ARTIFACT_PLATFORMS = ("29cm", "ably")
+TREND_ARTIFACT_REFRESH_SEC = int(os.environ.get("TREND_ARTIFACT_REFRESH_SEC", 300))   # 포인터 확인 주기 (초)
+TREND_SNAPSHOT_MEMORY_MAX = int(os.environ.get("TREND_SNAPSHOT_MEMORY_MAX", 64))      # 메모리에 보관할 업체 스냅샷 수
+TREND_SNAPSHOT_MISSING_TTL = int(os.environ.get("TREND_SNAPSHOT_MISSING_TTL", 300))   # "스냅샷 없음" 결과 유지 (초)
+
+# 포인터 동시 갱신 시 generation 조건부 쓰기 재시도
+MAX_POINTER_UPDATE_ATTEMPTS = 5
+
+# loader가 일부 탭만 읽었을 때 스냅샷 dict에 넣는 표시 (읽은 탭 목록, 캐시에서 제거 후 보관)
+PARTIAL_TABS_KEY = "_partial_tabs"
+
+
+def trend_artifact_prefix(platform: str) -> str:
+    return f"ai-reports/trend/{platform}/_artifacts"
+
+
+def trend_artifact_path(platform: str, run_id: str) -> str:
+    return f"{trend_artifact_prefix(platform)}/{run_id}.json.gz"
+
+
+def trend_pointer_path(platform: str) -> str:
+    return f"{trend_artifact_prefix(platform)}/latest.json"
+
+
+def _get_bucket(bucket_name: str = GCS_BUCKET):
+    return storage.Client(project=PROJECT_ID).bucket(bucket_name)
+
+
+# ============================================================
+# 아티팩트 생성 (주간 스냅샷 작업 / 스냅샷 생성 API)
+# ============================================================
+
+def publish_trend_artifact(
+    platform: str,
+    run_id: str,
+    tabs_data: Dict[str, Dict[str, List[Dict[str, Any]]]],
+    tabs: Optional[List[str]] = None,
+    bucket=None,
+) -> bool:
+    """
+    run_id 아티팩트 저장 후 latest 포인터 갱신
+    실패해도 스냅샷 작업은 계속 진행하도록 False만 반환 (대시보드는 BigQuery 경로로 폴백)
+    """
+    from google.api_core.exceptions import NotFound, PreconditionFailed
+
+    try:
+        bucket = bucket or _get_bucket()
+        payload = {
+            "version": TREND_ARTIFACT_VERSION,
+            "platform": platform,
+            "run_id": run_id,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "tabs": list(tabs) if tabs is not None else list(tabs_data.keys()),
+            "tabs_data": tabs_data,
+        }
+        # 날짜/Decimal 값은 문자열로 (BigQuery 행 그대로 넘어와도 저장 가능하도록)
+        data = gzip.compress(json.dumps(payload, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8"))
+
+        blob = bucket.blob(trend_artifact_path(platform, run_id))
+        blob.upload_from_string(data, content_type="application/gzip")
+        if blob.generation is None:
+            blob.reload()
+
+        pointer = {
+            "version": TREND_ARTIFACT_VERSION,
+            "run_id": run_id,
+            "path": blob.name,
+            "generation": blob.generation,
+            "updated_at": datetime.now(timezone.utc).isoformat(),
+        }
+
+        for _ in range(MAX_POINTER_UPDATE_ATTEMPTS):
+            pointer_blob = bucket.get_blob(trend_pointer_path(platform))
+            if pointer_blob is not None:
+                try:
+                    current = json.loads(pointer_blob.download_as_bytes(if_generation_match=pointer_blob.generation))
+                except (PreconditionFailed, NotFound):
+                    continue
+                if current.get("run_id") and current["run_id"] > run_id:
+                    print(f"[TREND_ARTIFACT] 과거 주차 아티팩트 저장 (포인터 유지: {current['run_id']}): {blob.name}", file=sys.stderr)
+                    return True
+
+            new_pointer_blob = bucket.blob(trend_pointer_path(platform))
+            new_pointer_blob.cache_control = "no-cache"
+            try:
+                new_pointer_blob.upload_from_string(
+                    json.dumps(pointer, ensure_ascii=False),
+                    content_type="application/json",
+                    if_generation_match=pointer_blob.generation if pointer_blob is not None else 0,
+                )
+            except PreconditionFailed:
+                # 다른 작업이 먼저 갱신함 → 다시 읽고 비교
+                continue
+
+            print(f"✅ [TREND_ARTIFACT] 아티팩트 게시: {blob.name}#{blob.generation} ({len(payload['tabs'])}개 탭)", file=sys.stderr)
+            return True
+
+        print(f"⚠️ [TREND_ARTIFACT] 포인터 갱신 재시도 초과: {platform}/{run_id}", file=sys.stderr)
+        return False
+    except Exception as e:
+        print(f"⚠️ [TREND_ARTIFACT] 아티팩트 게시 실패: {platform}/{run_id}: {e}", file=sys.stderr)
+        return False
+
+
+# ============================================================
+# 워커 메모리 캐시
+# ============================================================
+
+class TrendArtifactCache:
+    """
+    플랫폼별 최신 트렌드 아티팩트 + 업체별 스냅샷 메모리 캐시 (스레드 안전)
+
+    get_artifact() → 메모리에 있으면 즉시 반환, 포인터 확인 주기가 지났으면 백그라운드 갱신만 예약
+    get_company_snapshot() → (platform, run_id, company) 메모리 LRU, 미스(또는 없는 탭)일 때만 loader 호출
+    """
+
+    def __init__(self, bucket_name: str, refresh_sec: int, snapshot_max: int, missing_ttl: int):
+        self._bucket_name = bucket_name
+        self._bucket = None
+        self._refresh_sec = refresh_sec
+        self._snapshot_max = snapshot_max
+        self._missing_ttl = missing_ttl
+        self._lock = threading.Lock()
+
+        self._artifacts: Dict[str, Dict[str, Any]] = {}
+        self._checked_at: Dict[str, float] = {}
+        self._refreshing: set = set()
+        # 값: (로드 시각, 스냅샷, 읽은 탭 집합 - None이면 전체 탭)
+        self._snapshots: "OrderedDict[Tuple[str, str, str], Tuple[float, Optional[Dict[str, Any]], Optional[set]]]" = OrderedDict()
+
+        self._stats = {"artifact_loads": 0, "pointer_checks": 0, "snapshot_hits": 0, "snapshot_loads": 0}
+
+    def _get_bucket(self):
+        if self._bucket is None:
+            self._bucket = _get_bucket(self._bucket_name)
+        return self._bucket
+
+    # ---------- 아티팩트 ----------
+    def refresh(self, platform: str) -> bool:
+        """포인터 확인 → 새 run_id/generation이면 아티팩트 교체 (교체했으면 True)"""
+        try:
+            bucket = self._get_bucket()
+            pointer = json.loads(bucket.blob(trend_pointer_path(platform)).download_as_bytes())
+            with self._lock:
+                self._stats["pointer_checks"] += 1
+                current = self._artifacts.get(platform)
+                if current and current["run_id"] == pointer["run_id"] and current["generation"] == pointer["generation"]:
+                    return False
+
+            # generation을 지정해서 다운로드 → 포인터와 다른 버전을 섞어 읽지 않음
+            raw = bucket.blob(pointer["path"], generation=pointer["generation"]).download_as_bytes(raw_download=True)
+            if raw[:2] == b"\x1f\x8b":
+                raw = gzip.decompress(raw)
+            artifact = json.loads(raw.decode("utf-8"))
+            artifact["generation"] = pointer["generation"]
+        except Exception as e:
+            print(f"[TREND_ARTIFACT] {platform} 아티팩트 갱신 실패 (기존 데이터 유지): {e}", file=sys.stderr)
+            return False
+
+        with self._lock:
+            previous = self._artifacts.get(platform)
+            self._artifacts[platform] = artifact
+            self._stats["artifact_loads"] += 1
+            if previous is None or previous["run_id"] != artifact["run_id"]:
+                # 주차가 바뀌면 이전 주차 업체 스냅샷은 더 이상 쓰지 않음
+                for key in [k for k in self._snapshots if k[0] == platform and k[1] != artifact["run_id"]]:
+                    del self._snapshots[key]
+
+        print(f"✅ [TREND_ARTIFACT] {platform} 아티팩트 로드: {artifact['run_id']}#{artifact['generation']}", file=sys.stderr)
+        return True
+
+    def _refresh_in_background(self, platform: str):
+        def run():
+            try:
+                self.refresh(platform)
+            finally:
+                with self._lock:
+                    self._refreshing.discard(platform)
+
+        threading.Thread(target=run, name=f"trend-artifact-{platform}", daemon=True).start()
+
+    def get_artifact(self, platform: str) -> Optional[Dict[str, Any]]:
+        """최신 아티팩트 (호출자는 수정하지 말 것 - 캐시 공유 객체)"""
+        now = time.time()
+        with self._lock:
+            artifact = self._artifacts.get(platform)
+            stale = now - self._checked_at.get(platform, 0.0) >= self._refresh_sec
+            if stale:
+                self._checked_at[platform] = now
+            schedule = stale and artifact is not None and platform not in self._refreshing
+            if schedule:
+                self._refreshing.add(platform)
+
+        if artifact is None:
+            # 첫 사용 (warm 전 요청) → 한 번만 동기 로드, 실패하면 다음 주기까지 재시도하지 않음
+            if stale:
+                self.refresh(platform)
+            with self._lock:
+                return self._artifacts.get(platform)
+
+        if schedule:
+            self._refresh_in_background(platform)
+        return artifact
+
+    def get_run_id(self, platform: str) -> Optional[str]:
+        artifact = self.get_artifact(platform)
+        return artifact["run_id"] if artifact else None
+
+    def get_tabs(self, platform: str) -> Optional[List[str]]:
+        artifact = self.get_artifact(platform)
+        return artifact.get("tabs") if artifact else None
+
+    def get_tabs_data(self, platform: str) -> Optional[Dict[str, Dict[str, List[Dict[str, Any]]]]]:
+        artifact = self.get_artifact(platform)
+        return artifact.get("tabs_data") if artifact else None
+
+    def warm(self, platforms=TREND_ARTIFACT_PLATFORMS):
+        """워커 시작 시 백그라운드로 미리 로드"""
+        def run():
+            for platform in platforms:
+                with self._lock:
+                    self._checked_at[platform] = time.time()
+                self.refresh(platform)
+
+        threading.Thread(target=run, name="trend-artifact-warm", daemon=True).start()
+
+    # ---------- 업체별 스냅샷 ----------
+    def get_company_snapshot(
+        self,
+        platform: str,
+        run_id: str,
+        company_name: str,
+        loader: Callable[..., Optional[Dict[str, Any]]],
+        tab_names: Optional[List[str]] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        업체 스냅샷 (메모리 미스일 때만 loader(run_id, company_name, tab_names) 호출)
+        tab_names: 응답에 필요한 탭 (None이면 전체) → 메모리에 없는 탭만 loader에 요청해 기존 스냅샷에 합침
+        """
+        key = (platform, run_id, company_name.lower())
+        wanted = set(tab_names) if tab_names else None
+        now = time.time()
+        with self._lock:
+            cached = self._snapshots.get(key)
+            base, base_tabs = None, set()
+            if cached is not None:
+                loaded_at, data, loaded = cached
+                if data is None:
+                    hit = now - loaded_at < self._missing_ttl
+                else:
+                    hit = loaded is None or (wanted is not None and wanted <= loaded)
+                    base, base_tabs = data, loaded or set()
+                if hit:
+                    self._snapshots.move_to_end(key)
+                    self._stats["snapshot_hits"] += 1
+                    return data
+
+        request_tabs = sorted(wanted - base_tabs) if wanted is not None else None
+        fresh = loader(run_id, company_name, request_tabs)
+        if fresh is None:
+            if base is not None:
+                # 추가 탭 로드 실패 → 이미 읽은 탭으로 응답
+                return base
+            data, loaded = None, None
+        else:
+            partial = fresh.pop(PARTIAL_TABS_KEY, None)
+            if base is not None and partial is not None:
+                data = {**base, **fresh, "tabs_data": {**(base.get("tabs_data") or {}), **(fresh.get("tabs_data") or {})}}
+            else:
+                data = fresh
+            loaded = None if partial is None else base_tabs | set(partial)
+
+        with self._lock:
+            self._stats["snapshot_loads"] += 1
+            self._snapshots[key] = (now, data, loaded)
+            self._snapshots.move_to_end(key)
+            while len(self._snapshots) > self._snapshot_max:
+                self._snapshots.popitem(last=False)
+        return data
+
+    def invalidate(self, platform: Optional[str] = None):
+        """메모리 비우기 (스냅샷 재생성 직후 등) - 다음 요청에서 다시 로드"""
+        with self._lock:
+            for name in [platform] if platform else list(self._artifacts.keys()):
+                self._artifacts.pop(name, None)
+                self._checked_at.pop(name, None)
+            for key in [k for k in self._snapshots if platform is None or k[0] == platform]:
+                del self._snapshots[key]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self._stats,
+                "artifacts": {name: artifact["run_id"] for name, artifact in self._artifacts.items()},
+                "snapshot_entries": len(self._snapshots),
+            }
+
+
+_trend_cache: Optional[TrendArtifactCache] = None
+_trend_cache_lock = threading.Lock()
+
+
+def get_trend_artifact_cache() -> TrendArtifactCache:
+    """TrendArtifactCache 싱글톤"""
+    global _trend_cache
+    if _trend_cache is None:
+        with _trend_cache_lock:
+            if _trend_cache is None:
+                _trend_cache = TrendArtifactCache(
+                    GCS_BUCKET, TREND_ARTIFACT_REFRESH_SEC, TREND_SNAPSHOT_MEMORY_MAX, TREND_SNAPSHOT_MISSING_TTL
+                )
+    return _trend_cache
@@ -3,6 +3,11 @@ from datetime import datetime, timedelta, timezone
 from google.cloud import bigquery
 from dotenv import load_dotenv, find_dotenv
 
+try:
+    from bq_query import run_query  # Cloud Run Job 이미지: /app/bq_query.py
+except ImportError:
+    from ngn_wep.dashboard.utils.bq_query import run_query
+
 # ✅ 환경설정 (로컬 개발용, Cloud Run에서는 환경변수 사용)
 load_dotenv(find_dotenv(), override=False)
 client = bigquery.Client()
@@ -20,7 +25,7 @@ logging.basicConfig(stream=sys.stdout,
 
 def run_merge(query: str, label: str):
     logging.info(f"⚡  MERGE 시작 → {label}")
-    client.query(query).result()
+    run_query(client, query, service="merge_meta_ads_summary")
     logging.info(f"✅  MERGE 완료  → {label}")
 
 # -------------------------------------------------------------------------
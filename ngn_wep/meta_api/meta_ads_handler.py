@@ -7,6 +7,11 @@ from datetime import datetime, timedelta, timezone
 from google.cloud import bigquery
 from dotenv import load_dotenv, find_dotenv
 
+try:
+    from bq_query import run_query  # Cloud Run Job 이미지: /app/bq_query.py
+except ImportError:
+    from ngn_wep.dashboard.utils.bq_query import run_query
+
 # ✅ KST 시간대
 KST = timezone(timedelta(hours=9))
 
@@ -30,7 +35,7 @@ def get_account_list():
         SELECT company_name, meta_acc_id AS id, meta_acc_name AS name
         FROM `{PROJECT_ID}.{DATASET_ID}.metaAds_acc`
     """
-    return [dict(row) for row in client.query(query).result()]
+    return [dict(row) for row in run_query(client, query, service="meta_ads_handler")]
 
 # ✅ 액션 값 추출
 def extract_first_match(actions, types):
@@ -210,7 +215,7 @@ def merge_into_main_table(temp_table_id, target_date=None):
                 S.purchases, S.purchase_value, S.shared_purchase_value, S.ad_status, S.updated_at
             )
     """
-    client.query(query).result()
+    run_query(client, query, service="meta_ads_handler")
     logging.info("🔁 Merged into main table")
 
 # ✅ 임시 테이블 제거
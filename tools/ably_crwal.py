@@ -7,8 +7,12 @@ import json
 import random
 import csv
 import re
+import base64
+import threading
 import requests
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timezone, timedelta
+from requests.adapters import HTTPAdapter
 from google.cloud import bigquery
 from google.cloud import storage
 from selenium import webdriver
@@ -26,6 +30,36 @@ GCS_PREFIX = os.environ.get("GCS_PREFIX", "ably_best")
 # KST 시간대 설정
 KST = timezone(timedelta(hours=9))
 
+# 수집 설정
+ABLY_API_URL = 'https://api.a-bly.com/api/v2/screens/CATEGORY_DEPARTMENT/'
+ABLY_MAX_ITEMS = 100
+ABLY_CATEGORY_CONCURRENCY = int(os.environ.get("ABLY_CATEGORY_CONCURRENCY", "4"))  # 동시 수집 카테고리 수
+ABLY_CATEGORY_RETRIES = int(os.environ.get("ABLY_CATEGORY_RETRIES", "2"))  # 실패한 카테고리만 재시도
+
+# 인증 토큰 캐시 (실행 간 재사용, 공개 버킷이 아닌 비공개 버킷에 저장)
+ABLY_TOKEN_CACHE_BUCKET = os.environ.get("ABLY_TOKEN_CACHE_BUCKET", "winged-precept-443218-v8.appspot.com")
+ABLY_TOKEN_CACHE_BLOB = os.environ.get("ABLY_TOKEN_CACHE_BLOB", "ably_best/_cache/anonymous_token.json")
+ABLY_TOKEN_TTL_SEC = int(os.environ.get("ABLY_TOKEN_TTL_SEC", str(6 * 3600)))  # 토큰에서 만료 시각을 읽을 수 없을 때 사용
+
+ABLY_HEADERS = {
+    'accept': 'application/json, text/plain, */*',
+    'x-device-type': 'PCWeb',
+    'x-web-type': 'Web',
+    'user-agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/143.0.0.0 Safari/537.36',
+    'referer': 'https://m.a-bly.com/',
+    'origin': 'https://m.a-bly.com'
+}
+
+CATEGORIES = [
+    {"name": "팬츠", "id": "174", "sort_param": "eyJsIjogIkRlcGFydG1lbnRDYXRlZ29yeVJlYWx0aW1lUmFua0dlbmVyYXRvciIsICJwIjogeyJkZXBhcnRtZW50X3R5cGUiOiAiQ0FURUdPUlkiLCAiY2F0ZWdvcnlfc25vIjogMTc0fSwgImQiOiAiQ0FURUdPUlkiLCAicHJldmlvdXNfc2NyZWVuX25hbWUiOiAiQ0xPVEhJTkdfQ0FURUdPUllfREVQQVJUTUVOVCIsICJjYXRlZ29yeV9zbm8iOiAxNzR9"},
+    {"name": "원피스/세트", "id": "10", "sort_param": "eyJsIjogIkRlcGFydG1lbnRDYXRlZ29yeVJlYWx0aW1lUmFua0dlbmVyYXRvciIsICJwIjogeyJkZXBhcnRtZW50X3R5cGUiOiAiQ0FURUdPUlkiLCAiY2F0ZWdvcnlfc25vIjogMTB9LCAiZCI6ICJDQVRFR09SWSIsICJwcmV2aW91c19zY3JlZW5fbmFtZSI6ICJDTE9USElOR19DQVRFR09SWV9ERVBBUlRNRU5UIiwgImNhdGVnb3J5X3NubyI6IDEwfQ=="},
+    {"name": "스커트", "id": "203", "sort_param": "eyJsIjogIkRlcGFydG1lbnRDYXRlZ29yeVJlYWx0aW1lUmFua0dlbmVyYXRvciIsICJwIjogeyJkZXBhcnRtZW50X3R5cGUiOiAiQ0FURUdPUlkiLCAiY2F0ZWdvcnlfc25vIjogMjAzfSwgImQiOiAiQ0FURUdPUlkiLCAicHJldmlvdXNfc2NyZWVuX25hbWUiOiAiQ0xPVEhJTkdfQ0FURUdPUllfREVQQVJUTUVOVCIsICJjYXRlZ29yeV9zbm8iOiAyMDN9"},
+    {"name": "상의", "id": "8", "sort_param": "eyJsIjogIkRlcGFydG1lbnRDYXRlZ29yeVJlYWx0aW1lUmFua0dlbmVyYXRvciIsICJwIjogeyJkZXBhcnRtZW50X3R5cGUiOiAiQ0FURUdPUlkiLCAiY2F0ZWdvcnlfc25vIjogOH0sICJkIjogIkNBVEVHT1JZIiwgInByZXZpb3VzX3NjcmVlbl9uYW1lIjogIkNMT1RISU5HX0NBVEVHT1JZX0RFUEFSVE1FTlQiLCAiY2F0ZWdvcnlfc25vIjogOH0="},
+    {"name": "트레이닝", "id": "517", "sort_param": "eyJsIjogIkRlcGFydG1lbnRDYXRlZ29yeVJlYWx0aW1lUmFua0dlbmVyYXRvciIsICJwIjogeyJkZXBhcnRtZW50X3R5cGUiOiAiQ0FURUdPUlkiLCAiY2F0ZWdvcnlfc25vIjogNTE3fSwgImQiOiAiQ0FURUdPUlkiLCAicHJldmlvdXNfc2NyZWVuX25hbWUiOiAiQ0xPVEhJTkdfQ0FURUdPUllfREVQQVJUTUVOVCIsICJjYXRlZ29yeV9zbm8iOiA1MTd9"},
+    {"name": "비치웨어", "id": "467", "sort_param": "eyJsIjogIkRlcGFydG1lbnRDYXRlZ29yeVJlYWx0aW1lUmFua0dlbmVyYXRvciIsICJwIjogeyJkZXBhcnRtZW50X3R5cGUiOiAiQ0FURUdPUlkiLCAiY2F0ZWdvcnlfc25vIjogNDY3fSwgImQiOiAiQ0FURUdPUlkiLCAicHJldmlvdXNfc2NyZWVuX25hbWUiOiAiQ0xPVEhJTkdfQ0FURUdPUllfREVQQVJUTUVOVCIsICJjYXRlZ29yeV9zbm8iOiA0Njd9"},
+    {"name": "아우터", "id": "7", "sort_param": "eyJsIjogIkRlcGFydG1lbnRDYXRlZ29yeVJlYWx0aW1lUmFua0dlbmVyYXRvciIsICJwIjogeyJkZXBhcnRtZW50X3R5cGUiOiAiQ0FURUdPUlkiLCAiY2F0ZWdvcnlfc25vIjogN30sICJkIjogIkNBVEVHT1JZIiwgInByZXZpb3VzX3NjcmVlbl9uYW1lIjogIkNMT1RISU5HX0NBVEVHT1JZX0RFUEFSVE1FTlQiLCAiY2F0ZWdvcnlfc25vIjogN30="},
+]
+
 # =============================================================================
 # 2. 유틸리티 함수
 # =============================================================================
@@ -64,21 +98,21 @@ def clean_product_name(name):
 def bq_table_fqn():
     return f"{PROJECT_ID}.{DATASET_ID}.{TABLE_ID}"
 
-def bq_run_already_loaded(bq, run_id):
+def bq_loaded_categories(bq, run_id):
     """
-    BigQuery에 이미 같은 run_id가 있는지 확인 (중복 적재 방지)
+    BigQuery에 같은 run_id로 이미 적재된 카테고리 목록 (중복 적재 방지)
+    카테고리 단위로 적재하므로 중간에 실패한 실행은 남은 카테고리만 다시 수집
     """
     sql = f"""
-    SELECT 1
+    SELECT DISTINCT category_medium
     FROM `{bq_table_fqn()}`
     WHERE run_id = @run_id
-    LIMIT 1
     """
     job_config = bigquery.QueryJobConfig(
         query_parameters=[bigquery.ScalarQueryParameter("run_id", "STRING", run_id)]
     )
     job = bq.query(sql, job_config=job_config)
-    return len(list(job.result())) > 0
+    return {row.category_medium for row in job.result()}
 
 def upload_to_gcs(local_path, bucket_name, blob_path):
     client = storage.Client(project=PROJECT_ID)
@@ -87,11 +121,15 @@ def upload_to_gcs(local_path, bucket_name, blob_path):
     blob.upload_from_filename(local_path)
     return f"gs://{bucket_name}/{blob_path}"
 
-def bq_insert_rows(bq, rows):
-    table_ref = bq.dataset(DATASET_ID).table(TABLE_ID)
-    errors = bq.insert_rows_json(table_ref, rows)
-    if errors:
-        raise RuntimeError(f"BigQuery insert errors: {errors}")
+def bq_load_rows(bq, rows, schema):
+    """카테고리 단위 load job 적재 (스트리밍 insert 대신 무료 배치 load)"""
+    job_config = bigquery.LoadJobConfig(
+        schema=schema,
+        source_format=bigquery.SourceFormat.NEWLINE_DELIMITED_JSON,
+        write_disposition=bigquery.WriteDisposition.WRITE_APPEND,
+    )
+    job = bq.load_table_from_json(rows, bq_table_fqn(), job_config=job_config)
+    job.result()
 
 # =============================================================================
 # 3. [보안 우회] 브라우저 네트워크 감청으로 '진짜 토큰' 획득
@@ -147,6 +185,82 @@ def get_real_token_from_browser():
         if driver: driver.quit()
     return target_token
 
+def _token_expires_at(token, fetched_at):
+    """토큰 만료 시각 (JWT면 exp - 60초, 아니면 획득 시각 + ABLY_TOKEN_TTL_SEC)"""
+    try:
+        payload = token.split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+        exp = json.loads(base64.urlsafe_b64decode(payload)).get("exp")
+        if exp:
+            return float(exp) - 60
+    except Exception:
+        pass
+    return fetched_at + ABLY_TOKEN_TTL_SEC
+
+def _token_cache_blob():
+    if not ABLY_TOKEN_CACHE_BUCKET:
+        return None
+    client = storage.Client(project=PROJECT_ID)
+    return client.bucket(ABLY_TOKEN_CACHE_BUCKET).blob(ABLY_TOKEN_CACHE_BLOB)
+
+def load_cached_token():
+    """이전 실행에서 저장한 토큰 (만료 전일 때만)"""
+    try:
+        blob = _token_cache_blob()
+        if blob is None or not blob.exists():
+            return None
+        cached = json.loads(blob.download_as_text())
+        if cached.get("token") and cached.get("expires_at", 0) > time.time():
+            return cached["token"]
+    except Exception as e:
+        print(f"⚠️ 토큰 캐시 조회 실패: {e}")
+    return None
+
+def save_cached_token(token):
+    try:
+        blob = _token_cache_blob()
+        if blob is None:
+            return
+        now = time.time()
+        payload = {"token": token, "fetched_at": now, "expires_at": _token_expires_at(token, now)}
+        blob.upload_from_string(json.dumps(payload), content_type="application/json")
+    except Exception as e:
+        print(f"⚠️ 토큰 캐시 저장 실패: {e}")
+
+class AnonymousTokenProvider:
+    """
+    x-anonymous-token 공유 (캐시 → 없거나 만료면 브라우저로 발급)
+    여러 카테고리 워커가 동시에 401/403을 받아도 브라우저 재발급은 한 번만 실행
+    """
+
+    def __init__(self):
+        self._token = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        with self._lock:
+            if self._token is None:
+                self._token = load_cached_token()
+                if self._token:
+                    print("✅ [캐시] 이전 실행의 인증 토큰을 재사용합니다.")
+                else:
+                    self._token = self._issue()
+            return self._token
+
+    def refresh(self, stale_token):
+        with self._lock:
+            # 다른 워커가 이미 재발급했으면 그 토큰을 그대로 사용
+            if self._token == stale_token:
+                print("🔄 인증 토큰이 거부되어 다시 발급합니다.")
+                self._token = self._issue()
+            return self._token
+
+    def _issue(self):
+        token = get_real_token_from_browser()
+        if token:
+            save_cached_token(token)
+        return token
+
 # =============================================================================
 # 4. [데이터 파싱]
 # =============================================================================
@@ -208,7 +322,87 @@ def parse_two_col_list(json_data, category_name, collected_at, run_id, period_ty
     return items
 
 # =============================================================================
-# 5. [메인 로직]
+# 5. [카테고리 수집]
+# =============================================================================
+class CategoryCrawlError(Exception):
+    """카테고리 수집 실패 (해당 카테고리만 재시도, partial에 실패 전까지 수집한 행)"""
+
+    def __init__(self, message, partial):
+        super().__init__(message)
+        self.partial = partial
+
+def crawl_category(session, tokens, cat, collected_at, run_id, period_type):
+    """카테고리 1개 수집 (최대 ABLY_MAX_ITEMS개, 요청 실패 시 CategoryCrawlError)"""
+    cat_items = []
+    params = {'next_token': cat['sort_param'], 'category_list[]': cat['id'], 'sorting_type': 'POPULAR'}
+    page_count = 0
+
+    while len(cat_items) < ABLY_MAX_ITEMS:
+        page_count += 1
+        token = tokens.get()
+        if not token:
+            raise CategoryCrawlError("인증 토큰 없음", cat_items)
+
+        try:
+            headers = dict(ABLY_HEADERS, **{'x-anonymous-token': token})
+            response = session.get(ABLY_API_URL, params=params, headers=headers, timeout=10)
+        except requests.RequestException as e:
+            raise CategoryCrawlError(f"요청 오류: {e}", cat_items)
+
+        if response.status_code in (401, 403):
+            tokens.refresh(token)
+            raise CategoryCrawlError(f"인증 실패 (Code: {response.status_code})", cat_items)
+        if response.status_code != 200:
+            raise CategoryCrawlError(f"요청 실패 (Code: {response.status_code})", cat_items)
+
+        data = response.json()
+        new_items = parse_two_col_list(data, cat['name'], collected_at, run_id, period_type)
+
+        if not new_items:
+            print(f"   ⚠️ [{cat['name']}] 더 이상 수집할 아이템이 없습니다.")
+            break
+
+        # 수집된 아이템을 100개까지 추가
+        for item in new_items:
+            if len(cat_items) >= ABLY_MAX_ITEMS:
+                break
+            item['rank'] = len(cat_items) + 1  # 순위 부여
+            cat_items.append(item)
+
+        print(f"   📊 [{cat['name']}] 현재 수집: {len(cat_items)}/{ABLY_MAX_ITEMS}개 (페이지 {page_count})")
+
+        # 100개를 채웠으면 종료
+        if len(cat_items) >= ABLY_MAX_ITEMS:
+            break
+
+        # 다음 페이지 토큰 확인
+        next_tk = data.get('next_token')
+        if next_tk:
+            params['next_token'] = next_tk
+            time.sleep(random.uniform(0.5, 1))
+        else:
+            print(f"   ⚠️ [{cat['name']}] 다음 페이지 토큰이 없습니다. 수집 종료.")
+            break
+
+    return cat_items
+
+def crawl_category_with_retry(session, tokens, cat, collected_at, run_id, period_type):
+    """실패한 카테고리만 처음부터 재시도 (모두 실패하면 마지막 시도의 부분 결과 반환)"""
+    partial = []
+    for attempt in range(ABLY_CATEGORY_RETRIES + 1):
+        try:
+            return crawl_category(session, tokens, cat, collected_at, run_id, period_type)
+        except CategoryCrawlError as e:
+            partial = e.partial
+            print(f"   ⚠️ [{cat['name']}] 수집 실패 ({attempt + 1}/{ABLY_CATEGORY_RETRIES + 1}): {e}")
+            if attempt < ABLY_CATEGORY_RETRIES:
+                time.sleep(2 ** attempt + random.uniform(0, 1))
+    if partial:
+        print(f"   ⚠️ [{cat['name']}] 재시도 모두 실패, 부분 수집 결과 {len(partial)}개 사용")
+    return partial
+
+# =============================================================================
+# 6. [메인 로직]
 # =============================================================================
 def main():
     # 1. 실행 ID 생성 (주간 기준)
@@ -221,96 +415,59 @@ def main():
     print(f"[INFO] run_id: {run_id}")
     print(f"[INFO] collected_at: {collected_at}")
 
-    # 2. BigQuery 중복 체크
+    # 2. BigQuery 중복 체크 (카테고리 단위)
     bq = bigquery.Client(project=PROJECT_ID)
-    if bq_run_already_loaded(bq, run_id):
+    loaded_categories = bq_loaded_categories(bq, run_id)
+    pending = [cat for cat in CATEGORIES if cat['name'] not in loaded_categories]
+    if not pending:
         print(f"⏭️ [SKIP] 이미 적재된 run_id 입니다: {run_id}")
         return
+    if loaded_categories:
+        print(f"[INFO] 이미 적재된 카테고리 {len(loaded_categories)}개 제외, {len(pending)}개 수집")
 
-    # 3. 토큰 획득
-    auth_token = get_real_token_from_browser()
-    if not auth_token:
+    # 3. 토큰 획득 (캐시 우선)
+    tokens = AnonymousTokenProvider()
+    if not tokens.get():
         print("❌ 토큰을 찾지 못해 종료합니다.")
         return
 
-    # 4. 데이터 수집
-    categories = [
-        {"name": "팬츠", "id": "174", "sort_param": "eyJsIjogIkRlcGFydG1lbnRDYXRlZ29yeVJlYWx0aW1lUmFua0dlbmVyYXRvciIsICJwIjogeyJkZXBhcnRtZW50X3R5cGUiOiAiQ0FURUdPUlkiLCAiY2F0ZWdvcnlfc25vIjogMTc0fSwgImQiOiAiQ0FURUdPUlkiLCAicHJldmlvdXNfc2NyZWVuX25hbWUiOiAiQ0xPVEhJTkdfQ0FURUdPUllfREVQQVJUTUVOVCIsICJjYXRlZ29yeV9zbm8iOiAxNzR9"},
-        {"name": "원피스/세트", "id": "10", "sort_param": "eyJsIjogIkRlcGFydG1lbnRDYXRlZ29yeVJlYWx0aW1lUmFua0dlbmVyYXRvciIsICJwIjogeyJkZXBhcnRtZW50X3R5cGUiOiAiQ0FURUdPUlkiLCAiY2F0ZWdvcnlfc25vIjogMTB9LCAiZCI6ICJDQVRFR09SWSIsICJwcmV2aW91c19zY3JlZW5fbmFtZSI6ICJDTE9USElOR19DQVRFR09SWV9ERVBBUlRNRU5UIiwgImNhdGVnb3J5X3NubyI6IDEwfQ=="},
-        {"name": "스커트", "id": "203", "sort_param": "eyJsIjogIkRlcGFydG1lbnRDYXRlZ29yeVJlYWx0aW1lUmFua0dlbmVyYXRvciIsICJwIjogeyJkZXBhcnRtZW50X3R5cGUiOiAiQ0FURUdPUlkiLCAiY2F0ZWdvcnlfc25vIjogMjAzfSwgImQiOiAiQ0FURUdPUlkiLCAicHJldmlvdXNfc2NyZWVuX25hbWUiOiAiQ0xPVEhJTkdfQ0FURUdPUllfREVQQVJUTUVOVCIsICJjYXRlZ29yeV9zbm8iOiAyMDN9"},
-        {"name": "상의", "id": "8", "sort_param": "eyJsIjogIkRlcGFydG1lbnRDYXRlZ29yeVJlYWx0aW1lUmFua0dlbmVyYXRvciIsICJwIjogeyJkZXBhcnRtZW50X3R5cGUiOiAiQ0FURUdPUlkiLCAiY2F0ZWdvcnlfc25vIjogOH0sICJkIjogIkNBVEVHT1JZIiwgInByZXZpb3VzX3NjcmVlbl9uYW1lIjogIkNMT1RISU5HX0NBVEVHT1JZX0RFUEFSVE1FTlQiLCAiY2F0ZWdvcnlfc25vIjogOH0="},
-        {"name": "트레이닝", "id": "517", "sort_param": "eyJsIjogIkRlcGFydG1lbnRDYXRlZ29yeVJlYWx0aW1lUmFua0dlbmVyYXRvciIsICJwIjogeyJkZXBhcnRtZW50X3R5cGUiOiAiQ0FURUdPUlkiLCAiY2F0ZWdvcnlfc25vIjogNTE3fSwgImQiOiAiQ0FURUdPUlkiLCAicHJldmlvdXNfc2NyZWVuX25hbWUiOiAiQ0xPVEhJTkdfQ0FURUdPUllfREVQQVJUTUVOVCIsICJjYXRlZ29yeV9zbm8iOiA1MTd9"},
-        {"name": "비치웨어", "id": "467", "sort_param": "eyJsIjogIkRlcGFydG1lbnRDYXRlZ29yeVJlYWx0aW1lUmFua0dlbmVyYXRvciIsICJwIjogeyJkZXBhcnRtZW50X3R5cGUiOiAiQ0FURUdPUlkiLCAiY2F0ZWdvcnlfc25vIjogNDY3fSwgImQiOiAiQ0FURUdPUlkiLCAicHJldmlvdXNfc2NyZWVuX25hbWUiOiAiQ0xPVEhJTkdfQ0FURUdPUllfREVQQVJUTUVOVCIsICJjYXRlZ29yeV9zbm8iOiA0Njd9"},
-        {"name": "아우터", "id": "7", "sort_param": "eyJsIjogIkRlcGFydG1lbnRDYXRlZ29yeVJlYWx0aW1lUmFua0dlbmVyYXRvciIsICJwIjogeyJkZXBhcnRtZW50X3R5cGUiOiAiQ0FURUdPUlkiLCAiY2F0ZWdvcnlfc25vIjogN30sICJkIjogIkNBVEVHT1JZIiwgInByZXZpb3VzX3NjcmVlbl9uYW1lIjogIkNMT1RISU5HX0NBVEVHT1JZX0RFUEFSVE1FTlQiLCAiY2F0ZWdvcnlfc25vIjogN30="},
-    ]
-
-    headers = {
-        'accept': 'application/json, text/plain, */*',
-        'x-anonymous-token': auth_token,
-        'x-device-type': 'PCWeb',
-        'x-web-type': 'Web',
-        'user-agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/143.0.0.0 Safari/537.36',
-        'referer': 'https://m.a-bly.com/',
-        'origin': 'https://m.a-bly.com'
-    }
+    # 4. 데이터 수집 (카테고리 병렬) → 끝난 카테고리부터 바로 BigQuery load
+    session = requests.Session()
+    session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=max(ABLY_CATEGORY_CONCURRENCY, 1)))
+    schema = bq.get_table(bq_table_fqn()).schema
 
     all_results = []
-    
-    print("\n🚀 [2단계] 고속 데이터 수집 시작...")
+    failed_categories = []
 
-    for cat in categories:
-        print(f"\n📂 [{cat['name']}] 카테고리 수집 중...")
-        cat_items = []
-        params = {'next_token': cat['sort_param'], 'category_list[]': cat['id'], 'sorting_type': 'POPULAR'}
-        max_items = 100
-        page_count = 0
+    print(f"\n🚀 [2단계] 고속 데이터 수집 시작... (카테고리 {len(pending)}개, 동시 {ABLY_CATEGORY_CONCURRENCY}개)")
 
-        while len(cat_items) < max_items:
-            page_count += 1
+    with ThreadPoolExecutor(max_workers=max(1, min(ABLY_CATEGORY_CONCURRENCY, len(pending)))) as executor:
+        futures = {
+            executor.submit(crawl_category_with_retry, session, tokens, cat, collected_at, run_id, period_type): cat
+            for cat in pending
+        }
+        for future in as_completed(futures):
+            cat = futures[future]
             try:
-                url = 'https://api.a-bly.com/api/v2/screens/CATEGORY_DEPARTMENT/'
-                response = requests.get(url, params=params, headers=headers, timeout=10)
-                if response.status_code != 200:
-                    print(f"   ❌ 요청 실패 (Code: {response.status_code})")
-                    break
-                
-                data = response.json()
-                new_items = parse_two_col_list(data, cat['name'], collected_at, run_id, period_type)
-                
-                if not new_items:
-                    print(f"   ⚠️ 더 이상 수집할 아이템이 없습니다.")
-                    break
-                
-                # 수집된 아이템을 100개까지 추가
-                for item in new_items:
-                    if len(cat_items) >= max_items:
-                        break
-                    item['rank'] = len(cat_items) + 1  # 순위 부여
-                    cat_items.append(item)
-                
-                print(f"   📊 현재 수집: {len(cat_items)}/{max_items}개 (페이지 {page_count})")
-                
-                # 100개를 채웠으면 종료
-                if len(cat_items) >= max_items:
-                    print(f"   ✅ 목표 수집량 달성: {len(cat_items)}개")
-                    break
-                
-                # 다음 페이지 토큰 확인
-                next_tk = data.get('next_token')
-                if next_tk:
-                    params['next_token'] = next_tk
-                    time.sleep(random.uniform(0.5, 1))
-                else:
-                    print(f"   ⚠️ 다음 페이지 토큰이 없습니다. 수집 종료.")
-                    break
-                    
+                cat_items = future.result()
             except Exception as e:
-                print(f"   ⚠️ 에러: {e}")
-                break
-        
-        print(f"   ✅ [{cat['name']}] 최종 수집: {len(cat_items)}개")
-        all_results.extend(cat_items)
-        time.sleep(1)
+                print(f"   ❌ [{cat['name']}] 수집 중 예외: {e}")
+                cat_items = []
+
+            if not cat_items:
+                failed_categories.append(cat['name'])
+                continue
+
+            try:
+                bq_load_rows(bq, cat_items, schema)
+                print(f"   ✅ [{cat['name']}] 최종 수집 {len(cat_items)}개 → BigQuery 적재 완료")
+            except Exception as e:
+                print(f"   ❌ [{cat['name']}] BigQuery 적재 실패: {e}")
+                failed_categories.append(cat['name'])
+            all_results.extend(cat_items)
+
+    if failed_categories:
+        print(f"⚠️ 수집/적재 실패 카테고리: {failed_categories} (다시 실행하면 해당 카테고리만 수집)")
 
     if not all_results:
         print("❌ 수집된 데이터가 없습니다.")
@@ -328,7 +485,7 @@ def main():
     print(f"✅ 로컬 JSON 저장 완료: {json_path}")
     print(f"   총 수집 건수: {len(all_results)}")
 
-    # 6. GCS 업로드
+    # 6. GCS 업로드 (원본 보관)
     try:
         gcs_path = f"{GCS_PREFIX}/{now.strftime('%Y-%m-%d')}/{os.path.basename(json_path)}"
         upload_to_gcs(json_path, GCS_BUCKET, gcs_path)
@@ -336,12 +493,5 @@ def main():
     except Exception as e:
         print(f"⚠️ GCS 업로드 실패: {e}")
 
-    # 7. BigQuery 적재
-    try:
-        bq_insert_rows(bq, all_results)
-        print(f"✅ BigQuery 적재 완료: {len(all_results)}건")
-    except Exception as e:
-        print(f"❌ BigQuery 적재 실패: {e}")
-
 if __name__ == "__main__":
     main()
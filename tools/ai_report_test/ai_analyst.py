@@ -10,7 +10,12 @@ import sys
 import json
 import gzip
 import re
+import time
+import hashlib
+import threading
 import traceback
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from contextlib import contextmanager
 from typing import Dict, Optional, List, Any
 from datetime import datetime
 
@@ -74,6 +79,13 @@ except ImportError:
     print("   설치: pip install google-cloud-storage", file=sys.stderr)
     storage = None
 
+try:
+    from tools.ai_report_test.snapshot_index import update_snapshot_index
+    from tools.ai_report_test.section_cache import AI_SECTION_CACHE, get_section_cache, section_cache_key
+except ImportError:
+    from snapshot_index import update_snapshot_index
+    from section_cache import AI_SECTION_CACHE, get_section_cache, section_cache_key
+
 # 환경 변수
 # GEMINI_API_KEY 로드 (여러 소스에서 확인)
 GEMINI_API_KEY = os.environ.get("GEMINI_API_KEY")
@@ -91,6 +103,20 @@ if not GEMINI_API_KEY:
                     break
 
 GEMINI_MODEL = os.environ.get("GEMINI_MODEL", "gemini-2.5-flash")
+# API 엔드포인트 재지정 (로컬 가짜 모델 서버 테스트용, 예: http://127.0.0.1:8765 - fake_gemini_server.py)
+GEMINI_BASE_URL = os.environ.get("GEMINI_BASE_URL")
+
+# 섹션 병렬 실행 설정
+AI_SECTION_CONCURRENCY = int(os.environ.get("AI_SECTION_CONCURRENCY", "4"))   # 동시 호출 수 (1이면 순차)
+AI_REQUESTS_PER_MINUTE = int(os.environ.get("AI_REQUESTS_PER_MINUTE", "0"))   # 분당 호출 상한 (0이면 제한 없음)
+AI_PROMPT_CACHE = os.environ.get("AI_PROMPT_CACHE", "1") == "1"               # System Prompt 컨텍스트 캐시 사용
+AI_PROMPT_CACHE_TTL = int(os.environ.get("AI_PROMPT_CACHE_TTL", "900"))        # 캐시 유지 시간 (초)
+
+# 섹션 의존성: 섹션 7은 섹션 5 분석을, 섹션 9(종합)는 1~8 분석 결과(signals)를 프롬프트에 사용
+SECTION_DEPENDENCIES = {
+    7: (5,),
+    9: (1, 2, 3, 4, 5, 6, 7, 8),
+}
 
 # System Prompt는 별도 파일에서 로드하거나 함수 파라미터로 받음
 DEFAULT_SYSTEM_PROMPT_TEMPLATE = """
@@ -311,6 +337,9 @@ def upload_to_gcs(data: Dict, gcs_path: str) -> None:
         # 업로드
         blob.upload_from_string(upload_bytes, content_type="application/json")
         
+        # 월간 스냅샷 경로면 대시보드 경로 인덱스 갱신 (덮어쓰기로 generation이 바뀜)
+        update_snapshot_index(bucket, blob)
+        
         print(f"✅ [SUCCESS] GCS에 파일 업로드 완료: {gcs_path}", file=sys.stderr)
         
     except Exception as e:
@@ -1127,17 +1156,327 @@ def parse_section_9_cards(text: str) -> List[Dict]:
 # 메인 AI 분석 함수
 # ============================================
 
+# ============================================
+# 섹션 병렬 생성 (스케줄러 / 호출 제한 / 프롬프트 캐시)
+# ============================================
+
+class ModelCallLimiter:
+    """
+    모델 호출 동시 실행 수 + 분당 호출 수 제한
+    프로세스 전역으로 공유 → 월간 작업에서 여러 회사를 병렬 처리해도 합산으로 적용됨
+    """
+
+    def __init__(self, max_concurrent: int, requests_per_minute: int):
+        self._semaphore = threading.BoundedSemaphore(max(1, max_concurrent))
+        self._interval = 60.0 / requests_per_minute if requests_per_minute > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next_start = 0.0
+
+    @contextmanager
+    def slot(self):
+        with self._semaphore:
+            if self._interval:
+                # 호출 시작 시각을 interval 간격으로 예약 (토큰 1개짜리 버킷)
+                with self._lock:
+                    now = time.monotonic()
+                    wait_sec = self._next_start - now
+                    self._next_start = max(now, self._next_start) + self._interval
+                if wait_sec > 0:
+                    time.sleep(wait_sec)
+            yield
+
+
+_model_call_limiter: Optional[ModelCallLimiter] = None
+_model_call_limiter_lock = threading.Lock()
+
+
+def get_model_call_limiter() -> ModelCallLimiter:
+    """ModelCallLimiter 싱글톤 (AI_SECTION_CONCURRENCY / AI_REQUESTS_PER_MINUTE)"""
+    global _model_call_limiter
+    if _model_call_limiter is None:
+        with _model_call_limiter_lock:
+            if _model_call_limiter is None:
+                _model_call_limiter = ModelCallLimiter(AI_SECTION_CONCURRENCY, AI_REQUESTS_PER_MINUTE)
+    return _model_call_limiter
+
+
+# (api 키 해시, 모델, System Prompt 해시) -> (캐시 이름, 만료 시각)
+_prompt_caches: Dict[str, tuple] = {}
+_prompt_cache_lock = threading.Lock()
+
+
+def _prompt_cache_key(api_key: str, model: str, system_prompt_text: str) -> str:
+    raw = f"{hashlib.sha256(api_key.encode('utf-8')).hexdigest()[:16]}|{model}|{system_prompt_text}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def get_system_prompt_cache(client, api_key: str, system_prompt_text: str, model: str = GEMINI_MODEL) -> Optional[str]:
+    """
+    System Prompt를 Gemini 컨텍스트 캐시로 등록하고 캐시 이름 반환
+    - 섹션마다 같은 System Prompt를 다시 보내지 않고 캐시된 접두부를 재사용
+    - 같은 프로세스 안에서는 만료 전까지 재사용 (여러 회사 리포트가 공유)
+    - 실패하면 None (너무 짧은 프롬프트, 미지원 모델 등) → 기존처럼 프롬프트에 직접 포함
+    """
+    if not AI_PROMPT_CACHE:
+        return None
+
+    cache_key = _prompt_cache_key(api_key, model, system_prompt_text)
+    with _prompt_cache_lock:
+        cached = _prompt_caches.get(cache_key)
+        if cached and cached[1] > time.time():
+            return cached[0]
+
+        try:
+            # 기존 호출과 같은 구성(System Prompt + 섹션 프롬프트)이 되도록 system_instruction이 아닌 contents로 캐시
+            cache = client.caches.create(
+                model=model,
+                config=types.CreateCachedContentConfig(
+                    contents=[system_prompt_text],
+                    ttl=f"{AI_PROMPT_CACHE_TTL}s",
+                ),
+            )
+        except Exception as e:
+            print(f"⚠️ [WARN] System Prompt 캐시 생성 실패 (프롬프트에 직접 포함): {e}", file=sys.stderr)
+            _prompt_caches[cache_key] = (None, time.time() + AI_PROMPT_CACHE_TTL)
+            return None
+
+        # 만료 직전 호출이 캐시 없음으로 실패하지 않도록 여유를 둠
+        _prompt_caches[cache_key] = (cache.name, time.time() + AI_PROMPT_CACHE_TTL - 60)
+        print(f"✅ [INFO] System Prompt 캐시 생성: {cache.name} (TTL {AI_PROMPT_CACHE_TTL}s)", file=sys.stderr)
+        return cache.name
+
+
+def invalidate_system_prompt_cache(cache_name: str) -> None:
+    with _prompt_cache_lock:
+        for key, (name, _) in list(_prompt_caches.items()):
+            if name == cache_name:
+                del _prompt_caches[key]
+
+
+def _usage_from_response(response) -> Dict:
+    """응답의 토큰 사용량 (usage_metadata 없으면 0)"""
+    usage = getattr(response, "usage_metadata", None)
+
+    def count(field):
+        return int(getattr(usage, field, 0) or 0) if usage is not None else 0
+
+    return {
+        "prompt_tokens": count("prompt_token_count"),
+        "cached_tokens": count("cached_content_token_count"),
+        "output_tokens": count("candidates_token_count"),
+        "thinking_tokens": count("thoughts_token_count"),
+        "total_tokens": count("total_token_count"),
+    }
+
+
+def _log_section_data(section_num: int, snapshot_data: Dict) -> None:
+    """섹션별 입력 데이터 존재 여부 로깅"""
+    facts = safe_get_dict(snapshot_data, "facts", default={})
+    print(f"📊 [INFO] 섹션 {section_num} 데이터 확인:", file=sys.stderr)
+    if section_num == 1:
+        has_data = bool(safe_get_dict(facts, "mall_sales", "this", default={}))
+        print(f"   - mall_sales.this: {'✅ 있음' if has_data else '❌ 없음'}", file=sys.stderr)
+    elif section_num == 2:
+        has_data = bool(safe_get_dict(facts, "ga4_traffic", "this", default={}))
+        print(f"   - ga4_traffic.this: {'✅ 있음' if has_data else '❌ 없음'}", file=sys.stderr)
+    elif section_num == 3:
+        has_data = bool(safe_get_dict(facts, "ga4_traffic", "this", "totals", default={}))
+        print(f"   - ga4_traffic.this.totals: {'✅ 있음' if has_data else '❌ 없음'}", file=sys.stderr)
+    elif section_num == 4:
+        top_products = safe_get_list(facts, "products", "this", "rolling", "d30", "top_products_by_sales", default=[])
+        has_data = bool(top_products)
+        print(f"   - products.this.rolling.d30.top_products_by_sales: {'✅ 있음' if has_data else '❌ 없음'}", file=sys.stderr)
+        # 조회수 데이터 확인
+        if top_products:
+            products_with_views = [p for p in top_products if isinstance(p, dict) and p.get("product_views", 0) > 0]
+            print(f"   - product_views 데이터가 있는 상품 수: {len(products_with_views)}/{len(top_products)}", file=sys.stderr)
+            if len(products_with_views) == 0:
+                print(f"   ⚠️ [WARN] 조회수(product_views) 데이터가 없습니다. GA4 데이터 병합 로직을 확인하세요.", file=sys.stderr)
+            else:
+                sample_product = top_products[0]
+                print(f"   - 샘플 상품 조회수: {sample_product.get('product_views', 'N/A')}", file=sys.stderr)
+    elif section_num == 5:
+        has_data = bool(safe_get_list(facts, "29cm_best", "items", default=[]))
+        print(f"   - 29cm_best.items: {'✅ 있음' if has_data else '❌ 없음'}", file=sys.stderr)
+    elif section_num == 6:
+        has_data = bool(safe_get_dict(facts, "meta_ads_goals", "this", default={}))
+        print(f"   - meta_ads_goals.this: {'✅ 있음' if has_data else '❌ 없음'}", file=sys.stderr)
+    elif section_num == 7:
+        has_data = bool(safe_get_list(facts, "29cm_best", "items", default=[]))
+        print(f"   - 29cm_best.items: {'✅ 있음' if has_data else '❌ 없음'}", file=sys.stderr)
+    elif section_num == 8:
+        has_data = bool(safe_get_dict(facts, "forecast_next_month", default={}))
+        print(f"   - forecast_next_month: {'✅ 있음' if has_data else '❌ 없음'}", file=sys.stderr)
+    elif section_num == 9:
+        has_data = True  # 섹션 9는 종합 데이터이므로 항상 있음
+        print(f"   - 종합 데이터: ✅ 있음", file=sys.stderr)
+
+
+def _store_section_result(signals: Dict, section_num: int, raw_analysis_text: str) -> str:
+    """모델 응답 → 섹션 텍스트 정리 후 signals에 저장 (섹션 7 비교표, 섹션 9 카드 포함)"""
+    section_key = f"section_{section_num}_analysis"
+    
+    # 해당 섹션의 내용만 추출 (다른 섹션 언급 제거)
+    extracted_text = extract_section_content(raw_analysis_text, section_num)
+    
+    # 섹션 5: JSON 코드 블록 제거 (```json ... ```)
+    if section_num == 5:
+        extracted_text = re.sub(r'```json\s*\n.*?\n```', '', extracted_text, flags=re.DOTALL)
+        extracted_text = re.sub(r'```\s*\n.*?\n```', '', extracted_text, flags=re.DOTALL)
+        # 중괄호로 감싸진 JSON 객체 패턴도 제거 (단, 너무 짧은 것은 제외)
+        extracted_text = re.sub(r'\{(?:[^{}]|(?:\{[^{}]*\})){20,}\}', '', extracted_text, flags=re.DOTALL)
+    
+    # 구분선 제거 (---, === 등)
+    extracted_text = re.sub(r'^---+$', '', extracted_text, flags=re.MULTILINE)
+    extracted_text = re.sub(r'^===+$', '', extracted_text, flags=re.MULTILINE)
+    extracted_text = re.sub(r'\n\s*\n\s*\n+', '\n\n', extracted_text)  # 연속된 빈 줄 정리
+    extracted_text = extracted_text.strip()
+    
+    # 1000자 초과 시 WARN 로그만 남기고 그대로 사용
+    if len(extracted_text) > 1000:
+        print(f"⚠️ [WARN] 섹션 {section_num} 응답이 1000자 초과 ({len(extracted_text)}자). 그대로 사용합니다.", file=sys.stderr)
+    
+    analysis_text = extracted_text
+    
+    # 원본과 추출된 텍스트 길이 비교 로그
+    if len(analysis_text) < len(raw_analysis_text):
+        reduction_pct = (1 - len(analysis_text) / len(raw_analysis_text)) * 100
+        print(f"📝 [INFO] 섹션 {section_num} 내용 추출: {len(raw_analysis_text)}자 → {len(analysis_text)}자 ({reduction_pct:.1f}% 감소)", file=sys.stderr)
+    
+    # 섹션 7: JSON 추출 및 분석 텍스트 분리
+    if section_num == 7:
+        json_data = extract_json_from_section(analysis_text)
+        if json_data and isinstance(json_data, dict):
+            # 프론트엔드는 section_7_data를 직접 순회하므로 table_data만 저장
+            table_data = json_data.get("table_data", {})
+
+            # table_data가 없으면 JSON 자체가 테이블 데이터인지 확인
+            # 시스템 프롬프트가 직접 {"주력_아이템": {...}, ...} 형식으로 생성할 수 있음
+            expected_keys = {"주력_아이템", "평균_가격", "핵심_소재", "타겟_고객층", "가격대"}
+            if not table_data and any(key in json_data for key in expected_keys):
+                # JSON 자체가 테이블 데이터인 경우 (분석 텍스트 키 제외)
+                analysis_keys = {"market_analysis", "company_analysis", "card_summary"}
+                table_data = {k: v for k, v in json_data.items() if k not in analysis_keys}
+                print(f"📝 [INFO] 섹션 7 JSON이 직접 테이블 데이터 형식입니다", file=sys.stderr)
+
+            # table_data가 비어있지 않을 때만 설정
+            if table_data and isinstance(table_data, dict) and len(table_data) > 0:
+                signals["section_7_data"] = table_data
+                print(f"✅ [INFO] 섹션 7 JSON 비교표 추출 완료: {len(table_data)}개 항목", file=sys.stderr)
+            else:
+                print(f"⚠️ [WARN] 섹션 7 table_data가 비어있거나 유효하지 않음", file=sys.stderr)
+
+            # JSON에서 card_summary의 market_analysis와 company_analysis 추출
+            card_summary = json_data.get("card_summary", {})
+            if "market_analysis" in card_summary:
+                signals["section_7_analysis_1"] = card_summary["market_analysis"]
+                print(f"✅ [INFO] 섹션 7 시장 분석 추출 완료", file=sys.stderr)
+            elif "market_analysis" in json_data:  # 하위 호환성
+                signals["section_7_analysis_1"] = json_data["market_analysis"]
+                print(f"✅ [INFO] 섹션 7 시장 분석 추출 완료 (하위 호환)", file=sys.stderr)
+
+            if "company_analysis" in card_summary:
+                signals["section_7_analysis_2"] = card_summary["company_analysis"]
+                print(f"✅ [INFO] 섹션 7 자사몰 분석 추출 완료", file=sys.stderr)
+            elif "company_analysis" in json_data:  # 하위 호환성
+                signals["section_7_analysis_2"] = json_data["company_analysis"]
+                print(f"✅ [INFO] 섹션 7 자사몰 분석 추출 완료 (하위 호환)", file=sys.stderr)
+
+            # JSON에서 분석 텍스트를 찾지 못한 경우 텍스트 분리 시도
+            if "section_7_analysis_1" not in signals or "section_7_analysis_2" not in signals:
+                analysis_parts = split_section_7_analysis(analysis_text)
+                if len(analysis_parts) >= 2:
+                    if "section_7_analysis_1" not in signals:
+                        signals["section_7_analysis_1"] = analysis_parts[0]
+                    if "section_7_analysis_2" not in signals:
+                        signals["section_7_analysis_2"] = analysis_parts[1]
+                    print(f"📝 [INFO] 섹션 7 분석 텍스트 분리 (JSON 추출 후 fallback)", file=sys.stderr)
+                elif "section_7_analysis_1" not in signals:
+                    # JSON 블록만 제거한 텍스트를 첫 번째 분석으로 사용
+                    text_without_json = re.sub(r'```json\s*[\s\S]*?\s*```', '', analysis_text, flags=re.DOTALL)
+                    signals["section_7_analysis_1"] = text_without_json.strip()
+                    signals["section_7_analysis_2"] = ""
+                    print(f"📝 [INFO] 섹션 7 JSON 제거 후 분석 텍스트 저장", file=sys.stderr)
+        else:
+            # JSON 추출 실패 시 기존 방식으로 분리 시도
+            analysis_parts = split_section_7_analysis(analysis_text)
+            if len(analysis_parts) >= 2:
+                signals["section_7_analysis_1"] = analysis_parts[0]  # 29CM 시장 분석
+                signals["section_7_analysis_2"] = analysis_parts[1]  # 자사몰 분석
+                print(f"✅ [INFO] 섹션 7 분석 텍스트 분리 완료 (1: {len(analysis_parts[0])}자, 2: {len(analysis_parts[1])}자)", file=sys.stderr)
+            else:
+                # 분리 실패 시 전체를 첫 번째로 저장
+                signals["section_7_analysis_1"] = analysis_text
+                signals["section_7_analysis_2"] = ""
+                print(f"⚠️ [WARN] 섹션 7 분석 텍스트 분리 실패, 전체를 첫 번째로 저장", file=sys.stderr)
+        
+        # 기존 section_7_analysis는 제거하지 않고 유지 (하위 호환성)
+        signals[section_key] = analysis_text
+    
+    # 섹션 9: 카드 파싱 및 별도 저장
+    if section_num == 9:
+        cards = parse_section_9_cards(analysis_text)
+        if cards:
+            signals["section_9_cards"] = cards
+            print(f"✅ [INFO] 섹션 9 카드 파싱 완료: {len(cards)}개 카드", file=sys.stderr)
+    
+    # signals에 저장
+    signals[section_key] = analysis_text
+    
+    return analysis_text
+
+
+def schedule_sections(sections: List[int], run_section, max_workers: int) -> None:
+    """
+    섹션 의존성(SECTION_DEPENDENCIES)을 지키면서 독립 섹션은 동시에 실행
+    - 의존 섹션이 이번 요청에 없으면 기존 signals 값을 그대로 사용 (예: 섹션 9만 재생성)
+    - run_section(section_num)은 예외를 내부에서 처리해야 함
+    """
+    requested = set(sections)
+    pending = list(sections)
+    done = set()
+
+    if max_workers <= 1:
+        # 순차 실행: 요청 순서대로 실행하되 의존 섹션이 먼저 오도록 맞춤
+        while pending:
+            section_num = next(
+                n for n in pending
+                if all(d in done for d in SECTION_DEPENDENCIES.get(n, ()) if d in requested)
+            )
+            pending.remove(section_num)
+            run_section(section_num)
+            done.add(section_num)
+        return
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ai-section") as executor:
+        running = {}
+        while pending or running:
+            for section_num in list(pending):
+                deps = [d for d in SECTION_DEPENDENCIES.get(section_num, ()) if d in requested]
+                if all(d in done for d in deps):
+                    pending.remove(section_num)
+                    running[executor.submit(run_section, section_num)] = section_num
+
+            finished, _ = wait(list(running), return_when=FIRST_COMPLETED)
+            for future in finished:
+                future.result()
+                done.add(running.pop(future))
+
+
 def generate_ai_analysis(
     snapshot_data: Dict,
     system_prompt: Optional[str] = None,
     system_prompt_file: Optional[str] = None,
     sections: Optional[List[int]] = None,
     api_key: Optional[str] = None,
-    enable_prompt_logging: bool = True
+    enable_prompt_logging: bool = True,
+    model_client=None,
+    use_section_cache: Optional[bool] = None
 ) -> Dict:
     """
     스냅샷 데이터를 AI에게 분석시키고 결과를 signals 필드에 추가
     섹션별 개별 API 호출 방식으로 정확도 향상
+    독립 섹션은 동시에 호출하고 섹션 7/9는 의존 섹션 완료 후 실행 (SECTION_DEPENDENCIES)
     
     Args:
         snapshot_data: 스냅샷 JSON 데이터 (report_meta, facts, signals 포함)
@@ -1146,9 +1485,12 @@ def generate_ai_analysis(
         sections: 분석할 섹션 번호 리스트 (None이면 1-9 모두)
         api_key: Gemini API 키 (None이면 환경변수에서 로드)
         enable_prompt_logging: 프롬프트 로깅 활성화 여부
+        model_client: genai.Client 대체 객체 (테스트용, 지정 시 System Prompt 캐시 미사용)
+        use_section_cache: 섹션 결과 캐시 사용 여부 (None이면 AI_SECTION_CACHE 환경변수, False면 모든 섹션 재생성)
     
     Returns:
         signals 필드에 AI 분석 텍스트가 추가된 snapshot_data
+        (signals.ai_generation_stats에 섹션별 지연 시간/토큰 사용량 기록)
     """
     # google-genai 패키지 확인
     if genai is None or types is None:
@@ -1156,18 +1498,25 @@ def generate_ai_analysis(
     
     # API 키 확인
     api_key = api_key or GEMINI_API_KEY
-    if not api_key:
+    if not api_key and model_client is None:
         raise ValueError("GEMINI_API_KEY 환경변수가 설정되지 않았거나 api_key 파라미터가 필요합니다.")
 
-    # API 키 디버깅 (앞 8자, 뒤 4자만 표시)
-    masked_key = f"{api_key[:8]}...{api_key[-4:]}" if len(api_key) > 12 else "***"
-    print(f"🔑 [DEBUG] 사용 중인 API 키: {masked_key} (길이: {len(api_key)}자)", file=sys.stderr)
-    
-    # Google Gen AI SDK (v1.0+) Client 초기화
-    try:
-        client = genai.Client(api_key=api_key)
-    except Exception as e:
-        raise ImportError(f"google-genai 초기화 실패: {e}")
+    if model_client is not None:
+        client = model_client
+    else:
+        # API 키 디버깅 (앞 8자, 뒤 4자만 표시)
+        masked_key = f"{api_key[:8]}...{api_key[-4:]}" if len(api_key) > 12 else "***"
+        print(f"🔑 [DEBUG] 사용 중인 API 키: {masked_key} (길이: {len(api_key)}자)", file=sys.stderr)
+        
+        # Google Gen AI SDK (v1.0+) Client 초기화
+        try:
+            if GEMINI_BASE_URL:
+                print(f"🧪 [INFO] Gemini 엔드포인트 재지정: {GEMINI_BASE_URL}", file=sys.stderr)
+                client = genai.Client(api_key=api_key, http_options=types.HttpOptions(base_url=GEMINI_BASE_URL))
+            else:
+                client = genai.Client(api_key=api_key)
+        except Exception as e:
+            raise ImportError(f"google-genai 초기화 실패: {e}")
     
     # System Prompt 로드
     if system_prompt:
@@ -1188,56 +1537,32 @@ def generate_ai_analysis(
     if sections is None:
         sections = list(range(1, 10))
     
-    # 각 섹션별 개별 API 호출로 분석 수행
-    for section_num in sections:
+    # 섹션 병렬 실행: 호출 제한(프로세스 전역) + System Prompt 캐시 공유
+    limiter = get_model_call_limiter()
+    # System Prompt 캐시는 실제로 모델을 호출하는 섹션이 생길 때 생성 (섹션 결과가 모두 캐시에 있으면 생략)
+    use_prompt_cache = model_client is None
+    if use_section_cache is None:
+        use_section_cache = AI_SECTION_CACHE
+    section_cache = get_section_cache() if use_section_cache else None
+    signals_lock = threading.Lock()
+    section_stats = {}
+    started_at = time.perf_counter()
+    
+    def run_section(section_num: int) -> None:
+        nonlocal use_prompt_cache
         section_key = f"section_{section_num}_analysis"
+        stat = {"status": "error", "latency_sec": 0.0, "queue_sec": 0.0, "prompt_cache": False, "cache_hit": False}
+        queued_at = time.perf_counter()
         
         try:
             print(f"🤖 [INFO] 섹션 {section_num} AI 분석 시작...", file=sys.stderr)
             
-            # 섹션별 프롬프트 생성
-            section_prompt = build_section_prompt(section_num, snapshot_data)
+            # 섹션별 프롬프트 생성 (의존 섹션 결과가 signals에 반영된 뒤 실행됨)
+            with signals_lock:
+                section_prompt = build_section_prompt(section_num, snapshot_data)
             
             # 데이터 존재 여부 확인 및 로깅
-            facts = safe_get_dict(snapshot_data, "facts", default={})
-            print(f"📊 [INFO] 섹션 {section_num} 데이터 확인:", file=sys.stderr)
-            if section_num == 1:
-                has_data = bool(safe_get_dict(facts, "mall_sales", "this", default={}))
-                print(f"   - mall_sales.this: {'✅ 있음' if has_data else '❌ 없음'}", file=sys.stderr)
-            elif section_num == 2:
-                has_data = bool(safe_get_dict(facts, "ga4_traffic", "this", default={}))
-                print(f"   - ga4_traffic.this: {'✅ 있음' if has_data else '❌ 없음'}", file=sys.stderr)
-            elif section_num == 3:
-                has_data = bool(safe_get_dict(facts, "ga4_traffic", "this", "totals", default={}))
-                print(f"   - ga4_traffic.this.totals: {'✅ 있음' if has_data else '❌ 없음'}", file=sys.stderr)
-            elif section_num == 4:
-                top_products = safe_get_list(facts, "products", "this", "rolling", "d30", "top_products_by_sales", default=[])
-                has_data = bool(top_products)
-                print(f"   - products.this.rolling.d30.top_products_by_sales: {'✅ 있음' if has_data else '❌ 없음'}", file=sys.stderr)
-                # 조회수 데이터 확인
-                if top_products:
-                    products_with_views = [p for p in top_products if isinstance(p, dict) and p.get("product_views", 0) > 0]
-                    print(f"   - product_views 데이터가 있는 상품 수: {len(products_with_views)}/{len(top_products)}", file=sys.stderr)
-                    if len(products_with_views) == 0:
-                        print(f"   ⚠️ [WARN] 조회수(product_views) 데이터가 없습니다. GA4 데이터 병합 로직을 확인하세요.", file=sys.stderr)
-                    else:
-                        sample_product = top_products[0]
-                        print(f"   - 샘플 상품 조회수: {sample_product.get('product_views', 'N/A')}", file=sys.stderr)
-            elif section_num == 5:
-                has_data = bool(safe_get_list(facts, "29cm_best", "items", default=[]))
-                print(f"   - 29cm_best.items: {'✅ 있음' if has_data else '❌ 없음'}", file=sys.stderr)
-            elif section_num == 6:
-                has_data = bool(safe_get_dict(facts, "meta_ads_goals", "this", default={}))
-                print(f"   - meta_ads_goals.this: {'✅ 있음' if has_data else '❌ 없음'}", file=sys.stderr)
-            elif section_num == 7:
-                has_data = bool(safe_get_list(facts, "29cm_best", "items", default=[]))
-                print(f"   - 29cm_best.items: {'✅ 있음' if has_data else '❌ 없음'}", file=sys.stderr)
-            elif section_num == 8:
-                has_data = bool(safe_get_dict(facts, "forecast_next_month", default={}))
-                print(f"   - forecast_next_month: {'✅ 있음' if has_data else '❌ 없음'}", file=sys.stderr)
-            elif section_num == 9:
-                has_data = True  # 섹션 9는 종합 데이터이므로 항상 있음
-                print(f"   - 종합 데이터: ✅ 있음", file=sys.stderr)
+            _log_section_data(section_num, snapshot_data)
             
             # 전체 프롬프트 구성
             full_prompt = f"{system_prompt_text}\n\n{section_prompt}"
@@ -1250,128 +1575,64 @@ def generate_ai_analysis(
             # 섹션 5는 토큰 제한을 더 크게 설정 (경쟁 상품 리스트가 길어질 수 있음)
             max_tokens = 16384 if section_num == 5 else 8192
             
-            response = client.models.generate_content(
-                model=GEMINI_MODEL,
-                contents=full_prompt,
-                config=types.GenerateContentConfig(
-                    temperature=0.7,
-                    top_p=0.95,
-                    top_k=40,
-                    max_output_tokens=max_tokens  # 섹션 5는 16384, 나머지는 8192
-                )
-            )
-            
-            # 응답 텍스트 추출
-            raw_analysis_text = response.text.strip()
-            
-            # 해당 섹션의 내용만 추출 (다른 섹션 언급 제거)
-            extracted_text = extract_section_content(raw_analysis_text, section_num)
-            
-            # 섹션 5: JSON 코드 블록 제거 (```json ... ```)
-            if section_num == 5:
-                extracted_text = re.sub(r'```json\s*\n.*?\n```', '', extracted_text, flags=re.DOTALL)
-                extracted_text = re.sub(r'```\s*\n.*?\n```', '', extracted_text, flags=re.DOTALL)
-                # 중괄호로 감싸진 JSON 객체 패턴도 제거 (단, 너무 짧은 것은 제외)
-                extracted_text = re.sub(r'\{(?:[^{}]|(?:\{[^{}]*\})){20,}\}', '', extracted_text, flags=re.DOTALL)
-            
-            # 구분선 제거 (---, === 등)
-            extracted_text = re.sub(r'^---+$', '', extracted_text, flags=re.MULTILINE)
-            extracted_text = re.sub(r'^===+$', '', extracted_text, flags=re.MULTILINE)
-            extracted_text = re.sub(r'\n\s*\n\s*\n+', '\n\n', extracted_text)  # 연속된 빈 줄 정리
-            extracted_text = extracted_text.strip()
+            # 같은 입력(템플릿 버전/모델/프롬프트)으로 생성한 결과가 있으면 재사용 → 모델 호출 생략
+            generation_params = {"temperature": 0.7, "top_p": 0.95, "top_k": 40, "max_output_tokens": max_tokens}
+            result_key = section_cache_key(section_num, GEMINI_MODEL, generation_params, system_prompt_text, section_prompt)
+            cached_entry = section_cache.get(result_key) if section_cache is not None else None
             
-            # 1000자 초과 시 WARN 로그만 남기고 그대로 사용
-            if len(extracted_text) > 1000:
-                print(f"⚠️ [WARN] 섹션 {section_num} 응답이 1000자 초과 ({len(extracted_text)}자). 그대로 사용합니다.", file=sys.stderr)
-            
-            analysis_text = extracted_text
-            
-            # 원본과 추출된 텍스트 길이 비교 로그
-            if len(analysis_text) < len(raw_analysis_text):
-                reduction_pct = (1 - len(analysis_text) / len(raw_analysis_text)) * 100
-                print(f"📝 [INFO] 섹션 {section_num} 내용 추출: {len(raw_analysis_text)}자 → {len(analysis_text)}자 ({reduction_pct:.1f}% 감소)", file=sys.stderr)
-            
-            # 섹션 7: JSON 추출 및 분석 텍스트 분리
-            if section_num == 7:
-                json_data = extract_json_from_section(analysis_text)
-                if json_data and isinstance(json_data, dict):
-                    # 프론트엔드는 section_7_data를 직접 순회하므로 table_data만 저장
-                    table_data = json_data.get("table_data", {})
-
-                    # table_data가 없으면 JSON 자체가 테이블 데이터인지 확인
-                    # 시스템 프롬프트가 직접 {"주력_아이템": {...}, ...} 형식으로 생성할 수 있음
-                    expected_keys = {"주력_아이템", "평균_가격", "핵심_소재", "타겟_고객층", "가격대"}
-                    if not table_data and any(key in json_data for key in expected_keys):
-                        # JSON 자체가 테이블 데이터인 경우 (분석 텍스트 키 제외)
-                        analysis_keys = {"market_analysis", "company_analysis", "card_summary"}
-                        table_data = {k: v for k, v in json_data.items() if k not in analysis_keys}
-                        print(f"📝 [INFO] 섹션 7 JSON이 직접 테이블 데이터 형식입니다", file=sys.stderr)
-
-                    # table_data가 비어있지 않을 때만 설정
-                    if table_data and isinstance(table_data, dict) and len(table_data) > 0:
-                        signals["section_7_data"] = table_data
-                        print(f"✅ [INFO] 섹션 7 JSON 비교표 추출 완료: {len(table_data)}개 항목", file=sys.stderr)
-                    else:
-                        print(f"⚠️ [WARN] 섹션 7 table_data가 비어있거나 유효하지 않음", file=sys.stderr)
-
-                    # JSON에서 card_summary의 market_analysis와 company_analysis 추출
-                    card_summary = json_data.get("card_summary", {})
-                    if "market_analysis" in card_summary:
-                        signals["section_7_analysis_1"] = card_summary["market_analysis"]
-                        print(f"✅ [INFO] 섹션 7 시장 분석 추출 완료", file=sys.stderr)
-                    elif "market_analysis" in json_data:  # 하위 호환성
-                        signals["section_7_analysis_1"] = json_data["market_analysis"]
-                        print(f"✅ [INFO] 섹션 7 시장 분석 추출 완료 (하위 호환)", file=sys.stderr)
-
-                    if "company_analysis" in card_summary:
-                        signals["section_7_analysis_2"] = card_summary["company_analysis"]
-                        print(f"✅ [INFO] 섹션 7 자사몰 분석 추출 완료", file=sys.stderr)
-                    elif "company_analysis" in json_data:  # 하위 호환성
-                        signals["section_7_analysis_2"] = json_data["company_analysis"]
-                        print(f"✅ [INFO] 섹션 7 자사몰 분석 추출 완료 (하위 호환)", file=sys.stderr)
-
-                    # JSON에서 분석 텍스트를 찾지 못한 경우 텍스트 분리 시도
-                    if "section_7_analysis_1" not in signals or "section_7_analysis_2" not in signals:
-                        analysis_parts = split_section_7_analysis(analysis_text)
-                        if len(analysis_parts) >= 2:
-                            if "section_7_analysis_1" not in signals:
-                                signals["section_7_analysis_1"] = analysis_parts[0]
-                            if "section_7_analysis_2" not in signals:
-                                signals["section_7_analysis_2"] = analysis_parts[1]
-                            print(f"📝 [INFO] 섹션 7 분석 텍스트 분리 (JSON 추출 후 fallback)", file=sys.stderr)
-                        elif "section_7_analysis_1" not in signals:
-                            # JSON 블록만 제거한 텍스트를 첫 번째 분석으로 사용
-                            text_without_json = re.sub(r'```json\s*[\s\S]*?\s*```', '', analysis_text, flags=re.DOTALL)
-                            signals["section_7_analysis_1"] = text_without_json.strip()
-                            signals["section_7_analysis_2"] = ""
-                            print(f"📝 [INFO] 섹션 7 JSON 제거 후 분석 텍스트 저장", file=sys.stderr)
-                else:
-                    # JSON 추출 실패 시 기존 방식으로 분리 시도
-                    analysis_parts = split_section_7_analysis(analysis_text)
-                    if len(analysis_parts) >= 2:
-                        signals["section_7_analysis_1"] = analysis_parts[0]  # 29CM 시장 분석
-                        signals["section_7_analysis_2"] = analysis_parts[1]  # 자사몰 분석
-                        print(f"✅ [INFO] 섹션 7 분석 텍스트 분리 완료 (1: {len(analysis_parts[0])}자, 2: {len(analysis_parts[1])}자)", file=sys.stderr)
-                    else:
-                        # 분리 실패 시 전체를 첫 번째로 저장
-                        signals["section_7_analysis_1"] = analysis_text
-                        signals["section_7_analysis_2"] = ""
-                        print(f"⚠️ [WARN] 섹션 7 분석 텍스트 분리 실패, 전체를 첫 번째로 저장", file=sys.stderr)
-                
-                # 기존 section_7_analysis는 제거하지 않고 유지 (하위 호환성)
-                signals[section_key] = analysis_text
-            
-            # 섹션 9: 카드 파싱 및 별도 저장
-            if section_num == 9:
-                cards = parse_section_9_cards(analysis_text)
-                if cards:
-                    signals["section_9_cards"] = cards
-                    print(f"✅ [INFO] 섹션 9 카드 파싱 완료: {len(cards)}개 카드", file=sys.stderr)
+            if cached_entry is not None:
+                raw_analysis_text = cached_entry["raw_text"].strip()
+                stat["cache_hit"] = True
+                print(f"♻️ [INFO] 섹션 {section_num} 입력 변경 없음 - 캐시된 결과 사용 ({result_key[:12]})", file=sys.stderr)
+            else:
+                with limiter.slot():
+                    stat["queue_sec"] = round(time.perf_counter() - queued_at, 3)
+                    call_started = time.perf_counter()
+                    current_cache = get_system_prompt_cache(client, api_key, system_prompt_text) if use_prompt_cache else None
+                    try:
+                        response = client.models.generate_content(
+                            model=GEMINI_MODEL,
+                            contents=section_prompt if current_cache else full_prompt,
+                            config=types.GenerateContentConfig(
+                                temperature=0.7,
+                                top_p=0.95,
+                                top_k=40,
+                                max_output_tokens=max_tokens,  # 섹션 5는 16384, 나머지는 8192
+                                cached_content=current_cache,
+                            )
+                        )
+                        stat["prompt_cache"] = bool(current_cache)
+                    except Exception as cache_error:
+                        if not current_cache:
+                            raise
+                        # 캐시 만료/삭제 → 이후 섹션은 캐시 없이 전체 프롬프트로 호출
+                        print(f"⚠️ [WARN] 섹션 {section_num} 캐시 호출 실패, 전체 프롬프트로 재시도: {cache_error}", file=sys.stderr)
+                        invalidate_system_prompt_cache(current_cache)
+                        use_prompt_cache = False
+                        response = client.models.generate_content(
+                            model=GEMINI_MODEL,
+                            contents=full_prompt,
+                            config=types.GenerateContentConfig(
+                                temperature=0.7,
+                                top_p=0.95,
+                                top_k=40,
+                                max_output_tokens=max_tokens
+                            )
+                        )
+                    stat["latency_sec"] = round(time.perf_counter() - call_started, 3)
+                usage = _usage_from_response(response)
+                stat.update(usage)
+                raw_analysis_text = response.text.strip()
+                if section_cache is not None:
+                    section_cache.put(result_key, section_num, GEMINI_MODEL, raw_analysis_text, usage)
             
-            # signals에 저장
-            signals[section_key] = analysis_text
+            # signals에 저장 (캐시 결과도 현재 파싱 로직으로 다시 처리)
+            with signals_lock:
+                analysis_text = _store_section_result(signals, section_num, raw_analysis_text)
+            stat["status"] = "ok"
+            stat["chars"] = len(analysis_text)
             
-            print(f"✅ [SUCCESS] 섹션 {section_num} AI 분석 완료 ({len(analysis_text)}자)", file=sys.stderr)
+            print(f"✅ [SUCCESS] 섹션 {section_num} AI 분석 완료 ({len(analysis_text)}자, {stat['latency_sec']:.1f}s)", file=sys.stderr)
             
         except Exception as e:
             error_msg = f"섹션 {section_num} AI 분석 실패: {str(e)}"
@@ -1379,7 +1640,38 @@ def generate_ai_analysis(
             traceback.print_exc(file=sys.stderr)
             
             # 에러 발생 시 빈 문자열 또는 에러 메시지 저장
-            signals[section_key] = f"[AI 분석 오류: {error_msg}]"
+            with signals_lock:
+                signals[section_key] = f"[AI 분석 오류: {error_msg}]"
+            stat["error"] = str(e)
+        finally:
+            with signals_lock:
+                section_stats[str(section_num)] = stat
+    
+    schedule_sections(sections, run_section, AI_SECTION_CONCURRENCY)
+    
+    # 섹션별 지연/토큰 사용량 기록 (일부 섹션만 재생성한 경우 기존 기록에 덮어씀)
+    generation_stats = signals.get("ai_generation_stats") if isinstance(signals.get("ai_generation_stats"), dict) else {}
+    generation_stats.setdefault("sections", {}).update(section_stats)
+    token_fields = ("prompt_tokens", "cached_tokens", "output_tokens", "thinking_tokens", "total_tokens")
+    generation_stats.update({
+        "model": GEMINI_MODEL,
+        "generated_at": datetime.now().isoformat(),
+        "concurrency": AI_SECTION_CONCURRENCY,
+        "prompt_cache": any(stat.get("prompt_cache") for stat in section_stats.values()),
+        "cache_hits": sum(1 for stat in section_stats.values() if stat.get("cache_hit")),
+        "wall_sec": round(time.perf_counter() - started_at, 3),
+        "totals": {
+            field: sum(int(stat.get(field, 0)) for stat in generation_stats["sections"].values())
+            for field in token_fields
+        },
+    })
+    signals["ai_generation_stats"] = generation_stats
+    print(
+        f"⏱️ [TIMING] AI 분석 {len(sections)}개 섹션 {generation_stats['wall_sec']:.1f}s "
+        f"(섹션 합계 {sum(s.get('latency_sec', 0) for s in section_stats.values()):.1f}s, "
+        f"토큰 {generation_stats['totals']['total_tokens']}, 캐시 {generation_stats['totals']['cached_tokens']})",
+        file=sys.stderr,
+    )
     
     # signals 업데이트
     snapshot_data["signals"] = signals
@@ -1391,7 +1683,8 @@ def generate_ai_analysis_from_file(
     snapshot_file: str,
     output_file: Optional[str] = None,
     system_prompt_file: Optional[str] = None,
-    sections: Optional[List[int]] = None
+    sections: Optional[List[int]] = None,
+    use_section_cache: Optional[bool] = None
 ) -> Dict:
     """
     스냅샷 JSON 파일에서 읽어서 AI 분석 후 저장 (GCS 지원)
@@ -1401,6 +1694,7 @@ def generate_ai_analysis_from_file(
         output_file: 출력 파일 경로 (None이면 입력 파일에 덮어쓰기, 로컬 파일 또는 gs:// 경로)
         system_prompt_file: System Prompt 파일 경로
         sections: 분석할 섹션 번호 리스트
+        use_section_cache: 섹션 결과 캐시 사용 여부 (False면 입력이 같아도 모델 재호출)
     
     Returns:
         AI 분석이 추가된 snapshot_data
@@ -1418,7 +1712,8 @@ def generate_ai_analysis_from_file(
     snapshot_data = generate_ai_analysis(
         snapshot_data,
         system_prompt_file=system_prompt_file,
-        sections=sections
+        sections=sections,
+        use_section_cache=use_section_cache
     )
     
     # 결과 저장 (출력 경로 미지정 시 입력 파일 경로에 덮어쓰기)
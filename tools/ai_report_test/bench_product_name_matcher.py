@@ -0,0 +1,166 @@
+"""
+상품명 정규화 / 매칭 마이크로벤치마크
+
+- 합성 카탈로그 N개(Cafe24 상품명 형태)와 쿼리 N개(GA4 item_name 형태: [태그] 접두어, _옵션 접미어, 공백/대소문자 차이)
+- 비교 대상
+  1) 정규화: 기존 방식(문자열마다 re.sub + while 루프) vs 컴파일 규칙(단건) vs 컬럼 일괄(normalize_item_names)
+  2) 매칭: 정확 일치 join vs ProductNameIndex(정확 + bigram 유사도) vs 전체 쌍 비교(difflib, 표본 측정 후 N건 환산)
+
+사용법:
+  python3 tools/ai_report_test/bench_product_name_matcher.py            # 10k x 10k
+  BENCH_N=2000 python3 tools/ai_report_test/bench_product_name_matcher.py
+"""
+import os
+import re
+import sys
+import time
+import random
+import difflib
+
+try:
+    from tools.ai_report_test.product_name_matcher import (
+        normalize_item_name,
+        normalize_item_names,
+        ProductNameIndex,
+    )
+except ImportError:
+    from product_name_matcher import normalize_item_name, normalize_item_names, ProductNameIndex
+
+BENCH_N = int(os.environ.get("BENCH_N", 10_000))
+BENCH_SEED = int(os.environ.get("BENCH_SEED", 42))
+BENCH_NAIVE_SAMPLE = int(os.environ.get("BENCH_NAIVE_SAMPLE", 20))
+
+_WORDS_KO = ["린넨", "코튼", "울", "캐시미어", "오버핏", "크롭", "와이드", "슬림", "스트라이프", "체크",
+             "니트", "셔츠", "팬츠", "자켓", "코트", "원피스", "스커트", "가디건", "블라우스", "데님"]
+_WORDS_EN = ["basic", "daily", "classic", "soft", "heavy", "light", "vintage", "ribbed", "oversized", "pleated"]
+_TAGS = ["[NEW]", "[BEST]", "[10%OFF]", "[당일발송]", "[단독]", "[재입고]"]
+_OPTIONS = ["_black", "_ivory", "_S", "_M", "_free", "_2color", "_블랙", "_네이비"]
+
+
+def legacy_normalize_item_name(name) -> str:
+    """기존 구현 (비교 기준)"""
+    if name is None:
+        return ""
+
+    s = str(name).strip()
+    if not s or s == "(not set)":
+        return ""
+
+    if not s.startswith("[SET]"):
+        while True:
+            new_s = re.sub(r"^\[[^\]]+\]\s*", "", s)
+            if new_s == s:
+                break
+            if new_s.startswith("[SET]"):
+                s = new_s
+                break
+            s = new_s
+
+    s = re.sub(
+        r"_(?:\d{1,2}color|xs|s|m|l|xl|xxl|free|[a-z]{1,12}|[가-힣]{1,6})(?=($|[\s\(\[])).*$",
+        "",
+        s,
+        flags=re.IGNORECASE
+    )
+    s = re.sub(r"\s+", " ", s).strip()
+    return s
+
+
+def make_catalog(rng: random.Random, n: int):
+    names = set()
+    while len(names) < n:
+        parts = rng.sample(_WORDS_KO, 2) + [rng.choice(_WORDS_EN)] + [rng.choice(_WORDS_KO)]
+        name = " ".join(parts) + f" {rng.randint(1, 999)}"
+        if rng.random() < 0.05:
+            name = "[SET] " + name
+        names.add(name)
+    return list(names)
+
+
+def make_queries(rng: random.Random, catalog, n: int):
+    """카탈로그 이름에 GA4 측 표기 변형 적용 (일부는 카탈로그에 없는 이름)"""
+    queries = []
+    for _ in range(n):
+        base = rng.choice(catalog)
+        r = rng.random()
+        if r < 0.15:
+            base = " ".join(rng.sample(_WORDS_KO, 3)) + f" 신상 {rng.randint(1000, 9999)}"
+        elif r < 0.35:
+            # 표기 차이: 공백 제거/대소문자
+            base = base.replace(" ", "", 1).upper() if rng.random() < 0.5 else base.replace(" ", "  ")
+        elif r < 0.45:
+            # 단어 하나 누락
+            words = base.split(" ")
+            if len(words) > 3:
+                words.pop(rng.randrange(1, len(words) - 1))
+            base = " ".join(words)
+        if rng.random() < 0.4 and not base.startswith("[SET]"):
+            base = " ".join(rng.sample(_TAGS, rng.randint(1, 2))) + " " + base
+        if rng.random() < 0.5:
+            base = base + rng.choice(_OPTIONS)
+        queries.append(base)
+    return queries
+
+
+def timed(label, fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<40s} {elapsed * 1000:10.1f} ms")
+    return result, elapsed
+
+
+def main():
+    rng = random.Random(BENCH_SEED)
+    catalog = make_catalog(rng, BENCH_N)
+    queries = make_queries(rng, catalog, BENCH_N)
+    names = catalog + queries
+    print(f"[BENCH] 카탈로그 {len(catalog):,}개 x 쿼리 {len(queries):,}개")
+
+    # ============================================================
+    # 1) 정규화
+    # ============================================================
+    print("\n[BENCH] 정규화 (카탈로그 + 쿼리)")
+    legacy, t_legacy = timed("legacy (re.sub per string)", lambda xs: [legacy_normalize_item_name(x) for x in xs], names)
+    scalar, t_scalar = timed("compiled (normalize_item_name)", lambda xs: [normalize_item_name(x) for x in xs], names)
+    column, t_column = timed("column (normalize_item_names)", normalize_item_names, names)
+
+    mismatches = sum(1 for a, b, c in zip(legacy, scalar, column) if not (a == b == c))
+    print(f"  결과 불일치: {mismatches}건 / speedup compiled x{t_legacy / t_scalar:.1f}, column x{t_legacy / t_column:.1f}")
+    if mismatches:
+        print("❌ [BENCH] 정규화 결과가 기존 구현과 다름")
+        sys.exit(1)
+
+    catalog_keys = column[:len(catalog)]
+    query_keys = column[len(catalog):]
+
+    # ============================================================
+    # 2) 매칭
+    # ============================================================
+    print("\n[BENCH] 매칭")
+    exact_set = set(catalog_keys)
+    exact, _ = timed("exact join (dict)", lambda ks: [k if k in exact_set else None for k in ks], query_keys)
+    index, _ = timed("ProductNameIndex build", ProductNameIndex, catalog_keys)
+    fuzzy, t_index = timed("ProductNameIndex.match_many", index.match_many, query_keys)
+
+    sample = query_keys[:BENCH_NAIVE_SAMPLE]
+
+    def naive(ks):
+        out = []
+        for k in ks:
+            best = max(catalog_keys, key=lambda c: difflib.SequenceMatcher(None, k, c).ratio())
+            out.append(best)
+        return out
+
+    _, t_naive = timed(f"naive difflib (표본 {len(sample)}건)", naive, sample)
+    t_naive_full = t_naive / max(len(sample), 1) * len(query_keys)
+    print(f"  naive difflib 환산 ({len(query_keys):,}건)          {t_naive_full:10.1f} s")
+
+    exact_hits = sum(1 for m in exact if m)
+    fuzzy_hits = sum(1 for m in fuzzy if m)
+    print(f"\n[BENCH] 매칭 건수: exact {exact_hits:,} / index {fuzzy_hits:,} (추가 {fuzzy_hits - exact_hits:,})")
+    print(f"[BENCH] index vs naive 환산 speedup: x{t_naive_full / t_index:.0f}")
+
+
+if __name__ == "__main__":
+    main()
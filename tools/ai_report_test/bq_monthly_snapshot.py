@@ -7,7 +7,9 @@ import statistics
 import time
 import random
 import concurrent.futures
+import copy
 import gzip
+import threading
 from datetime import date, timedelta, datetime, timezone
 from decimal import Decimal
 from collections import defaultdict
@@ -17,6 +19,23 @@ from urllib.parse import urlencode
 from google.cloud import bigquery
 from google.cloud import storage
 
+try:
+    from tools.ai_report_test.snapshot_index import update_snapshot_index
+except ImportError:
+    # 스크립트로 직접 실행하는 경우 (python3 bq_monthly_snapshot.py ...)
+    from snapshot_index import update_snapshot_index
+
+try:
+    from tools.ai_report_test.product_name_matcher import normalize_item_name, normalize_item_names, ProductNameIndex
+except ImportError:
+    from product_name_matcher import normalize_item_name, normalize_item_names, ProductNameIndex
+
+try:
+    # 29CM 리뷰 워터마크 캐시 (ngn_wep이 PYTHONPATH에 있을 때만 사용, 없으면 매번 전체 수집)
+    from dashboard.utils.review_watermark_cache import get_review_watermark_cache
+except ImportError:
+    get_review_watermark_cache = None
+
 PROJECT_ID = os.environ.get("GOOGLE_CLOUD_PROJECT", "winged-precept-443218-v8")
 DATASET = "ngn_dataset"
 GCS_BUCKET = os.environ.get("GCS_BUCKET", "winged-precept-443218-v8.appspot.com")
@@ -59,6 +78,30 @@ storage_client = storage.Client(project=PROJECT_ID)
 bq_client = bigquery.Client(project=PROJECT_ID)
 
 
+class BoundedQueryClient:
+    """
+    BigQuery 클라이언트 래퍼 - 동시에 실행 중인 쿼리 수 상한
+    여러 회사 스냅샷을 병렬로 만들 때 프로젝트 동시 쿼리/슬롯을 과점하지 않도록 사용
+
+    query()는 상한 안에서 작업 완료까지 기다린 뒤 job을 반환하므로
+    호출부의 job.result()는 이미 끝난 작업의 결과만 읽음 (기존 코드 수정 불필요)
+    """
+
+    def __init__(self, client, max_concurrent: int):
+        self._client = client
+        self._semaphore = threading.BoundedSemaphore(max_concurrent)
+        self.max_concurrent = max_concurrent
+
+    def query(self, *args, **kwargs):
+        with self._semaphore:
+            job = self._client.query(*args, **kwargs)
+            job.result()
+        return job
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+
 # -----------------------
 # 날짜 헬퍼
 # -----------------------
@@ -109,47 +152,23 @@ def rolling_range(end_date_iso: str, days: int):
 
 
 # -----------------------
-# 상품명 정규화 (핵심)
+# 29CM 크롤링 함수
 # -----------------------
-def normalize_item_name(name: str) -> str:
-    if name is None:
-        return ""
-
-    s = str(name).strip()
-    if not s or s == "(not set)":
-        return ""
-
-    # [ ] 제거 (단, [SET]은 보호) - 여러 개 반복 제거
-    if not s.startswith("[SET]"):
-        while True:
-            new_s = re.sub(r"^\[[^\]]+\]\s*", "", s)
-            if new_s == s:
-                break
-            # 제거 과정에서 [SET]이 맨 앞으로 오면 즉시 중단
-            if new_s.startswith("[SET]"):
-                s = new_s
-                break
-            s = new_s
-
-    # 옵션 제거: "옵션 토큰" + "옵션 경계"일 때만 절단
-    # - 토큰 길이 제한으로 과삭제 방지 (한글 1~6자, 영문 1~12자)
-    # - 옵션 뒤는 EOL/공백/괄호/대괄호 등 옵션스러운 경계만 허용
-    s = re.sub(
-        r"_(?:\d{1,2}color|xs|s|m|l|xl|xxl|free|[a-z]{1,12}|[가-힣]{1,6})(?=($|[\s\(\[])).*$",
-        "",
-        s,
-        flags=re.IGNORECASE
-    )
+_crawl_29cm_lock = threading.Lock()
+_crawl_29cm_memo = {}
 
-    # 공백 정리
-    s = re.sub(r"\s+", " ", s).strip()
 
-    return s
+def crawl_29cm_best_shared():
+    """
+    29CM 베스트 크롤링 (프로세스 내 1회만 실행)
+    회사와 무관한 데이터라 여러 회사 스냅샷을 만들 때 결과를 공유 (호출마다 복사본 반환)
+    """
+    with _crawl_29cm_lock:
+        if "result" not in _crawl_29cm_memo:
+            _crawl_29cm_memo["result"] = crawl_29cm_best()
+        return copy.deepcopy(_crawl_29cm_memo["result"])
 
 
-# -----------------------
-# 29CM 크롤링 함수
-# -----------------------
 def crawl_29cm_best():
     """29CM 베스트 상품 및 리뷰 크롤링"""
     if SKIP_29CM_CRAWL:
@@ -224,30 +243,56 @@ def crawl_29cm_best():
                             tabs.append({"name": c_name, "middle_id": int(mid_code)})
         return tabs
     
-    def fetch_item_reviews(item_id):
-        """리뷰 수집 (최신순/베스트순 시도)"""
-        for sort_type in ["RECENT", "BEST"]:
+    def fetch_review_page(item_id, sort_type, page, size):
+        """
+        리뷰 API 페이지 조회 (page는 0부터, 기존 요청과 같이 API에는 page+1 전달)
+        실제 요청 직전에만 대기 (워터마크 캐시 적중 시에는 호출/대기 모두 생략)
+        """
+        time.sleep(random.uniform(CRAWL_29CM_SLEEP_MIN, CRAWL_29CM_SLEEP_MAX))
+        params = {
+            "itemId": item_id,
+            "page": page + 1,
+            "size": size,
+            "sort": sort_type
+        }
+        url = f"{REVIEW_API_URL}?{urlencode(params)}"
+        data = get_json(url)
+        return data.get("data", {}).get("results", [])
+    
+    def normalize_reviews(results):
+        reviews = []
+        for r in results:
+            content = clean_text(r.get("contents"))
+            if not content:
+                continue
+            reviews.append({
+                "txt": content[:200],  # 너무 긴 리뷰는 자름
+                "score": r.get("point"),
+                "opt": r.get("optionValue")  # 구매 옵션(색상/사이즈)
+            })
+        return reviews
+    
+    review_cache = get_review_watermark_cache() if get_review_watermark_cache else None
+    
+    def fetch_item_reviews(item_id, review_count=None):
+        """리뷰 수집 (최신순: 워터마크 캐시로 새 리뷰만 조회 / 베스트순 fallback)"""
+        sort_types = ["RECENT", "BEST"]
+        if review_cache is not None:
+            cached = review_cache.get_reviews(
+                item_id,
+                lambda page, size: fetch_review_page(item_id, "RECENT", page, size),
+                CRAWL_29CM_REVIEWS_PER_ITEM,
+                review_count=review_count,
+            )
+            if cached is not None:
+                reviews = normalize_reviews(cached)
+                if reviews:
+                    return reviews
+                sort_types = ["BEST"]  # 최신순은 이미 확인됨
+        
+        for sort_type in sort_types:
             try:
-                params = {
-                    "itemId": item_id,
-                    "page": 1,
-                    "size": CRAWL_29CM_REVIEWS_PER_ITEM,
-                    "sort": sort_type
-                }
-                url = f"{REVIEW_API_URL}?{urlencode(params)}"
-                data = get_json(url)
-                
-                reviews = []
-                for r in data.get("data", {}).get("results", []):
-                    content = clean_text(r.get("contents"))
-                    if not content:
-                        continue
-                    reviews.append({
-                        "txt": content[:200],  # 너무 긴 리뷰는 자름
-                        "score": r.get("point"),
-                        "opt": r.get("optionValue")  # 구매 옵션(색상/사이즈)
-                    })
-                
+                reviews = normalize_reviews(fetch_review_page(item_id, sort_type, 0, CRAWL_29CM_REVIEWS_PER_ITEM))
                 if reviews:
                     return reviews  # 리뷰 있으면 반환
             except Exception:
@@ -292,9 +337,8 @@ def crawl_29cm_best():
                 if not item_id:
                     continue
                 
-                # 리뷰 수집 (잠시 대기 후 호출)
-                time.sleep(random.uniform(CRAWL_29CM_SLEEP_MIN, CRAWL_29CM_SLEEP_MAX))
-                reviews = fetch_item_reviews(item_id)
+                # 리뷰 수집 (리뷰 API 호출 시에만 대기)
+                reviews = fetch_item_reviews(item_id, review_count=info.get("reviewCount"))
                 
                 # URL 추출 (itemUrl 객체에서 webLink 가져오기)
                 item_url_obj = it.get("itemUrl", {})
@@ -314,6 +358,8 @@ def crawl_29cm_best():
                 })
         
         print(f"✅ [SUCCESS] 29CM 수집 완료! 총 {len(final_data)}개 상품", file=sys.stderr)
+        if review_cache is not None:
+            review_cache.flush()
         return {
             "collected_at": datetime.now(KST).isoformat(),
             "items": final_data
@@ -513,12 +559,17 @@ def query_monthly_13m_from_monthly_table(client, table_fq, company_name, end_rep
         ).result()
     )
     
+    return _monthly_rows_to_metrics(rows)
+
+
+def _monthly_rows_to_metrics(rows, skip_fields=("ym",)):
+    """월별 집계 row → dict[ym] = metrics"""
     result = {}
     for row in rows:
         ym = row.ym
         metrics = {}
         for field in row.keys():
-            if field != "ym":
+            if field not in skip_fields:
                 value = getattr(row, field)
                 if isinstance(value, (int, float)):
                     metrics[field] = float(value) if isinstance(value, float) else int(value)
@@ -529,6 +580,253 @@ def query_monthly_13m_from_monthly_table(client, table_fq, company_name, end_rep
     return result
 
 
+# -----------------------
+# 회사 통합 배치 조회 (월간 작업용)
+# -----------------------
+# 회사별 스냅샷에서 쓰는 단순 GROUP BY 쿼리들을 "회사 전체 × this/prev/yoy/13m 전체 기간"으로
+# 한 번씩만 실행하고, run()은 결과에서 자기 회사 몫만 꺼내 씀
+# → BigQuery 작업 수: (회사 수 × 쿼리 수) → 쿼리 수 / 스캔 바이트: 같은 파티션을 회사마다 다시 읽지 않음
+
+# 월간 집계 테이블별 SELECT 식 (run()과 배치 조회가 같은 정의를 사용)
+MONTHLY_FACT_TABLES = {
+    "mall_sales": (
+        "mall_sales_monthly",
+        """
+        SUM(net_sales) AS net_sales,
+        SUM(total_orders) AS total_orders,
+        SUM(total_first_order) AS total_first_order,
+        SUM(total_canceled) AS total_canceled
+        """,
+    ),
+    "meta_ads": (
+        "meta_ads_monthly",
+        """
+        SUM(spend) AS spend,
+        SUM(impressions) AS impressions,
+        SUM(clicks) AS clicks,
+        SUM(purchases) AS purchases,
+        SUM(purchase_value) AS purchase_value
+        """,
+    ),
+    "ga4_traffic": (
+        "ga4_traffic_monthly",
+        """
+        SUM(total_users) AS total_users,
+        SUM(screen_page_views) AS screen_page_views,
+        SUM(event_count) AS event_count,
+        SUM(add_to_cart_users) AS add_to_cart_users,
+        SUM(sign_up_users) AS sign_up_users
+        """,
+    ),
+}
+
+# GA4 유입 소스명 통합 (ga4_source_summary.py와 동일)
+GA4_SOURCE_CASE_SQL = """
+            CASE
+                -- Instagram 관련 통합
+                WHEN LOWER(first_user_source) LIKE '%instagram%' 
+                     OR LOWER(first_user_source) LIKE '%insta%'
+                     OR LOWER(first_user_source) IN ('ig', 'linktr.ee', 'lookbook', 'igshopping') THEN 'instagram'
+                -- Naver 관련 통합
+                WHEN LOWER(first_user_source) LIKE '%naver%' THEN 'naver.com'
+                -- Meta Ad 관련 (별도 유지)
+                WHEN LOWER(first_user_source) LIKE '%meta_ad%' THEN 'meta_ad'
+                -- Facebook 관련 통합 (facebook.com, m.facebook.com 등)
+                WHEN LOWER(first_user_source) LIKE '%facebook%'
+                     OR LOWER(first_user_source) = 'fb' THEN 'facebook'
+                -- YouTube 관련 통합
+                WHEN LOWER(first_user_source) LIKE '%youtube%' THEN 'youtube.com'
+                -- TikTok
+                WHEN LOWER(first_user_source) LIKE '%tiktok%' 
+                     OR LOWER(first_user_source) LIKE '%tt.%' THEN 'tiktok'
+                -- Direct 관련 통합
+                WHEN LOWER(first_user_source) IN ('(direct)', 'direct')
+                     OR LOWER(first_user_source) LIKE '%piscess%'
+                     OR LOWER(first_user_source) = '파이시스' THEN '(direct)'
+                -- Google 관련 통합
+                WHEN LOWER(first_user_source) LIKE '%google%' THEN 'google'
+                -- Daum
+                WHEN LOWER(first_user_source) = 'daum' THEN 'daum'
+                -- Cafe24 관련 통합
+                WHEN LOWER(first_user_source) LIKE '%cafe24%' THEN 'cafe24.com'
+                -- 특수 케이스
+                WHEN LOWER(first_user_source) = '인트로 mdgt' THEN 'from madgoat'
+                WHEN LOWER(first_user_source) IN ('(data not available)', 'data not available') THEN '(data not available)'
+                -- 나머지는 원본 유지
+                ELSE LOWER(first_user_source)
+            END"""
+
+
+class BatchFacts:
+    """
+    회사 통합 배치 조회 결과
+    - monthly_13m(family, company): query_monthly_13m_from_monthly_table()과 같은 형태
+    - rows(family, company, min_date, max_date): 일자/광고 단위 row (기간이 배치 범위 밖이면 None → 개별 조회)
+    """
+
+    def __init__(self, report_month: str, start_date: str, end_date: str, company_names):
+        self.report_month = report_month
+        self.start_date = start_date
+        self.end_date = end_date
+        self.company_names = set(company_names)
+        self._monthly = {}                      # family -> company -> {ym: metrics}
+        self._rows = {}                         # family -> company -> [row]
+
+    def covers(self, company_name: str, report_month: str) -> bool:
+        return company_name in self.company_names and report_month == self.report_month
+
+    def monthly_13m(self, family: str, company_name: str):
+        if family not in self._monthly:
+            return None
+        return copy.deepcopy(self._monthly[family].get(company_name, {}))
+
+    def rows(self, family: str, company_name: str, min_date: str, max_date: str):
+        if family not in self._rows or company_name not in self.company_names:
+            return None
+        if min_date < self.start_date or max_date > self.end_date:
+            return None
+        return list(self._rows[family].get(company_name, []))
+
+
+def prefetch_batch_facts(client, company_names, year: int, month: int):
+    """
+    리포트 월 기준으로 모든 회사의 사실 데이터를 계열별 쿼리 1회씩 조회
+    - 월간 집계 13개월 (mall_sales / meta_ads / ga4_traffic)
+    - 일자별 매출 (daily_cafe24_sales)
+    - GA4 유입 소스 일자별 (ga4_traffic_ngn)
+    - 광고 단위 월별 성과 (meta_ads_ad_summary) - 목표별 분해/6개월 벤치마크용
+    한 계열이 실패하면 해당 계열만 비워두고 run()이 회사별로 개별 조회함
+    """
+    report_month = month_to_ym(year, month)
+    yoy_start, _ = month_range(year - 1, month)
+    _, this_end = month_range(year, month)
+    batch = BatchFacts(report_month, yoy_start, this_end, company_names)
+
+    companies_param = bigquery.ArrayQueryParameter("company_names", "STRING", sorted(batch.company_names))
+    started = time.time()
+
+    def run_query(query, extra_params):
+        return list(
+            client.query(
+                query,
+                job_config=bigquery.QueryJobConfig(query_parameters=[companies_param, *extra_params]),
+            ).result()
+        )
+
+    # (1) 월간 집계 13개월
+    start_13m, _ = month_range_exclusive(shift_month(report_month, -12))
+    _, end_exclusive_13m = month_range_exclusive(shift_month(report_month, 1))
+    for family, (table, select_exprs) in MONTHLY_FACT_TABLES.items():
+        try:
+            rows = run_query(
+                f"""
+                SELECT
+                    company_name,
+                    FORMAT_DATE('%Y-%m', month_date) AS ym,
+                    {select_exprs}
+                FROM `{PROJECT_ID}.{DATASET}.{table}`
+                WHERE company_name IN UNNEST(@company_names)
+                  AND month_date >= @start_date
+                  AND month_date < @end_exclusive_date
+                GROUP BY company_name, ym
+                ORDER BY company_name, ym
+                """,
+                [
+                    bigquery.ScalarQueryParameter("start_date", "DATE", start_13m),
+                    bigquery.ScalarQueryParameter("end_exclusive_date", "DATE", end_exclusive_13m),
+                ],
+            )
+            by_company = defaultdict(list)
+            for row in rows:
+                by_company[row.company_name].append(row)
+            batch._monthly[family] = {
+                company: _monthly_rows_to_metrics(company_rows, skip_fields=("ym", "company_name"))
+                for company, company_rows in by_company.items()
+            }
+        except Exception as e:
+            print(f"⚠️ [WARN] 배치 조회 실패 ({family} 13m) - 회사별 개별 조회로 대체: {e}", file=sys.stderr)
+
+    # (2) 일자/광고 단위 row (this/prev/yoy 전체 기간)
+    row_queries = {
+        "sales_daily": f"""
+            SELECT
+                company_name,
+                payment_date AS date,
+                SUM(net_sales) AS net_sales,
+                SUM(total_orders) AS total_orders,
+                SUM(total_first_order) AS total_first_order,
+                SUM(total_canceled) AS total_canceled
+            FROM `{PROJECT_ID}.{DATASET}.daily_cafe24_sales`
+            WHERE company_name IN UNNEST(@company_names)
+              AND payment_date >= @min_date
+              AND payment_date <= @max_date
+            GROUP BY company_name, payment_date
+            ORDER BY company_name, payment_date
+        """,
+        "ga4_top_sources": f"""
+            SELECT
+                company_name,
+                event_date,
+                {GA4_SOURCE_CASE_SQL} AS source,
+                SUM(total_users) AS total_users,
+                SUM(screen_page_views) AS screen_page_views,
+                SAFE_DIVIDE(
+                    SUM(IFNULL(bounce_rate, 0) * total_users),
+                    SUM(total_users)
+                ) AS bounce_rate
+            FROM `{PROJECT_ID}.{DATASET}.ga4_traffic_ngn`
+            WHERE company_name IN UNNEST(@company_names)
+              AND event_date >= @min_date
+              AND event_date <= @max_date
+              AND first_user_source IS NOT NULL
+              AND first_user_source != ''
+              AND first_user_source != '(not set)'
+              AND first_user_source != 'not set'
+            GROUP BY company_name, event_date, source
+        """,
+        "meta_ads_by_ad": f"""
+            SELECT
+                company_name,
+                FORMAT_DATE('%Y-%m', date) AS ym,
+                ad_id,
+                ad_name,
+                campaign_name,
+                SUM(spend) AS spend,
+                SUM(impressions) AS impressions,
+                SUM(clicks) AS clicks,
+                SUM(purchases) AS purchases,
+                SUM(purchase_value) AS purchase_value
+            FROM `{PROJECT_ID}.{DATASET}.meta_ads_ad_summary`
+            WHERE company_name IN UNNEST(@company_names)
+              AND date >= @min_date
+              AND date <= @max_date
+            GROUP BY company_name, ym, ad_id, ad_name, campaign_name
+        """,
+    }
+    if SKIP_META_ADS_GOALS:
+        del row_queries["meta_ads_by_ad"]
+
+    date_params = [
+        bigquery.ScalarQueryParameter("min_date", "DATE", yoy_start),
+        bigquery.ScalarQueryParameter("max_date", "DATE", this_end),
+    ]
+    for family, query in row_queries.items():
+        try:
+            by_company = defaultdict(list)
+            for row in run_query(query, date_params):
+                by_company[row.company_name].append(row)
+            batch._rows[family] = dict(by_company)
+        except Exception as e:
+            print(f"⚠️ [WARN] 배치 조회 실패 ({family}) - 회사별 개별 조회로 대체: {e}", file=sys.stderr)
+
+    print(
+        f"✅ [INFO] 회사 통합 배치 조회 완료: {len(batch.company_names)}개 회사, "
+        f"{len(batch._monthly) + len(batch._rows)}개 계열 ({time.time() - started:.1f}s)",
+        file=sys.stderr,
+    )
+    return batch
+
+
 def remove_reviews_for_log(data):
     """리뷰 데이터를 제거한 요약 버전 생성 (로그 출력용)"""
     import copy
@@ -604,7 +902,7 @@ def load_snapshot_from_gcs(company_name: str, year: int, month: int):
         return None
 
 
-def run(company_name: str, year: int, month: int, upsert_flag: bool = False, save_to_gcs_flag: bool = False, load_from_gcs_flag: bool = True, use_current_month_events: bool = False):
+def run(company_name: str, year: int, month: int, upsert_flag: bool = False, save_to_gcs_flag: bool = False, load_from_gcs_flag: bool = True, use_current_month_events: bool = False, client=None, batch_facts=None):
     """
     Args:
         company_name: 회사명
@@ -614,6 +912,8 @@ def run(company_name: str, year: int, month: int, upsert_flag: bool = False, sav
         save_to_gcs_flag: GCS에 저장할지 여부
         load_from_gcs_flag: GCS에서 먼저 읽을지 여부 (기본값: True)
         use_current_month_events: True면 동월 이벤트 조회 (테스트용), False면 전월 이벤트 조회 (기본값, 배포 후 자동 실행용)
+        client: BigQuery 클라이언트 (None이면 전역 bq_client, 병렬 실행 시 BoundedQueryClient 공유)
+        batch_facts: prefetch_batch_facts() 결과 (있으면 해당 계열은 회사별 쿼리 대신 재사용)
     """
     # -----------------------
     # GCS에서 스냅샷 읽기 (우선)
@@ -656,12 +956,32 @@ def run(company_name: str, year: int, month: int, upsert_flag: bool = False, sav
     # -----------------------
     # BigQuery에서 데이터 조회 (GCS에 없을 때만)
     # -----------------------
-    # 전역 bq_client 사용 (재사용)
-    client = bq_client
+    # 전역 bq_client 사용 (재사용) - 병렬 작업에서는 동시 실행 상한이 걸린 공유 클라이언트 전달
+    if client is None:
+        client = bq_client
     
     report_month = month_to_ym(year, month)
     this_start, this_end = month_range(year, month)
     
+    use_batch = batch_facts is not None and batch_facts.covers(company_name, report_month)
+    
+    def fetch_monthly_13m(family):
+        """월간 집계 13개월 (배치 조회 결과가 있으면 재사용)"""
+        if use_batch:
+            cached = batch_facts.monthly_13m(family, company_name)
+            if cached is not None:
+                return cached
+        table, select_exprs = MONTHLY_FACT_TABLES[family]
+        return query_monthly_13m_from_monthly_table(
+            client, f"{PROJECT_ID}.{DATASET}.{table}", company_name, report_month, select_exprs
+        )
+    
+    def fetch_batch_rows(family, min_date, max_date):
+        """배치 조회 row (없거나 기간이 범위 밖이면 None → 회사별 쿼리)"""
+        if not use_batch:
+            return None
+        return batch_facts.rows(family, company_name, min_date, max_date)
+    
     if month == 1:
         prev_y, prev_m = year - 1, 12
     else:
@@ -719,18 +1039,7 @@ def run(company_name: str, year: int, month: int, upsert_flag: bool = False, sav
     
     # ✅ 최적화 1단계: 월간 집계 테이블에서 this/prev/yoy 추출 (raw 테이블 조회 제거)
     # 월간 집계 테이블 사용 (성능 최적화) - 먼저 조회
-    monthly_13m_raw = query_monthly_13m_from_monthly_table(
-        client,
-        f"{PROJECT_ID}.{DATASET}.mall_sales_monthly",
-        company_name,
-        report_month,
-        """
-        SUM(net_sales) AS net_sales,
-        SUM(total_orders) AS total_orders,
-        SUM(total_first_order) AS total_first_order,
-        SUM(total_canceled) AS total_canceled
-        """
-    )
+    monthly_13m_raw = fetch_monthly_13m("mall_sales")
     
     monthly_13m = [
         {"ym": ym, **metrics}
@@ -812,18 +1121,20 @@ def run(company_name: str, year: int, month: int, upsert_flag: bool = False, sav
         ORDER BY payment_date
         """
         
-        rows = list(
-            client.query(
-                q_sales_daily_multi,
-                job_config=bigquery.QueryJobConfig(
-                    query_parameters=[
-                        bigquery.ScalarQueryParameter("company_name", "STRING", company_name),
-                        bigquery.ScalarQueryParameter("min_date", "DATE", min_date),
-                        bigquery.ScalarQueryParameter("max_date", "DATE", max_date),
-                    ]
-                ),
-            ).result()
-        )
+        rows = fetch_batch_rows("sales_daily", min_date, max_date)
+        if rows is None:
+            rows = list(
+                client.query(
+                    q_sales_daily_multi,
+                    job_config=bigquery.QueryJobConfig(
+                        query_parameters=[
+                            bigquery.ScalarQueryParameter("company_name", "STRING", company_name),
+                            bigquery.ScalarQueryParameter("min_date", "DATE", min_date),
+                            bigquery.ScalarQueryParameter("max_date", "DATE", max_date),
+                        ]
+                    ),
+                ).result()
+            )
         
         # 각 기간별로 분류
         result = {"this": [], "prev": [], "yoy": []}
@@ -923,19 +1234,7 @@ def run(company_name: str, year: int, month: int, upsert_flag: bool = False, sav
     
     # ✅ 최적화 1단계: 월간 집계 테이블에서 this/prev/yoy 추출 (raw 테이블 조회 제거)
     # 월간 집계 테이블 사용 (성능 최적화) - 먼저 조회
-    monthly_13m_meta_raw = query_monthly_13m_from_monthly_table(
-        client,
-        f"{PROJECT_ID}.{DATASET}.meta_ads_monthly",
-        company_name,
-        report_month,
-        """
-        SUM(spend) AS spend,
-        SUM(impressions) AS impressions,
-        SUM(clicks) AS clicks,
-        SUM(purchases) AS purchases,
-        SUM(purchase_value) AS purchase_value
-        """
-    )
+    monthly_13m_meta_raw = fetch_monthly_13m("meta_ads")
     
     monthly_13m_meta = []
     for ym, metrics in sorted(monthly_13m_meta_raw.items()):
@@ -1253,18 +1552,20 @@ def run(company_name: str, year: int, month: int, upsert_flag: bool = False, sav
         GROUP BY ym, ad_id, ad_name, campaign_name
         """
         
-        rows = list(
-            client.query(
-                q_meta_ads_goals_multi,
-                job_config=bigquery.QueryJobConfig(
-                    query_parameters=[
-                        bigquery.ScalarQueryParameter("company_name", "STRING", company_name),
-                        bigquery.ScalarQueryParameter("min_date", "DATE", min_date),
-                        bigquery.ScalarQueryParameter("max_date", "DATE", max_date),
-                    ]
-                ),
-            ).result()
-        )
+        rows = fetch_batch_rows("meta_ads_by_ad", min_date, max_date)
+        if rows is None:
+            rows = list(
+                client.query(
+                    q_meta_ads_goals_multi,
+                    job_config=bigquery.QueryJobConfig(
+                        query_parameters=[
+                            bigquery.ScalarQueryParameter("company_name", "STRING", company_name),
+                            bigquery.ScalarQueryParameter("min_date", "DATE", min_date),
+                            bigquery.ScalarQueryParameter("max_date", "DATE", max_date),
+                        ]
+                    ),
+                ).result()
+            )
         
         # 각 기간별로 분류 (월(ym) 기준)
         period_ym_map = {}
@@ -1518,18 +1819,21 @@ def run(company_name: str, year: int, month: int, upsert_flag: bool = False, sav
             GROUP BY ym, campaign_name
             """
             
-            rows = list(
-                client.query(
-                    q_6m_goals,
-                    job_config=bigquery.QueryJobConfig(
-                        query_parameters=[
-                            bigquery.ScalarQueryParameter("company_name", "STRING", company_name),
-                            bigquery.ScalarQueryParameter("start_date", "DATE", start_date_iso),
-                            bigquery.ScalarQueryParameter("end_exclusive_date", "DATE", end_excl_iso),
-                        ]
-                    ),
-                ).result()
-            )
+            # 배치 조회된 광고 단위 row가 있으면 그대로 사용 (아래 목표별 집계는 campaign_name 기준이라 결과 동일)
+            rows = fetch_batch_rows("meta_ads_by_ad", start_date_iso, this_end)
+            if rows is None:
+                rows = list(
+                    client.query(
+                        q_6m_goals,
+                        job_config=bigquery.QueryJobConfig(
+                            query_parameters=[
+                                bigquery.ScalarQueryParameter("company_name", "STRING", company_name),
+                                bigquery.ScalarQueryParameter("start_date", "DATE", start_date_iso),
+                                bigquery.ScalarQueryParameter("end_exclusive_date", "DATE", end_excl_iso),
+                            ]
+                        ),
+                    ).result()
+                )
             
             # 월별로 그룹화
             by_month = defaultdict(list)
@@ -1701,39 +2005,7 @@ def run(company_name: str, year: int, month: int, upsert_flag: bool = False, sav
         q_ga4_top_sources_multi = f"""
         SELECT
             event_date,
-            CASE
-                -- Instagram 관련 통합
-                WHEN LOWER(first_user_source) LIKE '%instagram%' 
-                     OR LOWER(first_user_source) LIKE '%insta%'
-                     OR LOWER(first_user_source) IN ('ig', 'linktr.ee', 'lookbook', 'igshopping') THEN 'instagram'
-                -- Naver 관련 통합
-                WHEN LOWER(first_user_source) LIKE '%naver%' THEN 'naver.com'
-                -- Meta Ad 관련 (별도 유지)
-                WHEN LOWER(first_user_source) LIKE '%meta_ad%' THEN 'meta_ad'
-                -- Facebook 관련 통합 (facebook.com, m.facebook.com 등)
-                WHEN LOWER(first_user_source) LIKE '%facebook%'
-                     OR LOWER(first_user_source) = 'fb' THEN 'facebook'
-                -- YouTube 관련 통합
-                WHEN LOWER(first_user_source) LIKE '%youtube%' THEN 'youtube.com'
-                -- TikTok
-                WHEN LOWER(first_user_source) LIKE '%tiktok%' 
-                     OR LOWER(first_user_source) LIKE '%tt.%' THEN 'tiktok'
-                -- Direct 관련 통합
-                WHEN LOWER(first_user_source) IN ('(direct)', 'direct')
-                     OR LOWER(first_user_source) LIKE '%piscess%'
-                     OR LOWER(first_user_source) = '파이시스' THEN '(direct)'
-                -- Google 관련 통합
-                WHEN LOWER(first_user_source) LIKE '%google%' THEN 'google'
-                -- Daum
-                WHEN LOWER(first_user_source) = 'daum' THEN 'daum'
-                -- Cafe24 관련 통합
-                WHEN LOWER(first_user_source) LIKE '%cafe24%' THEN 'cafe24.com'
-                -- 특수 케이스
-                WHEN LOWER(first_user_source) = '인트로 mdgt' THEN 'from madgoat'
-                WHEN LOWER(first_user_source) IN ('(data not available)', 'data not available') THEN '(data not available)'
-                -- 나머지는 원본 유지
-                ELSE LOWER(first_user_source)
-            END AS source,
+            {GA4_SOURCE_CASE_SQL} AS source,
             SUM(total_users) AS total_users,
             SUM(screen_page_views) AS screen_page_views,
             -- 이탈율 가중평균 계산 (날짜별)
@@ -1752,18 +2024,20 @@ def run(company_name: str, year: int, month: int, upsert_flag: bool = False, sav
         GROUP BY event_date, source
         """
         
-        rows = list(
-            client.query(
-                q_ga4_top_sources_multi,
-                job_config=bigquery.QueryJobConfig(
-                    query_parameters=[
-                        bigquery.ScalarQueryParameter("company_name", "STRING", company_name),
-                        bigquery.ScalarQueryParameter("min_date", "DATE", min_date),
-                        bigquery.ScalarQueryParameter("max_date", "DATE", max_date),
-                    ]
-                ),
-            ).result()
-        )
+        rows = fetch_batch_rows("ga4_top_sources", min_date, max_date)
+        if rows is None:
+            rows = list(
+                client.query(
+                    q_ga4_top_sources_multi,
+                    job_config=bigquery.QueryJobConfig(
+                        query_parameters=[
+                            bigquery.ScalarQueryParameter("company_name", "STRING", company_name),
+                            bigquery.ScalarQueryParameter("min_date", "DATE", min_date),
+                            bigquery.ScalarQueryParameter("max_date", "DATE", max_date),
+                        ]
+                    ),
+                ).result()
+            )
         
         # 각 기간별로 분류 및 집계
         by_period = defaultdict(lambda: defaultdict(lambda: {
@@ -1824,19 +2098,7 @@ def run(company_name: str, year: int, month: int, upsert_flag: bool = False, sav
     
     # ✅ 최적화 1단계: 월간 집계 테이블에서 this/prev/yoy 추출 (raw 테이블 조회 제거)
     # 월간 집계 테이블 사용 (성능 최적화) - 먼저 조회
-    monthly_13m_ga4_raw = query_monthly_13m_from_monthly_table(
-        client,
-        f"{PROJECT_ID}.{DATASET}.ga4_traffic_monthly",
-        company_name,
-        report_month,
-        """
-        SUM(total_users) AS total_users,
-        SUM(screen_page_views) AS screen_page_views,
-        SUM(event_count) AS event_count,
-        SUM(add_to_cart_users) AS add_to_cart_users,
-        SUM(sign_up_users) AS sign_up_users
-        """
-    )
+    monthly_13m_ga4_raw = fetch_monthly_13m("ga4_traffic")
     
     monthly_13m_ga4 = [
         {"ym": ym, **metrics}
@@ -2064,16 +2326,14 @@ def run(company_name: str, year: int, month: int, upsert_flag: bool = False, sav
     """
     
     def get_viewitem_block(ym, products_30d):
+        # 상품명 정규화는 컬럼 단위로 한 번에 (판매 상품 / view_item 각각)
+        sales_products = [p for p in (products_30d or []) if isinstance(p, dict) and p.get("product_name")]
         sales_map = {}
-        if products_30d:
-            for p in products_30d:
-                if isinstance(p, dict):
-                    product_name = p.get("product_name")
-                    if product_name:
-                        key = normalize_item_name(product_name)
-                        if key:
-                            if key not in sales_map:
-                                sales_map[key] = p
+        for key, p in zip(normalize_item_names(p["product_name"] for p in sales_products), sales_products):
+            if key and key not in sales_map:
+                sales_map[key] = p
+        # 정확히 일치하지 않는 이름(표기/옵션 차이)은 bigram 유사도 색인으로 보조 매칭
+        sales_index = ProductNameIndex(sales_map.keys())
         
         rows = list(
             client.query(
@@ -2090,24 +2350,22 @@ def run(company_name: str, year: int, month: int, upsert_flag: bool = False, sav
         
         aggregated = defaultdict(lambda: {"total_view_item": 0, "matched": None})
         
-        for r in rows:
-            raw = r.item_name or ""
+        row_keys = normalize_item_names(r.item_name or "" for r in rows)
+        for r, key in zip(rows, row_keys):
             view_item_count = int(r.view_item or 0)
             
             if view_item_count == 0:
                 continue
             
-            key = normalize_item_name(raw)
-            
             if not key:
                 continue
             
             aggregated[key]["total_view_item"] += view_item_count
             
             if aggregated[key]["matched"] is None:
-                matched = sales_map.get(key)
-                if matched:
-                    aggregated[key]["matched"] = matched
+                match = sales_index.best_match(key)
+                if match:
+                    aggregated[key]["matched"] = sales_map[match[0]]
         
         items = []
         for key, data in aggregated.items():
@@ -2584,7 +2842,7 @@ def run(company_name: str, year: int, month: int, upsert_flag: bool = False, sav
     # -----------------------
     # 29CM 크롤링 실행
     # -----------------------
-    crawl_29cm_result = crawl_29cm_best()
+    crawl_29cm_result = crawl_29cm_best_shared()
     
     # 디버깅: 29CM 크롤링 결과 확인
     if crawl_29cm_result is None:
@@ -2796,6 +3054,9 @@ def run(company_name: str, year: int, month: int, upsert_flag: bool = False, sav
                 content_type='application/json'
             )
             
+            # 대시보드 경로 인덱스 갱신 (company, YYYY-MM → 경로/generation)
+            update_snapshot_index(bucket, blob)
+            
             gcs_url = f"gs://{GCS_BUCKET}/{blob_path}"
             print("=" * 80, file=sys.stderr)
             print(f"✅ [SUCCESS] 스냅샷이 GCS에 저장되었습니다", file=sys.stderr)
@@ -0,0 +1,114 @@
+"""
+로컬 가짜 Gemini 서버 (AI 분석 병렬 실행/캐시 동작 확인용)
+- generateContent: 지연 후 섹션 번호가 들어간 고정 응답 + usageMetadata 반환
+- cachedContents: 캐시 생성/삭제만 흉내냄 (캐시된 토큰 수는 요청 본문 길이로 계산)
+- 동시 처리 중인 요청 수의 최대값을 로그로 남겨 병렬 실행 여부 확인
+
+사용법:
+    python3 tools/ai_report_test/fake_gemini_server.py [port] [latency_sec]
+    GEMINI_BASE_URL=http://127.0.0.1:8765 GEMINI_API_KEY=fake \\
+        python3 tools/ai_report_test/ai_analyst.py snapshot.json output.json
+"""
+import re
+import sys
+import json
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PORT = int(sys.argv[1]) if len(sys.argv) > 1 else 8765
+LATENCY_SEC = float(sys.argv[2]) if len(sys.argv) > 2 else 1.0
+
+_lock = threading.Lock()
+_state = {"in_flight": 0, "max_in_flight": 0, "requests": 0, "caches": {}}
+
+SECTION_PATTERN = re.compile(r"\[섹션\s*(\d+)")
+
+
+def _estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 2)
+
+
+def _request_text(body: dict) -> str:
+    parts = []
+    for content in body.get("contents", []):
+        for part in content.get("parts", []):
+            parts.append(part.get("text", ""))
+    return "\n".join(parts)
+
+
+def _fake_answer(prompt: str) -> str:
+    match = SECTION_PATTERN.search(prompt)
+    section_num = int(match.group(1)) if match else 0
+    if section_num == 7:
+        table = {"table_data": {"주력_아이템": {"29cm": "테스트", "자사몰": "테스트"}},
+                 "card_summary": {"market_analysis": "시장 분석 (fake)", "company_analysis": "자사몰 분석 (fake)"}}
+        return f"## 섹션 7\n가짜 분석 텍스트입니다.\n```json\n{json.dumps(table, ensure_ascii=False)}\n```"
+    return f"## 섹션 {section_num}\n가짜 분석 텍스트입니다. (섹션 {section_num})"
+
+
+class FakeGeminiHandler(BaseHTTPRequestHandler):
+    def _send_json(self, status: int, payload: dict):
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _read_body(self) -> dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def do_POST(self):
+        body = self._read_body()
+
+        if self.path.split("?")[0].endswith("/cachedContents"):
+            with _lock:
+                name = f"cachedContents/fake-{len(_state['caches']) + 1}"
+                _state["caches"][name] = _estimate_tokens(_request_text(body))
+            self._send_json(200, {"name": name, "model": body.get("model"), "usageMetadata": {"totalTokenCount": _state["caches"][name]}})
+            return
+
+        if ":generateContent" not in self.path:
+            self._send_json(404, {"error": {"code": 404, "message": f"unknown path {self.path}"}})
+            return
+
+        with _lock:
+            _state["in_flight"] += 1
+            _state["requests"] += 1
+            _state["max_in_flight"] = max(_state["max_in_flight"], _state["in_flight"])
+            cached_tokens = _state["caches"].get(body.get("cachedContent"), 0)
+
+        try:
+            time.sleep(LATENCY_SEC)
+            prompt = _request_text(body)
+            answer = _fake_answer(prompt)
+            prompt_tokens = _estimate_tokens(prompt) + cached_tokens
+            output_tokens = _estimate_tokens(answer)
+            self._send_json(200, {
+                "candidates": [{"content": {"role": "model", "parts": [{"text": answer}]}, "finishReason": "STOP"}],
+                "usageMetadata": {
+                    "promptTokenCount": prompt_tokens,
+                    "cachedContentTokenCount": cached_tokens,
+                    "candidatesTokenCount": output_tokens,
+                    "totalTokenCount": prompt_tokens + output_tokens,
+                },
+            })
+        finally:
+            with _lock:
+                _state["in_flight"] -= 1
+                print(f"[FAKE_GEMINI] 요청 {_state['requests']}건, 최대 동시 처리 {_state['max_in_flight']}건", file=sys.stderr)
+
+    def do_DELETE(self):
+        with _lock:
+            _state["caches"].pop(self.path.lstrip("/").split("/", 1)[-1], None)
+        self._send_json(200, {})
+
+    def log_message(self, format, *args):
+        pass
+
+
+if __name__ == "__main__":
+    print(f"🧪 [INFO] 가짜 Gemini 서버: http://127.0.0.1:{PORT} (지연 {LATENCY_SEC}s)", file=sys.stderr)
+    ThreadingHTTPServer(("127.0.0.1", PORT), FakeGeminiHandler).serve_forever()
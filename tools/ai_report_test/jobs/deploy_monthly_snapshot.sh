@@ -58,6 +58,10 @@ GOOGLE_CLOUD_PROJECT: ${PROJECT}
 BQ_DATASET: ngn_dataset
 GCS_BUCKET: winged-precept-443218-v8.appspot.com
 COMPANY_NAMES: piscess,demo
+SNAPSHOT_PARALLELISM: "4"
+BQ_MAX_CONCURRENT_QUERIES: "8"
+SNAPSHOT_BATCH_FACTS: "1"
+AI_SECTION_CONCURRENCY: "4"
 GEMINI_API_KEY: ${GEMINI_API_KEY}
 EOF
 
@@ -2,6 +2,7 @@
 """
 월간 AI 분석 생성 Cloud Run Job
 매월 1일 실행되어 전월 스냅샷에 AI 분석을 추가합니다.
+섹션 결과 캐시(section_cache.py)로 입력이 바뀐 섹션만 모델을 호출합니다. (AI_SECTION_CACHE=0이면 전체 재생성)
 """
 
 import os
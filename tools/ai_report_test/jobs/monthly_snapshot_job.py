@@ -55,9 +55,90 @@ else:
     project_root = current_file.parent.parent.parent.parent
     sys.path.insert(0, str(project_root))
 
-from tools.ai_report_test.bq_monthly_snapshot import run
+# 29CM 리뷰 워터마크 캐시(dashboard.utils.review_watermark_cache) 사용을 위해 ngn_wep 경로 추가
+_ngn_wep_path = os.path.join(sys.path[0], 'ngn_wep')
+if os.path.isdir(_ngn_wep_path):
+    sys.path.insert(1, _ngn_wep_path)
+
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from tools.ai_report_test.bq_monthly_snapshot import run, bq_client, BoundedQueryClient, prefetch_batch_facts
 from tools.ai_report_test.ai_analyst import generate_ai_analysis_from_file
 
+# 회사 병렬 처리 수 (1이면 기존처럼 순차 처리)
+# BigQuery/GCS/Gemini 모두 I/O 대기라 스레드 풀로 충분 (프로세스 풀 불필요)
+SNAPSHOT_PARALLELISM = int(os.environ.get("SNAPSHOT_PARALLELISM", "4"))
+# 전체 회사 합산 BigQuery 동시 실행 쿼리 상한
+BQ_MAX_CONCURRENT_QUERIES = int(os.environ.get("BQ_MAX_CONCURRENT_QUERIES", "8"))
+# 회사 통합 배치 조회 사용 여부 (0이면 기존처럼 회사별 쿼리)
+SNAPSHOT_BATCH_FACTS = os.environ.get("SNAPSHOT_BATCH_FACTS", "1") == "1"
+
+
+def process_company(company_name, target_year, target_month, gcs_bucket, client, batch_facts=None):
+    """
+    회사 1곳 스냅샷 생성 + AI 분석
+
+    Returns:
+        {"company": str, "ok": bool, "snapshot_sec": float, "ai_sec": float, "ai_ok": bool, "error": str|None}
+    """
+    result = {"company": company_name, "ok": False, "snapshot_sec": 0.0, "ai_sec": 0.0, "ai_ok": False, "error": None}
+
+    try:
+        print(f"\n{'='*60}", file=sys.stderr)
+        print(f"📊 [INFO] {company_name} 스냅샷 생성 시작...", file=sys.stderr)
+        print(f"{'='*60}\n", file=sys.stderr)
+
+        # 스냅샷 생성 (GCS에 저장, 강제 재생성)
+        # use_current_month_events=True: 리포트 대상 월의 이벤트를 조회
+        # 예: 12월 리포트 생성 시 → 12월 이벤트 조회 (동월 이벤트)
+        started = time.perf_counter()
+        run(
+            company_name=company_name,
+            year=target_year,
+            month=target_month,
+            upsert_flag=False,
+            save_to_gcs_flag=True,
+            load_from_gcs_flag=False,  # --force와 동일 (재생성)
+            use_current_month_events=True,  # 동월 이벤트 조회 (리포트 대상 월의 이벤트)
+            client=client,
+            batch_facts=batch_facts
+        )
+        result["snapshot_sec"] = time.perf_counter() - started
+        result["ok"] = True
+
+        print(f"✅ [SUCCESS] {company_name} 스냅샷 생성 완료 ({result['snapshot_sec']:.1f}s)", file=sys.stderr)
+    except Exception as e:
+        result["error"] = str(e)
+        print(f"❌ [ERROR] {company_name} 스냅샷 생성 실패: {e}", file=sys.stderr)
+        traceback.print_exc(file=sys.stderr)
+        return result
+
+    # AI 분석 자동 추가
+    print(f"\n🤖 [INFO] {company_name} AI 분석 생성 중...", file=sys.stderr)
+    started = time.perf_counter()
+    try:
+        snapshot_path = f"gs://{gcs_bucket}/ai-reports/monthly/{company_name}/{target_year}-{target_month:02d}/snapshot.json.gz"
+
+        # AI 분석 생성 (같은 파일에 덮어쓰기)
+        generate_ai_analysis_from_file(
+            snapshot_file=snapshot_path,
+            output_file=None,  # 입력 파일에 덮어쓰기
+            system_prompt_file=None  # 자동으로 system_prompt_v44.txt 찾기
+        )
+        result["ai_ok"] = True
+        print(f"✅ [SUCCESS] {company_name} AI 분석 완료", file=sys.stderr)
+    except Exception as ai_error:
+        # AI 분석 실패해도 스냅샷은 성공했으므로 경고만 출력
+        print(f"⚠️ [WARN] {company_name} AI 분석 실패 (스냅샷은 정상 저장됨): {ai_error}", file=sys.stderr)
+        traceback.print_exc(file=sys.stderr)
+    finally:
+        result["ai_sec"] = time.perf_counter() - started
+
+    return result
+
+
 def main():
     """전월 데이터로 스냅샷 생성 및 AI 분석"""
     # 현재 시간 (UTC)
@@ -83,64 +164,51 @@ def main():
         print(f"❌ [ERROR] 처리할 회사 목록이 없습니다.", file=sys.stderr)
         sys.exit(1)
     
+    parallelism = max(1, min(SNAPSHOT_PARALLELISM, len(company_names)))
+    
     print(f"📅 [INFO] 스냅샷 생성 대상: {target_year}년 {target_month}월", file=sys.stderr)
     print(f"🏢 [INFO] 대상 회사: {', '.join(company_names)}", file=sys.stderr)
+    print(f"⚙️ [INFO] 병렬 처리: 회사 {parallelism}개 동시, BigQuery 동시 쿼리 최대 {BQ_MAX_CONCURRENT_QUERIES}개", file=sys.stderr)
+    
+    # 모든 회사가 하나의 BigQuery 클라이언트(커넥션 풀)와 동시 실행 상한을 공유
+    shared_client = BoundedQueryClient(bq_client, BQ_MAX_CONCURRENT_QUERIES)
     
-    success_count = 0
-    error_count = 0
+    job_started = time.perf_counter()
     
-    for company_name in company_names:
+    # 회사 공통 사실 데이터를 계열별 쿼리 1회로 미리 조회 (실패 시 회사별 쿼리로 진행)
+    batch_facts = None
+    if SNAPSHOT_BATCH_FACTS:
         try:
-            print(f"\n{'='*60}", file=sys.stderr)
-            print(f"📊 [INFO] {company_name} 스냅샷 생성 시작...", file=sys.stderr)
-            print(f"{'='*60}\n", file=sys.stderr)
-            
-            # 스냅샷 생성 (GCS에 저장, 강제 재생성)
-            # use_current_month_events=True: 리포트 대상 월의 이벤트를 조회
-            # 예: 12월 리포트 생성 시 → 12월 이벤트 조회 (동월 이벤트)
-            run(
-                company_name=company_name,
-                year=target_year,
-                month=target_month,
-                upsert_flag=False,
-                save_to_gcs_flag=True,
-                load_from_gcs_flag=False,  # --force와 동일 (재생성)
-                use_current_month_events=True  # 동월 이벤트 조회 (리포트 대상 월의 이벤트)
-            )
-            
-            print(f"✅ [SUCCESS] {company_name} 스냅샷 생성 완료", file=sys.stderr)
-            
-            # AI 분석 자동 추가
-            print(f"\n🤖 [INFO] {company_name} AI 분석 생성 중...", file=sys.stderr)
-            try:
-                snapshot_path = f"gs://{gcs_bucket}/ai-reports/monthly/{company_name}/{target_year}-{target_month:02d}/snapshot.json.gz"
-                
-                # AI 분석 생성 (같은 파일에 덮어쓰기)
-                generate_ai_analysis_from_file(
-                    snapshot_file=snapshot_path,
-                    output_file=None,  # 입력 파일에 덮어쓰기
-                    system_prompt_file=None  # 자동으로 system_prompt_v44.txt 찾기
-                )
-                
-                print(f"✅ [SUCCESS] {company_name} AI 분석 완료", file=sys.stderr)
-                success_count += 1
-                
-            except Exception as ai_error:
-                # AI 분석 실패해도 스냅샷은 성공했으므로 경고만 출력
-                print(f"⚠️ [WARN] {company_name} AI 분석 실패 (스냅샷은 정상 저장됨): {ai_error}", file=sys.stderr)
-                import traceback
-                traceback.print_exc(file=sys.stderr)
-                # 스냅샷은 성공했으므로 success_count 증가
-                success_count += 1
-            
+            batch_facts = prefetch_batch_facts(shared_client, company_names, target_year, target_month)
         except Exception as e:
-            error_count += 1
-            print(f"❌ [ERROR] {company_name} 스냅샷 생성 실패: {e}", file=sys.stderr)
-            import traceback
+            print(f"⚠️ [WARN] 회사 통합 배치 조회 실패 - 회사별 쿼리로 진행: {e}", file=sys.stderr)
             traceback.print_exc(file=sys.stderr)
-            # 하나 실패해도 다른 회사는 계속 진행
+    results = []
+    
+    if parallelism == 1:
+        for company_name in company_names:
+            results.append(process_company(company_name, target_year, target_month, gcs_bucket, shared_client, batch_facts))
+    else:
+        with ThreadPoolExecutor(max_workers=parallelism, thread_name_prefix="snapshot") as executor:
+            futures = [
+                executor.submit(process_company, company_name, target_year, target_month, gcs_bucket, shared_client, batch_facts)
+                for company_name in company_names
+            ]
+            # 하나 실패해도 다른 회사는 계속 진행 (process_company 내부에서 예외 처리)
+            for future in as_completed(futures):
+                results.append(future.result())
+    
+    total_sec = time.perf_counter() - job_started
+    success_count = sum(1 for r in results if r["ok"])
+    error_count = len(results) - success_count
     
     print(f"\n{'='*60}", file=sys.stderr)
+    print(f"⏱️ [TIMING] 회사별 소요 시간", file=sys.stderr)
+    for r in sorted(results, key=lambda r: r["snapshot_sec"] + r["ai_sec"], reverse=True):
+        status = "OK" if r["ok"] else f"FAIL ({r['error']})"
+        ai_status = "" if not r["ok"] else (" / AI OK" if r["ai_ok"] else " / AI FAIL")
+        print(f"   {r['company']:<20} snapshot {r['snapshot_sec']:7.1f}s  ai {r['ai_sec']:7.1f}s  {status}{ai_status}", file=sys.stderr)
+    print(f"   전체 {total_sec:.1f}s (회사별 합계 {sum(r['snapshot_sec'] + r['ai_sec'] for r in results):.1f}s)", file=sys.stderr)
     print(f"📊 [SUMMARY] 성공: {success_count}, 실패: {error_count}", file=sys.stderr)
     print(f"{'='*60}\n", file=sys.stderr)
     
@@ -150,4 +218,3 @@ def main():
 
 if __name__ == "__main__":
     main()
-
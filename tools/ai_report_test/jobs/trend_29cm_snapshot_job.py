@@ -59,14 +59,15 @@ else:
 from tools.trend_29cm_snapshot import (
     get_current_week_run_id,
     get_available_tabs,
-    get_rising_star,
-    get_new_entry,
-    get_rank_drop,
+    get_all_tabs_trend,
     get_snapshot_path,
     save_snapshot_to_gcs,
     get_all_companies_from_bq,
-    get_company_korean_name_from_bq
+    get_company_korean_name_from_bq,
+    process_companies
 )
+from ngn_wep.dashboard.services.trend_rank_diff import empty_trend_lists
+from ngn_wep.dashboard.utils.trend_artifact_cache import publish_trend_artifact
 
 def main():
     """최신 주차 데이터로 업체별 스냅샷 생성"""
@@ -80,21 +81,21 @@ def main():
         tabs = get_available_tabs(run_id)
         print(f"   [INFO] 찾은 탭: {', '.join(tabs)}", file=sys.stderr)
         
-        # 각 탭별 데이터 조회 (모든 업체 공통)
+        # 전체 탭 데이터 조회 (모든 업체 공통, 쿼리 1회)
         print(f"\n📊 [INFO] 데이터 조회 중...", file=sys.stderr)
+        all_tabs = get_all_tabs_trend(run_id)
         tabs_data = {}
         
         for tab in tabs:
-            print(f"   [INFO] [{tab}] 조회 중...", file=sys.stderr)
-            tabs_data[tab] = {
-                "rising_star": get_rising_star(tab, run_id),
-                "new_entry": get_new_entry(tab, run_id),
-                "rank_drop": get_rank_drop(tab, run_id)
-            }
+            print(f"   [INFO] [{tab}]", file=sys.stderr)
+            tabs_data[tab] = all_tabs.get(tab) or empty_trend_lists()
             print(f"      [INFO] - 급상승: {len(tabs_data[tab]['rising_star'])}개", file=sys.stderr)
             print(f"      [INFO] - 신규진입: {len(tabs_data[tab]['new_entry'])}개", file=sys.stderr)
             print(f"      [INFO] - 순위하락: {len(tabs_data[tab]['rank_drop'])}개", file=sys.stderr)
         
+        # 대시보드 워커가 메모리에 올릴 주간 아티팩트 게시 (전체 탭 × 3개 목록)
+        publish_trend_artifact("29cm", run_id, tabs_data, tabs=tabs)
+        
         # 처리할 업체 목록 조회 (demo 포함)
         companies_to_process = get_all_companies_from_bq()
         if not companies_to_process:
@@ -102,17 +103,8 @@ def main():
             sys.exit(1)
         print(f"\n📌 [INFO] 처리할 업체: {', '.join(companies_to_process)}", file=sys.stderr)
         
-        # 각 업체별 스냅샷 생성 및 AI 분석
-        from tools.trend_29cm_snapshot import process_single_company
-        
-        success_count = 0
-        fail_count = 0
-        
-        for company_name in companies_to_process:
-            if process_single_company(run_id, company_name, tabs_data, target_brand=None):
-                success_count += 1
-            else:
-                fail_count += 1
+        # 업체별 스냅샷 생성 및 AI 분석 (병렬, TREND_SNAPSHOT_CONCURRENCY)
+        success_count, fail_count = process_companies(run_id, companies_to_process, tabs_data)
         
         # 최종 결과 출력
         print(f"\n{'='*60}", file=sys.stderr)
@@ -0,0 +1,167 @@
+"""
+상품명 정규화 / 매칭 엔진
+- 정규화 규칙은 모듈 로드 시 1회 컴파일 (기존: 문자열마다 re.sub 반복 + [..] 제거 while 루프)
+- normalize_item_names(): 컬럼 단위 정규화 - 고유값만 1회씩 정규화 후 재사용 (GA4 item_name은 중복이 많음)
+  ※ pandas .str.replace(object dtype)는 내부적으로 같은 re 순회라 이득이 없고,
+    Arrow(RE2) 문자열 연산은 규칙에 필요한 lookahead를 지원하지 않아 사용하지 않음
+- ProductNameIndex: 정확 일치 dict + 문자 bigram 역색인 (Dice 유사도)
+  후보 생성은 prefix filtering(희귀 bigram 순으로 정렬한 앞부분만 색인/조회)으로 전체 쌍 비교 없이 수행하고
+  후보만 정확한 Dice 값으로 검증 → 임계값 이상인 쌍은 빠짐없이 찾음
+
+벤치마크: python3 tools/ai_report_test/bench_product_name_matcher.py
+"""
+import math
+import re
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+# 기본 유사도 임계값 (옵션/표기 차이 수준만 매칭되도록 보수적으로 설정)
+PRODUCT_NAME_MATCH_MIN_SCORE = 0.8
+
+# ============================================================
+# 정규화 규칙 (기존 bq_monthly_snapshot.normalize_item_name과 동일한 결과)
+# ============================================================
+# 앞쪽 [..] 반복 제거 ([SET]을 만나면 중단)
+_LEADING_BRACKETS_RE = re.compile(r"^(?:\[(?!SET\])[^\]]+\]\s*)+")
+# 옵션 제거: "옵션 토큰" + "옵션 경계"일 때만 절단
+# - 토큰 길이 제한으로 과삭제 방지 (한글 1~6자, 영문 1~12자)
+# - 옵션 뒤는 EOL/공백/괄호/대괄호 등 옵션스러운 경계만 허용
+_OPTION_SUFFIX_RE = re.compile(
+    r"_(?:\d{1,2}color|xs|s|m|l|xl|xxl|free|[a-z]{1,12}|[가-힣]{1,6})(?=($|[\s\(\[])).*$",
+    flags=re.IGNORECASE,
+)
+_WHITESPACE_RE = re.compile(r"\s+")
+_EMPTY_NAMES = ("", "(not set)")
+
+
+def normalize_item_name(name) -> str:
+    """상품명 정규화 (단건)"""
+    if name is None:
+        return ""
+
+    s = str(name).strip()
+    if s in _EMPTY_NAMES:
+        return ""
+
+    s = _LEADING_BRACKETS_RE.sub("", s)
+    s = _OPTION_SUFFIX_RE.sub("", s)
+    return _WHITESPACE_RE.sub(" ", s).strip()
+
+
+def normalize_item_names(names: Iterable) -> List[str]:
+    """상품명 컬럼 일괄 정규화 (normalize_item_name과 같은 결과)"""
+    memo: Dict[str, str] = {}
+    result = []
+    for name in names:
+        if name is None:
+            result.append("")
+            continue
+        key = memo.get(name)
+        if key is None:
+            key = normalize_item_name(name)
+            memo[name] = key
+        result.append(key)
+    return result
+
+
+# ============================================================
+# 매칭 (bigram 역색인 + prefix filtering)
+# ============================================================
+def name_bigrams(key: str) -> frozenset:
+    """정규화된 상품명의 문자 bigram 집합 (대소문자/공백 무시)"""
+    compact = key.lower().replace(" ", "")
+    if len(compact) < 2:
+        return frozenset([compact]) if compact else frozenset()
+    return frozenset(compact[i:i + 2] for i in range(len(compact) - 1))
+
+
+def _dice(a: frozenset, b: frozenset) -> float:
+    if not a or not b:
+        return 0.0
+    return 2.0 * len(a & b) / (len(a) + len(b))
+
+
+def _prefix_length(size: int, min_score: float) -> int:
+    """Dice >= min_score 이려면 공유해야 하는 최소 bigram 수 기준 prefix 길이"""
+    min_overlap = math.ceil(min_score * size / (2.0 - min_score) - 1e-9)
+    return max(size - min_overlap + 1, 1)
+
+
+class ProductNameIndex:
+    """
+    정규화된 상품명 목록에 대한 정확/유사 매칭 색인
+
+    index = ProductNameIndex(keys)
+    index.best_match("상품명")  → (매칭된 key, 점수) 또는 None
+    """
+
+    def __init__(self, keys: Iterable[str], min_score: float = PRODUCT_NAME_MATCH_MIN_SCORE):
+        self.min_score = min_score
+        self.keys: List[str] = []
+        self._exact: Dict[str, int] = {}
+        for key in keys:
+            if key and key not in self._exact:
+                self._exact[key] = len(self.keys)
+                self.keys.append(key)
+
+        self._grams: List[frozenset] = [name_bigrams(k) for k in self.keys]
+
+        # 전역 순서: 문서 빈도가 낮은 bigram 먼저 (희귀 bigram일수록 후보가 적음)
+        df: Dict[str, int] = defaultdict(int)
+        for grams in self._grams:
+            for g in grams:
+                df[g] += 1
+        self._df = df
+
+        self._postings: Dict[str, List[int]] = defaultdict(list)
+        for doc_id, grams in enumerate(self._grams):
+            for g in self._ordered(grams)[:_prefix_length(len(grams), min_score)]:
+                self._postings[g].append(doc_id)
+
+    def _ordered(self, grams: frozenset) -> List[str]:
+        return sorted(grams, key=lambda g: (self._df.get(g, 0), g))
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def best_match(self, key: str) -> Optional[Tuple[str, float]]:
+        """정확 일치 우선, 없으면 Dice 유사도가 가장 높은 key (min_score 미만이면 None)"""
+        if not key:
+            return None
+        if key in self._exact:
+            return key, 1.0
+
+        grams = name_bigrams(key)
+        if not grams:
+            return None
+
+        size = len(grams)
+        min_size = self.min_score * size / (2.0 - self.min_score)
+        max_size = (2.0 - self.min_score) * size / self.min_score
+
+        candidates = set()
+        for g in self._ordered(grams)[:_prefix_length(size, self.min_score)]:
+            candidates.update(self._postings.get(g, ()))
+
+        best: Optional[Tuple[str, float]] = None
+        best_doc = -1
+        for doc_id in candidates:
+            doc_grams = self._grams[doc_id]
+            if not (min_size - 1e-9 <= len(doc_grams) <= max_size + 1e-9):
+                continue
+            score = _dice(grams, doc_grams)
+            # 동점이면 먼저 등록된 key (입력 순서 = 매출 순위 등) 우선
+            if score >= self.min_score and (best is None or score > best[1] or (score == best[1] and doc_id < best_doc)):
+                best = (self.keys[doc_id], score)
+                best_doc = doc_id
+        return best
+
+    def match_many(self, keys: Sequence[str]) -> List[Optional[Tuple[str, float]]]:
+        """여러 key 일괄 매칭 (같은 key는 한 번만 계산)"""
+        memo: Dict[str, Optional[Tuple[str, float]]] = {}
+        results = []
+        for key in keys:
+            if key not in memo:
+                memo[key] = self.best_match(key)
+            results.append(memo[key])
+        return results
@@ -2,6 +2,7 @@
 """
 섹션 7만 재생성하는 스크립트
 기존 리포트의 섹션 7 데이터를 수정된 파싱 로직으로 재생성합니다.
+입력(섹션 7 프롬프트)이 그대로면 캐시된 모델 응답을 다시 파싱만 하고, --force면 모델을 다시 호출합니다.
 """
 
 import os
@@ -14,16 +15,20 @@ from tools.ai_report_test.ai_analyst import generate_ai_analysis_from_file
 
 def main():
     """섹션 7만 재생성"""
-    if len(sys.argv) < 4:
-        print("Usage: python3 regenerate_section7.py <company_name> <year> <month>")
+    force = "--force" in sys.argv[1:]
+    args = [arg for arg in sys.argv[1:] if arg != "--force"]
+    
+    if len(args) < 3:
+        print("Usage: python3 regenerate_section7.py <company_name> <year> <month> [--force]")
         print("예시: python3 regenerate_section7.py piscess 2025 1")
+        print("  --force: 섹션 결과 캐시를 무시하고 모델을 다시 호출")
         print("")
         print("GCS 경로: gs://{bucket}/ai-reports/monthly/{company}/{YYYY-MM}/snapshot.json.gz")
         sys.exit(1)
     
-    company_name = sys.argv[1]
-    year = int(sys.argv[2])
-    month = int(sys.argv[3])
+    company_name = args[0]
+    year = int(args[1])
+    month = int(args[2])
     
     # GCS 버킷 정보
     gcs_bucket = os.environ.get("GCS_BUCKET", "winged-precept-443218-v8.appspot.com")
@@ -37,6 +42,8 @@ def main():
     print(f"📅 [INFO] 대상: {company_name} {year}년 {month}월")
     print("")
     print("⚠️ [참고] 이 스크립트는 섹션 7만 재생성하며, 다른 섹션(1-6, 8-9)은 기존 데이터를 유지합니다.")
+    if force:
+        print("⚠️ [참고] --force: 섹션 결과 캐시를 사용하지 않습니다.")
     print("")
     
     try:
@@ -46,7 +53,8 @@ def main():
             snapshot_file=snapshot_path,
             output_file=None,  # 같은 파일에 덮어쓰기
             system_prompt_file=None,  # 자동으로 system_prompt_v44.txt 찾기
-            sections=[7]  # 섹션 7만 재생성 (다른 섹션은 기존 데이터 유지)
+            sections=[7],  # 섹션 7만 재생성 (다른 섹션은 기존 데이터 유지)
+            use_section_cache=False if force else None  # 기본: 입력이 같으면 캐시된 응답 재파싱
         )
         
         print("")
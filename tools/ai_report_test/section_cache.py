@@ -0,0 +1,142 @@
+"""
+AI 섹션 결과 캐시 (Content-addressed)
+- 키: sha256(프롬프트 템플릿 버전 + 모델 + 생성 파라미터 + System Prompt + build_section_prompt() 결과)
+  → 섹션에 들어가는 스냅샷 데이터가 그대로면 재실행해도 모델을 다시 호출하지 않음
+- 값: 모델 원본 응답 텍스트 + 토큰 사용량 (후처리/파싱은 읽을 때마다 다시 적용 → 파싱 로직 수정은 바로 반영)
+- 저장소: AI_SECTION_CACHE_BUCKET(기본 GCS_BUCKET) 설정 시 GCS, 아니면 로컬 디스크(AI_SECTION_CACHE_DIR)
+"""
+import os
+import sys
+import json
+import time
+import hashlib
+import threading
+from typing import Dict, Optional
+
+# 프롬프트 밖의 생성 방식(응답 형식 약속, 모델 설정 등)을 바꾸면 버전을 올려서 기존 캐시 무효화
+# (build_section_prompt/System Prompt 내용 변경은 키에 포함되므로 자동으로 무효화됨)
+PROMPT_TEMPLATE_VERSION = os.environ.get("AI_PROMPT_TEMPLATE_VERSION", "v44.1")
+
+AI_SECTION_CACHE = os.environ.get("AI_SECTION_CACHE", "1") == "1"
+AI_SECTION_CACHE_DIR = os.environ.get("AI_SECTION_CACHE_DIR", "/tmp/ai_section_cache")
+AI_SECTION_CACHE_BUCKET = os.environ.get("AI_SECTION_CACHE_BUCKET", os.environ.get("GCS_BUCKET", ""))
+AI_SECTION_CACHE_PREFIX = os.environ.get("AI_SECTION_CACHE_PREFIX", "ai-reports/_section_cache")
+
+
+def section_cache_key(section_num: int, model: str, generation_params: Dict, system_prompt_text: str, section_prompt: str) -> str:
+    """섹션 결과 캐시 키"""
+    raw = "|".join([
+        PROMPT_TEMPLATE_VERSION,
+        model,
+        str(section_num),
+        json.dumps(generation_params, sort_keys=True),
+        hashlib.sha256(system_prompt_text.encode("utf-8")).hexdigest(),
+        section_prompt,
+    ])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class LocalSectionStore:
+    """로컬 디스크 저장소"""
+
+    def __init__(self, root: str):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], f"{key}.json")
+
+    def read(self, key: str) -> Optional[bytes]:
+        try:
+            with open(self._path(key), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def write(self, key: str, data: bytes):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # 임시 파일에 쓰고 rename → 동시 실행 중인 작업이 반쯤 쓰인 파일을 읽지 않도록
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+
+class GCSSectionStore:
+    """GCS 저장소 (Cloud Run Job 실행 간 공유)"""
+
+    def __init__(self, bucket_name: str, prefix: str):
+        from google.cloud import storage
+
+        self.bucket = storage.Client().bucket(bucket_name)
+        self.prefix = prefix.strip("/")
+
+    def _blob(self, key: str):
+        return self.bucket.blob(f"{self.prefix}/{key[:2]}/{key}.json")
+
+    def read(self, key: str) -> Optional[bytes]:
+        from google.api_core.exceptions import NotFound
+
+        try:
+            return self._blob(key).download_as_bytes()
+        except NotFound:
+            return None
+
+    def write(self, key: str, data: bytes):
+        self._blob(key).upload_from_string(data, content_type="application/json")
+
+
+class SectionCache:
+    """섹션 결과 캐시 (조회/저장 실패는 경고만 남기고 모델 호출로 진행)"""
+
+    def __init__(self, store):
+        self.store = store
+
+    def get(self, key: str) -> Optional[Dict]:
+        try:
+            raw = self.store.read(key)
+        except Exception as e:
+            print(f"⚠️ [WARN] 섹션 캐시 조회 실패 ({key[:12]}): {e}", file=sys.stderr)
+            return None
+        if raw is None:
+            return None
+
+        entry = json.loads(raw)
+        if entry.get("template_version") != PROMPT_TEMPLATE_VERSION or not entry.get("raw_text"):
+            return None
+        return entry
+
+    def put(self, key: str, section_num: int, model: str, raw_text: str, usage: Dict):
+        entry = {
+            "template_version": PROMPT_TEMPLATE_VERSION,
+            "model": model,
+            "section_num": section_num,
+            "raw_text": raw_text,
+            "usage": usage,
+            "created_at": int(time.time()),
+        }
+        try:
+            self.store.write(key, json.dumps(entry, ensure_ascii=False).encode("utf-8"))
+        except Exception as e:
+            print(f"⚠️ [WARN] 섹션 캐시 저장 실패 ({key[:12]}): {e}", file=sys.stderr)
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_section_cache() -> SectionCache:
+    """SectionCache 싱글톤 (환경변수에 따라 GCS/로컬 선택)"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                if AI_SECTION_CACHE_BUCKET:
+                    print(f"✅ [INFO] AI 섹션 캐시: gs://{AI_SECTION_CACHE_BUCKET}/{AI_SECTION_CACHE_PREFIX}", file=sys.stderr)
+                    store = GCSSectionStore(AI_SECTION_CACHE_BUCKET, AI_SECTION_CACHE_PREFIX)
+                else:
+                    print(f"✅ [INFO] AI 섹션 캐시: {AI_SECTION_CACHE_DIR}", file=sys.stderr)
+                    store = LocalSectionStore(AI_SECTION_CACHE_DIR)
+                _cache = SectionCache(store)
+    return _cache
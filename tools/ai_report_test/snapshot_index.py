@@ -0,0 +1,115 @@
+"""
+월간 스냅샷 경로 인덱스 (ai-reports/monthly/_index.json)
+- 스냅샷을 쓸 때마다 (company, YYYY-MM) → 경로/generation 을 기록
+- 대시보드(ngn_wep/dashboard/utils/monthly_snapshot_cache.py)는 이 인덱스로
+  blob.exists() 탐색 없이 경로를 찾고, generation 기준으로 캐시를 무효화함
+
+형식:
+{
+    "version": 1,
+    "updated_at": "2026-01-01T00:00:00+00:00",
+    "entries": {
+        "<company>/<YYYY-MM>": {"path": "...", "generation": 123, "gzip": true, "updated": "..."}
+    }
+}
+"""
+import re
+import sys
+import json
+from datetime import datetime, timezone
+
+INDEX_BLOB_PATH = "ai-reports/monthly/_index.json"
+INDEX_VERSION = 1
+
+# ai-reports/monthly/{company}/{YYYY-MM}/snapshot.json[.gz]
+SNAPSHOT_PATH_PATTERN = re.compile(r"^ai-reports/monthly/([^/]+)/(\d{4}-\d{2})/snapshot\.json(\.gz)?$")
+
+# 동시에 여러 회사 스냅샷이 인덱스를 갱신할 수 있으므로 generation 조건부 쓰기 재시도
+MAX_UPDATE_ATTEMPTS = 8
+
+
+def _entry_for_blob(blob) -> dict:
+    return {
+        "path": blob.name,
+        "generation": blob.generation,
+        "gzip": blob.name.endswith(".gz"),
+        "updated": blob.updated.isoformat() if blob.updated else None,
+    }
+
+
+def _write_index(bucket, entries: dict, if_generation_match):
+    index_blob = bucket.blob(INDEX_BLOB_PATH)
+    index_blob.cache_control = "no-cache"
+    payload = {
+        "version": INDEX_VERSION,
+        "updated_at": datetime.now(timezone.utc).isoformat(),
+        "entries": entries,
+    }
+    index_blob.upload_from_string(
+        json.dumps(payload, ensure_ascii=False, sort_keys=True),
+        content_type="application/json",
+        if_generation_match=if_generation_match,
+    )
+
+
+def rebuild_snapshot_index(bucket) -> dict:
+    """버킷의 스냅샷 목록으로 인덱스 전체 재생성 (list 1회)"""
+    entries = {}
+    for blob in bucket.list_blobs(prefix="ai-reports/monthly/"):
+        match = SNAPSHOT_PATH_PATTERN.match(blob.name)
+        if not match:
+            continue
+        company_name, month_str, gz = match.groups()
+        key = f"{company_name}/{month_str}"
+        # 같은 월에 .json/.json.gz 가 둘 다 있으면 압축 파일 우선 (대시보드 탐색 순서와 동일)
+        if key in entries and entries[key]["gzip"] and not gz:
+            continue
+        entries[key] = _entry_for_blob(blob)
+
+    _write_index(bucket, entries, if_generation_match=None)
+    print(f"✅ [INFO] 스냅샷 인덱스 재생성: {len(entries)}개 항목", file=sys.stderr)
+    return entries
+
+
+def update_snapshot_index(bucket, blob) -> bool:
+    """
+    방금 쓴 스냅샷 blob을 인덱스에 반영
+    - 스냅샷 경로 형식이 아니면 무시
+    - 실패해도 스냅샷 저장 자체는 성공이므로 False만 반환 (대시보드는 경로 탐색으로 폴백)
+    """
+    from google.api_core.exceptions import NotFound, PreconditionFailed
+
+    match = SNAPSHOT_PATH_PATTERN.match(blob.name)
+    if not match:
+        return False
+
+    company_name, month_str, _ = match.groups()
+    key = f"{company_name}/{month_str}"
+
+    try:
+        if blob.generation is None:
+            blob.reload()
+        entry = _entry_for_blob(blob)
+
+        for _ in range(MAX_UPDATE_ATTEMPTS):
+            index_blob = bucket.get_blob(INDEX_BLOB_PATH)
+            if index_blob is None:
+                # 인덱스가 없으면 전체 재생성 (방금 쓴 스냅샷도 포함됨)
+                rebuild_snapshot_index(bucket)
+                return True
+
+            try:
+                entries = json.loads(index_blob.download_as_bytes(if_generation_match=index_blob.generation)).get("entries", {})
+                entries[key] = entry
+                _write_index(bucket, entries, if_generation_match=index_blob.generation)
+                print(f"✅ [INFO] 스냅샷 인덱스 갱신: {key} → {entry['path']}#{entry['generation']}", file=sys.stderr)
+                return True
+            except (PreconditionFailed, NotFound):
+                # 다른 작업이 먼저 갱신함 → 다시 읽고 재시도
+                continue
+
+        print(f"⚠️ [WARN] 스냅샷 인덱스 갱신 재시도 초과: {key}", file=sys.stderr)
+        return False
+    except Exception as e:
+        print(f"⚠️ [WARN] 스냅샷 인덱스 갱신 실패 (스냅샷은 정상 저장됨): {key}: {e}", file=sys.stderr)
+        return False
@@ -406,24 +406,11 @@ def optimize_data_for_flash(json_data: Dict) -> str:
 # 프롬프트 생성 함수
 # ============================================
 
-def build_trend_analysis_prompt(
-    snapshot_data: Dict,
-    target_brand: str = DEFAULT_TARGET_BRAND
-) -> str:
-    """
-    29CM 트렌드 분석 프롬프트 생성
+TREND_SEGMENTS = ("rising_star", "new_entry", "rank_drop")
 
-    Args:
-        snapshot_data: 트렌드 스냅샷 데이터
-        target_brand: 분석 타겟 브랜드명 (한글명)
-
-    Returns:
-        프롬프트 문자열
-    """
-    tabs_data = snapshot_data.get("tabs_data", {})
-    current_week = snapshot_data.get("current_week", "")
 
-    # 자사몰 브랜드 목록 가져오기 (target_brand 기반)
+def get_own_brand_names(target_brand: str) -> list:
+    """target_brand(한글명)에 해당하는 자사몰 브랜드 목록 (없으면 target_brand 자체)"""
     own_brand_names = []
     if COMPANY_MAPPING_AVAILABLE:
         # target_brand(한글명)에 해당하는 영문 company_name 찾기
@@ -434,67 +421,99 @@ def build_trend_analysis_prompt(
     # 자사몰 브랜드 목록이 없으면 target_brand 자체를 포함
     if not own_brand_names:
         own_brand_names = [target_brand]
+    return own_brand_names
 
-    # 데이터 요약 및 필수 필드만 추출 (자사몰 상품 우선 포함)
-    def extract_essential_fields(items: list, max_items: int = 15) -> list:
-        """필수 필드만 추출하여 AI 프롬프트 크기 최적화 (자사몰 상품 우선 포함)"""
-        essential = []
-        own_brand_items = []
-        other_items = []
-
-        # 자사몰 상품과 일반 상품 분리
-        for item in items:
-            brand_name = item.get("Brand_Name") or ""
-            item_data = {
-                "Brand": brand_name,  # 필수: 브랜드명
-                "Product": item.get("Product_Name"),  # 필수: 상품명
-                "Rank_Change": item.get("Rank_Change"),  # 필수: 순위 변화
-                "Price": item.get("price")  # 필수: 가격
-            }
-
-            # 자사몰 브랜드인지 확인
-            if brand_name in own_brand_names:
-                own_brand_items.append(item_data)
-            else:
-                other_items.append(item_data)
 
-        # 자사몰 상품 먼저 추가 (전부 포함)
-        essential.extend(own_brand_items)
+def select_essential_items(categories: Dict, own_brand_names: list, max_items: int = 15) -> Dict:
+    """카테고리/세그먼트별 상위 max_items개 선택 (자사몰 상품은 전부 우선 포함)"""
+    selected = {}
+    for tab_name, segments in categories.items():
+        selected[tab_name] = {}
+        for segment, items in segments.items():
+            own_brand_items = [item for item in items if item["Brand"] in own_brand_names]
+            other_items = [item for item in items if item["Brand"] not in own_brand_names]
+            # 남은 슬롯에 일반 상품 추가
+            remaining_slots = max(0, max_items - len(own_brand_items))
+            selected[tab_name][segment] = own_brand_items + other_items[:remaining_slots]
+    return selected
 
-        # 남은 슬롯에 일반 상품 추가
-        remaining_slots = max(0, max_items - len(own_brand_items))
-        essential.extend(other_items[:remaining_slots])
 
-        return essential
-    
+def build_trend_prompt_base(snapshot_data: Dict) -> Dict:
+    """
+    업체와 무관한 프롬프트 재료 (여러 업체 리포트 생성 시 한 번만 계산해서 재사용)
+    - 카테고리별 필수 필드 추출, 요약 통계, 자사몰 상품이 없는 경우의 압축 데이터 텍스트
+    """
+    tabs_data = snapshot_data.get("tabs_data", {})
+
     # 모든 카테고리 선택 (CORE_CATEGORIES 필터링 제거)
     # tabs_data에 있는 모든 카테고리를 사용 (29CM와 Ably 모두 지원)
-    all_tabs = list(tabs_data.keys())
-    
     # "전체" 탭이 있으면 제외 (세부 카테고리만 사용)
-    if "전체" in all_tabs:
-        all_tabs = [tab for tab in all_tabs if tab != "전체"]
-    
-    # 데이터 준비 (모든 카테고리, 각 세그먼트당 상위 15개)
-    all_categories_data = {}
-    
+    all_tabs = [tab for tab in tabs_data.keys() if tab != "전체"]
+
+    # 필수 필드만 추출하여 AI 프롬프트 크기 최적화
+    categories = {}
+    brands = set()
     for tab_name in all_tabs:
-        if tab_name not in tabs_data:
-            continue
         tab_data = tabs_data[tab_name]
-        all_categories_data[tab_name] = {
-            "rising_star": extract_essential_fields(tab_data.get("rising_star", []), max_items=15),
-            "new_entry": extract_essential_fields(tab_data.get("new_entry", []), max_items=15),
-            "rank_drop": extract_essential_fields(tab_data.get("rank_drop", []), max_items=15)
-        }
-    
-    # 데이터 요약 통계 (전체 탭 기준)
-    total_rising = sum(len(tab_data.get("rising_star", [])) for tab_data in tabs_data.values())
-    total_new_entry = sum(len(tab_data.get("new_entry", [])) for tab_data in tabs_data.values())
-    total_rank_drop = sum(len(tab_data.get("rank_drop", [])) for tab_data in tabs_data.values())
-    
+        categories[tab_name] = {}
+        for segment in TREND_SEGMENTS:
+            items = []
+            for item in tab_data.get(segment, []):
+                brand_name = item.get("Brand_Name") or ""
+                brands.add(brand_name)
+                items.append({
+                    "Brand": brand_name,  # 필수: 브랜드명
+                    "Product": item.get("Product_Name"),  # 필수: 상품명
+                    "Rank_Change": item.get("Rank_Change"),  # 필수: 순위 변화
+                    "Price": item.get("price")  # 필수: 가격
+                })
+            categories[tab_name][segment] = items
+
+    return {
+        "current_week": snapshot_data.get("current_week", ""),
+        "categories": categories,
+        "brands": brands,
+        # 데이터 요약 통계 (전체 탭 기준)
+        "total_rising": sum(len(tab_data.get("rising_star", [])) for tab_data in tabs_data.values()),
+        "total_new_entry": sum(len(tab_data.get("new_entry", [])) for tab_data in tabs_data.values()),
+        "total_rank_drop": sum(len(tab_data.get("rank_drop", [])) for tab_data in tabs_data.values()),
+        # 자사몰 상품이 목록에 없는 업체는 모두 같은 데이터 텍스트를 사용
+        "default_optimized_data": optimize_data_for_flash(select_essential_items(categories, [])),
+    }
+
+
+def build_trend_analysis_prompt(
+    snapshot_data: Dict,
+    target_brand: str = DEFAULT_TARGET_BRAND,
+    prompt_base: Optional[Dict] = None
+) -> str:
+    """
+    29CM 트렌드 분석 프롬프트 생성
+
+    Args:
+        snapshot_data: 트렌드 스냅샷 데이터
+        target_brand: 분석 타겟 브랜드명 (한글명)
+        prompt_base: build_trend_prompt_base() 결과 (None이면 snapshot_data로 계산)
+
+    Returns:
+        프롬프트 문자열
+    """
+    if prompt_base is None:
+        prompt_base = build_trend_prompt_base(snapshot_data)
+
+    # 자사몰 브랜드 목록 가져오기 (target_brand 기반)
+    own_brand_names = get_own_brand_names(target_brand)
+
     # 데이터를 텍스트 형태로 압축 (Flash 모델 최적화 + 상품명 단축)
-    optimized_data = optimize_data_for_flash(all_categories_data)
+    # 자사몰 상품이 목록에 있을 때만 자사몰 우선 포함 버전을 새로 계산
+    if prompt_base["brands"].isdisjoint(own_brand_names):
+        optimized_data = prompt_base["default_optimized_data"]
+    else:
+        optimized_data = optimize_data_for_flash(select_essential_items(prompt_base["categories"], own_brand_names))
+    current_week = prompt_base["current_week"]
+    total_rising = prompt_base["total_rising"]
+    total_new_entry = prompt_base["total_new_entry"]
+    total_rank_drop = prompt_base["total_rank_drop"]
     
     # 디버깅: 압축된 데이터 확인
     print(f"🔍 [DEBUG] 압축된 데이터 길이: {len(optimized_data):,} 자", file=sys.stderr)
@@ -541,7 +560,8 @@ def generate_trend_analysis(
     api_key: Optional[str] = None,
     target_brand: Optional[str] = None,
     max_tokens: int = 16384,
-    platform: str = "29CM"
+    platform: str = "29CM",
+    prompt_base: Optional[Dict] = None
 ) -> Optional[str]:
     """
     29CM 트렌드 스냅샷 데이터를 AI로 분석하여 리포트 생성
@@ -551,6 +571,7 @@ def generate_trend_analysis(
         api_key: Gemini API 키 (None이면 환경변수에서 로드)
         target_brand: 분석 타겟 브랜드명 (한글명, None이면 DEFAULT_TARGET_BRAND 사용)
         max_tokens: 최대 토큰 수 (기본값 16384)
+        prompt_base: 업체 공통 프롬프트 재료 (build_trend_prompt_base 결과, 여러 업체 처리 시 재사용)
     
     Returns:
         AI 분석 리포트 텍스트 (마크다운 형식)
@@ -624,7 +645,7 @@ def generate_trend_analysis(
             print(f"⚠️ [WARN] Safety Settings 사용 불가 (import 실패), 기본 설정 사용", file=sys.stderr)
         
         # 프롬프트 생성
-        prompt = build_trend_analysis_prompt(snapshot_data, target_brand=target_brand)
+        prompt = build_trend_analysis_prompt(snapshot_data, target_brand=target_brand, prompt_base=prompt_base)
         
         # System Instruction과 프롬프트 결합
         full_prompt = f"{system_instruction}\n\n{prompt}"
@@ -702,7 +723,8 @@ def generate_trend_analysis_from_snapshot(
     snapshot_data: Dict,
     api_key: Optional[str] = None,
     target_brand: Optional[str] = None,
-    platform: str = "29CM"
+    platform: str = "29CM",
+    prompt_base: Optional[Dict] = None
 ) -> Dict:
     """
     스냅샷 데이터에 AI 분석 리포트를 추가하여 반환
@@ -711,6 +733,7 @@ def generate_trend_analysis_from_snapshot(
         snapshot_data: 트렌드 스냅샷 데이터
         api_key: Gemini API 키
         target_brand: 분석 타겟 브랜드명 (한글명, None이면 자동 감지)
+        prompt_base: 업체 공통 프롬프트 재료 (build_trend_prompt_base 결과)
     
     Returns:
         AI 분석 리포트가 추가된 snapshot_data
@@ -721,7 +744,8 @@ def generate_trend_analysis_from_snapshot(
             snapshot_data,
             api_key=api_key,
             target_brand=target_brand,
-            platform=platform
+            platform=platform,
+            prompt_base=prompt_base
         )
         
         if analysis_text:
@@ -843,6 +867,15 @@ def generate_ai_analysis_from_file(
         
         blob.upload_from_string(compressed_bytes, content_type='application/gzip')
         print(f"✅ [DEBUG] GCS 업로드 완료. 파일 크기: {len(compressed_bytes):,} bytes", file=sys.stderr)
+        
+        # Columnar 스냅샷(탭별 Parquet + manifest)도 AI 분석 포함 내용으로 다시 저장
+        # (실패해도 manifest의 JSON generation 불일치로 로더가 JSON을 사용하므로 리포트는 유지됨)
+        if "tabs_data" in snapshot_data:
+            try:
+                from ngn_wep.dashboard.services.trend_rank_diff import write_trend_snapshot_columnar
+                write_trend_snapshot_columnar(bucket, blob_path, snapshot_data, json_generation=blob.generation)
+            except ImportError as e:
+                print(f"⚠️ [WARN] Columnar 스냅샷 갱신 건너뜀: {e}", file=sys.stderr)
     else:
         print(f"📤 [INFO] 로컬 파일 저장 중: {output_path}", file=sys.stderr)
         with open(output_path, 'w', encoding='utf-8') as f:
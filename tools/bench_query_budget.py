@@ -0,0 +1,355 @@
+"""
+대시보드 서비스 쿼리 예산(스캔 bytes) 점검 / 파티션 프루닝 회귀 검사
+
+- dry run 모드 (기본, BigQuery 인증 필요 / 과금 없음)
+  1) 패널 서비스 함수를 대표 파라미터(BENCH_COMPANY, 종료일 BENCH_END_DATE, 기간 BENCH_DAYS일)로 호출
+     - cached_query 우회 (__wrapped__), bq_query.dry_run_capture()로 run_query 호출을 dry run으로 대체
+  2) 쿼리별 예상 처리 bytes를 tools/query_budgets.json의 예산과 비교 → 초과 시 실패
+     (키: "<시나리오>#<시나리오 안 쿼리 순번>", 예산 = 기록 시점 bytes × (1 + BENCH_BUDGET_HEADROOM))
+  3) 날짜 시나리오는 1일 조회도 dry run → 1일 bytes / BENCH_DAYS일 bytes 비율이 BENCH_PRUNE_MAX_RATIO 이상이면
+     파티션 프루닝이 안 되는 쿼리로 보고 실패 (전체 스캔이 의도된 쿼리는 예산 항목에 "allow_full_scan": true)
+  4) 실제 실행될 SQL에 lint 규칙 적용 (경고)
+- lint 모드 (--lint-only, BigQuery/Flask 없이 실행 가능)
+  서비스 소스의 SQL 문자열 리터럴(f-string 포함)에 lint 규칙 적용 → 파일:줄 출력
+- lint 규칙
+  - lower_company_filter : LOWER(company_name) = / IN 필터 (컬럼에 함수 적용 → 클러스터링/프루닝 무력화)
+  - format_date_select   : SELECT / ORDER BY 안의 FORMAT_DATE (문자열 정렬·집계, 날짜 컬럼 그대로 반환 권장)
+  - tables_metadata      : __TABLES__ 메타 테이블 조회 (레거시 메타데이터, 쿼리마다 별도 스캔)
+
+사용법:
+  python3 -m tools.bench_query_budget                 # dry run + 예산/프루닝 점검
+  python3 -m tools.bench_query_budget --update        # 측정값으로 예산 파일 갱신 (커밋해서 변화 추적)
+  python3 -m tools.bench_query_budget --lint-only
+  BENCH_COMPANY=demo BENCH_DAYS=28 BENCH_ONLY=cafe24_sales,viewitem_summary python3 -m tools.bench_query_budget
+"""
+import os
+import re
+import ast
+import sys
+import json
+import math
+import argparse
+import contextlib
+import datetime
+import subprocess
+from pathlib import Path
+
+BENCH_COMPANY = os.environ.get("BENCH_COMPANY", "demo")
+BENCH_USER_ID = os.environ.get("BENCH_USER_ID", "demo")
+BENCH_END_DATE = os.environ.get("BENCH_END_DATE", "")  # 기본: 어제
+BENCH_DAYS = int(os.environ.get("BENCH_DAYS", 28))
+BENCH_ONLY = [s for s in os.environ.get("BENCH_ONLY", "").split(",") if s]
+BENCH_BUDGET_HEADROOM = float(os.environ.get("BENCH_BUDGET_HEADROOM", 0.2))
+BENCH_MIN_BUDGET_BYTES = int(os.environ.get("BENCH_MIN_BUDGET_BYTES", 10 * 1024 ** 2))
+BENCH_PRUNE_MAX_RATIO = float(os.environ.get("BENCH_PRUNE_MAX_RATIO", 0.5))
+# 이보다 작은 쿼리는 프루닝 검사 생략 (작은 테이블은 비율이 의미 없음)
+BENCH_PRUNE_MIN_BYTES = int(os.environ.get("BENCH_PRUNE_MIN_BYTES", 100 * 1024 ** 2))
+BENCH_HISTORY = 10
+
+ROOT = Path(__file__).resolve().parent.parent
+SERVICES_DIR = ROOT / "ngn_wep" / "dashboard" / "services"
+BUDGET_FILE = Path(os.environ.get("BENCH_BUDGET_FILE", Path(__file__).resolve().parent / "query_budgets.json"))
+
+MB = 1024 ** 2
+
+
+# ============================================================
+# lint 규칙
+# ============================================================
+
+_LINT_RULES = {
+    "lower_company_filter": "LOWER(company_name) 필터 → company_name = @company_name (값은 파이썬에서 소문자 정규화)",
+    "format_date_select": "SELECT/ORDER BY의 FORMAT_DATE → 날짜 컬럼 그대로 반환/정렬, 포맷은 파이썬에서",
+    "tables_metadata": "__TABLES__ 조회 → INFORMATION_SCHEMA.PARTITIONS 또는 캐시된 값 사용",
+}
+
+_SQL_COMMENT_RE = re.compile(r"--[^\n]*|/\*.*?\*/", re.S)
+_SQL_STRING_RE = re.compile(r"'(?:[^'\\\n]|\\.)*'|\"(?:[^\"\\\n]|\\.)*\"")
+_LOWER_COMPANY_RE = re.compile(r"\bLOWER\s*\(\s*(?:\w+\.)?company_name\s*\)\s*(?:=|!=|<>|(?:NOT\s+)?IN\b)", re.I)
+_TABLES_META_RE = re.compile(r"\b__TABLES__\b")
+_CLAUSE_TOKEN_RE = re.compile(
+    r"\(|\)|\b(SELECT|FROM|WHERE|GROUP\s+BY|HAVING|ORDER\s+BY|QUALIFY|LIMIT|JOIN|ON|UNION)\b|\bFORMAT_DATE\s*(?=\()",
+    re.I,
+)
+
+
+def _blank(match) -> str:
+    # 위치(줄 번호)가 유지되도록 같은 길이의 공백으로 치환
+    return re.sub(r"[^\n]", " ", match.group(0))
+
+
+def lint_sql(sql: str):
+    """SQL 텍스트의 lint 위반 목록 [(rule, 줄 번호(0부터), 절)]"""
+    text = _SQL_COMMENT_RE.sub(_blank, sql)
+    text = _SQL_STRING_RE.sub(lambda m: m.group(0)[0] + " " * (len(m.group(0)) - 2) + m.group(0)[-1], text)
+
+    findings = []
+    for m in _LOWER_COMPANY_RE.finditer(text):
+        findings.append(("lower_company_filter", text.count("\n", 0, m.start()), "WHERE"))
+    for m in _TABLES_META_RE.finditer(text):
+        findings.append(("tables_metadata", text.count("\n", 0, m.start()), "FROM"))
+
+    # 괄호 깊이별 현재 절 추적 (서브쿼리/함수 인자는 바깥 절을 물려받고, 안에서 SELECT 등이 나오면 갱신)
+    clauses = [None]
+    for m in _CLAUSE_TOKEN_RE.finditer(text):
+        token = m.group(0)
+        if token == "(":
+            clauses.append(clauses[-1])
+        elif token == ")":
+            if len(clauses) > 1:
+                clauses.pop()
+        elif m.group(1):
+            clauses[-1] = re.sub(r"\s+", " ", m.group(1).upper())
+        elif clauses[-1] in ("SELECT", "ORDER BY", None):
+            # None: 절을 알 수 없는 SQL 조각 (파이썬에서 조립되는 표현식) → 보고
+            findings.append(("format_date_select", text.count("\n", 0, m.start()), clauses[-1] or "?"))
+    return sorted(findings, key=lambda f: f[1])
+
+
+def _string_nodes(tree):
+    """모듈의 문자열 리터럴 (f-string은 치환부를 {}로 둔 텍스트)"""
+    fstring_parts = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.JoinedStr):
+            parts = []
+            for value in node.values:
+                fstring_parts.add(id(value))
+                parts.append(value.value if isinstance(value, ast.Constant) and isinstance(value.value, str) else "{}")
+            yield node.lineno, "".join(parts)
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Constant) and isinstance(node.value, str) and id(node) not in fstring_parts:
+            yield node.lineno, node.value
+
+
+def lint_sources(paths):
+    findings = []
+    for path in paths:
+        try:
+            tree = ast.parse(path.read_text(encoding="utf-8"), filename=str(path))
+        except SyntaxError as e:
+            print(f"⚠️ [LINT] 파싱 실패: {path}: {e}", file=sys.stderr)
+            continue
+        for lineno, text in _string_nodes(tree):
+            for rule, offset, clause in lint_sql(text):
+                findings.append((path.relative_to(ROOT), lineno + offset, rule, clause))
+    return sorted(set(findings))
+
+
+def print_lint(findings, label: str):
+    print(f"\n[LINT] {label}: {len(findings)}건", file=sys.stderr)
+    for location, rule, clause in findings:
+        print(f"  {location:<60s} {rule:<22s} ({clause})", file=sys.stderr)
+    for rule in sorted({f[1] for f in findings}):
+        print(f"  - {rule}: {_LINT_RULES[rule]}", file=sys.stderr)
+
+
+# ============================================================
+# 시나리오 (대표 파라미터)
+# ============================================================
+
+def _scenarios():
+    """(이름, 함수 로더, 인자 생성(start, end), 날짜 범위 사용 여부) — 서비스 import는 시나리오별로 지연"""
+    company, user_id = BENCH_COMPANY, BENCH_USER_ID
+
+    def load(module: str, name: str):
+        def loader():
+            mod = __import__(f"ngn_wep.dashboard.services.{module}", fromlist=[name])
+            fn = getattr(mod, name)
+            return getattr(fn, "__wrapped__", fn)  # cached_query 우회
+        return loader
+
+    return [
+        ("performance_summary_new", load("performance_summary_new", "get_performance_summary_new"),
+         lambda s, e: ((company, s, e), {"user_id": user_id}), True),
+        ("cafe24_sales", load("cafe24_service", "get_cafe24_sales_data"),
+         lambda s, e: ((company, "manual", s, e), {"user_id": user_id}), True),
+        ("cafe24_sales_daily", load("cafe24_service", "get_cafe24_sales_data"),
+         lambda s, e: ((company, "manual", s, e), {"date_type": "daily", "user_id": user_id}), True),
+        ("cafe24_product_sales", load("cafe24_service", "get_cafe24_product_sales"),
+         lambda s, e: ((company, "manual", s, e), {"user_id": user_id}), True),
+        ("product_sales_ratio", load("product_sales_ratio", "get_product_sales_ratio"),
+         lambda s, e: ((company, s, e), {"user_id": user_id}), True),
+        ("ga4_source_summary", load("ga4_source_summary", "get_ga4_source_summary"),
+         lambda s, e: ((company, s, e), {}), True),
+        ("viewitem_summary", load("viewitem_summary", "get_viewitem_summary"),
+         lambda s, e: ((company, s, e), {}), True),
+        ("meta_ads_data", load("meta_ads_service", "get_meta_ads_data"),
+         lambda s, e: ((company, "manual", s, e), {}), True),
+        ("meta_ads_insight_table", load("meta_ads_insight", "get_meta_ads_insight_table"),
+         lambda s, e: (("account", company, s, e), {}), True),
+        ("meta_ads_insight_daily", load("meta_ads_insight", "get_meta_ads_insight_table"),
+         lambda s, e: (("account", company, s, e), {"date_type": "daily"}), True),
+        ("platform_sales_by_day", load("platform_sales_summary", "get_platform_sales_by_day"),
+         lambda s, e: (([company], s, e), {}), True),
+        ("platform_sales_ratio", load("platform_sales_summary", "get_platform_sales_ratio"),
+         lambda s, e: (([company], s, e), {}), True),
+        ("monthly_platform_sales", load("platform_sales_summary", "get_monthly_platform_sales"),
+         lambda s, e: (([company],), {}), False),
+        ("monthly_net_sales_visitors", load("monthly_net_sales_visitors", "get_monthly_net_sales_visitors"),
+         lambda s, e: ((company,), {}), False),
+    ]
+
+
+def capture(loader, make_args, start: str, end: str):
+    """시나리오 1회 dry run → (캡처된 쿼리 목록, 오류 메시지)"""
+    from ngn_wep.dashboard.utils.bq_query import dry_run_capture
+
+    error = None
+    # 서비스 디버그 print(SQL 전문 등)는 버림
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull), dry_run_capture() as captured:
+        try:
+            args, kwargs = make_args(start, end)
+            loader()(*args, **kwargs)
+        except Exception as e:
+            # 빈 결과 처리 중 오류가 나도 그 전까지 캡처된 쿼리는 유효
+            error = f"{type(e).__name__}: {e}"
+    return captured, error
+
+
+# ============================================================
+# 예산 파일
+# ============================================================
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, timeout=10).stdout.strip() or "unknown"
+    except (OSError, subprocess.SubprocessError):
+        return "unknown"
+
+
+def load_budgets() -> dict:
+    if not BUDGET_FILE.exists():
+        return {}
+    with open(BUDGET_FILE, encoding="utf-8") as f:
+        return json.load(f).get("queries", {})
+
+
+def save_budgets(queries: dict):
+    data = {
+        "_comment": "python3 -m tools.bench_query_budget --update 로 생성. budget_bytes는 직접 조정 가능",
+        "params": {"company": BENCH_COMPANY, "days": BENCH_DAYS, "headroom": BENCH_BUDGET_HEADROOM},
+        "queries": dict(sorted(queries.items())),
+    }
+    with open(BUDGET_FILE, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+        f.write("\n")
+
+
+def _budget_for(bytes_processed: int) -> int:
+    raw = max(bytes_processed * (1 + BENCH_BUDGET_HEADROOM), BENCH_MIN_BUDGET_BYTES)
+    return int(math.ceil(raw / MB) * MB)
+
+
+# ============================================================
+# main
+# ============================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="서비스 쿼리 스캔 bytes 예산 / 프루닝 점검")
+    parser.add_argument("--lint-only", action="store_true", help="BigQuery 없이 서비스 소스 SQL lint만 실행")
+    parser.add_argument("--update", action="store_true", help="측정값으로 예산 파일 갱신")
+    parser.add_argument("--strict", action="store_true", help="예산 미등록 쿼리 / lint 위반도 실패 처리")
+    opts = parser.parse_args()
+
+    if opts.lint_only:
+        paths = sorted(p for p in SERVICES_DIR.glob("*.py") if "backup" not in p.name)
+        findings = lint_sources(paths)
+        print_lint([(f"{path}:{line}", rule, clause) for path, line, rule, clause in findings], "서비스 소스")
+        if opts.strict and findings:
+            sys.exit(1)
+        return
+
+    end = datetime.date.fromisoformat(BENCH_END_DATE) if BENCH_END_DATE else \
+        datetime.date.today() - datetime.timedelta(days=1)
+    start = end - datetime.timedelta(days=BENCH_DAYS - 1)
+    print(f"[BENCH] company={BENCH_COMPANY} 기간 {start}~{end} ({BENCH_DAYS}일), 예산 파일 {BUDGET_FILE}",
+          file=sys.stderr)
+
+    budgets = load_budgets()
+    commit = _git_commit()
+    measured, failures, lint_findings, seen_shapes = {}, [], [], set()
+
+    for name, loader, make_args, dated in _scenarios():
+        if BENCH_ONLY and name not in BENCH_ONLY:
+            continue
+        captured, error = capture(loader, make_args, start.isoformat(), end.isoformat())
+        if error:
+            print(f"⚠️ [BENCH] {name}: {error}", file=sys.stderr)
+        if not captured:
+            failures.append(f"{name}: 캡처된 쿼리 없음")
+            continue
+
+        narrow = {}
+        if dated:
+            narrow_captured, _ = capture(loader, make_args, end.isoformat(), end.isoformat())
+            narrow = {i: q["bytes_processed"] for i, q in enumerate(narrow_captured)}
+
+        for i, q in enumerate(captured):
+            key = f"{name}#{i}"
+            bytes_processed = q["bytes_processed"]
+            entry = budgets.get(key, {})
+            budget = entry.get("budget_bytes")
+            measured[key] = (q, entry)
+
+            status = "ok"
+            if budget is None:
+                status = "NEW"
+                if opts.strict:
+                    failures.append(f"{key}: 예산 미등록")
+            elif bytes_processed > budget:
+                status = "OVER"
+                failures.append(f"{key}: {bytes_processed / MB:.1f}MB > 예산 {budget / MB:.1f}MB "
+                                f"(기록 {entry.get('commit', '?')}: {entry.get('last_bytes', 0) / MB:.1f}MB)")
+
+            ratio = None
+            if i in narrow and bytes_processed >= BENCH_PRUNE_MIN_BYTES:
+                ratio = narrow[i] / bytes_processed
+                if ratio >= BENCH_PRUNE_MAX_RATIO and not entry.get("allow_full_scan"):
+                    status = "NO_PRUNE" if status == "ok" else status + ",NO_PRUNE"
+                    failures.append(f"{key}: 1일 조회가 {BENCH_DAYS}일 조회의 {ratio:.0%} 스캔 "
+                                    f"(파티션 프루닝 안 됨, tables={q['referenced_tables']})")
+
+            shape_note = " (SQL 변경)" if entry.get("shape_id") not in (None, q["shape_id"]) else ""
+            budget_text = f"{budget / MB:9.1f}MB" if budget is not None else f"{'-':>11s}"
+            ratio_text = f"{ratio:6.0%}" if ratio is not None else f"{'-':>6s}"
+            print(f"  {key:<30s} {bytes_processed / MB:9.1f}MB / {budget_text}  1일비 {ratio_text}  "
+                  f"{status}{shape_note}", file=sys.stderr)
+
+            if q["shape_id"] not in seen_shapes:
+                seen_shapes.add(q["shape_id"])
+                lint_findings += [(f"{key}:{line + 1}", rule, clause) for rule, line, clause in lint_sql(q["query"])]
+
+    if lint_findings:
+        print_lint(lint_findings, "실행 SQL")
+        if opts.strict:
+            failures.append(f"lint 위반 {len(lint_findings)}건")
+
+    if opts.update:
+        for key, (q, entry) in measured.items():
+            history = (entry.get("history", []) + [{"commit": commit, "bytes": q["bytes_processed"]}])[-BENCH_HISTORY:]
+            budgets[key] = {
+                **entry,
+                "service": q["service"],
+                "shape_id": q["shape_id"],
+                "referenced_tables": q["referenced_tables"],
+                "last_bytes": q["bytes_processed"],
+                "budget_bytes": _budget_for(q["bytes_processed"]),
+                "commit": commit,
+                "history": history,
+            }
+        save_budgets(budgets)
+        print(f"\n[BENCH] 예산 {len(measured)}건 갱신 → {BUDGET_FILE} (commit {commit})", file=sys.stderr)
+        return
+
+    total = sum(q["bytes_processed"] for q, _ in measured.values())
+    print(f"\n[BENCH] 쿼리 {len(measured)}건, 예상 스캔 합계 {total / MB:.1f}MB", file=sys.stderr)
+    if failures:
+        print(f"❌ [BENCH] 실패 {len(failures)}건", file=sys.stderr)
+        for failure in failures:
+            print(f"  - {failure}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
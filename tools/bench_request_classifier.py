@@ -0,0 +1,173 @@
+"""
+모바일 판정 / 요청 디버그 로그 마이크로벤치마크
+
+- 합성 부하: User-Agent 풀(BENCH_UA_POOL개)에서 BENCH_REQUESTS건 요청 생성 (일부는 screen_width 파라미터 포함)
+- 비교 대상
+  1) 기존 app.is_mobile_device (요청마다 키워드 리스트/정규식 컴파일 + 디버그 print 4줄, 출력은 /dev/null)
+  2) request_classifier.is_mobile_request (미리 컴파일 + User-Agent LRU) + log_event (DEBUG 꺼짐)
+  3) 2)와 같지만 DEBUG 켜짐 (출력은 NullHandler)
+- 두 방식의 판정 결과가 모두 같은지 확인
+
+사용법:
+  python3 -m tools.bench_request_classifier
+  BENCH_REQUESTS=200000 BENCH_UA_POOL=50 python3 -m tools.bench_request_classifier
+"""
+import os
+import re
+import sys
+import time
+import random
+import logging
+import contextlib
+
+from ngn_wep.dashboard.utils.request_classifier import classify_request, is_mobile_request, is_mobile_user_agent
+from ngn_wep.dashboard.utils.log_utils import DEBUG, log_event
+
+BENCH_REQUESTS = int(os.environ.get("BENCH_REQUESTS", 100_000))
+BENCH_UA_POOL = int(os.environ.get("BENCH_UA_POOL", 200))
+BENCH_SEED = int(os.environ.get("BENCH_SEED", 42))
+
+_UA_TEMPLATES = [
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/{v}.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_{m}) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.{m} Safari/605.1.15",
+    "Mozilla/5.0 (iPhone; CPU iPhone OS 17_{m} like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.{m} Mobile/15E148 Safari/604.1",
+    "Mozilla/5.0 (Linux; Android 14; SM-S91{m}N) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/{v}.0.0.0 Mobile Safari/537.36",
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) HeadlessChrome/{v}.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:12{m}.0) Gecko/20100101 Firefox/12{m}.0",
+]
+
+
+class FakeRequest:
+    __slots__ = ("headers", "args")
+
+    def __init__(self, user_agent, accept, args):
+        self.headers = {"User-Agent": user_agent, "Accept": accept}
+        self.args = args
+
+
+def legacy_is_mobile_device(request) -> bool:
+    """기존 app.is_mobile_device (비교 기준, Flask request 대신 FakeRequest)"""
+    user_agent = request.headers.get('User-Agent', '').lower()
+
+    mobile_keywords = [
+        'mobile', 'android', 'iphone', 'ipad', 'blackberry', 'windows phone',
+        'opera mini', 'opera mobi', 'mobile safari', 'mobile chrome',
+        'samsung', 'lg', 'huawei', 'xiaomi', 'oneplus', 'motorola',
+        'nexus', 'pixel', 'galaxy', 'note', 'edge', 'plus',
+        'kindle', 'nook', 'tablet', 'phone', 'smartphone',
+        'chrome mobile', 'firefox mobile', 'safari mobile'
+    ]
+
+    print(f"[MOBILE DETECTION] User-Agent: {user_agent}")
+    print(f"[MOBILE DETECTION] Mobile keywords found: {[kw for kw in mobile_keywords if kw in user_agent]}")
+
+    screen_width = request.args.get('screen_width')
+    if screen_width:
+        try:
+            width = int(screen_width)
+            if width <= 768:
+                print(f"[MOBILE DETECTION] Screen width detected: {width}px (mobile)")
+                return True
+        except ValueError:
+            pass
+
+    is_mobile_ua = any(keyword in user_agent for keyword in mobile_keywords)
+
+    accept_header = request.headers.get('Accept', '').lower()
+    is_mobile_accept = 'application/vnd.wap.xhtml+xml' in accept_header or 'text/vnd.wap.wml' in accept_header
+
+    mobile_patterns = [
+        r'mozilla/.*mobile',
+        r'mozilla/.*android.*mobile',
+        r'mozilla/.*iphone.*mobile',
+        r'mozilla/.*ipad.*mobile',
+        r'chrome/.*mobile',
+        r'firefox/.*mobile',
+        r'safari/.*mobile',
+        r'android.*mobile',
+        r'iphone.*mobile',
+        r'ipad.*mobile'
+    ]
+    is_mobile_pattern = any(re.search(pattern, user_agent, re.IGNORECASE) for pattern in mobile_patterns)
+
+    viewport_width = request.args.get('viewport_width')
+    if viewport_width:
+        try:
+            width = int(viewport_width)
+            if width <= 768:
+                print(f"[MOBILE DETECTION] Viewport width detected: {width}px (mobile)")
+                return True
+        except ValueError:
+            pass
+
+    is_mobile = is_mobile_ua or is_mobile_accept or is_mobile_pattern
+
+    print(f"[MOBILE DETECTION] UA-based: {is_mobile_ua}, Accept-based: {is_mobile_accept}, Pattern-based: {is_mobile_pattern}")
+    print(f"[MOBILE DETECTION] Final Result: {is_mobile}")
+
+    return is_mobile
+
+
+def make_requests(rng: random.Random, n: int, pool: int):
+    user_agents = [
+        rng.choice(_UA_TEMPLATES).format(v=rng.randint(100, 130), m=rng.randint(0, 9)) + f" build/{i}"
+        for i in range(pool)
+    ]
+    accept = "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8"
+    reqs = []
+    for _ in range(n):
+        args = {}
+        r = rng.random()
+        if r < 0.05:
+            args["screen_width"] = str(rng.choice([375, 390, 1280, 1920]))
+        elif r < 0.08:
+            args["viewport_width"] = str(rng.choice([360, 1440]))
+        reqs.append(FakeRequest(rng.choice(user_agents), accept, args))
+    return reqs
+
+
+def run(label, fn, reqs):
+    start = time.perf_counter()
+    results = [fn(r) for r in reqs]
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<44s} {elapsed * 1000:9.1f} ms  {elapsed / len(reqs) * 1e6:7.2f} µs/req", file=sys.stderr)
+    return results, elapsed
+
+
+def main():
+    rng = random.Random(BENCH_SEED)
+    reqs = make_requests(rng, BENCH_REQUESTS, BENCH_UA_POOL)
+    print(f"[BENCH] 요청 {len(reqs):,}건 / User-Agent {BENCH_UA_POOL}종", file=sys.stderr)
+
+    logger = logging.getLogger("bench.request")
+    logger.addHandler(logging.NullHandler())
+    logger.propagate = False
+
+    def new_path(req):
+        is_mobile = is_mobile_request(req)
+        if logger.isEnabledFor(DEBUG):
+            log_event(logger, DEBUG, "MOBILE DETECTION", result=is_mobile,
+                      user_agent=req.headers.get("User-Agent", ""), **classify_request(req))
+        return is_mobile
+
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        legacy, t_legacy = run("legacy (print -> /dev/null)", legacy_is_mobile_device, reqs)
+
+    is_mobile_user_agent.cache_clear()
+    logger.setLevel(logging.INFO)
+    new, t_new = run("classifier + log_event (DEBUG off)", new_path, reqs)
+    logger.setLevel(logging.DEBUG)
+    _, t_debug = run("classifier + log_event (DEBUG on)", new_path, reqs)
+
+    mismatches = sum(1 for a, b in zip(legacy, new) if a != b)
+    info = is_mobile_user_agent.cache_info()
+    print(f"\n[BENCH] UA 캐시: hits={info.hits:,}, misses={info.misses:,}, size={info.currsize}", file=sys.stderr)
+    print(f"[BENCH] 판정 불일치: {mismatches}건 / speedup x{t_legacy / t_new:.1f} (DEBUG off), "
+          f"x{t_legacy / t_debug:.1f} (DEBUG on)", file=sys.stderr)
+    if mismatches:
+        print("❌ [BENCH] 판정 결과가 기존 구현과 다름", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -30,7 +30,8 @@ from dashboard.services.compare_29cm_service import (
     get_competitor_brands,
     get_own_brand_id,
     load_best_ranking_dict,
-    collect_and_save_brand_results,
+    crawl_brands,
+    collect_and_save_company_brands,
     load_search_results_from_gcs,
 )
 
@@ -86,6 +87,7 @@ def save_snapshot_to_gcs(run_id: str, snapshot_data: Dict[str, Any]) -> bool:
     """
     try:
         from dashboard.services.compare_29cm_service import get_compare_snapshot_path
+        from dashboard.utils.columnar_snapshot import write_columnar_snapshot
         
         # company_name 추출
         company_name = snapshot_data.get("company_name")
@@ -103,6 +105,14 @@ def save_snapshot_to_gcs(run_id: str, snapshot_data: Dict[str, Any]) -> bool:
         bucket = client.bucket(GCS_BUCKET)
         blob = bucket.blob(blob_path)
         blob.upload_from_string(compressed_bytes, content_type='application/gzip')
+        # 서비스 저장 경로와 같이 브랜드별 row group Columnar 스냅샷도 저장
+        write_columnar_snapshot(
+            bucket,
+            blob_path,
+            snapshot_data.get("search_results") or {},
+            meta={k: v for k, v in snapshot_data.items() if k != "search_results"},
+            json_generation=blob.generation,
+        )
         
         print(f"[INFO] 스냅샷 저장 완료: {blob_path}")
         return True
@@ -130,69 +140,47 @@ def main():
         companies = get_all_companies()
         print(f"[INFO] 자사몰 {len(companies)}개 발견")
 
-        # 4. 각 자사몰별로 브랜드 데이터 수집 (자사몰 + 경쟁사)
-        all_results = {}
+        # 4. 자사몰별 수집 대상 브랜드 (자사몰 + 경쟁사)
+        brand_plans: Dict[str, List[Dict[str, Any]]] = {}
 
         for company_name in companies:
-            print(f"\n[INFO] === {company_name} 처리 시작 ===")
+            brands = []
 
-            collected_brands = []
-
-            # 1. 자사몰 브랜드 ID 조회 및 수집
             own_brand_id = get_own_brand_id(company_name)
             if own_brand_id:
-                print(f"[INFO] 자사몰 브랜드 ID: {own_brand_id}")
-
-                brand_name = collect_and_save_brand_results(
-                    company_name=company_name,
-                    brand_id=own_brand_id,
-                    run_id=run_id,
-                    best_dict=best_dict,
-                    is_own_mall=True
-                )
-
-                if brand_name:
-                    collected_brands.append({
-                        "brand_id": own_brand_id,
-                        "brand_name": brand_name,
-                        "is_own_mall": True
-                    })
+                print(f"[INFO] {company_name} 자사몰 브랜드 ID: {own_brand_id}")
+                brands.append({"brand_id": own_brand_id, "is_own_mall": True})
             else:
                 print(f"[WARN] {company_name}의 자사몰 브랜드 ID 없음")
 
-            # 2. 경쟁사 브랜드 조회 및 수집
             competitor_brands = get_competitor_brands(company_name)
             if not competitor_brands:
                 print(f"[WARN] {company_name}의 경쟁사 브랜드 없음")
             else:
-                print(f"[INFO] 경쟁사 브랜드 {len(competitor_brands)}개 발견")
-
-                for brand_info in competitor_brands:
-                    brand_id = brand_info["brand_id"]
-                    display_name = brand_info.get("display_name") or brand_info.get("brand_name")
-
-                    print(f"[INFO] 경쟁사 수집: brand_id={brand_id}")
-
-                    # 브랜드 ID로 상품 수집 및 저장
-                    brand_name = collect_and_save_brand_results(
-                        company_name=company_name,
-                        brand_id=brand_id,
-                        run_id=run_id,
-                        best_dict=best_dict,
-                        is_own_mall=False
-                    )
-
-                    if brand_name:
-                        collected_brands.append({
-                            "brand_id": brand_id,
-                            "brand_name": brand_name,
-                            "is_own_mall": False
-                        })
+                print(f"[INFO] {company_name} 경쟁사 브랜드 {len(competitor_brands)}개 발견")
+                brands.extend({"brand_id": b["brand_id"], "is_own_mall": False} for b in competitor_brands)
+
+            brand_plans[company_name] = brands
 
+        # 5. 전체 브랜드 병렬 수집 (자사몰 간 중복 브랜드/상품은 1회만 호출)
+        crawled = crawl_brands(b["brand_id"] for brands in brand_plans.values() for b in brands)
+
+        # 6. 자사몰별 매칭 및 스냅샷 저장 (자사몰당 1회 저장)
+        all_results = {}
+
+        for company_name, brands in brand_plans.items():
+            print(f"\n[INFO] === {company_name} 처리 시작 ===")
+            collected_brands = collect_and_save_company_brands(
+                company_name=company_name,
+                brands=brands,
+                run_id=run_id,
+                best_dict=best_dict,
+                crawled=crawled,
+            )
             if collected_brands:
                 all_results[company_name] = collected_brands
 
-        # 5. 완료 메시지
+        # 7. 완료 메시지
         if all_results:
             print(f"\n[INFO] ✅ 전체 수집 완료 ({len(all_results)}개 자사몰)")
             for company_name, brands in all_results.items():
@@ -72,7 +72,7 @@ if gcloud run jobs describe "$JOB" --region="$REGION_RUN" --project="$PROJECT" &
     --cpu=2 \
     --max-retries=3 \
     --task-timeout=3600s \
-    --update-env-vars="GOOGLE_CLOUD_PROJECT=${PROJECT},GCS_BUCKET=winged-precept-443218-v8.appspot.com,RUNNING_IN_CLOUD_RUN=true,GEMINI_API_KEY=${GEMINI_API_KEY}" \
+    --update-env-vars="GOOGLE_CLOUD_PROJECT=${PROJECT},GCS_BUCKET=winged-precept-443218-v8.appspot.com,RUNNING_IN_CLOUD_RUN=true,TREND_SNAPSHOT_CONCURRENCY=4,GEMINI_API_KEY=${GEMINI_API_KEY}" \
     --project="$PROJECT"
 else
   echo "새 Job 생성 중..."
@@ -84,7 +84,7 @@ else
     --cpu=2 \
     --max-retries=3 \
     --task-timeout=3600s \
-    --set-env-vars="GOOGLE_CLOUD_PROJECT=${PROJECT},GCS_BUCKET=winged-precept-443218-v8.appspot.com,RUNNING_IN_CLOUD_RUN=true,GEMINI_API_KEY=${GEMINI_API_KEY}" \
+    --set-env-vars="GOOGLE_CLOUD_PROJECT=${PROJECT},GCS_BUCKET=winged-precept-443218-v8.appspot.com,RUNNING_IN_CLOUD_RUN=true,TREND_SNAPSHOT_CONCURRENCY=4,GEMINI_API_KEY=${GEMINI_API_KEY}" \
     --project="$PROJECT"
 fi
 
@@ -0,0 +1,353 @@
+"""
+크롭 결과 캐시 (Content-addressed)
+- 키: sha256(모델 버전 + 이미지 URL) → 같은 이미지는 YOLO를 다시 돌리지 않음
+- 저장소: GCS (기본, CROP_CACHE_BUCKET - 미설정 시 GCS_BUCKET/프로젝트 기본 버킷)
+  - 인스턴스 간 공유 + scale-to-zero 후에도 유지 → 크롭 ID/URL 응답은 GCS 저장소일 때만 사용
+  - CROP_CACHE_BUCKET="" 또는 GCS 초기화 실패 시 로컬 디스크(CROP_CACHE_DIR)
+    → 다른 인스턴스에서 /crops URL이 404가 되므로 응답은 예전처럼 data_url(inline)
+  - 로컬: Cloud Run의 /tmp는 메모리 기반 → CROP_CACHE_MAX_MB 초과 시 오래된 항목부터 삭제(LRU)
+- 메모리 매니페스트 캐시도 CROP_MANIFEST_CACHE_SIZE 개로 제한(LRU)
+- 응답에는 base64 대신 크롭 ID/URL만 내려보냄
+"""
+import os
+import json
+import time
+import hashlib
+import shutil
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+# 크롭 파라미터(conf, imgsz, 마진, 비율 필터 등)를 바꾸면 버전을 올려서 기존 캐시 무효화
+MODEL_VERSION = os.environ.get("CROP_MODEL_VERSION", "yolov8n-crop-v1")
+
+# 상품 페이지(상품명 + 이미지 URL 목록) 캐시 유효 시간 - 상세페이지는 바뀔 수 있으므로 짧게
+PAGE_CACHE_TTL = int(os.environ.get("PAGE_CACHE_TTL", 6 * 3600))
+
+CROP_CACHE_DIR = os.environ.get("CROP_CACHE_DIR", "/tmp/image_extractor_cache")
+CROP_CACHE_BUCKET = os.environ.get(
+    "CROP_CACHE_BUCKET", os.environ.get("GCS_BUCKET", "winged-precept-443218-v8.appspot.com")
+)
+CROP_CACHE_PREFIX = os.environ.get("CROP_CACHE_PREFIX", "image_extractor")
+CROP_CACHE_MAX_BYTES = int(os.environ.get("CROP_CACHE_MAX_MB", 256)) * 1024 * 1024
+CROP_MANIFEST_CACHE_SIZE = int(os.environ.get("CROP_MANIFEST_CACHE_SIZE", 2048))
+
+
+def image_key(img_url: str) -> str:
+    """이미지 URL + 모델 버전 해시 (크롭 결과 키)"""
+    raw = f"{MODEL_VERSION}|{img_url.strip()}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32]
+
+
+def page_key(page_url: str, selectors: list) -> str:
+    """상품 페이지 URL + 선택자 해시 (페이지 결과 키)"""
+    raw = f"{page_url.strip()}|{json.dumps(selectors, ensure_ascii=False)}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32]
+
+
+def crop_name(index: int) -> str:
+    return f"{index}.jpg"
+
+
+class LocalCropStore:
+    """
+    로컬 디스크 저장소 (Cloud Run에서는 인스턴스 수명 동안 유지)
+    - shared=False: 인스턴스 로컬이므로 크롭 URL 대신 inline 응답
+    - 크롭 키 디렉토리(crops/<key>)와 페이지 파일(pages/<key>.json) 단위로 크기 집계
+    - max_bytes 초과 시 가장 오래 사용되지 않은 단위부터 삭제, on_evict(key) 호출
+    - 인덱스는 프로세스별 (다른 워커가 지운 파일은 조회 시 미스로 처리)
+    """
+
+    shared = False
+
+    def __init__(self, root: str, max_bytes: int = CROP_CACHE_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.on_evict = None
+        self._index: "OrderedDict[tuple, int]" = OrderedDict()  # (kind, key) -> bytes (LRU 순서)
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        os.makedirs(os.path.join(root, "crops"), exist_ok=True)
+        os.makedirs(os.path.join(root, "pages"), exist_ok=True)
+        self._load_index()
+
+    def _path(self, *parts) -> str:
+        return os.path.join(self.root, *parts)
+
+    def _load_index(self):
+        """기존 디스크 파일로 인덱스 복원 (수정 시간 오래된 순)"""
+        entries = []
+        crops_dir = self._path("crops")
+        for key in os.listdir(crops_dir):
+            key_dir = os.path.join(crops_dir, key)
+            size, mtime = 0, 0.0
+            for name in os.listdir(key_dir) if os.path.isdir(key_dir) else []:
+                try:
+                    st = os.stat(os.path.join(key_dir, name))
+                except OSError:
+                    continue
+                size += st.st_size
+                mtime = max(mtime, st.st_mtime)
+            entries.append((mtime, ("crops", key), size))
+
+        pages_dir = self._path("pages")
+        for name in os.listdir(pages_dir):
+            if not name.endswith(".json"):
+                continue
+            try:
+                st = os.stat(os.path.join(pages_dir, name))
+            except OSError:
+                continue
+            entries.append((st.st_mtime, ("pages", name[:-len(".json")]), st.st_size))
+
+        for _, unit, size in sorted(entries):
+            self._index[unit] = size
+            self._total_bytes += size
+
+    def _unit_path(self, unit: tuple) -> str:
+        kind, key = unit
+        return self._path("crops", key) if kind == "crops" else self._path("pages", f"{key}.json")
+
+    def _touch(self, unit: tuple):
+        with self._lock:
+            if unit in self._index:
+                self._index.move_to_end(unit)
+
+    def _account(self, unit: tuple, added: int):
+        """단위 크기 반영 후 용량 초과분 삭제"""
+        with self._lock:
+            self._total_bytes += added
+            self._index[unit] = self._index.get(unit, 0) + added
+            self._index.move_to_end(unit)
+
+            evicted = []
+            while self._total_bytes > self.max_bytes and len(self._index) > 1:
+                old_unit, size = self._index.popitem(last=False)
+                self._total_bytes -= size
+                evicted.append(old_unit)
+
+        for old_unit in evicted:
+            path = self._unit_path(old_unit)
+            if old_unit[0] == "crops":
+                shutil.rmtree(path, ignore_errors=True)
+                if self.on_evict is not None:
+                    self.on_evict(old_unit[1])
+            else:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def _read(self, unit: tuple, path: str) -> Optional[bytes]:
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        self._touch(unit)
+        return data
+
+    def _write(self, unit: tuple, path: str, data: bytes):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        try:
+            previous = os.path.getsize(path)
+        except OSError:
+            previous = 0
+        # 임시 파일에 쓰고 rename → 동시 요청이 반쯤 쓰인 파일을 읽지 않도록
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        self._account(unit, len(data) - previous)
+
+    def read_manifest(self, key: str) -> Optional[bytes]:
+        return self._read(("crops", key), self._path("crops", key, "manifest.json"))
+
+    def write_manifest(self, key: str, data: bytes):
+        self._write(("crops", key), self._path("crops", key, "manifest.json"), data)
+
+    def read_crop(self, key: str, name: str) -> Optional[bytes]:
+        return self._read(("crops", key), self._path("crops", key, name))
+
+    def write_crop(self, key: str, name: str, data: bytes):
+        self._write(("crops", key), self._path("crops", key, name), data)
+
+    def read_page(self, key: str) -> Optional[bytes]:
+        return self._read(("pages", key), self._path("pages", f"{key}.json"))
+
+    def write_page(self, key: str, data: bytes):
+        self._write(("pages", key), self._path("pages", f"{key}.json"), data)
+
+
+class GCSCropStore:
+    """GCS 저장소 (인스턴스 간 공유)"""
+
+    shared = True
+
+    def __init__(self, bucket_name: str, prefix: str):
+        from google.cloud import storage
+
+        self.bucket = storage.Client().bucket(bucket_name)
+        self.prefix = prefix.strip("/")
+
+    def _blob(self, *parts):
+        return self.bucket.blob("/".join([self.prefix, *parts]))
+
+    def _read(self, blob) -> Optional[bytes]:
+        from google.api_core.exceptions import NotFound
+
+        try:
+            return blob.download_as_bytes()
+        except NotFound:
+            return None
+
+    def read_manifest(self, key: str) -> Optional[bytes]:
+        return self._read(self._blob("crops", key, "manifest.json"))
+
+    def write_manifest(self, key: str, data: bytes):
+        self._blob("crops", key, "manifest.json").upload_from_string(data, content_type="application/json")
+
+    def read_crop(self, key: str, name: str) -> Optional[bytes]:
+        return self._read(self._blob("crops", key, name))
+
+    def write_crop(self, key: str, name: str, data: bytes):
+        blob = self._blob("crops", key, name)
+        blob.cache_control = "public, max-age=31536000, immutable"
+        blob.upload_from_string(data, content_type="image/jpeg")
+
+    def read_page(self, key: str) -> Optional[bytes]:
+        return self._read(self._blob("pages", f"{key}.json"))
+
+    def write_page(self, key: str, data: bytes):
+        self._blob("pages", f"{key}.json").upload_from_string(data, content_type="application/json")
+
+
+class CropCache:
+    """크롭 매니페스트/바이트 캐시 (저장소 앞단에 작은 메모리 LRU)"""
+
+    def __init__(self, store, max_manifests: int = CROP_MANIFEST_CACHE_SIZE):
+        self.store = store
+        self.max_manifests = max_manifests
+        self._manifests: "OrderedDict[str, dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        if hasattr(store, "on_evict"):
+            # 로컬 저장소에서 크롭이 삭제되면 메모리 매니페스트도 버림 (없는 크롭 URL 응답 방지)
+            store.on_evict = self._forget
+
+    def _remember(self, key: str, manifest: dict):
+        with self._lock:
+            self._manifests[key] = manifest
+            self._manifests.move_to_end(key)
+            while len(self._manifests) > self.max_manifests:
+                self._manifests.popitem(last=False)
+
+    def _forget(self, key: str):
+        with self._lock:
+            self._manifests.pop(key, None)
+
+    # ---------- 이미지 단위 (박스 + 크롭) ----------
+    def get_image(self, key: str) -> Optional[dict]:
+        with self._lock:
+            cached = self._manifests.get(key)
+            if cached is not None:
+                self._manifests.move_to_end(key)
+        if cached is not None:
+            return cached
+
+        try:
+            raw = self.store.read_manifest(key)
+        except Exception as e:
+            print(f"[WARN] 크롭 캐시 조회 실패 ({key}): {e}")
+            return None
+        if raw is None:
+            return None
+
+        manifest = json.loads(raw)
+        if manifest.get("model_version") != MODEL_VERSION:
+            return None
+
+        self._remember(key, manifest)
+        return manifest
+
+    def put_image(self, key: str, img_url: str, boxes: list, crops: list, fallback: Optional[dict]) -> dict:
+        """
+        crops/fallback: [{"jpeg": bytes, "width": int, "height": int}, ...]
+        매니페스트는 크롭 파일을 모두 쓴 뒤 마지막에 기록 (매니페스트가 있으면 크롭도 있음)
+        """
+        manifest = {
+            "model_version": MODEL_VERSION,
+            "image_url": img_url,
+            "boxes": boxes,
+            "crops": [],
+            "fallback": None,
+            "created_at": int(time.time()),
+        }
+
+        index = 0
+        for crop in crops:
+            name = crop_name(index)
+            self.store.write_crop(key, name, crop["jpeg"])
+            manifest["crops"].append({"name": name, "width": crop["width"], "height": crop["height"]})
+            index += 1
+
+        if fallback is not None:
+            name = crop_name(index)
+            self.store.write_crop(key, name, fallback["jpeg"])
+            manifest["fallback"] = {"name": name, "width": fallback["width"], "height": fallback["height"]}
+
+        self.store.write_manifest(key, json.dumps(manifest, ensure_ascii=False).encode("utf-8"))
+        self._remember(key, manifest)
+        return manifest
+
+    def read_crop(self, key: str, name: str) -> Optional[bytes]:
+        return self.store.read_crop(key, name)
+
+    # ---------- 페이지 단위 (상품명 + 이미지 URL 목록) ----------
+    def get_page(self, key: str) -> Optional[dict]:
+        try:
+            raw = self.store.read_page(key)
+        except Exception as e:
+            print(f"[WARN] 페이지 캐시 조회 실패 ({key}): {e}")
+            return None
+        if raw is None:
+            return None
+
+        page = json.loads(raw)
+        if time.time() - page.get("created_at", 0) > PAGE_CACHE_TTL:
+            return None
+        return page
+
+    def put_page(self, key: str, product_name: str, img_urls: list):
+        page = {
+            "product_name": product_name,
+            "img_urls": img_urls,
+            "created_at": int(time.time()),
+        }
+        try:
+            self.store.write_page(key, json.dumps(page, ensure_ascii=False).encode("utf-8"))
+        except Exception as e:
+            print(f"[WARN] 페이지 캐시 저장 실패 ({key}): {e}")
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_crop_cache() -> CropCache:
+    """CropCache 싱글톤 (환경변수에 따라 GCS/로컬 선택)"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                store = None
+                if CROP_CACHE_BUCKET:
+                    try:
+                        store = GCSCropStore(CROP_CACHE_BUCKET, CROP_CACHE_PREFIX)
+                        print(f"[INFO] 크롭 캐시: gs://{CROP_CACHE_BUCKET}/{CROP_CACHE_PREFIX}")
+                    except Exception as e:
+                        print(f"[ERROR] 크롭 캐시 GCS 초기화 실패: {e} - 로컬 캐시 + inline 응답으로 폴백")
+                if store is None:
+                    print(f"[INFO] 크롭 캐시: {CROP_CACHE_DIR} (최대 {CROP_CACHE_MAX_BYTES // (1024 * 1024)}MB)")
+                    store = LocalCropStore(CROP_CACHE_DIR)
+                _cache = CropCache(store)
+    return _cache
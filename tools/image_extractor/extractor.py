@@ -19,6 +19,8 @@ from selenium.webdriver.chrome.service import Service
 # YOLO 모델 (Nano - 속도/비용 최적화)
 from ultralytics import YOLO
 
+from crop_cache import get_crop_cache, image_key, page_key
+
 model = None
 
 
@@ -31,11 +33,16 @@ def get_model():
     return model
 
 
-def pil_to_base64(img: Image.Image, quality: int = 90) -> str:
-    """PIL 이미지를 Base64 문자열로 변환"""
+def pil_to_jpeg(img: Image.Image, quality: int = 90) -> bytes:
+    """PIL 이미지를 JPEG 바이트로 변환"""
     buffered = BytesIO()
     img.save(buffered, format="JPEG", quality=quality)
-    b64 = base64.b64encode(buffered.getvalue()).decode()
+    return buffered.getvalue()
+
+
+def jpeg_to_data_url(data: bytes) -> str:
+    """JPEG 바이트를 Base64 data URL로 변환"""
+    b64 = base64.b64encode(data).decode()
     return f"data:image/jpeg;base64,{b64}"
 
 
@@ -167,20 +174,27 @@ def extract_product_name(page_url: str, headers: dict) -> str:
         return "product"
 
 
-def smart_slice_by_yolo(img: Image.Image) -> list:
-    """YOLO로 이미지에서 사람/상품 영역 감지 후 크롭"""
+def smart_slice_by_yolo(img: Image.Image) -> tuple:
+    """
+    YOLO로 이미지에서 사람/상품 영역 감지 후 크롭
+
+    Returns:
+        (boxes, crops) - boxes: 감지된 원본 박스 [[x1, y1, x2, y2], ...]
+                         crops: [{"jpeg": bytes, "width": int, "height": int}, ...]
+    """
+    boxes_data = []
     results_data = []
 
     # 가로로 너무 긴 이미지 스킵 (배너 등)
     if img.width > img.height * 2.5:
-        return results_data
+        return boxes_data, results_data
 
     yolo = get_model()
     results = yolo.predict(img, conf=0.25, imgsz=1024, verbose=False)
     boxes = results[0].boxes
 
     if not boxes:
-        return results_data
+        return boxes_data, results_data
 
     # Y좌표 기준 정렬 (위에서 아래로)
     xyxy_list = sorted(boxes.xyxy.cpu().numpy(), key=lambda box: box[1])
@@ -188,6 +202,7 @@ def smart_slice_by_yolo(img: Image.Image) -> list:
 
     for box in xyxy_list:
         x1, y1, x2, y2 = map(int, box[:4])
+        boxes_data.append([x1, y1, x2, y2])
 
         # 너무 작은 영역 스킵
         if (y2 - y1) < 150:
@@ -207,10 +222,8 @@ def smart_slice_by_yolo(img: Image.Image) -> list:
         if not (0.5 <= ratio <= 1.5):
             continue
 
-        # Base64 data URL로 변환
-        data_url = pil_to_base64(cropped)
         results_data.append({
-            "data_url": data_url,
+            "jpeg": pil_to_jpeg(cropped),
             "width": cropped.width,
             "height": cropped.height
         })
@@ -219,7 +232,76 @@ def smart_slice_by_yolo(img: Image.Image) -> list:
         if saved_count >= 12:
             break
 
-    return results_data
+    return boxes_data, results_data
+
+
+def make_fallback(img: Image.Image):
+    """YOLO가 못 찾았을 때 쓸 원본 이미지 (조건 불충족 시 None)"""
+    if img.width < 400 or img.height < 400:
+        return None
+
+    ratio = img.width / img.height
+    if not (0.4 <= ratio <= 2.0):
+        return None
+
+    # 리사이즈
+    if img.width > 1200:
+        new_height = int(img.height * (1200 / img.width))
+        img = img.resize((1200, new_height), Image.LANCZOS)
+
+    return {"jpeg": pil_to_jpeg(img), "width": img.width, "height": img.height}
+
+
+def process_image(session: requests.Session, img_url: str, headers: dict) -> dict:
+    """
+    이미지 1장 처리 (캐시 우선)
+    - 캐시 히트: 다운로드/YOLO 없이 매니페스트 반환
+    - 캐시 미스: 다운로드 → YOLO 크롭 → 캐시에 저장
+    """
+    cache = get_crop_cache()
+    key = image_key(img_url)
+
+    manifest = cache.get_image(key)
+    if manifest is not None:
+        print(f"    -> 캐시 히트 ({len(manifest['crops'])}개 크롭)")
+        return {"key": key, **manifest}
+
+    response = session.get(img_url, headers=headers, timeout=15)
+    response.raise_for_status()
+
+    img = Image.open(BytesIO(response.content)).convert("RGB")
+    print(f"    이미지 크기: {img.width}x{img.height}")
+
+    # YOLO 크롭
+    boxes, crops = smart_slice_by_yolo(img)
+
+    # 폴백용: YOLO가 못 찾아도 원본 저장
+    fallback = make_fallback(img) if not crops else None
+
+    try:
+        manifest = cache.put_image(key, img_url, boxes, crops, fallback)
+    except Exception as e:
+        # 저장 실패해도 이번 요청은 인라인으로 응답할 수 있도록 바이트를 들고 있음
+        print(f"    -> 캐시 저장 실패: {e}")
+        return {"key": None, "crops": crops, "fallback": fallback}
+
+    print(f"    -> {len(crops)}개 크롭 생성")
+    return {"key": key, **manifest}
+
+
+def _to_image_ref(key, item: dict) -> dict:
+    """매니페스트 항목 → 응답용 이미지 참조 (캐시 저장 실패 시 data_url)"""
+    if key is None:
+        return {
+            "data_url": jpeg_to_data_url(item["jpeg"]),
+            "width": item["width"],
+            "height": item["height"]
+        }
+    return {
+        "id": f"{key}/{item['name']}",
+        "width": item["width"],
+        "height": item["height"]
+    }
 
 
 def extract_images_from_url(url: str, selectors: list) -> dict:
@@ -229,63 +311,59 @@ def extract_images_from_url(url: str, selectors: list) -> dict:
     Returns:
         {
             "product_name": "상품명",
-            "images": [{"data_url": "data:image/jpeg;base64,...", "width": 800, "height": 800}, ...]
+            "images": [{"id": "<image_key>/0.jpg", "width": 800, "height": 800}, ...]
         }
+        id는 crop_cache에 저장된 크롭을 가리킴 (/crops/<id> 로 조회)
     """
     headers = {
         "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
         "Referer": url
     }
 
-    # 1. 상품명 추출
-    product_name = extract_product_name(url, headers)
-    print(f"[INFO] 상품명: {product_name}")
+    cache = get_crop_cache()
+    p_key = page_key(url, selectors)
+    page = cache.get_page(p_key)
+
+    if page is not None:
+        # 재시도: Selenium 없이 이전 결과 재사용
+        product_name = page["product_name"]
+        img_urls = page["img_urls"]
+        print(f"[INFO] 페이지 캐시 히트: {product_name} ({len(img_urls)}개 이미지 URL)")
+    else:
+        # 1. 상품명 추출
+        product_name = extract_product_name(url, headers)
+        print(f"[INFO] 상품명: {product_name}")
+
+        # 2. 상세페이지 이미지 URL 수집
+        img_urls = fetch_detail_images(url, selectors)
+        print(f"[INFO] 발견된 이미지 URL 수: {len(img_urls)}")
 
-    # 2. 상세페이지 이미지 URL 수집
-    img_urls = fetch_detail_images(url, selectors)
-    print(f"[INFO] 발견된 이미지 URL 수: {len(img_urls)}")
+        if img_urls:
+            cache.put_page(p_key, product_name, img_urls)
 
     if not img_urls:
         print("[WARN] 이미지 URL을 찾지 못했습니다")
         return {"product_name": product_name, "images": []}
 
-    # 3. 각 이미지 다운로드 및 YOLO 처리
+    # 3. 각 이미지 다운로드 및 YOLO 처리 (캐시 우선)
     all_images = []
     fallback_images = []
 
-    for seq, img_url in enumerate(img_urls[:15], 1):
-        print(f"[{seq}] 처리 중: {img_url[:80]}...")
-
-        try:
-            response = requests.get(img_url, headers=headers, timeout=15)
-            response.raise_for_status()
-
-            img = Image.open(BytesIO(response.content)).convert("RGB")
-            print(f"    이미지 크기: {img.width}x{img.height}")
-
-            # YOLO 크롭
-            cropped_images = smart_slice_by_yolo(img)
-            all_images.extend(cropped_images)
-
-            # 폴백용: YOLO가 못 찾아도 원본 저장
-            if not cropped_images and img.width >= 400 and img.height >= 400:
-                ratio = img.width / img.height
-                if 0.4 <= ratio <= 2.0 and len(fallback_images) < 8:
-                    # 리사이즈
-                    if img.width > 1200:
-                        new_height = int(img.height * (1200 / img.width))
-                        img = img.resize((1200, new_height), Image.LANCZOS)
-                    fallback_images.append({
-                        "data_url": pil_to_base64(img),
-                        "width": img.width,
-                        "height": img.height
-                    })
-
-            print(f"    -> {len(cropped_images)}개 크롭 생성")
-
-        except Exception as e:
-            print(f"    -> 오류: {e}")
-            continue
+    with requests.Session() as session:
+        for seq, img_url in enumerate(img_urls[:15], 1):
+            print(f"[{seq}] 처리 중: {img_url[:80]}...")
+
+            try:
+                result = process_image(session, img_url, headers)
+            except Exception as e:
+                print(f"    -> 오류: {e}")
+                continue
+
+            key = result["key"]
+            all_images.extend(_to_image_ref(key, crop) for crop in result["crops"])
+
+            if result["fallback"] is not None and len(fallback_images) < 8:
+                fallback_images.append(_to_image_ref(key, result["fallback"]))
 
     # YOLO 결과가 없으면 폴백 이미지 사용
     if not all_images and fallback_images:
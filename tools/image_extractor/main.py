@@ -4,14 +4,22 @@
 - Cloud Run 서비스로 배포 (min-instances=0)
 """
 import os
+import re
 import json
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 from flask_cors import CORS
+from werkzeug.middleware.proxy_fix import ProxyFix
 from google.cloud import bigquery
-from extractor import extract_images_from_url
+from extractor import extract_images_from_url, jpeg_to_data_url
+from crop_cache import get_crop_cache
 
 app = Flask(__name__)
 CORS(app)  # 모든 도메인에서 접근 허용
+# Cloud Run 프록시 뒤에서 https 크롭 URL을 만들기 위해 X-Forwarded-* 반영
+app.wsgi_app = ProxyFix(app.wsgi_app, x_proto=1, x_host=1)
+
+# 크롭 ID 형식: <32자리 hex 키>/<n>.jpg
+CROP_ID_PATTERN = re.compile(r"^[0-9a-f]{32}/\d+\.jpg$")
 
 # BigQuery 클라이언트
 bq_client = bigquery.Client()
@@ -53,6 +61,52 @@ def health():
     return {"status": "ok"}
 
 
+def resolve_image_refs(images: list, inline: bool) -> list:
+    """
+    크롭 ID → 응답용 URL (inline=True면 예전처럼 data_url로 변환)
+    - 공유 저장소(GCS)가 아니면 항상 inline (다른 인스턴스/재시작 후 /crops URL이 404)
+    """
+    cache = get_crop_cache()
+    inline = inline or not cache.store.shared
+    base_url = request.host_url.rstrip("/")
+    resolved = []
+
+    for img in images:
+        crop_id = img.get("id")
+        if not crop_id:
+            # 캐시 저장 실패 시 이미 data_url이 들어있음
+            resolved.append(img)
+            continue
+
+        if inline:
+            key, name = crop_id.split("/", 1)
+            data = cache.read_crop(key, name)
+            if data is None:
+                continue
+            resolved.append({"data_url": jpeg_to_data_url(data), "width": img["width"], "height": img["height"]})
+        else:
+            resolved.append({**img, "url": f"{base_url}/crops/{crop_id}"})
+
+    return resolved
+
+
+@app.route("/crops/<path:crop_id>", methods=["GET"])
+def get_crop(crop_id):
+    """캐시된 크롭 이미지 (내용 주소 기반이라 변경 불가 → 장기 캐시)"""
+    if not CROP_ID_PATTERN.match(crop_id):
+        return jsonify({"success": False, "error": "잘못된 크롭 ID입니다."}), 400
+
+    key, name = crop_id.split("/", 1)
+    data = get_crop_cache().read_crop(key, name)
+    if data is None:
+        return jsonify({"success": False, "error": "크롭을 찾을 수 없습니다."}), 404
+
+    resp = Response(data, mimetype="image/jpeg")
+    resp.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+    resp.headers["ETag"] = f'"{key}-{name}"'
+    return resp
+
+
 @app.route("/extract", methods=["POST"])
 def extract():
     """
@@ -61,14 +115,15 @@ def extract():
     Request Body:
     {
         "url": "https://example.com/product/123",
-        "account_id": "1289149138367044"  (optional)
+        "account_id": "1289149138367044",  (optional)
+        "inline": false  (optional, true면 base64 data_url로 응답)
     }
 
     Response:
     {
         "success": true,
         "product_name": "상품명",
-        "images": ["data:image/jpeg;base64,...", ...],
+        "images": [{"id": "<key>/0.jpg", "url": "https://.../crops/<key>/0.jpg", "width": 800, "height": 800}, ...],
         "count": 5
     }
     """
@@ -79,6 +134,7 @@ def extract():
 
     url = data["url"]
     account_id = data.get("account_id")
+    inline = bool(data.get("inline", False))
 
     # 계정별 선택자 조회
     selectors = DEFAULT_SELECTORS
@@ -90,12 +146,13 @@ def extract():
 
     try:
         result = extract_images_from_url(url, selectors)
+        images = resolve_image_refs(result["images"], inline)
 
         return jsonify({
             "success": True,
             "product_name": result["product_name"],
-            "images": result["images"],
-            "count": len(result["images"])
+            "images": images,
+            "count": len(images)
         })
 
     except Exception as e:
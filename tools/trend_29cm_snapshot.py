@@ -16,7 +16,9 @@ import os
 import sys
 import re
 from datetime import datetime, timezone, timedelta
-from typing import Optional
+from typing import Dict, List, Optional, Tuple
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # 프로젝트 루트를 Python 경로에 추가
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -27,10 +29,16 @@ import json
 import gzip
 import io
 
+from ngn_wep.dashboard.services.trend_rank_diff import fetch_trend_rank_diff, empty_trend_lists, write_trend_snapshot_columnar
+from ngn_wep.dashboard.utils.trend_artifact_cache import publish_trend_artifact
+
 PROJECT_ID = os.environ.get("GOOGLE_CLOUD_PROJECT", "winged-precept-443218-v8")
 DATASET = "ngn_dataset"
 GCS_BUCKET = os.environ.get("GCS_BUCKET", "winged-precept-443218-v8.appspot.com")
 
+# 업체별 스냅샷 저장 + AI 분석 동시 처리 수 (Gemini 호출 수 상한)
+TREND_SNAPSHOT_CONCURRENCY = int(os.environ.get("TREND_SNAPSHOT_CONCURRENCY", 4))
+
 
 def get_current_week_run_id() -> str:
     """최신 주차 run_id 조회"""
@@ -78,154 +86,29 @@ def get_available_tabs(run_id: str) -> list:
     return [row.best_page_name for row in rows]
 
 
+@lru_cache(maxsize=4)
+def get_all_tabs_trend(run_id: str) -> dict:
+    """
+    전체 탭의 급상승/신규진입/순위하락 조회 (쿼리 1회)
+    같은 run_id는 프로세스 내에서 재사용
+    """
+    client = bigquery.Client(project=PROJECT_ID)
+    return fetch_trend_rank_diff(client, "29cm", run_id)
+
+
 def get_rising_star(tab_name: str, run_id: str) -> list:
     """급상승 랭킹 조회"""
-    client = bigquery.Client(project=PROJECT_ID)
-    
-    query = """
-    DECLARE target_tab STRING DEFAULT @tab_name;
-    DECLARE target_run_id STRING DEFAULT @run_id;
-    
-    WITH all_weeks AS (
-      SELECT DISTINCT run_id 
-      FROM `{}.{}.platform_29cm_best`
-      WHERE period_type = 'WEEKLY'
-      ORDER BY run_id DESC
-    ),
-    target_week_idx AS (
-      SELECT 
-        run_id,
-        ROW_NUMBER() OVER (ORDER BY run_id DESC) as week_idx
-      FROM all_weeks
-    ),
-    target_week_info AS (
-      SELECT week_idx
-      FROM target_week_idx
-      WHERE run_id = target_run_id
-    ),
-    weeks AS (
-      SELECT t1.run_id
-      FROM target_week_idx t1
-      CROSS JOIN target_week_info t2
-      WHERE t1.week_idx IN (t2.week_idx, t2.week_idx + 1)
-      ORDER BY t1.run_id DESC
-      LIMIT 2
-    ),
-    base_data AS (
-      SELECT *,
-        DENSE_RANK() OVER (ORDER BY run_id DESC) as week_idx,
-        REGEXP_EXTRACT(item_url, r'catalog/([0-9]+)') as product_id
-      FROM `{}.{}.platform_29cm_best`
-      WHERE period_type = 'WEEKLY' 
-        AND best_page_name = target_tab 
-        AND run_id IN (SELECT run_id FROM weeks)
-      QUALIFY ROW_NUMBER() OVER (PARTITION BY run_id, item_url ORDER BY collected_at DESC) = 1
-    ),
-    curr_week AS (SELECT * FROM base_data WHERE week_idx = 1),
-    prev_week AS (SELECT * FROM base_data WHERE week_idx = 2)
-    
-    SELECT 
-      CONCAT(curr.best_page_name, ' ', CAST(curr.rank AS STRING), '위') AS Ranking,
-      curr.brand_name AS Brand_Name,
-      curr.product_name AS Product_Name,
-      (prev.rank - curr.rank) AS Rank_Change,
-      curr.rank AS This_Week_Rank,
-      prev.rank AS Last_Week_Rank,
-      curr.thumbnail_url,
-      curr.price,
-      curr.item_url,
-      curr.run_id AS current_run_id
-    FROM curr_week curr
-    JOIN prev_week prev ON curr.product_id = prev.product_id
-    WHERE prev.rank > curr.rank
-    ORDER BY Rank_Change DESC
-    LIMIT 20
-    """.format(PROJECT_ID, DATASET, PROJECT_ID, DATASET, PROJECT_ID, DATASET)
-    
-    job_config = bigquery.QueryJobConfig(
-        query_parameters=[
-            bigquery.ScalarQueryParameter("tab_name", "STRING", tab_name),
-            bigquery.ScalarQueryParameter("run_id", "STRING", run_id)
-        ]
-    )
-    
-    rows = client.query(query, job_config=job_config).result()
-    return [dict(row) for row in rows]
+    return (get_all_tabs_trend(run_id).get(tab_name) or empty_trend_lists())["rising_star"]
 
 
 def get_new_entry(tab_name: str, run_id: str) -> list:
     """신규 진입 조회"""
-    client = bigquery.Client(project=PROJECT_ID)
-    
-    query = """
-    DECLARE target_tab STRING DEFAULT @tab_name;
-    DECLARE target_run_id STRING DEFAULT @run_id;
-    
-    WITH all_weeks AS (
-      SELECT DISTINCT run_id 
-      FROM `{}.{}.platform_29cm_best`
-      WHERE period_type = 'WEEKLY'
-      ORDER BY run_id DESC
-    ),
-    target_week_idx AS (
-      SELECT 
-        run_id,
-        ROW_NUMBER() OVER (ORDER BY run_id DESC) as week_idx
-      FROM all_weeks
-    ),
-    target_week_info AS (
-      SELECT week_idx
-      FROM target_week_idx
-      WHERE run_id = target_run_id
-    ),
-    weeks AS (
-      SELECT t1.run_id
-      FROM target_week_idx t1
-      CROSS JOIN target_week_info t2
-      WHERE t1.week_idx IN (t2.week_idx, t2.week_idx + 1)
-      ORDER BY t1.run_id DESC
-      LIMIT 2
-    ),
-    base_data AS (
-      SELECT *,
-        DENSE_RANK() OVER (ORDER BY run_id DESC) as week_idx,
-        REGEXP_EXTRACT(item_url, r'catalog/([0-9]+)') as product_id
-      FROM `{}.{}.platform_29cm_best`
-      WHERE period_type = 'WEEKLY' 
-        AND best_page_name = target_tab 
-        AND run_id IN (SELECT run_id FROM weeks)
-      QUALIFY ROW_NUMBER() OVER (PARTITION BY run_id, item_url ORDER BY collected_at DESC) = 1
-    ),
-    curr_week AS (SELECT * FROM base_data WHERE week_idx = 1),
-    prev_week AS (SELECT * FROM base_data WHERE week_idx = 2)
-    
-    SELECT 
-      CONCAT(curr.best_page_name, ' ', CAST(curr.rank AS STRING), '위') AS Ranking,
-      curr.brand_name AS Brand_Name,
-      curr.product_name AS Product_Name,
-      NULL AS Rank_Change,
-      curr.rank AS This_Week_Rank,
-      NULL AS Last_Week_Rank,
-      curr.thumbnail_url,
-      curr.price,
-      curr.item_url,
-      curr.run_id AS current_run_id
-    FROM curr_week curr
-    LEFT JOIN prev_week prev ON curr.product_id = prev.product_id
-    WHERE prev.product_id IS NULL
-    ORDER BY curr.rank ASC
-    LIMIT 20
-    """.format(PROJECT_ID, DATASET, PROJECT_ID, DATASET, PROJECT_ID, DATASET)
-    
-    job_config = bigquery.QueryJobConfig(
-        query_parameters=[
-            bigquery.ScalarQueryParameter("tab_name", "STRING", tab_name),
-            bigquery.ScalarQueryParameter("run_id", "STRING", run_id)
-        ]
-    )
-    
-    rows = client.query(query, job_config=job_config).result()
-    return [dict(row) for row in rows]
+    return (get_all_tabs_trend(run_id).get(tab_name) or empty_trend_lists())["new_entry"]
+
+
+def get_rank_drop(tab_name: str, run_id: str) -> list:
+    """순위 하락 조회"""
+    return (get_all_tabs_trend(run_id).get(tab_name) or empty_trend_lists())["rank_drop"]
 
 
 def get_company_korean_name_from_bq(company_name_en: str) -> Optional[str]:
@@ -262,6 +145,36 @@ def get_company_korean_name_from_bq(company_name_en: str) -> Optional[str]:
         return None
 
 
+def get_company_korean_names_from_bq(company_names: List[str]) -> Optional[Dict[str, str]]:
+    """
+    여러 업체의 한글명을 쿼리 1회로 조회
+
+    Returns:
+        {소문자 company_name: 한글명}, 조회 실패 시 None (호출 측에서 업체별 조회로 폴백)
+    """
+    if not company_names:
+        return {}
+    try:
+        client = bigquery.Client(project=PROJECT_ID)
+        query = """
+        SELECT LOWER(company_name) AS company_name, ANY_VALUE(korean_name) AS korean_name
+        FROM `winged-precept-443218-v8.ngn_dataset.company_info`
+        WHERE LOWER(company_name) IN UNNEST(@company_names)
+          AND korean_name IS NOT NULL
+        GROUP BY 1
+        """
+        job_config = bigquery.QueryJobConfig(
+            query_parameters=[
+                bigquery.ArrayQueryParameter("company_names", "STRING", [name.lower() for name in company_names])
+            ]
+        )
+        rows = client.query(query, job_config=job_config).result()
+        return {row.company_name: row.korean_name for row in rows if row.korean_name}
+    except Exception as e:
+        print(f"⚠️ [WARN] BigQuery에서 한글명 일괄 조회 실패: {e}", file=sys.stderr)
+        return None
+
+
 def get_all_companies_from_bq() -> list:
     """
     BigQuery company_info 테이블에서 모든 업체 목록 조회 (demo 포함)
@@ -284,81 +197,6 @@ def get_all_companies_from_bq() -> list:
         return []
 
 
-def get_rank_drop(tab_name: str, run_id: str) -> list:
-    """순위 하락 조회"""
-    client = bigquery.Client(project=PROJECT_ID)
-    
-    query = """
-    DECLARE target_tab STRING DEFAULT @tab_name;
-    DECLARE target_run_id STRING DEFAULT @run_id;
-    
-    WITH all_weeks AS (
-      SELECT DISTINCT run_id 
-      FROM `{}.{}.platform_29cm_best`
-      WHERE period_type = 'WEEKLY'
-      ORDER BY run_id DESC
-    ),
-    target_week_idx AS (
-      SELECT 
-        run_id,
-        ROW_NUMBER() OVER (ORDER BY run_id DESC) as week_idx
-      FROM all_weeks
-    ),
-    target_week_info AS (
-      SELECT week_idx
-      FROM target_week_idx
-      WHERE run_id = target_run_id
-    ),
-    weeks AS (
-      SELECT t1.run_id
-      FROM target_week_idx t1
-      CROSS JOIN target_week_info t2
-      WHERE t1.week_idx IN (t2.week_idx, t2.week_idx + 1)
-      ORDER BY t1.run_id DESC
-      LIMIT 2
-    ),
-    base_data AS (
-      SELECT *,
-        DENSE_RANK() OVER (ORDER BY run_id DESC) as week_idx,
-        REGEXP_EXTRACT(item_url, r'catalog/([0-9]+)') as product_id
-      FROM `{}.{}.platform_29cm_best`
-      WHERE period_type = 'WEEKLY' 
-        AND best_page_name = target_tab 
-        AND run_id IN (SELECT run_id FROM weeks)
-      QUALIFY ROW_NUMBER() OVER (PARTITION BY run_id, item_url ORDER BY collected_at DESC) = 1
-    ),
-    curr_week AS (SELECT * FROM base_data WHERE week_idx = 1),
-    prev_week AS (SELECT * FROM base_data WHERE week_idx = 2)
-    
-    SELECT 
-      CONCAT(curr.best_page_name, ' ', CAST(curr.rank AS STRING), '위') AS Ranking,
-      curr.brand_name AS Brand_Name,
-      curr.product_name AS Product_Name,
-      (prev.rank - curr.rank) AS Rank_Change,
-      curr.rank AS This_Week_Rank,
-      prev.rank AS Last_Week_Rank,
-      curr.thumbnail_url,
-      curr.price,
-      curr.item_url,
-      curr.run_id AS current_run_id
-    FROM curr_week curr
-    JOIN prev_week prev ON curr.product_id = prev.product_id
-    WHERE prev.rank < curr.rank
-    ORDER BY Rank_Change ASC
-    LIMIT 20
-    """.format(PROJECT_ID, DATASET, PROJECT_ID, DATASET, PROJECT_ID, DATASET)
-    
-    job_config = bigquery.QueryJobConfig(
-        query_parameters=[
-            bigquery.ScalarQueryParameter("tab_name", "STRING", tab_name),
-            bigquery.ScalarQueryParameter("run_id", "STRING", run_id)
-        ]
-    )
-    
-    rows = client.query(query, job_config=job_config).result()
-    return [dict(row) for row in rows]
-
-
 def get_snapshot_path(run_id: str, company_name: Optional[str] = None) -> str:
     """스냅샷 파일 경로 생성 (업체명 폴더 구조)"""
     match = re.match(r'(\d{4})W(\d{2})', run_id)
@@ -384,17 +222,29 @@ def get_snapshot_path(run_id: str, company_name: Optional[str] = None) -> str:
         return f"ai-reports/trend/29cm/{year}-{month:02d}-{week}/snapshot.json.gz"
 
 
-def save_snapshot_to_gcs(run_id: str, tabs_data: dict, company_name: Optional[str] = None) -> bool:
-    """스냅샷을 GCS에 저장 (업체명 폴더 구조)"""
+def build_snapshot_data(run_id: str, tabs_data: dict) -> dict:
+    """스냅샷 데이터 구조"""
+    return {
+        "run_id": run_id,
+        "current_week": run_id,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "tabs_data": tabs_data
+    }
+
+
+@lru_cache(maxsize=1)
+def _get_bucket():
+    """GCS 버킷 (업체 처리 스레드 간 클라이언트 공유)"""
+    return storage.Client(project=PROJECT_ID).bucket(GCS_BUCKET)
+
+
+def save_snapshot_to_gcs(run_id: str, tabs_data: dict, company_name: Optional[str] = None, snapshot_data: Optional[dict] = None) -> bool:
+    """스냅샷을 GCS에 저장 (업체명 폴더 구조, snapshot_data를 주면 그대로 저장)"""
     try:
         blob_path = get_snapshot_path(run_id, company_name)
         
-        snapshot_data = {
-            "run_id": run_id,
-            "current_week": run_id,
-            "created_at": datetime.now(timezone.utc).isoformat(),
-            "tabs_data": tabs_data
-        }
+        if snapshot_data is None:
+            snapshot_data = build_snapshot_data(run_id, tabs_data)
         
         # JSON 직렬화 및 Gzip 압축
         json_str = json.dumps(snapshot_data, ensure_ascii=False, indent=2)
@@ -402,10 +252,9 @@ def save_snapshot_to_gcs(run_id: str, tabs_data: dict, company_name: Optional[st
         compressed_bytes = gzip.compress(json_bytes)
         
         # GCS에 업로드
-        client = storage.Client(project=PROJECT_ID)
-        bucket = client.bucket(GCS_BUCKET)
-        blob = bucket.blob(blob_path)
+        blob = _get_bucket().blob(blob_path)
         blob.upload_from_string(compressed_bytes, content_type='application/gzip')
+        write_trend_snapshot_columnar(_get_bucket(), blob_path, snapshot_data, json_generation=blob.generation)
         
         print(f"✅ 스냅샷 저장 완료: gs://{GCS_BUCKET}/{blob_path}")
         return True
@@ -430,60 +279,123 @@ def check_snapshot_exists(run_id: str, company_name: Optional[str] = None) -> bo
         return False
 
 
-def process_single_company(run_id: str, company_name: str, tabs_data: dict, target_brand: Optional[str] = None) -> bool:
-    """단일 업체에 대한 스냅샷 저장 및 AI 분석 수행"""
-    print(f"\n{'='*60}")
-    print(f"📊 [{company_name}] 스냅샷 처리 시작")
-    print(f"{'='*60}")
+def load_trend_ai_analyst():
+    """trend_29cm_ai_analyst 모듈 (업체마다 다시 import하지 않도록 한 번만 로드)"""
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    project_root = os.path.dirname(script_dir)
+    tools_path = os.path.join(project_root, 'tools', 'ai_report_test')
+    if tools_path not in sys.path:
+        sys.path.insert(0, tools_path)
 
-    # 기존 스냅샷 확인 (무조건 강제 실행)
-    if check_snapshot_exists(run_id, company_name):
-        print(f"⚠️ 스냅샷이 이미 존재하지만 강제로 재생성합니다: {run_id} (업체: {company_name})")
+    import trend_29cm_ai_analyst
+    return trend_29cm_ai_analyst
 
-    # 스냅샷 저장 (업체명 폴더 구조)
-    print(f"💾 스냅샷 저장 중...")
-    success = save_snapshot_to_gcs(run_id, tabs_data, company_name)
 
-    if not success:
-        print(f"❌ [{company_name}] 스냅샷 생성 실패")
-        return False
+def process_single_company(
+    run_id: str,
+    company_name: str,
+    tabs_data: dict,
+    target_brand: Optional[str] = None,
+    prompt_base: Optional[dict] = None,
+    lookup_brand: bool = True
+) -> bool:
+    """
+    단일 업체에 대한 AI 분석 + 스냅샷 저장
+    - 메모리에서 AI 분석 후 한 번만 업로드 (AI 분석 실패 시에도 스냅샷은 저장)
+    - prompt_base: 업체 공통 프롬프트 재료 (process_companies에서 한 번만 계산)
+    - lookup_brand: target_brand가 없을 때 BigQuery 개별 조회 여부 (일괄 조회 성공 시 False)
+    """
+    print(f"📊 [{company_name}] 스냅샷 처리 시작")
 
-    snapshot_path = f"gs://{GCS_BUCKET}/{get_snapshot_path(run_id, company_name)}"
-    print(f"✅ 스냅샷 생성 완료: {snapshot_path}")
+    snapshot_data = build_snapshot_data(run_id, tabs_data)
 
     # AI 분석 자동 추가
-    print(f"🤖 AI 분석 리포트 생성 중...")
     try:
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        project_root = os.path.dirname(script_dir)
-        tools_path = os.path.join(project_root, 'tools', 'ai_report_test')
-        if tools_path not in sys.path:
-            sys.path.insert(0, tools_path)
-
-        from trend_29cm_ai_analyst import generate_ai_analysis_from_file
-
         # target_brand 결정
-        if not target_brand:
+        if not target_brand and lookup_brand:
             target_brand = get_company_korean_name_from_bq(company_name.lower())
 
         if target_brand:
-            generate_ai_analysis_from_file(
-                snapshot_file=snapshot_path,
-                output_file=None,
+            print(f"🤖 [{company_name}] AI 분석 리포트 생성 중... (브랜드: {target_brand})")
+            snapshot_data = load_trend_ai_analyst().generate_trend_analysis_from_snapshot(
+                snapshot_data,
                 api_key=None,
-                target_brand=target_brand
+                target_brand=target_brand,
+                prompt_base=prompt_base
             )
-            print(f"✅ AI 분석 리포트 추가 완료! (브랜드: {target_brand})")
         else:
-            print(f"⚠️ [WARN] 한글명을 찾을 수 없어 AI 리포트를 생성하지 않습니다.", file=sys.stderr)
+            print(f"⚠️ [WARN] [{company_name}] 한글명을 찾을 수 없어 AI 리포트를 생성하지 않습니다.", file=sys.stderr)
     except Exception as e:
-        print(f"⚠️ AI 분석 리포트 생성 실패 (스냅샷은 정상 저장됨): {e}", file=sys.stderr)
+        print(f"⚠️ [{company_name}] AI 분석 리포트 생성 실패 (스냅샷은 저장됨): {e}", file=sys.stderr)
         import traceback
         traceback.print_exc(file=sys.stderr)
 
+    # 스냅샷 저장 (업체명 폴더 구조)
+    if not save_snapshot_to_gcs(run_id, tabs_data, company_name, snapshot_data=snapshot_data):
+        print(f"❌ [{company_name}] 스냅샷 생성 실패")
+        return False
+
+    has_report = bool(snapshot_data.get("insights", {}).get("analysis_report"))
+    print(f"✅ [{company_name}] 스냅샷 생성 완료: gs://{GCS_BUCKET}/{get_snapshot_path(run_id, company_name)} (AI 리포트: {'O' if has_report else 'X'})")
     return True
 
 
+def process_companies(
+    run_id: str,
+    company_names: List[str],
+    tabs_data: dict,
+    target_brand: Optional[str] = None,
+    max_workers: int = TREND_SNAPSHOT_CONCURRENCY
+) -> Tuple[int, int]:
+    """
+    여러 업체 스냅샷을 병렬 처리 → (성공 수, 실패 수)
+    - 업체 공통 작업(한글명 일괄 조회, AI 모듈 로드, 공통 프롬프트 재료)은 한 번만 수행
+    - 업체별 작업(AI 호출 + 업로드)은 max_workers개까지 동시 실행
+    """
+    # 한글명 일괄 조회 (target_brand가 지정되면 모든 업체에 그대로 사용)
+    korean_names = {} if target_brand else get_company_korean_names_from_bq(company_names)
+    lookup_brand = korean_names is None
+    korean_names = korean_names or {}
+
+    # 업체 공통 프롬프트 재료
+    prompt_base = None
+    try:
+        prompt_base = load_trend_ai_analyst().build_trend_prompt_base(build_snapshot_data(run_id, tabs_data))
+    except Exception as e:
+        print(f"⚠️ [WARN] 공통 프롬프트 준비 실패 (업체별로 계산): {e}", file=sys.stderr)
+
+    def run(company_name: str) -> bool:
+        return process_single_company(
+            run_id,
+            company_name,
+            tabs_data,
+            target_brand=target_brand or korean_names.get(company_name.lower()),
+            prompt_base=prompt_base,
+            lookup_brand=lookup_brand
+        )
+
+    success_count = 0
+    fail_count = 0
+    workers = max(1, min(max_workers, len(company_names)))
+    print(f"\n🚀 [INFO] 업체 {len(company_names)}개 처리 (동시 {workers}개)")
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(run, company_name): company_name for company_name in company_names}
+        for future in as_completed(futures):
+            company_name = futures[future]
+            try:
+                ok = future.result()
+            except Exception as e:
+                print(f"❌ [{company_name}] 처리 중 오류: {e}", file=sys.stderr)
+                ok = False
+            if ok:
+                success_count += 1
+            else:
+                fail_count += 1
+
+    return success_count, fail_count
+
+
 def main():
     """메인 함수"""
     import argparse
@@ -509,21 +421,21 @@ def main():
     tabs = get_available_tabs(run_id)
     print(f"   찾은 탭: {', '.join(tabs)}")
 
-    # 각 탭별 데이터 조회 (모든 업체 공통)
+    # 전체 탭 데이터 조회 (모든 업체 공통, 쿼리 1회)
     print(f"\n📊 데이터 조회 중...")
+    all_tabs = get_all_tabs_trend(run_id)
     tabs_data = {}
 
     for tab in tabs:
-        print(f"   [{tab}] 조회 중...")
-        tabs_data[tab] = {
-            "rising_star": get_rising_star(tab, run_id),
-            "new_entry": get_new_entry(tab, run_id),
-            "rank_drop": get_rank_drop(tab, run_id)
-        }
+        print(f"   [{tab}]")
+        tabs_data[tab] = all_tabs.get(tab) or empty_trend_lists()
         print(f"      - 급상승: {len(tabs_data[tab]['rising_star'])}개")
         print(f"      - 신규진입: {len(tabs_data[tab]['new_entry'])}개")
         print(f"      - 순위하락: {len(tabs_data[tab]['rank_drop'])}개")
 
+    # 대시보드 워커가 메모리에 올릴 주간 아티팩트 게시 (전체 탭 × 3개 목록)
+    publish_trend_artifact("29cm", run_id, tabs_data, tabs=tabs)
+
     # 처리할 업체 목록 결정
     if args.company_name:
         # 특정 업체만 처리
@@ -537,16 +449,9 @@ def main():
             sys.exit(1)
         print(f"\n📌 전체 업체 처리: {', '.join(companies_to_process)}")
 
-    # 각 업체별 스냅샷 생성 및 AI 분석
-    success_count = 0
-    fail_count = 0
-
-    for company_name in companies_to_process:
-        target_brand = args.target_brand if args.company_name else None
-        if process_single_company(run_id, company_name, tabs_data, target_brand):
-            success_count += 1
-        else:
-            fail_count += 1
+    # 업체별 스냅샷 생성 및 AI 분석 (병렬)
+    target_brand = args.target_brand if args.company_name else None
+    success_count, fail_count = process_companies(run_id, companies_to_process, tabs_data, target_brand)
 
     # 최종 결과 출력
     print(f"\n{'='*60}")
@@ -20,12 +20,12 @@ import sys
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 # 서비스 함수 import
+from ngn_wep.dashboard.services.trend_rank_diff import empty_trend_lists
+from ngn_wep.dashboard.utils.trend_artifact_cache import publish_trend_artifact
 from ngn_wep.dashboard.services.trend_ably_service import (
     get_current_week_info,
     get_available_tabs,
-    get_rising_star,
-    get_new_entry,
-    get_rank_drop,
+    get_trend_lists_by_tab,
     get_trend_snapshot_path,
     save_trend_snapshot_to_gcs
 )
@@ -180,21 +180,24 @@ def main():
     tabs = get_available_tabs()
     print(f"   찾은 탭: {', '.join(tabs)}")
 
-    # 각 탭별 데이터 조회 (모든 업체 공통)
+    # 전체 탭 데이터 조회 (모든 업체 공통, 쿼리 1회)
     print(f"\n📊 데이터 조회 중...")
+    all_tabs = get_trend_lists_by_tab(run_id)
+    if all_tabs is None:
+        print("❌ 트렌드 데이터 조회에 실패했습니다.")
+        sys.exit(1)
     tabs_data = {}
 
     for tab in tabs:
-        print(f"   [{tab}] 조회 중...")
-        tabs_data[tab] = {
-            "rising_star": get_rising_star(tab),
-            "new_entry": get_new_entry(tab),
-            "rank_drop": get_rank_drop(tab)
-        }
+        print(f"   [{tab}]")
+        tabs_data[tab] = all_tabs.get(tab) or empty_trend_lists()
         print(f"      - 급상승: {len(tabs_data[tab]['rising_star'])}개")
         print(f"      - 신규진입: {len(tabs_data[tab]['new_entry'])}개")
         print(f"      - 순위하락: {len(tabs_data[tab]['rank_drop'])}개")
 
+    # 대시보드 워커가 메모리에 올릴 주간 아티팩트 게시 (전체 탭 × 3개 목록)
+    publish_trend_artifact("ably", run_id, tabs_data, tabs=tabs)
+
     # 처리할 업체 목록 결정
     if args.company_name:
         # 특정 업체만 처리